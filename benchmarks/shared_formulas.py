@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Shared-formula parse benchmark for fin123.
+
+An imported model is dominated by filled-down formulas: the same formula
+in every row of a column, differing only in its row numbers.  Parsed as
+A1 text, every copy is a distinct string, so each one is lexed, parsed and
+cached separately.  Parsed through its relative shape
+(``fin123.formulas.shared.parse_at``), a column costs one parse.
+
+Both paths parse the same formulas from a cold cache, once timed and
+once under ``tracemalloc``; the retained size is what the parse caches
+hold afterwards.
+
+Usage:
+    python benchmarks/shared_formulas.py
+    python benchmarks/shared_formulas.py --formulas 10000 300000
+
+Results saved to benchmarks/results/shared_formulas.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import gc
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Ensure fin123 is importable from source tree
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+N_FORMULA_COLS = 10
+
+
+def generate_formulas(n_formulas: int) -> list[tuple[str, int, int]]:
+    """Generate ``(text, row, col)`` for N_FORMULA_COLS filled-down columns.
+
+    Columns B-J hold inputs; formulas live in K onwards.
+    """
+    formulas = []
+    row = 0
+    while len(formulas) < n_formulas:
+        for c in range(N_FORMULA_COLS):
+            if len(formulas) == n_formulas:
+                break
+            r = row + 1
+            formulas.append((f"=B{r}*{c + 1}+IF(C{r}>0, D{r}, E{r})", row, 10 + c))
+        row += 1
+    return formulas
+
+
+def _clear_caches() -> None:
+    from fin123.formulas import parser, shared
+
+    parser._parse_cache.clear()
+    shared._shape_cache.clear()
+    shared._refs_cache.clear()
+
+
+def measure(parse) -> tuple[float, int]:
+    """Return ``(seconds, retained_bytes)`` for ``parse()`` on cold caches."""
+    _clear_caches()
+    gc.collect()
+    t0 = time.perf_counter()
+    parse()
+    elapsed = time.perf_counter() - t0
+
+    # Memory is measured on a separate run: tracing slows allocation
+    _clear_caches()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    parse()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed, after - before
+
+
+def run_point(n_formulas: int) -> dict:
+    from fin123.formulas import parse_formula
+    from fin123.formulas.shared import parse_at
+
+    # Fresh strings per formula, as a workbook load produces
+    formulas = [("".join(text), row, col) for text, row, col in generate_formulas(n_formulas)]
+
+    # Warm up lark's grammar construction outside the timed runs
+    parse_formula("=1")
+    parse_at("=A1", 0, 0)
+
+    a1_s, a1_bytes = measure(lambda: [parse_formula(t) for t, _, _ in formulas])
+    shared_s, shared_bytes = measure(lambda: [parse_at(t, r, c) for t, r, c in formulas])
+    _clear_caches()
+
+    return {
+        "formulas": n_formulas,
+        "a1_s": round(a1_s, 3),
+        "shared_s": round(shared_s, 3),
+        "speedup": round(a1_s / shared_s, 1) if shared_s else 0,
+        "a1_mb": round(a1_bytes / 2**20, 1),
+        "shared_mb": round(shared_bytes / 2**20, 2),
+        "mem_ratio": round(a1_bytes / shared_bytes, 1) if shared_bytes else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="fin123 shared-formula parse benchmark")
+    parser.add_argument(
+        "--formulas",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 50_000],
+        help="Formula counts to test",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="benchmarks/results/shared_formulas.csv",
+        help="Output CSV path",
+    )
+    args = parser.parse_args()
+
+    print()
+    print("fin123 shared-formula parse benchmark")
+    print(f"{'=' * 60}")
+    print(f"Platform: {platform.system()} {platform.machine()}")
+    print(f"Python: {platform.python_version()}")
+    print()
+    print(
+        f"{'formulas':>10} {'a1_s':>8} {'shared_s':>9} {'speedup':>8} "
+        f"{'a1_mb':>7} {'shared_mb':>10} {'mem':>7}"
+    )
+    print("-" * 64)
+
+    results = []
+    for n in args.formulas:
+        r = run_point(n)
+        results.append(r)
+        print(
+            f"{r['formulas']:>10,} {r['a1_s']:>8.3f} {r['shared_s']:>9.3f} {r['speedup']:>7.1f}x "
+            f"{r['a1_mb']:>7.1f} {r['shared_mb']:>10.2f} {r['mem_ratio']:>6.1f}x"
+        )
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0]))
+        writer.writeheader()
+        writer.writerows(results)
+
+    print()
+    print(f"Results saved to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
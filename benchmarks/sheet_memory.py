@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Sheet storage memory benchmark for the fin123 UI server.
+
+Compares the per-cell dict layout used by ``workbook.yaml``
+(``{"A1": {"formula": "..."}}``) with the compact ``SheetCells`` store the
+UI service holds sheets in.  The workload imitates an imported model:
+columns of numeric inputs, a label column, and formula columns whose text
+repeats down the rows (as Excel fill-down / shared formulas produce).
+
+Each layout is built from the same cell data under ``tracemalloc``;
+the retained size is what remains allocated after construction.  Read
+throughput is measured as ``get()`` over every address, the access
+pattern of ``CellGraph`` evaluation.
+
+Usage:
+    python benchmarks/sheet_memory.py
+    python benchmarks/sheet_memory.py --cells 100000 1000000
+
+Results saved to benchmarks/results/sheet_memory.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import gc
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Ensure fin123 is importable from source tree
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+N_COLS = 20
+
+
+def generate_cells(n_cells: int) -> dict[str, dict]:
+    """Generate deterministic sheet cells, N_COLS per row.
+
+    Column A is a label, B-J numeric inputs, K-T formulas.
+    """
+    from fin123.ui.service import make_addr
+
+    cells: dict[str, dict] = {}
+    n_rows = -(-n_cells // N_COLS)
+    for r in range(n_rows):
+        for c in range(N_COLS):
+            if len(cells) == n_cells:
+                return cells
+            addr = make_addr(r, c)
+            if c == 0:
+                cells[addr] = {"value": f"Line {r % 50}"}
+            elif c < 10:
+                cells[addr] = {"value": (r * 31 + c) % 1000 * 1.5}
+            else:
+                # The same formula in every row, relative to that row
+                cells[addr] = {"formula": f"=B{r + 1}*{c}+C{r + 1}"}
+    return cells
+
+
+def _as_yaml_loads(cells: dict[str, dict]) -> dict[str, dict]:
+    """Fresh copy without shared strings, as yaml.safe_load would return."""
+    return {
+        "".join(addr): {k: ("".join(v) if isinstance(v, str) else v) for k, v in cell.items()}
+        for addr, cell in cells.items()
+    }
+
+
+def measure(build) -> tuple[object, int]:
+    """Return ``(result, retained_bytes)`` for ``build()``."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def time_reads(cells, addrs: list[str]) -> float:
+    t0 = time.perf_counter()
+    for addr in addrs:
+        cells.get(addr)
+    return time.perf_counter() - t0
+
+
+def run_point(n_cells: int) -> dict:
+    from fin123.ui.sheet_store import SheetCells
+
+    source = generate_cells(n_cells)
+    addrs = list(source)
+
+    dict_layout, dict_bytes = measure(lambda: _as_yaml_loads(source))
+    store, store_bytes = measure(lambda: SheetCells(_as_yaml_loads(source)))
+    assert store == dict_layout
+
+    dict_read = time_reads(dict_layout, addrs)
+    store_read = time_reads(store, addrs)
+
+    return {
+        "cells": n_cells,
+        "dict_mb": round(dict_bytes / 2**20, 1),
+        "store_mb": round(store_bytes / 2**20, 1),
+        "dict_bytes_per_cell": round(dict_bytes / n_cells),
+        "store_bytes_per_cell": round(store_bytes / n_cells),
+        "ratio": round(dict_bytes / store_bytes, 2) if store_bytes else 0,
+        "dict_read_us": round(dict_read / n_cells * 1e6, 3),
+        "store_read_us": round(store_read / n_cells * 1e6, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="fin123 sheet storage memory benchmark")
+    parser.add_argument(
+        "--cells",
+        type=int,
+        nargs="+",
+        default=[100_000, 500_000, 1_000_000],
+        help="Cell counts to test",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="benchmarks/results/sheet_memory.csv",
+        help="Output CSV path",
+    )
+    args = parser.parse_args()
+
+    print()
+    print("fin123 sheet storage memory benchmark")
+    print(f"{'=' * 60}")
+    print(f"Platform: {platform.system()} {platform.machine()}")
+    print(f"Python: {platform.python_version()}")
+    print()
+    print(
+        f"{'cells':>10} {'dict_mb':>8} {'store_mb':>9} {'B/cell':>7} {'B/cell':>7} "
+        f"{'ratio':>6} {'get_us':>7} {'get_us':>7}"
+    )
+    print(f"{'':>10} {'':>8} {'':>9} {'dict':>7} {'store':>7} {'':>6} {'dict':>7} {'store':>7}")
+    print("-" * 70)
+
+    results = []
+    for n in args.cells:
+        r = run_point(n)
+        results.append(r)
+        print(
+            f"{r['cells']:>10,} {r['dict_mb']:>8.1f} {r['store_mb']:>9.1f} "
+            f"{r['dict_bytes_per_cell']:>7} {r['store_bytes_per_cell']:>7} "
+            f"{r['ratio']:>5.2f}x {r['dict_read_us']:>7.3f} {r['store_read_us']:>7.3f}"
+        )
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0]))
+        writer.writeheader()
+        writer.writerows(results)
+
+    print()
+    print(f"Results saved to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
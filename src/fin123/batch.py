@@ -2,17 +2,48 @@
 
 Runs a workbook multiple times with different parameter sets,
 loaded from a CSV file.
+
+Parallel batches run on a warm worker pool that is kept for later batches
+of the same project.  Each worker imports the engine, loads plugins and
+materializes the table graph once (see ``Workbook.warm_up``); builds it
+runs afterwards reuse that state through the plugin registry and the
+in-process table cache, which both re-check file hashes, so edits between
+batches are picked up.  ``workbook.yaml`` is likewise parsed once per
+process and re-parsed only when its text changes.
 """
 
 from __future__ import annotations
 
+import atexit
+import copy
 import csv
 import json
-from concurrent.futures import ProcessPoolExecutor
+import math
+import multiprocessing
+import threading
+from collections.abc import Callable
+from concurrent.futures import CancelledError, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import Any
 from uuid import uuid4
 
+import yaml
+
+# Warm worker pools kept across batches, by (project dir, worker count)
+_pools: dict[tuple[str, int], ProcessPoolExecutor] = {}
+# Batches currently running on each pool; busy pools are never evicted
+_pool_users: dict[tuple[str, int], int] = {}
+_pools_lock = threading.Lock()
+_MAX_POOLS = 2
+
+# This process's parsed workbook.yaml: (project dir, text, spec)
+_spec_cache: tuple[str, str, dict[str, Any]] | None = None
+
+# Chunks handed out per worker: enough to balance uneven build times while
+# amortizing the per-task round trip
+_CHUNKS_PER_WORKER = 4
+
 
 def load_params_csv(path: Path) -> list[dict[str, Any]]:
     """Load parameter sets from a CSV file.
@@ -45,6 +76,7 @@ def run_batch(
     params_rows: list[dict[str, Any]],
     scenario_name: str | None = None,
     max_workers: int = 1,
+    on_progress: Callable[[dict[str, Any], int, int], None] | None = None,
 ) -> dict[str, Any]:
     """Run a batch of workbook builds with different parameter sets.
 
@@ -53,9 +85,11 @@ def run_batch(
         params_rows: List of parameter dicts (one per build).
         scenario_name: Optional scenario to apply to each build.
         max_workers: Number of parallel workers (1 = sequential).
+        on_progress: Optional callback ``(result, done, total)`` invoked as
+            each build completes (in completion order when parallel).
 
     Returns:
-        Summary dict with batch_id, results list, and counts.
+        Summary dict with batch_id, results list (in row order), and counts.
     """
     batch_id = str(uuid4())
 
@@ -66,9 +100,11 @@ def run_batch(
     )
 
     if max_workers <= 1:
-        results = _run_sequential(project_dir, params_rows, scenario_name, batch_id)
+        results = _run_sequential(project_dir, params_rows, scenario_name, batch_id, on_progress)
     else:
-        results = _run_parallel(project_dir, params_rows, scenario_name, batch_id, max_workers)
+        results = _run_parallel(
+            project_dir, params_rows, scenario_name, batch_id, max_workers, on_progress
+        )
 
     ok_count = sum(1 for r in results if r["status"] == "ok")
     fail_count = sum(1 for r in results if r["status"] == "error")
@@ -93,12 +129,15 @@ def _run_sequential(
     params_rows: list[dict[str, Any]],
     scenario_name: str | None,
     batch_id: str,
+    on_progress: Callable[[dict[str, Any], int, int], None] | None = None,
 ) -> list[dict[str, Any]]:
     """Run builds sequentially."""
     results: list[dict[str, Any]] = []
     for idx, params in enumerate(params_rows):
         result = _run_single_build(project_dir, params, scenario_name, batch_id, idx)
         results.append(result)
+        if on_progress is not None:
+            on_progress(result, len(results), len(params_rows))
     return results
 
 
@@ -113,7 +152,11 @@ def _run_single_build(
     try:
         from fin123.workbook import Workbook
 
-        wb = Workbook(project_dir, overrides=params, scenario_name=scenario_name)
+        raw_yaml, spec = _load_spec(project_dir)
+        wb = Workbook(
+            project_dir, overrides=params, scenario_name=scenario_name,
+            raw_yaml=raw_yaml, spec=spec,
+        )
         result = wb.run()
 
         # Amend batch metadata
@@ -134,10 +177,13 @@ def _run_single_build(
         }
 
 
-def _run_single_args(args: tuple) -> dict[str, Any]:
-    """Top-level picklable function for ProcessPoolExecutor."""
-    project_dir, params, scenario_name, batch_id, index = args
-    return _run_single_build(Path(project_dir), params, scenario_name, batch_id, index)
+def _run_chunk(args: tuple) -> list[dict[str, Any]]:
+    """Top-level picklable function for ProcessPoolExecutor: run a chunk of rows."""
+    project_dir, rows, scenario_name, batch_id = args
+    return [
+        _run_single_build(Path(project_dir), params, scenario_name, batch_id, index)
+        for index, params in rows
+    ]
 
 
 def _run_parallel(
@@ -146,19 +192,168 @@ def _run_parallel(
     scenario_name: str | None,
     batch_id: str,
     max_workers: int,
+    on_progress: Callable[[dict[str, Any], int, int], None] | None = None,
 ) -> list[dict[str, Any]]:
-    """Run builds in parallel using ProcessPoolExecutor."""
-    args_list = [
-        (str(project_dir), params, scenario_name, batch_id, idx)
-        for idx, params in enumerate(params_rows)
-    ]
+    """Run builds in parallel on a warm worker pool.
+
+    Rows are handed out in chunks and collected as chunks complete; a
+    ``batch_progress`` event is emitted per chunk.
+    """
+    total = len(params_rows)
+    indexed = list(enumerate(params_rows))
+    size = max(1, math.ceil(total / (max_workers * _CHUNKS_PER_WORKER)))
+    chunks = [indexed[i:i + size] for i in range(0, total, size)]
+
+    pool = _acquire_pool(project_dir, max_workers)
     results: list[dict[str, Any]] = []
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        for result in executor.map(_run_single_args, args_list):
-            results.append(result)
+    pending = {}
+    try:
+        for chunk in chunks:
+            future = pool.submit(_run_chunk, (str(project_dir), chunk, scenario_name, batch_id))
+            pending[future] = chunk
+        for future in as_completed(pending):
+            chunk_results = future.result()
+            del pending[future]
+            for result in chunk_results:
+                results.append(result)
+                if on_progress is not None:
+                    on_progress(result, len(results), total)
+            _emit_batch_event(
+                project_dir, batch_id, "progress",
+                total=total,
+                ok=sum(1 for r in results if r["status"] == "ok"),
+                failed=sum(1 for r in results if r["status"] == "error"),
+            )
+    except (BrokenProcessPool, CancelledError) as exc:
+        # A worker died (e.g. killed by the OS) or the pool was shut down
+        # at exit; drop the pool and report the rows it did not finish
+        _discard_pool(project_dir, max_workers, pool)
+        for chunk in pending.values():
+            for index, params in chunk:
+                result = {
+                    "index": index,
+                    "status": "error",
+                    "error": f"Worker process failed: {exc}",
+                    "params": params,
+                }
+                results.append(result)
+                if on_progress is not None:
+                    on_progress(result, len(results), total)
+    finally:
+        _release_pool(project_dir, max_workers, pool)
+
+    results.sort(key=lambda r: r["index"])
     return results
 
 
+def _mp_context() -> multiprocessing.context.BaseContext:
+    """Return the start method for batch workers.
+
+    Spawn, not fork: forking a process with live Polars thread pools can
+    deadlock.  Pools persist across batches, so the slower start is paid
+    once per pool.
+    """
+    return multiprocessing.get_context("spawn")
+
+
+def _acquire_pool(project_dir: Path, max_workers: int) -> ProcessPoolExecutor:
+    """Return the warm pool for *project_dir*, starting one if needed.
+
+    The pool is marked in use until :func:`_release_pool`.  Idle pools are
+    evicted oldest first to stay within ``_MAX_POOLS``; pools with work in
+    flight are left running, and evicted once released instead.
+    """
+    key = (str(project_dir.resolve()), max_workers)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            _evict_idle_pools(_MAX_POOLS - 1)
+            pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=_mp_context(),
+                initializer=_init_worker,
+                initargs=(key[0],),
+            )
+            _pools[key] = pool
+        _pool_users[key] = _pool_users.get(key, 0) + 1
+        return pool
+
+
+def _release_pool(project_dir: Path, max_workers: int, pool: ProcessPoolExecutor) -> None:
+    """Mark one use of *pool* finished (see :func:`_acquire_pool`)."""
+    key = (str(project_dir.resolve()), max_workers)
+    with _pools_lock:
+        if _pools.get(key) is not pool:
+            return  # discarded meanwhile
+        _pool_users[key] -= 1
+        _evict_idle_pools(_MAX_POOLS)
+
+
+def _evict_idle_pools(limit: int) -> None:
+    """Shut down idle pools, oldest first, until at most *limit* remain.
+
+    Must be called with ``_pools_lock`` held.
+    """
+    for key in list(_pools):
+        if len(_pools) <= limit:
+            break
+        if _pool_users.get(key, 0) == 0:
+            _pool_users.pop(key, None)
+            _pools.pop(key).shutdown(wait=False, cancel_futures=True)
+
+
+def _discard_pool(project_dir: Path, max_workers: int, pool: ProcessPoolExecutor) -> None:
+    """Forget *pool* (if still cached) and shut it down."""
+    key = (str(project_dir.resolve()), max_workers)
+    with _pools_lock:
+        if _pools.get(key) is pool:
+            del _pools[key]
+            _pool_users.pop(key, None)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pools() -> None:
+    """Shut down all warm batch worker pools."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+        _pool_users.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+atexit.register(shutdown_pools)
+
+
+def _init_worker(project_dir: str) -> None:
+    """Process pool initializer: load the spec, engine, plugins and tables once."""
+    try:
+        from fin123.workbook import Workbook
+
+        raw_yaml, spec = _load_spec(Path(project_dir))
+        Workbook(Path(project_dir), raw_yaml=raw_yaml, spec=spec).warm_up()
+    except Exception:
+        # Each build evaluates (and reports) the error itself
+        pass
+
+
+def _load_spec(project_dir: Path) -> tuple[str, dict[str, Any]]:
+    """Return ``workbook.yaml``'s text and a private copy of its parsed spec.
+
+    The file is read on every call but only parsed when its text changed,
+    so a worker parses it once per commit rather than once per build.
+
+    Raises:
+        FileNotFoundError: If the project has no ``workbook.yaml``.
+    """
+    global _spec_cache
+    key = str(project_dir.resolve())
+    raw_yaml = (project_dir / "workbook.yaml").read_text()
+    if _spec_cache is None or _spec_cache[:2] != (key, raw_yaml):
+        _spec_cache = (key, raw_yaml, yaml.safe_load(raw_yaml))
+    return raw_yaml, copy.deepcopy(_spec_cache[2])
+
+
 def _emit_batch_event(
     project_dir: Path,
     batch_id: str,
@@ -169,7 +364,7 @@ def _emit_batch_event(
     failed: int = 0,
     scenario_name: str | None = None,
 ) -> None:
-    """Emit a batch_started or batch_completed event."""
+    """Emit a batch_started, batch_progress or batch_completed event."""
     try:
         from fin123.logging.events import (
             EventLevel,
@@ -190,6 +385,18 @@ def _emit_batch_event(
                 f"Batch started: {total} build(s), batch_id={batch_id[:8]}",
                 extra=extra,
             ))
+        elif phase == "progress":
+            emit(make_run_event(
+                EventType.batch_progress,
+                EventLevel.info,
+                f"Batch progress: {ok + failed}/{total} build(s)",
+                extra={
+                    "build_batch_id": batch_id,
+                    "total": total,
+                    "ok": ok,
+                    "failed": failed,
+                },
+            ))
         else:
             emit(make_run_event(
                 EventType.batch_completed,
@@ -221,3 +428,7 @@ def _amend_batch_meta(run_dir: Path, batch_id: str, index: int) -> None:
     meta["build_batch_id"] = batch_id
     meta["batch_index"] = index
     meta_path.write_text(json.dumps(meta, indent=2))
+
+    from fin123.run_index import RunIndex
+
+    RunIndex(run_dir.parent.parent).upsert(meta)
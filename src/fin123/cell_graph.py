@@ -1,22 +1,34 @@
 """On-demand memoized cell formula evaluator with cross-sheet support.
 
 Evaluates sheet cell formulas lazily: a cell is computed only when
-referenced, and the result is cached for the duration of one evaluation
-pass.  Detects cycles across cells (including cross-sheet) and raises
-a clear error showing the cycle path.
+referenced, and the result is cached until the cell or one of its
+precedents is edited.  Detects cycles across cells (including cross-sheet)
+and raises a clear error showing the cycle path.
 
 Also supports named ranges — rectangular regions that expand to flat
 lists of values for use in aggregate functions (SUM, AVERAGE, etc.).
+
+Edits are applied incrementally via ``recalculate``: a reverse dependency
+index (cell references plus named-range membership) identifies the
+transitive dependents of the edited cells, and only those are invalidated.
+
+Formulas are parsed through their shared relative shape
+(``formulas/shared.py``), so a filled-down column of formulas is parsed,
+compiled and dependency-scanned once rather than once per cell.
 """
 
 from __future__ import annotations
 
 import re
+from collections.abc import Iterable, Mapping
 from typing import Any
 
+import polars as pl
+
 from fin123.formulas.errors import FormulaError, FormulaRefError
 from fin123.formulas.evaluator import CellResolver, evaluate_formula
 from fin123.formulas.parser import extract_all_refs, parse_formula
+from fin123.formulas.shared import canonicalize, parse_at, shape_refs
 from fin123.ui.service import col_letter_to_index, index_to_col_letter, parse_addr, make_addr
 
 
@@ -122,6 +134,10 @@ class CellGraph:
     names : dict[str, dict[str, str]] | None
         Named ranges.  Each entry maps a name to a dict with keys
         ``sheet``, ``start``, ``end`` (e.g. ``{"sheet": "Data", "start": "B2", "end": "B10"}``).
+    params : dict[str, Any] | None
+        Scalar context for bare names in cell formulas.
+    table_cache : Mapping[str, pl.DataFrame] | None
+        Materialized tables for table functions (VLOOKUP, SUMIFS, ...).
     """
 
     def __init__(
@@ -129,14 +145,25 @@ class CellGraph:
         sheets_data: dict[str, dict[str, Any]],
         names: dict[str, dict[str, str]] | None = None,
         params: dict[str, Any] | None = None,
+        table_cache: Mapping[str, pl.DataFrame] | None = None,
     ) -> None:
         self._sheets = sheets_data  # sheet_name -> {addr: cell_dict}
         self._names = names or {}
         self._params = params or {}
+        self._table_cache = table_cache
         self._cache: dict[tuple[str, str], Any] = {}
         self._in_progress: set[tuple[str, str]] = set()
         self._eval_stack: list[tuple[str, str]] = []
+        # (row, col) of the formula being evaluated, for relative references
+        self._origin: tuple[int, int] | None = None
         self._errors: dict[tuple[str, str], str] = {}
+        # Formatted display strings; dropped with the values they render
+        self._display: dict[tuple[str, str], str] = {}
+        # Dependency index, built on first ``recalculate``
+        self._indexed = False
+        self._precedents: dict[tuple[str, str], tuple[set[tuple[str, str]], set[str]]] = {}
+        self._dependents: dict[tuple[str, str], set[tuple[str, str]]] = {}
+        self._name_dependents: dict[str, set[tuple[str, str]]] = {}
 
     # ------------------------------------------------------------------
     # CellResolver protocol implementation
@@ -146,6 +173,14 @@ class CellGraph:
         """Resolve a cell value, triggering recursive evaluation if needed."""
         return self.evaluate_cell(sheet, addr.upper())
 
+    def resolve_offset(self, sheet: str, drow: int, dcol: int) -> Any:
+        """Resolve a relative reference from the formula being evaluated."""
+        if self._origin is None:
+            raise FormulaRefError(f"R[{drow}]C[{dcol}]", available=[])
+        return self.evaluate_cell(
+            sheet, make_addr(self._origin[0] + drow, self._origin[1] + dcol)
+        )
+
     def resolve_range(self, name: str) -> list[Any]:
         """Resolve a named range to a flat list of values (row-major)."""
         if name not in self._names:
@@ -212,14 +247,17 @@ class CellGraph:
             # It's a formula — parse and evaluate
             self._in_progress.add(key)
             self._eval_stack.append(key)
+            prev_origin = self._origin
             try:
-                tree = parse_formula(raw_formula)
+                tree, self._origin = self._parse_cell_formula(sheet, addr, raw_formula)
                 # Context: empty dict — cell formulas resolve everything
                 # through the resolver (cross-sheet refs and named ranges).
                 # Scalar context is empty because cells don't have scalar params.
                 # current_sheet enables bare A1 cell refs (e.g. F2) to resolve
                 # within the sheet that owns this formula.
-                result = evaluate_formula(tree, self._params, resolver=self, current_sheet=sheet)
+                result = evaluate_formula(
+                    tree, self._params, self._table_cache, resolver=self, current_sheet=sheet
+                )
                 self._cache[key] = result
                 return result
             except CellCycleError:
@@ -230,6 +268,7 @@ class CellGraph:
                 self._cache[key] = None
                 return None
             finally:
+                self._origin = prev_origin
                 self._in_progress.discard(key)
                 if self._eval_stack and self._eval_stack[-1] == key:
                     self._eval_stack.pop()
@@ -258,7 +297,9 @@ class CellGraph:
     def get_display_value(self, sheet: str, addr: str) -> str:
         """Get a display-friendly string for a cell value.
 
-        Evaluates the cell if not yet cached, and formats the result.
+        Evaluates the cell if not yet cached, and formats the result.  The
+        string is cached until ``recalculate`` or ``invalidate`` drops the
+        cell's value.
 
         Error display codes:
             #CIRC!  — circular reference
@@ -268,8 +309,16 @@ class CellGraph:
             #NUM!   — numeric error (e.g. IRR did not converge)
             #ERR!   — any other evaluation error
         """
+        key = (sheet, addr.upper())
+        display = self._display.get(key)
+        if display is None:
+            display = self._display[key] = self._format_display(key)
+        return display
+
+    def _format_display(self, key: tuple[str, str]) -> str:
+        """Evaluate and format one cell for ``get_display_value``."""
         try:
-            val = self.evaluate_cell(sheet, addr)
+            val = self.evaluate_cell(*key)
         except CellCycleError:
             return "#CIRC!"
         except Exception:
@@ -277,7 +326,6 @@ class CellGraph:
 
         # evaluate_cell swallows errors and returns None; check stored errors.
         if val is None:
-            key = (sheet, addr)
             err_msg = self._errors.get(key)
             if err_msg is not None:
                 return classify_error_message(err_msg)
@@ -307,12 +355,199 @@ class CellGraph:
     def invalidate(self) -> None:
         """Clear all cached values and errors.
 
-        Call this when cells have been edited and need re-evaluation.
+        Call this when the workbook changed in ways ``recalculate`` does not
+        track (params, named-range definitions, sheet structure).
         """
         self._cache.clear()
+        self._display.clear()
         self._in_progress.clear()
         self._eval_stack.clear()
         self._errors.clear()
+        self._indexed = False
+        self._precedents.clear()
+        self._dependents.clear()
+        self._name_dependents.clear()
+
+    # ------------------------------------------------------------------
+    # Incremental recalculation
+    # ------------------------------------------------------------------
+
+    def recalculate(
+        self,
+        sheet: str,
+        addrs: Iterable[str],
+        cells: dict[str, Any] | None = None,
+    ) -> list[tuple[str, str]]:
+        """Re-evaluate after cells on *sheet* were edited.
+
+        The caller edits the sheet's cells dict first.  Only the edited cells
+        and their transitive dependents are invalidated.  Dependents that had
+        been computed are re-evaluated immediately so their changes can be
+        reported; the rest stay lazy.
+
+        Args:
+            sheet: Sheet containing the edited cells.
+            addrs: Addresses of the edited cells.
+            cells: The sheet's cells dict, if it was replaced rather than
+                mutated in place.
+
+        Returns:
+            Sorted ``(sheet, addr)`` keys whose computed value or error
+            changed, always including the edited cells.
+        """
+        if cells is not None:
+            self._sheets[sheet] = cells
+        self._ensure_index()
+
+        edited = [(sheet, a.upper()) for a in addrs]
+        for key in edited:
+            self._index_cell(key)
+
+        dirty = self._transitive_dependents(edited)
+        before = {
+            key: (self._cache[key], self._errors.get(key))
+            for key in dirty
+            if key in self._cache
+        }
+        for key in dirty:
+            self._cache.pop(key, None)
+            self._errors.pop(key, None)
+            self._display.pop(key, None)
+
+        changed = set(edited)
+        for key, old in before.items():
+            try:
+                value = self.evaluate_cell(*key)
+            except CellCycleError:
+                changed.add(key)
+                continue
+            new = (value, self._errors.get(key))
+            if new != old or type(new[0]) is not type(old[0]):
+                changed.add(key)
+        return sorted(changed)
+
+    def dependents_of(self, sheet: str, addr: str) -> set[tuple[str, str]]:
+        """Return the transitive dependents of one cell (excluding itself).
+
+        Args:
+            sheet: Sheet name.
+            addr: Cell address.
+
+        Returns:
+            Set of ``(sheet, addr)`` keys of formula cells that depend on it.
+        """
+        self._ensure_index()
+        key = (sheet, addr.upper())
+        return self._transitive_dependents([key]) - {key}
+
+    def _ensure_index(self) -> None:
+        """Build the forward and reverse dependency index once."""
+        if self._indexed:
+            return
+        self._indexed = True
+        for sheet_name, cells in self._sheets.items():
+            for addr in cells:
+                self._index_cell((sheet_name, addr))
+
+    def _index_cell(self, key: tuple[str, str]) -> None:
+        """(Re)record the precedents of one cell in both directions."""
+        old_cells, old_names = self._precedents.pop(key, (set(), set()))
+        for dep in old_cells:
+            self._dependents.get(dep, set()).discard(key)
+        for name in old_names:
+            self._name_dependents.get(name, set()).discard(key)
+
+        sheet, addr = key
+        cell = self._sheets.get(sheet, {}).get(addr)
+        raw = cell.get("formula") if cell else None
+        if not (isinstance(raw, str) and raw.startswith("=")):
+            return
+        ref_cells: set[tuple[str, str]] | None = None
+        shape, origin = self._cell_shape(sheet, addr, raw)
+        if shape is not None:
+            try:
+                scalar_refs, offsets = shape_refs(shape)
+            except FormulaError:
+                pass  # fall back to the A1 text below
+            else:
+                row, col = origin
+                ref_cells = {
+                    (ref_sheet or sheet, make_addr(row + dr, col + dc))
+                    for ref_sheet, dr, dc in offsets
+                }
+        if ref_cells is None:
+            try:
+                scalar_refs, cell_refs = extract_all_refs(parse_formula(raw))
+            except Exception:
+                # Unparseable formulas evaluate to an error and depend on nothing
+                return
+            ref_cells = {(ref_sheet or sheet, ref_addr) for ref_sheet, ref_addr in cell_refs}
+        ref_names = {name for name in scalar_refs if name in self._names}
+        self._precedents[key] = (ref_cells, ref_names)
+        for dep in ref_cells:
+            self._dependents.setdefault(dep, set()).add(key)
+        for name in ref_names:
+            self._name_dependents.setdefault(name, set()).add(key)
+
+    def _cell_shape(
+        self, sheet: str, addr: str, raw: str
+    ) -> tuple[str | None, tuple[int, int] | None]:
+        """Return a formula cell's shared shape and position.
+
+        Sheets held in a ``SheetCells`` store already know their shapes;
+        plain cell dicts are canonicalized here.  The shape is None when
+        the formula is parsed as written.
+        """
+        try:
+            origin = parse_addr(addr)
+        except ValueError:
+            return None, None
+        shape_of = getattr(self._sheets.get(sheet), "formula_shape", None)
+        shape = shape_of(addr) if shape_of is not None else None
+        if shape is None:
+            shape = canonicalize(raw, *origin)
+        return shape, origin
+
+    def _parse_cell_formula(
+        self, sheet: str, addr: str, raw: str
+    ) -> tuple[Any, tuple[int, int] | None]:
+        """Return the parse tree for a formula cell and its origin."""
+        shape, origin = self._cell_shape(sheet, addr, raw)
+        if origin is None:
+            return parse_formula(raw), None
+        return parse_at(raw, *origin, shape=shape), origin
+
+    def _names_containing(self, key: tuple[str, str]) -> list[str]:
+        """Return the named ranges whose rectangle contains *key*."""
+        sheet, addr = key
+        found = []
+        row, col = parse_addr(addr)
+        for name in self._name_dependents:
+            defn = self._names.get(name)
+            if not defn or defn["sheet"] != sheet:
+                continue
+            try:
+                r0, c0 = parse_addr(defn["start"])
+                r1, c1 = parse_addr(defn["end"])
+            except ValueError:
+                continue
+            if min(r0, r1) <= row <= max(r0, r1) and min(c0, c1) <= col <= max(c0, c1):
+                found.append(name)
+        return found
+
+    def _transitive_dependents(self, keys: list[tuple[str, str]]) -> set[tuple[str, str]]:
+        """Return *keys* plus every cell that depends on them, transitively."""
+        seen = set(keys)
+        stack = list(keys)
+        while stack:
+            key = stack.pop()
+            nxt = set(self._dependents.get(key, ()))
+            for name in self._names_containing(key):
+                nxt |= self._name_dependents[name]
+            for dep in nxt - seen:
+                seen.add(dep)
+                stack.append(dep)
+        return seen
 
 
 # ---------------------------------------------------------------------------
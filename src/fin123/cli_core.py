@@ -347,7 +347,14 @@ def _do_build(
         _emit(ctx, f"Scalars: {len(result.scalars)}")
         _emit(ctx, f"Tables: {', '.join(result.tables.keys())}")
         if result.timings_ms and ctx.obj.get("verbose"):
-            parts = [f"{k}={v:.1f}ms" for k, v in result.timings_ms.items()]
+            parts = [
+                f"{k}={v:.1f}ms"
+                for k, v in result.timings_ms.items()
+                if isinstance(v, (int, float))
+            ]
+            if "table_cache" in result.timings_ms:
+                stats = result.timings_ms["table_cache"]
+                parts.append(f"table_cache={stats['hits']}/{stats['hits'] + stats['misses']} hits")
             _emit(ctx, f"Timings: {', '.join(parts)}")
 
 
@@ -563,13 +570,13 @@ def diff_version(ctx: click.Context, version_a: str, version_b: str, directory:
 # ---------------------------------------------------------------------------
 
 
-def _do_verify_build(ctx: click.Context, run_id: str, directory: str) -> None:
+def _do_verify_build(ctx: click.Context, run_id: str, directory: str, use_hash_cache: bool = False) -> None:
     from fin123.logging.events import set_project_dir
     from fin123.verify import verify_run
 
     project_dir = Path(directory)
     set_project_dir(project_dir)
-    report = verify_run(project_dir, run_id)
+    report = verify_run(project_dir, run_id, use_hash_cache=use_hash_cache)
 
     if report.get("no_run"):
         if ctx.obj.get("json"):
@@ -600,14 +607,40 @@ def _do_verify_build(ctx: click.Context, run_id: str, directory: str) -> None:
         sys.exit(EXIT_VERIFY_FAIL)
 
 
+def _do_verify_all(ctx: click.Context, directory: str, max_workers: int, use_hash_cache: bool) -> None:
+    from fin123.logging.events import set_project_dir
+    from fin123.verify import verify_runs
+
+    project_dir = Path(directory)
+    set_project_dir(project_dir)
+    summary = verify_runs(project_dir, max_workers=max_workers, use_hash_cache=use_hash_cache)
+    ok = summary["failed"] == 0
+
+    if ctx.obj.get("json"):
+        click.echo(_json_out(ok, "verify", data=summary, error=None if ok else {"code": EXIT_VERIFY_FAIL, "message": "Verification failed"}))
+    else:
+        for run in summary["runs"]:
+            _emit(ctx, f"{run['status'].upper()}  {run['run_id']}")
+            for f in run["failures"]:
+                _emit(ctx, f"  FAIL: {f}")
+        _emit(ctx, f"Verified {summary['total']} build(s): {summary['passed']} passed, {summary['failed']} failed")
+
+    if not ok:
+        sys.exit(EXIT_VERIFY_FAIL)
+
+
 @main.command()
-@click.argument("path")
+@click.argument("path", required=False)
 @click.option("--project", "directory", type=click.Path(exists=True), default=".", help="Project directory.")
+@click.option("--all", "verify_all", is_flag=True, help="Verify every build in the project.")
+@click.option("--max-workers", type=int, default=1, help="Number of parallel workers for --all (1=sequential).")
+@click.option("--use-hash-cache", is_flag=True, help="Trust cached input hashes for files whose size and mtime are unchanged.")
 @click.pass_context
-def verify(ctx: click.Context, path: str, directory: str) -> None:
+def verify(ctx: click.Context, path: str | None, directory: str, verify_all: bool, max_workers: int, use_hash_cache: bool) -> None:
     """Verify the integrity of a completed build or artifact.
 
-    PATH is a run ID (e.g. 20260227T120000_run_1).
+    PATH is a run ID (e.g. 20260227T120000_run_1). With --all, every
+    build in the project is verified and a summary is printed.
 
     Lifecycle: Edit -> Commit -> Build -> *Verify*
 
@@ -615,8 +648,16 @@ def verify(ctx: click.Context, path: str, directory: str) -> None:
 
       fin123 verify 20260227T120000_run_1 --project my_model
       fin123 verify 20260227T120000_run_1 --project my_model --json
+      fin123 verify --all --project my_model --max-workers 4
     """
-    _do_verify_build(ctx, path, directory)
+    if verify_all:
+        if path:
+            raise click.UsageError("Pass either PATH or --all, not both.")
+        _do_verify_all(ctx, directory, max_workers, use_hash_cache)
+        return
+    if not path:
+        raise click.UsageError("Missing argument 'PATH' (or pass --all).")
+    _do_verify_build(ctx, path, directory, use_hash_cache)
 
 
 # Keep verify-build as hidden alias for backward compatibility
@@ -685,8 +726,19 @@ def clear_cache(ctx: click.Context, directory: str, dry_run: bool, aggressive: b
         if not dry_run:
             hash_cache_path.unlink()
 
+    from fin123.table_cache import TableCache
+
+    table_cache = TableCache(project_dir)
+    if dry_run:
+        table_cache_size = sum(
+            f.stat().st_size for f in table_cache.cache_dir.rglob("*") if f.is_file()
+        ) if table_cache.cache_dir.exists() else 0
+    else:
+        table_cache_size = table_cache.clear()
+
     if ctx.obj.get("json"):
         summary["hash_cache_cleared_bytes"] = hash_cache_size
+        summary["table_cache_cleared_bytes"] = table_cache_size
         click.echo(_json_out(True, "clear-cache", summary))
         return
 
@@ -697,7 +749,8 @@ def clear_cache(ctx: click.Context, directory: str, dry_run: bool, aggressive: b
     _emit(ctx, f"  Sync runs deleted: {summary['sync_runs_deleted']}")
     _emit(ctx, f"  Model versions deleted: {summary['model_versions_deleted']}")
     _emit(ctx, f"  Hash cache cleared: {hash_cache_size:,} bytes")
-    _emit(ctx, f"  Bytes freed: {summary['bytes_freed'] + hash_cache_size:,}")
+    _emit(ctx, f"  Table cache cleared: {table_cache_size:,} bytes")
+    _emit(ctx, f"  Bytes freed: {summary['bytes_freed'] + hash_cache_size + table_cache_size:,}")
 
 
 # ---------------------------------------------------------------------------
@@ -723,15 +776,14 @@ def export(ctx: click.Context, directory: str, fmt: str, out_path: str | None) -
 
     project_dir = Path(directory)
     run_store = RunStore(project_dir)
-    runs = run_store.list_runs()
+    run_meta = run_store.latest_run()
 
-    if not runs:
+    if run_meta is None:
         if ctx.obj.get("json"):
             click.echo(_json_out(False, "export", error={"code": EXIT_ERROR, "message": "No runs found"}))
             sys.exit(EXIT_ERROR)
         raise click.ClickException("No runs found.")
 
-    run_meta = runs[-1]
     run_dir = project_dir / "runs" / run_meta["run_id"]
     outputs_dir = run_dir / "outputs"
 
@@ -805,7 +857,14 @@ def batch_build(ctx: click.Context, directory: str, params_file: str, scenario_n
     if max_workers > 1:
         _emit(ctx, f"Parallel workers: {max_workers}")
 
-    summary = run_batch(project_dir, rows, scenario_name=scenario_name, max_workers=max_workers)
+    def on_progress(result: dict, done: int, total: int) -> None:
+        status = "OK" if result["status"] == "ok" else "FAIL"
+        _emit(ctx, f"  {done}/{total}  [{result['index']}] {status}")
+
+    summary = run_batch(
+        project_dir, rows, scenario_name=scenario_name, max_workers=max_workers,
+        on_progress=None if ctx.obj.get("json") else on_progress,
+    )
 
     if ctx.obj.get("json"):
         click.echo(_json_out(True, "batch build", summary))
@@ -1101,11 +1160,20 @@ def inspect(ctx: click.Context, result_id: str, directory: str) -> None:
         for k, v in sorted(export_rows.items()):
             _emit(ctx, f"  {k}: {v:,} rows")
     if timings:
-        total = sum(timings.values())
+        from fin123.versioning import phase_total
+
         _emit(ctx, "")
-        _emit(ctx, f"Timing: {total:.0f} ms total")
+        _emit(ctx, f"Timing: {phase_total(timings):.0f} ms total")
         for k, v in timings.items():
+            if isinstance(v, dict):
+                continue
             _emit(ctx, f"  {k}: {v:.1f} ms")
+            if k == "export_outputs":
+                for table_name, ms in timings.get("export_tables", {}).items():
+                    _emit(ctx, f"    {table_name}: {ms:.1f} ms")
+        if "table_cache" in timings:
+            stats = timings["table_cache"]
+            _emit(ctx, f"  table_cache: {stats['hits']} hits, {stats['misses']} misses")
     _emit(ctx, "")
     _emit(ctx, f"Artifact: {data['artifact_path']}")
 
@@ -3,6 +3,9 @@
 Public API::
 
     from fin123.formulas import parse_formula, extract_refs, evaluate_formula
+
+``compile_formula`` turns a parse tree into a reusable closure; it is what
+``evaluate_formula`` uses under the hood.
 """
 
 from fin123.formulas.errors import (
@@ -13,6 +16,7 @@ from fin123.formulas.errors import (
     FormulaRefError,
 )
 from fin123.formulas.evaluator import evaluate_formula
+from fin123.formulas.compiler import compile_formula
 from fin123.formulas.parser import (
     extract_all_refs,
     extract_refs,
@@ -26,6 +30,7 @@ __all__ = [
     "FormulaFunctionError",
     "FormulaParseError",
     "FormulaRefError",
+    "compile_formula",
     "evaluate_formula",
     "extract_all_refs",
     "extract_refs",
@@ -0,0 +1,412 @@
+"""Compile parsed formula trees into nested Python closures.
+
+``_eval()`` in ``evaluator.py`` walks the Lark tree on every call, comparing
+rule names and re-parsing NUMBER tokens each time.  This module turns a tree
+into a closure once, with:
+
+- number/string/boolean literals decoded at compile time,
+- constant arithmetic sub-expressions pre-folded,
+- function dispatch resolved against ``_FUNC_TABLE`` at compile time.
+
+Compiled closures take ``(ctx, tc, resolver, cs)`` and raise exactly the same
+errors as the tree-walker (``FormulaRefError``, ``ZeroDivisionError``,
+``FormulaFunctionError``, ...).  IF, IFERROR and ISERROR keep their lazy
+semantics: branches are compiled but only invoked when selected.  Errors are
+never raised at compile time; a formula like ``=1/0`` compiles to a closure
+that raises when evaluated, so ``IFERROR`` can still catch it.
+"""
+
+from __future__ import annotations
+
+import operator
+from typing import Any, Callable
+
+from lark import Token, Tree
+
+from fin123.formulas.errors import (
+    ENGINE_ERRORS,
+    FormulaError,
+    FormulaFunctionError,
+    FormulaRefError,
+)
+from fin123.formulas.evaluator import (
+    _AGGREGATE_FUNCTIONS,
+    _FUNC_TABLE,
+    _LAZY_FUNCTIONS,
+    _eval_token,
+    _flatten_args,
+    _parse_number,
+)
+from fin123.formulas.parser import parse_sheet_ref
+from fin123.formulas.shared import parse_rc_ref
+
+# A compiled formula: fn(ctx, tc, resolver, cs) -> value
+CompiledFormula = Callable[[dict, dict, Any, "str | None"], Any]
+
+# Keyed by id(tree); the tree is kept alive alongside so ids are never reused.
+_compile_cache: dict[int, tuple[Tree | Token, CompiledFormula]] = {}
+
+
+def compile_formula(tree: Tree | Token) -> CompiledFormula:
+    """Compile a parse tree into a closure, caching by tree identity.
+
+    ``parse_formula()`` caches trees by formula text, so every occurrence of
+    the same formula shares one compiled closure.
+
+    Args:
+        tree: Parse tree from ``parse_formula()``.
+
+    Returns:
+        A callable ``fn(ctx, tc, resolver, cs)`` returning the formula value.
+    """
+    entry = _compile_cache.get(id(tree))
+    if entry is not None and entry[0] is tree:
+        return entry[1]
+    fn = _compile(tree)
+    _compile_cache[id(tree)] = (tree, fn)
+    return fn
+
+
+def clear_compile_cache() -> None:
+    """Drop all compiled closures (e.g. after function table changes)."""
+    _compile_cache.clear()
+
+
+# ---------------------------------------------------------------------------
+# Node compilation
+# ---------------------------------------------------------------------------
+
+
+class _Const:
+    """Marker wrapping a compile-time constant value."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+
+def _compile(node: Tree | Token) -> CompiledFormula:
+    """Compile a node into a closure."""
+    compiled = _compile_node(node)
+    if isinstance(compiled, _Const):
+        value = compiled.value
+        return lambda ctx, tc, resolver, cs: value
+    return compiled
+
+
+def _as_fn(compiled: _Const | CompiledFormula) -> CompiledFormula:
+    """Wrap a constant marker as a closure; pass closures through."""
+    if isinstance(compiled, _Const):
+        value = compiled.value
+        return lambda ctx, tc, resolver, cs: value
+    return compiled
+
+
+def _compile_node(node: Tree | Token) -> _Const | CompiledFormula:
+    """Compile a node, returning a ``_Const`` for compile-time constants."""
+    if isinstance(node, Token):
+        return _Const(_eval_token(node))
+
+    rule = node.data
+    children = node.children
+
+    if rule == "start":
+        return _compile_node(children[0])
+
+    if rule in _BINARY_OPS:
+        return _compile_binary(rule, children)
+    if rule in ("neg", "pos", "percent"):
+        return _compile_unary(rule, children[0])
+
+    if rule == "number":
+        return _Const(_parse_number(children[0]))
+    if rule == "boolean":
+        return _Const(str(children[0]) == "TRUE")
+    if rule == "string":
+        raw = str(children[0])
+        return _Const(raw[1:-1].replace('\\"', '"').replace("\\\\", "\\"))
+
+    if rule == "cell_ref":
+        return _compile_cell_ref(str(children[0]).upper())
+    if rule == "sheet_cell_ref":
+        sheet_name, cell_addr = parse_sheet_ref(str(children[0]))
+        return _compile_sheet_cell_ref(sheet_name, cell_addr)
+
+    if rule in ("rc_ref", "sheet_rc_ref"):
+        return _compile_rc_ref(str(children[0]))
+
+    if rule in ("ref_bare", "ref_dollar"):
+        return _compile_ref(str(children[0]))
+
+    if rule == "func_call":
+        return _compile_func(node)
+
+    if rule == "args":
+        arg_fns = [_as_fn(_compile_node(child)) for child in children]
+        return lambda ctx, tc, resolver, cs: [f(ctx, tc, resolver, cs) for f in arg_fns]
+
+    def unknown(ctx: dict, tc: dict, resolver: Any, cs: str | None) -> Any:
+        raise FormulaError(f"Unknown node type: {rule}")
+
+    return unknown
+
+
+def _checked_div(left: Any, right: Any) -> Any:
+    """Division with the evaluator's zero check."""
+    if right == 0:
+        raise ZeroDivisionError("Division by zero in formula")
+    return left / right
+
+
+_BINARY_OPS: dict[str, Callable[[Any, Any], Any]] = {
+    "add": operator.add,
+    "sub": operator.sub,
+    "mul": operator.mul,
+    "div": _checked_div,
+    "pow": operator.pow,
+    "gt": operator.gt,
+    "lt": operator.lt,
+    "gte": operator.ge,
+    "lte": operator.le,
+    "eq": operator.eq,
+    "neq": operator.ne,
+}
+
+
+def _compile_binary(rule: str, children: list) -> _Const | CompiledFormula:
+    """Compile a binary operator node, folding constant operands."""
+    op = _BINARY_OPS[rule]
+    left = _compile_node(children[0])
+    right = _compile_node(children[1])
+
+    if isinstance(left, _Const) and isinstance(right, _Const):
+        try:
+            return _Const(op(left.value, right.value))
+        except Exception:
+            pass  # Defer the error to evaluation time
+
+    if isinstance(right, _Const):
+        rv = right.value
+        lf = _as_fn(left)
+        if rule == "div" and rv != 0:
+            return lambda ctx, tc, resolver, cs: lf(ctx, tc, resolver, cs) / rv
+        return lambda ctx, tc, resolver, cs: op(lf(ctx, tc, resolver, cs), rv)
+
+    rf = right
+    if isinstance(left, _Const):
+        lv = left.value
+        return lambda ctx, tc, resolver, cs: op(lv, rf(ctx, tc, resolver, cs))
+
+    lf = left
+    return lambda ctx, tc, resolver, cs: op(
+        lf(ctx, tc, resolver, cs), rf(ctx, tc, resolver, cs)
+    )
+
+
+def _compile_unary(rule: str, child: Tree | Token) -> _Const | CompiledFormula:
+    """Compile ``neg``, ``pos`` and ``percent`` nodes."""
+    if rule == "neg":
+        op: Callable[[Any], Any] = operator.neg
+    elif rule == "pos":
+        op = _identity
+    else:
+        op = _percent
+    inner = _compile_node(child)
+    if isinstance(inner, _Const):
+        try:
+            return _Const(op(inner.value))
+        except Exception:
+            pass
+    fn = _as_fn(inner)
+    if op is _identity:
+        return fn
+    return lambda ctx, tc, resolver, cs: op(fn(ctx, tc, resolver, cs))
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _percent(value: Any) -> Any:
+    return value / 100
+
+
+def _compile_cell_ref(cell_addr: str) -> CompiledFormula:
+    """Compile a bare in-sheet cell reference."""
+
+    def cell_ref(ctx: dict, tc: dict, resolver: Any, cs: str | None) -> Any:
+        if resolver is None or cs is None:
+            raise FormulaRefError(cell_addr, available=sorted(ctx.keys()))
+        return resolver.resolve_cell(cs, cell_addr)
+
+    return cell_ref
+
+
+def _compile_sheet_cell_ref(sheet_name: str, cell_addr: str) -> CompiledFormula:
+    """Compile a cross-sheet cell reference."""
+
+    def sheet_cell_ref(ctx: dict, tc: dict, resolver: Any, cs: str | None) -> Any:
+        if resolver is None:
+            raise FormulaRefError(
+                f"{sheet_name}!{cell_addr}", available=sorted(ctx.keys())
+            )
+        return resolver.resolve_cell(sheet_name, cell_addr)
+
+    return sheet_cell_ref
+
+
+def _compile_rc_ref(token: str) -> CompiledFormula:
+    """Compile a relative reference from a shared-formula shape."""
+    ref_sheet, drow, dcol = parse_rc_ref(token)
+
+    def rc_ref(ctx: dict, tc: dict, resolver: Any, cs: str | None) -> Any:
+        sheet = ref_sheet or cs
+        if resolver is None or sheet is None:
+            raise FormulaRefError(token, available=sorted(ctx.keys()))
+        return resolver.resolve_offset(sheet, drow, dcol)
+
+    return rc_ref
+
+
+def _compile_ref(name: str) -> CompiledFormula:
+    """Compile a scalar (or named range used as scalar) reference."""
+
+    def ref(ctx: dict, tc: dict, resolver: Any, cs: str | None) -> Any:
+        try:
+            return ctx[name]
+        except KeyError:
+            raise FormulaRefError(name, available=sorted(ctx.keys())) from None
+
+    return ref
+
+
+def _compile_range_arg(node: Tree | Token) -> CompiledFormula:
+    """Compile an aggregate-function argument that may be a named range."""
+    fn = _as_fn(_compile_node(node))
+    if not (isinstance(node, Tree) and node.data in ("ref_bare", "ref_dollar")):
+        return fn
+    name = str(node.children[0])
+
+    def range_arg(ctx: dict, tc: dict, resolver: Any, cs: str | None) -> Any:
+        if name not in ctx and resolver is not None and resolver.has_named_range(name):
+            return resolver.resolve_range(name)
+        return fn(ctx, tc, resolver, cs)
+
+    return range_arg
+
+
+def _compile_func(node: Tree) -> CompiledFormula:
+    """Compile a function call with dispatch resolved at compile time."""
+    func_name = str(node.children[0]).upper()
+    args_node = node.children[1]
+    raw_args = list(args_node.children) if args_node.children else []
+
+    if func_name in _LAZY_FUNCTIONS:
+        native = _LAZY_COMPILERS.get(func_name)
+        if native is not None:
+            return native(raw_args)
+        # Unknown lazy extension: hand it the raw nodes, as _eval does
+        lazy_fn = _FUNC_TABLE[func_name]
+        return lambda ctx, tc, resolver, cs: lazy_fn(raw_args, ctx, tc, resolver, cs)
+
+    if func_name in _AGGREGATE_FUNCTIONS:
+        arg_fns = [_compile_range_arg(arg) for arg in raw_args]
+        flatten = True
+    else:
+        arg_fns = [_as_fn(_compile_node(arg)) for arg in raw_args]
+        flatten = False
+
+    fn = _FUNC_TABLE.get(func_name)
+    if fn is None:
+        def unknown(ctx: dict, tc: dict, resolver: Any, cs: str | None) -> Any:
+            # Arguments are evaluated first so their errors take precedence
+            for f in arg_fns:
+                f(ctx, tc, resolver, cs)
+            raise FormulaFunctionError(func_name)
+
+        return unknown
+
+    if flatten:
+        def call_aggregate(ctx: dict, tc: dict, resolver: Any, cs: str | None) -> Any:
+            args = _flatten_args([f(ctx, tc, resolver, cs) for f in arg_fns])
+            return fn(args, ctx, tc, resolver)
+
+        return call_aggregate
+
+    def call(ctx: dict, tc: dict, resolver: Any, cs: str | None) -> Any:
+        return fn([f(ctx, tc, resolver, cs) for f in arg_fns], ctx, tc, resolver)
+
+    return call
+
+
+# ---------------------------------------------------------------------------
+# Lazy functions
+# ---------------------------------------------------------------------------
+
+
+def _raiser(func_name: str, message: str) -> CompiledFormula:
+    """Closure that raises an arity error when evaluated."""
+
+    def fail(ctx: dict, tc: dict, resolver: Any, cs: str | None) -> Any:
+        raise FormulaFunctionError(func_name, message)
+
+    return fail
+
+
+def _compile_if(raw_args: list) -> CompiledFormula:
+    """IF(condition, then_value [, else_value]) — only the chosen branch runs."""
+    if len(raw_args) < 2 or len(raw_args) > 3:
+        return _raiser("IF", "IF requires 2-3 arguments")
+    cond = _as_fn(_compile_node(raw_args[0]))
+    then = _as_fn(_compile_node(raw_args[1]))
+    if len(raw_args) == 3:
+        other = _as_fn(_compile_node(raw_args[2]))
+    else:
+        other = lambda ctx, tc, resolver, cs: False  # noqa: E731
+
+    def if_(ctx: dict, tc: dict, resolver: Any, cs: str | None) -> Any:
+        if cond(ctx, tc, resolver, cs):
+            return then(ctx, tc, resolver, cs)
+        return other(ctx, tc, resolver, cs)
+
+    return if_
+
+
+def _compile_iferror(raw_args: list) -> CompiledFormula:
+    """IFERROR(value, fallback) — fallback runs only if value errors."""
+    if len(raw_args) != 2:
+        return _raiser("IFERROR", "IFERROR requires exactly 2 arguments")
+    value = _as_fn(_compile_node(raw_args[0]))
+    fallback = _as_fn(_compile_node(raw_args[1]))
+
+    def iferror(ctx: dict, tc: dict, resolver: Any, cs: str | None) -> Any:
+        try:
+            return value(ctx, tc, resolver, cs)
+        except ENGINE_ERRORS:
+            return fallback(ctx, tc, resolver, cs)
+
+    return iferror
+
+
+def _compile_iserror(raw_args: list) -> CompiledFormula:
+    """ISERROR(expr) — TRUE if the expression raises an engine error."""
+    if len(raw_args) != 1:
+        return _raiser("ISERROR", "ISERROR requires exactly 1 argument")
+    expr = _as_fn(_compile_node(raw_args[0]))
+
+    def iserror(ctx: dict, tc: dict, resolver: Any, cs: str | None) -> bool:
+        try:
+            expr(ctx, tc, resolver, cs)
+            return False
+        except ENGINE_ERRORS:
+            return True
+
+    return iserror
+
+
+_LAZY_COMPILERS: dict[str, Callable[[list], CompiledFormula]] = {
+    "IF": _compile_if,
+    "IFERROR": _compile_iferror,
+    "ISERROR": _compile_iserror,
+}
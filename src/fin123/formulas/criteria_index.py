@@ -0,0 +1,230 @@
+"""Pre-aggregated criteria index for SUMIFS and COUNTIFS.
+
+Chaining one filter per criterion re-scans the table for every formula.
+Instead, formulas that share a table and criteria columns share one
+``CriteriaIndex``: the table's rows grouped (one ``group_by``) by the
+columns of its ``=`` criteria and, when there is a range criterion
+(``>``, ``>=``, ``<``, ``<=``), sorted within each group by the range
+column.  Equality criteria are then a dict probe and range criteria a
+binary search, so COUNTIFS is O(1)/O(log n).  SUMIFS sums the matching
+rows in table order -- exactly the rows and order the chained filters
+would have summed, so results are bit-identical -- and memoizes the sum.
+
+Indexes are built lazily on first use and attached to the table frame
+(see ``fin123.functions.lookup_index.frame_indexes``), so ScalarGraph
+evaluation, CellGraph evaluation, and sweep points over the same frames
+all share them.
+
+Criteria the index cannot answer with the same semantics as the Polars
+filter -- ``<>``, mismatched value types, None or NaN values, range
+criteria on more than one column, NaN in the range column -- return
+None and the caller falls back to filtering.
+"""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_left, bisect_right
+from typing import Any
+
+import polars as pl
+
+from fin123.functions.lookup_index import can_index, frame_indexes
+
+_RANGE_OPS = (">", ">=", "<", "<=")
+_ROW = "__fin123_row"
+_VALUE = "__fin123_value"
+
+
+class CriteriaIndex:
+    """Rows of one table grouped by equality columns, sorted by a range column."""
+
+    def __init__(self, df: pl.DataFrame, eq_cols: tuple[str, ...], range_col: str | None) -> None:
+        """Build the index.
+
+        Args:
+            df: The table.
+            eq_cols: Columns of the ``=`` criteria (group key order).
+            range_col: Column of the range criteria, if any.
+        """
+        self.range_col = range_col
+        self.has_nan = (
+            range_col is not None
+            and df.schema[range_col].is_float()
+            and bool(df[range_col].is_nan().any())
+        )
+        self._sums: dict[tuple, float] = {}
+
+        exprs = [pl.int_range(pl.len(), dtype=pl.UInt32).alias(_ROW)]
+        exprs += [pl.col(c) for c in eq_cols]
+        if range_col is not None:
+            exprs.append(pl.col(range_col).alias(_VALUE))
+        frame = df.select(exprs)
+        if range_col is not None:
+            # Null never satisfies a comparison; a stable sort keeps table
+            # order among equal values
+            frame = frame.filter(pl.col(_VALUE).is_not_null()).sort(_VALUE, maintain_order=True)
+
+        if eq_cols:
+            aggs = [pl.col(_ROW)] + ([pl.col(_VALUE)] if range_col is not None else [])
+            grouped = frame.group_by(list(eq_cols), maintain_order=True).agg(aggs)
+            keys = list(zip(*(grouped[c].to_list() for c in eq_cols)))
+            rows = grouped[_ROW].to_list()
+            values = grouped[_VALUE].to_list() if range_col is not None else [None] * len(keys)
+        else:
+            keys = [()]
+            rows = [frame[_ROW].to_list()]
+            values = [frame[_VALUE].to_list() if range_col is not None else None]
+
+        # group key -> (rows, sorted range values or None)
+        self.groups: dict[tuple, tuple[list[int], list[Any] | None]] = {}
+        for key, key_rows, key_values in zip(keys, rows, values):
+            if key in self.groups:
+                # Keys Polars groups apart but Python equality merges
+                # (0.0 and -0.0)
+                key_rows, key_values = _merge(self.groups[key], (key_rows, key_values))
+            self.groups[key] = (key_rows, key_values)
+
+    def bounds(self, key: tuple, ranges: list[tuple[str, Any]]) -> tuple[int, int]:
+        """Return the slice of the group's rows satisfying *ranges*.
+
+        Args:
+            key: Equality group key.
+            ranges: List of (op, value) range criteria on ``range_col``.
+
+        Returns:
+            Half-open (lo, hi) positions into the group's rows.
+        """
+        rows, values = self.groups.get(key, ([], None))
+        lo, hi = 0, len(rows)
+        for op, value in ranges:
+            if op == ">":
+                lo = max(lo, bisect_right(values, value))
+            elif op == ">=":
+                lo = max(lo, bisect_left(values, value))
+            elif op == "<":
+                hi = min(hi, bisect_left(values, value))
+            else:
+                hi = min(hi, bisect_right(values, value))
+        return lo, max(lo, hi)
+
+    def count(self, key: tuple, ranges: list[tuple[str, Any]]) -> int:
+        """Return the number of rows matching the criteria."""
+        lo, hi = self.bounds(key, ranges)
+        return hi - lo
+
+    def sum(self, series: pl.Series, key: tuple, ranges: list[tuple[str, Any]]) -> float:
+        """Return the sum of *series* over the rows matching the criteria.
+
+        Args:
+            series: The column to sum (from the indexed table).
+            key: Equality group key.
+            ranges: Range criteria on ``range_col``.
+
+        Returns:
+            The sum, as the chained filters would have computed it.
+        """
+        lo, hi = self.bounds(key, ranges)
+        memo = (series.name, key, lo, hi)
+        total = self._sums.get(memo)
+        if total is None:
+            rows = self.groups.get(key, ([], None))[0][lo:hi]
+            if self.range_col is not None:
+                rows = sorted(rows)
+            total = self._sums[memo] = float(series.gather(rows).sum())
+        return total
+
+
+def _merge(
+    a: tuple[list[int], list[Any] | None], b: tuple[list[int], list[Any] | None]
+) -> tuple[list[int], list[Any] | None]:
+    """Merge two groups, keeping value order (if any) then table order."""
+    if a[1] is None:
+        return sorted(a[0] + b[0]), None
+    pairs = sorted(zip(a[1] + b[1], a[0] + b[0]))
+    return [r for _, r in pairs], [v for v, _ in pairs]
+
+
+def _range_compatible(dtype: pl.DataType, value: Any) -> bool:
+    """Whether Python ordering of *value* agrees with Polars for *dtype*."""
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        if isinstance(value, float) and math.isnan(value):
+            return False
+        return dtype.is_integer() or dtype.is_float()
+    return isinstance(value, str) and dtype == pl.String
+
+
+def _plan(
+    df: pl.DataFrame, criteria: list[tuple[str, str, Any]]
+) -> tuple[CriteriaIndex, tuple, list[tuple[str, Any]]] | None:
+    """Resolve criteria to (index, group key, range criteria), or None."""
+    schema = df.schema
+    eq: dict[str, Any] = {}
+    ranges: list[tuple[str, Any]] = []
+    range_col: str | None = None
+    for col, op, value in criteria:
+        if col not in schema:
+            return None
+        if op == "=":
+            if col in eq or not can_index(schema[col], value):
+                return None
+            eq[col] = value
+        elif op in _RANGE_OPS:
+            if range_col not in (None, col) or not _range_compatible(schema[col], value):
+                return None
+            range_col = col
+            ranges.append((op, value))
+        else:
+            return None
+
+    eq_cols = tuple(sorted(eq))
+    indexes = frame_indexes(df)
+    slot = ("criteria", eq_cols, range_col)
+    index = indexes.get(slot)
+    if index is None:
+        index = indexes.setdefault(slot, CriteriaIndex(df, eq_cols, range_col))
+    if index.has_nan:
+        return None
+    return index, tuple(eq[c] for c in eq_cols), ranges
+
+
+def indexed_countifs(df: pl.DataFrame, criteria: list[tuple[str, str, Any]]) -> int | None:
+    """Count rows of *df* matching all criteria using a criteria index.
+
+    Args:
+        df: The table.
+        criteria: List of (column, op, value).
+
+    Returns:
+        The count, or None if the criteria need the filter path.
+    """
+    plan = _plan(df, criteria)
+    if plan is None:
+        return None
+    index, key, ranges = plan
+    return index.count(key, ranges)
+
+
+def indexed_sumifs(
+    df: pl.DataFrame, sum_col: str, criteria: list[tuple[str, str, Any]]
+) -> float | None:
+    """Sum ``df[sum_col]`` over rows matching all criteria using a criteria index.
+
+    Args:
+        df: The table.
+        sum_col: Column to sum.
+        criteria: List of (column, op, value).
+
+    Returns:
+        The sum, or None if the criteria need the filter path.
+    """
+    dtype = df.schema.get(sum_col)
+    if dtype is None or not (dtype.is_numeric() or dtype == pl.Boolean):
+        return None
+    plan = _plan(df, criteria)
+    if plan is None:
+        return None
+    index, key, ranges = plan
+    return index.sum(df[sum_col], key, ranges)
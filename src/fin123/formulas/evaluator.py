@@ -1,4 +1,8 @@
-"""Tree-walking evaluator for parsed formula expressions.
+"""Evaluator for parsed formula expressions.
+
+``evaluate_formula`` runs trees through the closure compiler in
+``compiler.py``; ``_eval`` is the reference tree-walker used by lazy
+extension functions.
 
 Supports:
 - Scalar context (existing)
@@ -19,7 +23,9 @@ from fin123.formulas.errors import (
     FormulaFunctionError,
     FormulaRefError,
 )
+from fin123.formulas.criteria_index import indexed_countifs, indexed_sumifs
 from fin123.formulas.parser import parse_sheet_ref
+from fin123.formulas.shared import parse_rc_ref
 from fin123.functions.scalar import scalar_lookup
 
 
@@ -43,6 +49,13 @@ class CellResolver(Protocol):
         """Check if a name is a defined named range."""
         ...
 
+    def resolve_offset(self, sheet: str, drow: int, dcol: int) -> Any:
+        """Resolve the cell *drow*/*dcol* away from the cell being evaluated.
+
+        Only needed for shared-formula shapes (``formulas/shared.py``).
+        """
+        ...
+
 
 def evaluate_formula(
     tree: Tree,
@@ -63,7 +76,8 @@ def evaluate_formula(
     Returns:
         The computed scalar value.
     """
-    return _eval(tree, context, table_cache or {}, resolver, current_sheet)
+    fn = compile_formula(tree)
+    return fn(context, table_cache or {}, resolver, current_sheet)
 
 
 def _eval(
@@ -156,6 +170,13 @@ def _eval(
             )
         return resolver.resolve_cell(sheet_name, cell_addr)
 
+    # Relative reference from a shared-formula shape
+    if rule in ("rc_ref", "sheet_rc_ref"):
+        ref_sheet, drow, dcol = parse_rc_ref(str(node.children[0]))
+        if resolver is None or (ref_sheet or cs) is None:
+            raise FormulaRefError(str(node.children[0]), available=sorted(ctx.keys()))
+        return resolver.resolve_offset(ref_sheet or cs, drow, dcol)
+
     # References (scalar or named range)
     if rule in ("ref_bare", "ref_dollar"):
         name = str(node.children[0])
@@ -386,10 +407,11 @@ def _fn_sumifs(args: list, ctx: dict, tc: dict, resolver) -> float:
         )
 
     df = tc[table_name]
-    for i in range(2, len(args), 3):
-        crit_col = args[i]
-        op = args[i + 1]
-        crit_val = args[i + 2]
+    criteria = [tuple(args[i:i + 3]) for i in range(2, len(args), 3)]
+    total = indexed_sumifs(df, sum_col, criteria)
+    if total is not None:
+        return total
+    for crit_col, op, crit_val in criteria:
         df = _apply_filter(df, crit_col, op, crit_val)
 
     return float(df[sum_col].sum())
@@ -412,10 +434,11 @@ def _fn_countifs(args: list, ctx: dict, tc: dict, resolver) -> int:
         )
 
     df = tc[table_name]
-    for i in range(1, len(args), 3):
-        crit_col = args[i]
-        op = args[i + 1]
-        crit_val = args[i + 2]
+    criteria = [tuple(args[i:i + 3]) for i in range(1, len(args), 3)]
+    count = indexed_countifs(df, criteria)
+    if count is not None:
+        return count
+    for crit_col, op, crit_val in criteria:
         df = _apply_filter(df, crit_col, op, crit_val)
 
     return len(df)
@@ -467,6 +490,14 @@ _FUNC_TABLE: dict[str, Any] = {
     "PARAM": _fn_param,
 }
 
+# Functions that read a table from the table cache, mapped to the position
+# of their table-name argument.  Extension modules merge theirs in below.
+TABLE_ARG_POSITIONS: dict[str, int] = {
+    "VLOOKUP": 1,
+    "SUMIFS": 0,
+    "COUNTIFS": 0,
+}
+
 
 # ---------- Merge extension formula modules ----------
 
@@ -478,8 +509,8 @@ def _load_extensions() -> None:
     from fin123.formulas.fn_logical import LOGICAL_FUNCTIONS
     from fin123.formulas.fn_error import ERROR_FUNCTIONS, ERROR_LAZY_FUNCTIONS
     from fin123.formulas.fn_date import DATE_FUNCTIONS
-    from fin123.formulas.fn_lookup import LOOKUP_FUNCTIONS
-    from fin123.formulas.fn_finance import FINANCE_FUNCTIONS
+    from fin123.formulas.fn_lookup import LOOKUP_FUNCTIONS, LOOKUP_TABLE_ARGS
+    from fin123.formulas.fn_finance import FINANCE_FUNCTIONS, FINANCE_TABLE_ARGS
 
     _FUNC_TABLE.update(LOGICAL_FUNCTIONS)
     _FUNC_TABLE.update(ERROR_FUNCTIONS)
@@ -487,6 +518,12 @@ def _load_extensions() -> None:
     _FUNC_TABLE.update(LOOKUP_FUNCTIONS)
     _FUNC_TABLE.update(FINANCE_FUNCTIONS)
     _LAZY_FUNCTIONS.update(ERROR_LAZY_FUNCTIONS)
+    TABLE_ARG_POSITIONS.update(LOOKUP_TABLE_ARGS)
+    TABLE_ARG_POSITIONS.update(FINANCE_TABLE_ARGS)
 
 
 _load_extensions()
+
+
+# Imported last: the compiler resolves dispatch against the tables above.
+from fin123.formulas.compiler import compile_formula  # noqa: E402
@@ -196,3 +196,9 @@ FINANCE_FUNCTIONS: dict[str, Any] = {
     "XNPV": _fn_xnpv,
     "XIRR": _fn_xirr,
 }
+
+# Position of the table-name argument of the table-reading functions above.
+FINANCE_TABLE_ARGS: dict[str, int] = {
+    "XNPV": 1,
+    "XIRR": 0,
+}
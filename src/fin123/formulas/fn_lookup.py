@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
+import math
 from typing import Any
 
 import polars as pl
 
 from fin123.formulas.errors import FormulaFunctionError
+from fin123.functions.lookup_index import can_index, get_lookup_index
 
 
 def _get_table(tc: dict[str, pl.DataFrame], table_name: str, func_name: str) -> pl.DataFrame:
@@ -30,10 +32,15 @@ def _fn_match(args: list, ctx: dict, tc: dict, resolver: Any) -> int:
         raise FormulaFunctionError(
             "MATCH", f"MATCH: column {col_name!r} not found in table {table_name!r}"
         )
-    series = df[col_name]
-    for i in range(len(series)):
-        if series[i] == value:
-            return i + 1  # 1-based
+    try:
+        # Python equality, as in the scan below; NaN never matches
+        indexable = not (isinstance(value, float) and math.isnan(value))
+        row = get_lookup_index(df, col_name).first_row.get(value) if indexable else None
+    except TypeError:  # unhashable value
+        series = df[col_name]
+        row = next((i for i in range(len(series)) if series[i] == value), None)
+    if row is not None:
+        return row + 1  # 1-based
     raise FormulaFunctionError(
         "MATCH", f"MATCH: value {value!r} not found in {table_name!r}.{col_name!r}"
     )
@@ -81,8 +88,13 @@ def _fn_xlookup(args: list, ctx: dict, tc: dict, resolver: Any) -> Any:
                 "XLOOKUP", f"XLOOKUP: column {col!r} not found in table {table_name!r}"
             )
 
-    matches = df.filter(pl.col(lookup_col) == value)
-    if len(matches) == 0:
+    if can_index(df.schema[lookup_col], value):
+        matches = df
+        row = get_lookup_index(df, lookup_col).first_row.get(value)
+    else:
+        matches = df.filter(pl.col(lookup_col) == value)
+        row = 0 if len(matches) else None
+    if row is None:
         if has_default:
             return if_not_found
         raise FormulaFunctionError(
@@ -90,7 +102,7 @@ def _fn_xlookup(args: list, ctx: dict, tc: dict, resolver: Any) -> Any:
             f"XLOOKUP: value {value!r} not found in {table_name!r}.{lookup_col!r}",
         )
 
-    val = matches[return_col][0]
+    val = matches[return_col][row]
     if isinstance(val, (int, float, str, bool, type(None))):
         return val
     return float(val)
@@ -101,3 +113,10 @@ LOOKUP_FUNCTIONS: dict[str, Any] = {
     "INDEX": _fn_index,
     "XLOOKUP": _fn_xlookup,
 }
+
+# Position of the table-name argument of each function above.
+LOOKUP_TABLE_ARGS: dict[str, int] = {
+    "MATCH": 1,
+    "INDEX": 0,
+    "XLOOKUP": 1,
+}
@@ -0,0 +1,320 @@
+"""Shared-formula canonicalization (relative R1C1 shapes).
+
+Filled-down formulas differ only in their cell references: ``=B2*C2`` in
+D2 and ``=B3*C3`` in D3 are the same formula relative to the cell holding
+it.  :func:`canonicalize` rewrites every cell reference as an offset from
+the holding cell (``=R[0]C[-2]*R[0]C[-1]``), so all copies map to one
+*shape*.  A shape is parsed and compiled once; its relative references are
+resolved at evaluation time through the resolver's ``resolve_offset``,
+which knows the cell being evaluated.
+
+The A1 grammar has no absolute (``$A$1``) form, so every reference is
+relative.  Formulas that cannot be canonicalized faithfully (a ``[``
+outside a string literal, or a reference such as ``A0`` or ``A01`` that
+does not round-trip) are left to :func:`parse_formula` unchanged.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from lark import Lark, Tree
+
+from fin123.formulas.errors import FormulaParseError
+from fin123.formulas.parser import GRAMMAR, _RefCollector, parse_formula
+
+# Tokens of an A1 formula that matter for canonicalization, tried in the
+# parser's terminal priority order (sheet refs, cell refs, names) so
+# references are recognized exactly where the parser would lex them.
+# Names and numbers are matched whole so their letters and digits are
+# never mistaken for a cell reference.
+_A1_TOKEN_RE = re.compile(
+    r'"(?:\\.|[^"\\])*"'
+    r"|(?P<sheet>'[^']+'|[A-Za-z_][A-Za-z0-9_]*)!(?P<scol>[A-Z]{1,3})(?P<srow>[0-9]+)"
+    r"|(?P<col>[A-Z]{1,3})(?P<row>[0-9]+)"
+    r"|[A-Za-z_][A-Za-z0-9_]*"
+    r"|(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?"
+    r"|(?P<bracket>\[)"
+)
+
+_SHAPE_TOKEN_RE = re.compile(
+    r'"(?:\\.|[^"\\])*"'
+    r"|(?:(?P<sheet>'[^']+'|[A-Za-z_][A-Za-z0-9_]*)!)?R\[(?P<dr>-?[0-9]+)\]C\[(?P<dc>-?[0-9]+)\]"
+    r"|[A-Za-z_][A-Za-z0-9_]*"
+)
+
+_RC_TOKEN_RE = re.compile(
+    r"(?:(?P<sheet>'[^']+'|[A-Za-z_][A-Za-z0-9_]*)!)?R\[(?P<dr>-?[0-9]+)\]C\[(?P<dc>-?[0-9]+)\]"
+)
+
+_CELL_REF_ATOM = "    | CELL_REF                  -> cell_ref\n"
+if _CELL_REF_ATOM not in GRAMMAR:  # pragma: no cover - guards grammar edits
+    raise RuntimeError("formula grammar changed; update the shape grammar")
+
+# The A1 grammar plus relative references.  Only canonical shapes are
+# parsed with it, so users cannot type R1C1 references into a cell.
+SHAPE_GRAMMAR = GRAMMAR.replace(
+    _CELL_REF_ATOM,
+    _CELL_REF_ATOM
+    + "    | RC_REF                    -> rc_ref\n"
+    + "    | SHEET_RC_REF              -> sheet_rc_ref\n",
+) + r"""
+RC_REF.3: /R\[-?[0-9]+\]C\[-?[0-9]+\]/
+SHEET_RC_REF.3: /('[^']+'|[A-Za-z_][A-Za-z0-9_]*)!R\[-?[0-9]+\]C\[-?[0-9]+\]/
+"""
+
+_shape_parser: Lark | None = None  # built on first use
+
+_shape_cache: dict[str, Tree] = {}
+_template_cache: dict[str, tuple[Any, ...]] = {}
+_refs_cache: dict[str, tuple[frozenset[str], tuple[tuple[str | None, int, int], ...]]] = {}
+
+
+def _col_index(letters: str) -> int:
+    idx = 0
+    for ch in letters:
+        idx = idx * 26 + (ord(ch) - 64)
+    return idx - 1
+
+
+def _col_letters(idx: int) -> str:
+    result = ""
+    n = idx + 1
+    while n > 0:
+        n, rem = divmod(n - 1, 26)
+        result = chr(65 + rem) + result
+    return result
+
+
+# Column letters up to ZZ; three-letter columns are computed
+_LETTERS = [_col_letters(i) for i in range(702)]
+
+
+def canonicalize(text: str, row: int, col: int) -> str | None:
+    """Return the relative shape of a formula held at ``(row, col)``.
+
+    Args:
+        text: A1 formula text (with leading ``=``).
+        row: 0-based row of the cell holding the formula.
+        col: 0-based column of the cell holding the formula.
+
+    Returns:
+        The shape text, or None if the formula cannot be canonicalized
+        (it is then parsed and stored as written).
+    """
+    parts: list[str] = []
+    last = 0
+    for m in _A1_TOKEN_RE.finditer(text):
+        if m.group("bracket"):
+            return None
+        if m.group("srow"):
+            prefix, letters, digits = m.group("sheet") + "!", m.group("scol"), m.group("srow")
+        elif m.group("row"):
+            prefix, letters, digits = "", m.group("col"), m.group("row")
+        else:
+            continue
+        if digits[0] == "0":
+            return None  # A0 / A01 would not round-trip
+        parts.append(text[last:m.start()])
+        parts.append(
+            f"{prefix}R[{int(digits) - 1 - row}]C[{_col_index(letters) - col}]"
+        )
+        last = m.end()
+    parts.append(text[last:])
+    return "".join(parts)
+
+
+def _template(shape: str) -> tuple[Any, ...]:
+    """Split a shape into literal text and ``(prefix, drow, dcol)`` refs."""
+    template = _template_cache.get(shape)
+    if template is None:
+        parts: list[Any] = []
+        last = 0
+        for m in _SHAPE_TOKEN_RE.finditer(shape):
+            dr = m.group("dr")
+            if dr is None:
+                continue  # string literal or name
+            sheet = m.group("sheet")
+            parts.append(shape[last:m.start()])
+            parts.append((f"{sheet}!" if sheet else "", int(dr), int(m.group("dc"))))
+            last = m.end()
+        parts.append(shape[last:])
+        template = _template_cache[shape] = tuple(parts)
+    return template
+
+
+def instantiate(shape: str, row: int, col: int) -> str:
+    """Return the A1 text of *shape* held at ``(row, col)``.
+
+    A reference that would fall off the sheet renders as ``#REF!``.
+    """
+    template = _template(shape)
+    if len(template) == 1:
+        return shape
+    out = []
+    for part in template:
+        if type(part) is str:
+            out.append(part)
+            continue
+        prefix, dr, dc = part
+        r, c = row + dr, col + dc
+        out.append(prefix)
+        if r < 0 or c < 0:
+            out.append("#REF!")
+        else:
+            out.append(_LETTERS[c] if c < 702 else _col_letters(c))
+            out.append(str(r + 1))
+    return "".join(out)
+
+
+def parse_shape(shape: str) -> Tree:
+    """Parse a shape into a tree, caching by shape text.
+
+    Raises:
+        FormulaParseError: If the shape has invalid syntax.
+    """
+    tree = _shape_cache.get(shape)
+    if tree is not None:
+        return tree
+    text = shape.strip()
+    if not text.startswith("="):
+        raise FormulaParseError("Formula must start with '='", position=0)
+    global _shape_parser
+    if _shape_parser is None:
+        _shape_parser = Lark(SHAPE_GRAMMAR, parser="lalr", start="start")
+    try:
+        tree = _shape_parser.parse(text)
+    except Exception as exc:
+        raise FormulaParseError(str(exc), position=getattr(exc, "column", None)) from exc
+    _shape_cache[shape] = tree
+    return tree
+
+
+def parse_at(text: str, row: int, col: int, shape: str | None = None) -> Tree:
+    """Parse a formula held at ``(row, col)`` through its shared shape.
+
+    Every copy of a filled-down formula returns the same tree.  Parse
+    errors are reported against the A1 text, as :func:`parse_formula`
+    reports them.
+
+    Args:
+        text: A1 formula text.
+        row: 0-based row of the holding cell.
+        col: 0-based column of the holding cell.
+        shape: The formula's shape, if already known.
+
+    Raises:
+        FormulaParseError: If the formula has invalid syntax.
+    """
+    if shape is None:
+        shape = canonicalize(text, row, col)
+    if shape is not None:
+        try:
+            return parse_shape(shape)
+        except FormulaParseError:
+            pass
+    return parse_formula(text)
+
+
+def parse_rc_ref(token: str) -> tuple[str | None, int, int]:
+    """Split an ``RC_REF`` / ``SHEET_RC_REF`` token into (sheet, drow, dcol).
+
+    Examples:
+        ``"R[0]C[-2]"`` → ``(None, 0, -2)``
+        ``"'My Sheet'!R[1]C[0]"`` → ``("My Sheet", 1, 0)``
+    """
+    m = _RC_TOKEN_RE.fullmatch(token.strip())
+    if m is None:
+        raise FormulaParseError(f"Invalid relative reference: {token!r}")
+    sheet = m.group("sheet")
+    if sheet and sheet.startswith("'"):
+        sheet = sheet[1:-1]
+    return sheet, int(m.group("dr")), int(m.group("dc"))
+
+
+class _ShapeRefCollector(_RefCollector):
+    """Reference collector that also records relative references."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.offsets: list[tuple[str | None, int, int]] = []
+
+    def rc_ref(self, tree: Tree) -> None:
+        self.offsets.append(parse_rc_ref(str(tree.children[0])))
+
+    sheet_rc_ref = rc_ref
+
+
+def shape_refs(
+    shape: str,
+) -> tuple[frozenset[str], tuple[tuple[str | None, int, int], ...]]:
+    """Return the scalar names and relative cell references of a shape.
+
+    Returns:
+        Tuple of (scalar_refs, offsets) where each offset is
+        ``(sheet | None, drow, dcol)``; ``None`` means the holding sheet.
+
+    Raises:
+        FormulaParseError: If the shape has invalid syntax.
+    """
+    refs = _refs_cache.get(shape)
+    if refs is None:
+        collector = _ShapeRefCollector()
+        collector.visit(parse_shape(shape))
+        refs = _refs_cache[shape] = (
+            frozenset(collector.scalar_refs),
+            tuple(dict.fromkeys(collector.offsets)),
+        )
+    return refs
+
+
+def _shift_delta(pos: int, index: int, count: int) -> int | None:
+    """How far a row/col index moves; None if it is deleted."""
+    if count > 0:
+        return count if pos >= index else 0
+    if pos < index:
+        return 0
+    return None if pos < index - count else count
+
+
+def follows_shift(
+    shape: str,
+    row: int,
+    col: int,
+    sheet: str,
+    affected_sheet: str,
+    axis: str,
+    index: int,
+    count: int,
+) -> bool:
+    """Return True if a row/col shift leaves the shape's meaning unchanged.
+
+    That is the case when every reference moves exactly as far as the
+    holding cell does (both below an inserted row, both above it, or on
+    other sheets), so the formula needs no rewriting.
+
+    Args:
+        shape: The formula's shape.
+        row: 0-based row of the holding cell (before the shift).
+        col: 0-based column of the holding cell (before the shift).
+        sheet: Sheet holding the formula.
+        affected_sheet: Sheet where rows/cols are inserted or deleted.
+        axis: "row" or "col".
+        index: 0-based index where insertion/deletion starts.
+        count: Positive for insert, negative for delete.
+    """
+    try:
+        _, offsets = shape_refs(shape)
+    except FormulaParseError:
+        return False
+    host = row if axis == "row" else col
+    host_delta = _shift_delta(host, index, count) if sheet == affected_sheet else 0
+    for ref_sheet, dr, dc in offsets:
+        if (ref_sheet or sheet) != affected_sheet:
+            delta: Any = 0
+        else:
+            delta = _shift_delta(host + (dr if axis == "row" else dc), index, count)
+        if delta != host_delta:
+            return False
+    return True
@@ -0,0 +1,384 @@
+"""Array-aware formula evaluation for batched parameter grids.
+
+Surface mode evaluates the same scalar DAG at thousands of parameter points.
+This module compiles a parse tree into a closure that accepts Polars
+``Series`` in place of scalar context values and evaluates the whole grid in
+one pass with broadcasting.
+
+Supported: arithmetic, comparisons, percent, ``IF``, ``IFERROR``, ``SUM``,
+``AVERAGE``, ``MIN``, ``MAX``, ``ABS``, ``AND``, ``OR``, ``NOT``, ``NPV`` and
+``PARAM``.  Any other eager function is called once with scalar arguments
+when none of its arguments vary across the grid.
+
+Vectorized results must match per-point evaluation exactly, so anything that
+could diverge raises ``VectorizeError`` instead of guessing: unsupported
+nodes at compile time, and at run time zero denominators, mixed-type ``IF``
+branches, negative bases with fractional exponents, and functions called
+with varying arguments (e.g. table lookups keyed on an axis parameter).
+Callers then fall back to per-point evaluation for that node.
+"""
+
+from __future__ import annotations
+
+import math
+import operator
+from typing import Any, Callable
+
+import polars as pl
+from lark import Token, Tree
+
+from fin123.formulas.errors import FormulaFunctionError, FormulaRefError
+from fin123.formulas.evaluator import (
+    _FUNC_TABLE,
+    _LAZY_FUNCTIONS,
+    _eval_token,
+    _parse_number,
+)
+
+# A vectorized formula: fn(ctx, tc) -> pl.Series | scalar
+VectorFormula = Callable[[dict, dict], Any]
+
+
+class VectorizeError(Exception):
+    """A formula, or the values it was given, cannot be evaluated as arrays."""
+
+
+_compile_cache: dict[int, tuple[Tree | Token, VectorFormula | VectorizeError]] = {}
+
+
+def compile_vectorized(tree: Tree | Token) -> VectorFormula:
+    """Compile a parse tree into an array-aware closure.
+
+    Results (including "not vectorizable" verdicts) are cached by tree
+    identity, like ``compile_formula``.
+
+    Args:
+        tree: Parse tree from ``parse_formula()``.
+
+    Returns:
+        A callable ``fn(ctx, tc)`` where context values may be Series.
+
+    Raises:
+        VectorizeError: If the formula uses constructs with no array form.
+    """
+    entry = _compile_cache.get(id(tree))
+    if entry is None or entry[0] is not tree:
+        try:
+            compiled: VectorFormula | VectorizeError = _compile(tree)
+        except VectorizeError as exc:
+            compiled = exc
+        entry = (tree, compiled)
+        _compile_cache[id(tree)] = entry
+    if isinstance(entry[1], VectorizeError):
+        raise entry[1]
+    return entry[1]
+
+
+def _is_vec(value: Any) -> bool:
+    return isinstance(value, pl.Series)
+
+
+def _const(value: Any) -> VectorFormula:
+    return lambda ctx, tc: value
+
+
+def _compile(node: Tree | Token) -> VectorFormula:
+    """Compile a node into an array-aware closure."""
+    if isinstance(node, Token):
+        return _const(_eval_token(node))
+
+    rule = node.data
+    children = node.children
+
+    if rule == "start":
+        return _compile(children[0])
+    if rule == "number":
+        return _const(_parse_number(children[0]))
+    if rule == "boolean":
+        return _const(str(children[0]) == "TRUE")
+    if rule == "string":
+        raw = str(children[0])
+        return _const(raw[1:-1].replace('\\"', '"').replace("\\\\", "\\"))
+
+    if rule in ("ref_bare", "ref_dollar"):
+        name = str(children[0])
+
+        def ref(ctx: dict, tc: dict) -> Any:
+            try:
+                return ctx[name]
+            except KeyError:
+                raise FormulaRefError(name, available=sorted(ctx.keys())) from None
+
+        return ref
+
+    if rule in _BINARY_OPS:
+        left = _compile(children[0])
+        right = _compile(children[1])
+        op = _BINARY_OPS[rule]
+        return lambda ctx, tc: op(left(ctx, tc), right(ctx, tc))
+
+    if rule == "neg":
+        inner = _compile(children[0])
+        return lambda ctx, tc: -inner(ctx, tc)
+    if rule == "pos":
+        return _compile(children[0])
+    if rule == "percent":
+        inner = _compile(children[0])
+        return lambda ctx, tc: _div(inner(ctx, tc), 100)
+
+    if rule == "func_call":
+        return _compile_func(node)
+
+    raise VectorizeError(f"Node type {rule!r} cannot be vectorized")
+
+
+# ---------------------------------------------------------------------------
+# Operators
+# ---------------------------------------------------------------------------
+
+
+def _div(left: Any, right: Any) -> Any:
+    """Division; zero denominators defer to per-point evaluation.
+
+    A scalar denominator is broadcast to a full Series first: Polars
+    divides by a scalar as a multiply by its reciprocal, which is not
+    bit-identical to per-point ``/`` (``1.75 / 2.5`` gives
+    ``0.7000000000000001``).
+    """
+    if _is_vec(right):
+        if (right == 0).any():
+            raise VectorizeError("Zero in vectorized denominator")
+    elif right == 0:
+        raise ZeroDivisionError("Division by zero in formula")
+    elif _is_vec(left):
+        right = pl.repeat(right, len(left), eager=True)
+    return left / right
+
+
+def _pow(base: Any, exp: Any) -> Any:
+    """Power; points where per-point ``**`` would not return a finite float defer.
+
+    That is a negative base with a fractional exponent, a zero base with a
+    negative exponent (``ZeroDivisionError``), and a non-finite result from
+    finite operands (``OverflowError``).
+
+    A scalar exponent is broadcast to a full Series first: Polars raises
+    to a scalar power through specialized kernels (repeated multiplication,
+    ``sqrt``) that can differ from per-point ``**`` in the last bit.
+    """
+    if not (_is_vec(base) or _is_vec(exp)):
+        return base ** exp
+    has_negative = (base < 0).any() if _is_vec(base) else base < 0
+    if has_negative:
+        integral = (exp == exp.round(0)).all() if _is_vec(exp) else float(exp).is_integer()
+        if not integral:
+            raise VectorizeError("Negative base with fractional exponent")
+    if not _is_vec(exp):
+        exp = pl.repeat(exp, len(base), eager=True)
+    if ((exp < 0) & (base == 0)).any():
+        raise VectorizeError("Zero base with negative exponent")
+    result = base ** exp
+    if result.dtype.is_float():
+        finite_base = base.is_finite() if _is_vec(base) else math.isfinite(base)
+        overflow = ~result.is_finite() & exp.is_finite() & finite_base
+        if overflow.any():
+            raise VectorizeError("Non-finite power of finite operands")
+    return result
+
+
+_BINARY_OPS: dict[str, Callable[[Any, Any], Any]] = {
+    "add": operator.add,
+    "sub": operator.sub,
+    "mul": operator.mul,
+    "div": _div,
+    "pow": _pow,
+    "gt": operator.gt,
+    "lt": operator.lt,
+    "gte": operator.ge,
+    "lte": operator.le,
+    "eq": operator.eq,
+    "neq": operator.ne,
+}
+
+
+def _where(cond: pl.Series, then: Any, other: Any) -> pl.Series:
+    """Element-wise select between two branches."""
+    then_bool = then.dtype == pl.Boolean if _is_vec(then) else isinstance(then, bool)
+    other_bool = other.dtype == pl.Boolean if _is_vec(other) else isinstance(other, bool)
+    if then_bool != other_bool:
+        raise VectorizeError("IF branches have mixed boolean/numeric types")
+    return pl.select(
+        pl.when(pl.lit(cond)).then(pl.lit(then)).otherwise(pl.lit(other))
+    ).to_series()
+
+
+def _as_bool(value: Any) -> Any:
+    """Truthiness, element-wise for Series."""
+    if _is_vec(value):
+        if value.dtype != pl.Boolean:
+            raise VectorizeError("Non-boolean Series used as a condition")
+        return value
+    return bool(value)
+
+
+# ---------------------------------------------------------------------------
+# Functions
+# ---------------------------------------------------------------------------
+
+
+def _compile_func(node: Tree) -> VectorFormula:
+    """Compile a function call."""
+    func_name = str(node.children[0]).upper()
+    args_node = node.children[1]
+    raw_args = list(args_node.children) if args_node.children else []
+
+    if func_name == "IF":
+        return _compile_if(raw_args)
+    if func_name == "IFERROR":
+        return _compile_iferror(raw_args)
+
+    if func_name in _LAZY_FUNCTIONS or func_name not in _FUNC_TABLE:
+        raise VectorizeError(f"{func_name} cannot be vectorized")
+    impl = _VECTOR_FUNCTIONS.get(func_name)
+
+    arg_fns = [_compile(arg) for arg in raw_args]
+    scalar_fn = _FUNC_TABLE[func_name]
+
+    def call(ctx: dict, tc: dict) -> Any:
+        args = [f(ctx, tc) for f in arg_fns]
+        if any(_is_vec(a) for a in args):
+            if impl is None:
+                raise VectorizeError(f"{func_name} called with varying arguments")
+            return impl(args)
+        # Nothing varies: the scalar implementation gives the exact answer
+        return scalar_fn(args, ctx, tc, None)
+
+    return call
+
+
+def _compile_if(raw_args: list) -> VectorFormula:
+    """IF: lazy when the condition is scalar, element-wise otherwise."""
+    if len(raw_args) < 2 or len(raw_args) > 3:
+        raise VectorizeError("IF arity error")
+    cond_fn = _compile(raw_args[0])
+    then_fn = _compile(raw_args[1])
+    other_fn = _compile(raw_args[2]) if len(raw_args) == 3 else _const(False)
+
+    def if_(ctx: dict, tc: dict) -> Any:
+        cond = _as_bool(cond_fn(ctx, tc))
+        if not _is_vec(cond):
+            return then_fn(ctx, tc) if cond else other_fn(ctx, tc)
+        try:
+            then = then_fn(ctx, tc)
+            other = other_fn(ctx, tc)
+        except VectorizeError:
+            raise
+        except Exception as exc:
+            # An untaken branch may legitimately fail at some points
+            raise VectorizeError(f"IF branch failed: {exc}") from exc
+        return _where(cond, then, other)
+
+    return if_
+
+
+def _compile_iferror(raw_args: list) -> VectorFormula:
+    """IFERROR: any error in the vectorized value defers to per-point."""
+    if len(raw_args) != 2:
+        raise VectorizeError("IFERROR arity error")
+    value_fn = _compile(raw_args[0])
+
+    def iferror(ctx: dict, tc: dict) -> Any:
+        try:
+            return value_fn(ctx, tc)
+        except VectorizeError:
+            raise
+        except Exception as exc:
+            raise VectorizeError(f"IFERROR value failed: {exc}") from exc
+
+    return iferror
+
+
+def _vec_sum(args: list) -> Any:
+    if len(args) < 1:
+        raise FormulaFunctionError("SUM", "SUM requires at least 1 argument")
+    total: Any = 0
+    for a in args:
+        total = total + a
+    return total
+
+
+def _vec_average(args: list) -> Any:
+    if len(args) < 1:
+        raise FormulaFunctionError("AVERAGE", "AVERAGE requires at least 1 argument")
+    return _div(_vec_sum(args), len(args))
+
+
+def _vec_min(args: list) -> Any:
+    if len(args) < 1:
+        raise FormulaFunctionError("MIN", "MIN requires at least 1 argument")
+    return pl.select(pl.min_horizontal([pl.lit(a) for a in args])).to_series()
+
+
+def _vec_max(args: list) -> Any:
+    if len(args) < 1:
+        raise FormulaFunctionError("MAX", "MAX requires at least 1 argument")
+    return pl.select(pl.max_horizontal([pl.lit(a) for a in args])).to_series()
+
+
+def _vec_abs(args: list) -> Any:
+    if len(args) != 1:
+        raise FormulaFunctionError("ABS", "ABS requires exactly 1 argument")
+    return args[0].abs()
+
+
+def _vec_and(args: list) -> Any:
+    if len(args) < 1:
+        raise FormulaFunctionError("AND", "AND requires at least 1 argument")
+    result: Any = True
+    for a in args:
+        result = _as_bool(a) & result
+    return result
+
+
+def _vec_or(args: list) -> Any:
+    if len(args) < 1:
+        raise FormulaFunctionError("OR", "OR requires at least 1 argument")
+    result: Any = False
+    for a in args:
+        result = _as_bool(a) | result
+    return result
+
+
+def _vec_not(args: list) -> Any:
+    if len(args) != 1:
+        raise FormulaFunctionError("NOT", "NOT requires exactly 1 argument")
+    return ~_as_bool(args[0])
+
+
+def _vec_npv(args: list) -> Any:
+    """NPV(rate, cf1, ...) discounted from t=1, as ``_fn_npv``."""
+    if len(args) < 2:
+        raise FormulaFunctionError("NPV", "NPV requires at least 2 arguments (rate, cf1, ...)")
+    rate = args[0].cast(pl.Float64) if _is_vec(args[0]) else float(args[0])
+    growth = 1 + rate
+    if (_is_vec(growth) and (growth == 0).any()) or (not _is_vec(growth) and growth == 0):
+        raise VectorizeError("NPV rate of -1")
+    total: Any = 0.0
+    for i, cf in enumerate(args[1:], start=1):
+        cf = cf.cast(pl.Float64) if _is_vec(cf) else float(cf)
+        # Same operations as _fn_npv, through the exact _pow and _div
+        total = total + _div(cf, _pow(growth, i))
+    return total
+
+
+_VECTOR_FUNCTIONS: dict[str, Callable[[list], Any]] = {
+    "SUM": _vec_sum,
+    "AVERAGE": _vec_average,
+    "MIN": _vec_min,
+    "MAX": _vec_max,
+    "ABS": _vec_abs,
+    "AND": _vec_and,
+    "OR": _vec_or,
+    "NOT": _vec_not,
+    "NPV": _vec_npv,
+}
@@ -0,0 +1,130 @@
+"""Hash indexes over table key columns for exact-match lookups.
+
+``lookup_scalar``/``VLOOKUP``, ``XLOOKUP`` and ``MATCH`` used to scan the
+key column on every call.  An index maps each key to its first row and
+records which keys occur more than once, so a lookup is a dict probe and
+the duplicate check is computed once per column.
+
+Indexes are built lazily on first use and keyed by the identity of the
+DataFrame they describe.  Materialized frames are shared by every consumer
+of a table graph in the process -- scalar evaluation of one run, the points
+of a sweep or surface, and later builds served by the table cache -- so
+they share the indexes too.  An index is dropped when its frame is
+garbage-collected.  Frames must not be mutated in place after an index is
+built (fin123 never does).
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import weakref
+from collections import Counter
+from typing import Any
+
+import polars as pl
+
+_lock = threading.Lock()
+# id(frame) -> index key -> index
+_indexes: dict[int, dict[Any, Any]] = {}
+
+
+class LookupIndex:
+    """First-row and duplicate-count index over one column."""
+
+    __slots__ = ("first_row", "duplicates")
+
+    def __init__(self, series: pl.Series) -> None:
+        """Build the index.
+
+        Args:
+            series: The key column.
+        """
+        values = series.to_list()
+        # Walking backwards leaves each key mapped to its first row
+        self.first_row: dict[Any, int] = dict(
+            zip(reversed(values), range(len(values) - 1, -1, -1))
+        )
+        self.duplicates: dict[Any, int] = (
+            {}
+            if len(self.first_row) == len(values)
+            else {k: n for k, n in Counter(values).items() if n > 1}
+        )
+
+    def find(self, value: Any) -> tuple[int | None, int]:
+        """Return the first matching row and the number of matching rows.
+
+        Args:
+            value: Key to look up (must be hashable).
+
+        Returns:
+            Tuple of (0-based first row or None, match count).
+        """
+        row = self.first_row.get(value)
+        if row is None:
+            return None, 0
+        return row, self.duplicates.get(value, 1)
+
+
+def frame_indexes(df: pl.DataFrame) -> dict[Any, Any]:
+    """Return the dict of indexes attached to *df*, creating it on first use.
+
+    Other index kinds (e.g. the SUMIFS/COUNTIFS criteria index) store their
+    indexes here under their own keys so they share the frame's lifetime.
+
+    Args:
+        df: The table.
+
+    Returns:
+        Mutable dict of index key to index, dropped when *df* is collected.
+    """
+    frame_id = id(df)
+    with _lock:
+        per_frame = _indexes.get(frame_id)
+        if per_frame is None:
+            per_frame = _indexes[frame_id] = {}
+            weakref.finalize(df, _indexes.pop, frame_id, None)
+        return per_frame
+
+
+def get_lookup_index(df: pl.DataFrame, key_col: str) -> LookupIndex:
+    """Return the index for ``df[key_col]``, building it on first use.
+
+    Args:
+        df: The table.
+        key_col: Key column name (must exist in *df*).
+
+    Returns:
+        The shared LookupIndex.
+    """
+    per_frame = frame_indexes(df)
+    index = per_frame.get(key_col)
+    if index is None:
+        index = per_frame.setdefault(key_col, LookupIndex(df[key_col]))
+    return index
+
+
+def can_index(dtype: pl.DataType, value: Any) -> bool:
+    """Whether a dict probe for *value* agrees with ``pl.col(...) == value``.
+
+    Polars compares across numeric types and treats NaN as equal to NaN;
+    it raises on string/number comparisons and matches nothing for None.
+    Only the combinations where Python equality gives the same answer are
+    indexed; everything else keeps the filter path.
+
+    Args:
+        dtype: Dtype of the key column.
+        value: The key being looked up.
+
+    Returns:
+        True if the index can answer the lookup.
+    """
+    if isinstance(value, bool):
+        return dtype == pl.Boolean
+    if isinstance(value, (int, float)):
+        if isinstance(value, float) and math.isnan(value):
+            return False
+        return dtype.is_integer() or dtype.is_float()
+    if isinstance(value, str):
+        return dtype == pl.String
+    return False
@@ -75,3 +75,25 @@ def get_table_fn(name: str) -> Callable:
     if name not in _TABLE_FUNCTIONS:
         raise KeyError(f"Unknown table function: {name!r}")
     return _TABLE_FUNCTIONS[name]
+
+
+def snapshot_functions() -> tuple[dict[str, Callable[..., Any]], dict[str, Callable[..., Any]]]:
+    """Return copies of the scalar and table function registries.
+
+    Returns:
+        Tuple of (scalar functions, table functions).
+    """
+    return dict(_SCALAR_FUNCTIONS), dict(_TABLE_FUNCTIONS)
+
+
+def restore_functions(
+    scalars: dict[str, Callable[..., Any]], tables: dict[str, Callable[..., Any]]
+) -> None:
+    """Re-register previously registered functions.
+
+    Args:
+        scalars: Scalar functions by name.
+        tables: Table functions by name.
+    """
+    _SCALAR_FUNCTIONS.update(scalars)
+    _TABLE_FUNCTIONS.update(tables)
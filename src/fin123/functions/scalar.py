@@ -7,6 +7,7 @@ from typing import Any
 
 import polars as pl
 
+from fin123.functions.lookup_index import can_index, get_lookup_index
 from fin123.functions.registry import register_scalar
 
 
@@ -229,9 +230,14 @@ def scalar_lookup(
             f"{table_name!r}. Available columns: {df.columns}"
         )
 
-    matches = df.filter(pl.col(key_col) == key_value)
+    if can_index(df.schema[key_col], key_value):
+        matches = df
+        row, n_matches = get_lookup_index(df, key_col).find(key_value)
+    else:
+        matches = df.filter(pl.col(key_col) == key_value)
+        row, n_matches = 0, len(matches)
 
-    if len(matches) == 0:
+    if n_matches == 0:
         if on_missing == "none":
             return None
         available = df[key_col].unique().sort().head(10).to_list()
@@ -241,17 +247,17 @@ def scalar_lookup(
             f"Available keys (up to 10): {available}"
         )
 
-    if len(matches) > 1:
+    if n_matches > 1:
         if on_duplicate == "first":
             pass  # take first below
         else:
             raise ValueError(
-                f"lookup_scalar: {len(matches)} rows found in table "
+                f"lookup_scalar: {n_matches} rows found in table "
                 f"{table_name!r} where {key_col}=={key_value!r}. "
                 f"Use on_duplicate='first' to take the first match."
             )
 
-    value = matches[value_col][0]
+    value = matches[value_col][row]
     # Convert Polars types to Python natives
     if isinstance(value, (int, float, str, bool, type(None))):
         return value
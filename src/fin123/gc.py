@@ -9,6 +9,7 @@ from pathlib import Path
 from typing import Any
 
 from fin123.project import load_project_config
+from fin123.run_index import RunIndex
 from fin123.versioning import SnapshotStore
 
 
@@ -201,6 +202,7 @@ def _gc_runs(
     max_runs = config.get("max_runs", 50)
     max_bytes = config.get("max_total_run_bytes", 2_000_000_000)
     ttl_days = config.get("ttl_days")
+    index = RunIndex(runs_dir.parent)
 
     run_dirs = sorted(
         [d for d in runs_dir.iterdir() if d.is_dir()],
@@ -220,6 +222,7 @@ def _gc_runs(
                     freed = _dir_size(rd)
                     if not dry_run:
                         shutil.rmtree(rd)
+                        index.remove(rd.name)
                     run_dirs.remove(rd)
                     summary["runs_deleted"] += 1
                     summary["bytes_freed"] += freed
@@ -231,6 +234,7 @@ def _gc_runs(
         freed = _dir_size(oldest)
         if not dry_run:
             shutil.rmtree(oldest)
+            index.remove(oldest.name)
         run_dirs.remove(oldest)
         summary["runs_deleted"] += 1
         summary["bytes_freed"] += freed
@@ -243,6 +247,7 @@ def _gc_runs(
         freed = _dir_size(oldest)
         if not dry_run:
             shutil.rmtree(oldest)
+            index.remove(oldest.name)
         run_dirs.remove(oldest)
         total_size -= freed
         summary["runs_deleted"] += 1
@@ -506,11 +511,16 @@ def _gc_model_versions(
 
     # Update index.json to remove deleted versions
     if deleted_ids and not dry_run:
-        index["versions"] = [
-            v for v in index["versions"]
-            if v["model_version_id"] not in deleted_ids
-        ]
-        store._write_index(index)
+
+        def drop_deleted(index: dict) -> None:
+            index["versions"] = [
+                v for v in index["versions"]
+                if v["model_version_id"] not in deleted_ids
+            ]
+
+        store._update_index(drop_deleted)
+        # Content no remaining version links to
+        store.prune_objects()
 
 
 def _gc_logs(
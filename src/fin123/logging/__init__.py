@@ -18,9 +18,10 @@ from fin123.logging.events import (
     redact_context,
     set_project_dir,
 )
-from fin123.logging.sink import EventSink
+from fin123.logging.sink import AsyncEventSink, EventSink
 
 __all__ = [
+    "AsyncEventSink",
     "EventLevel",
     "EventSink",
     "EventType",
@@ -73,6 +73,7 @@ class EventType(str, Enum):
 
     # Batch lifecycle
     batch_started = "batch_started"
+    batch_progress = "batch_progress"
     batch_completed = "batch_completed"
 
     # Release lifecycle
@@ -391,19 +392,36 @@ def set_project_dir(project_dir: Any) -> None:
     This should be called early in a CLI command or server startup.  If
     it is never called, ``emit()`` silently discards events.
 
-    Reads ``logging_fsync`` and ``logging_tail_bytes`` from the project
-    config (``fin123.yaml``) to configure the sink.
+    Reads ``logging_fsync``, ``logging_tail_bytes`` and
+    ``logging_segment_bytes`` from the project config (``fin123.yaml``) to
+    configure the sink.  With
+    ``logging_async: true`` events are written by a background
+    ``AsyncEventSink`` (bounded by ``logging_async_buffer``, full-buffer
+    policy ``logging_async_overflow``), which is reused across calls for
+    the same project and flushed at process exit.
+
+    Invalid values are never fatal.  A non-positive
+    ``logging_segment_bytes`` falls back to the default segment size and
+    smaller values are raised to 64 KB; bad async options fall back to
+    the synchronous ``EventSink``.  Both warn on stderr.
     """
     global _sink, _project_dir
     from pathlib import Path
 
-    from fin123.logging.sink import EventSink
-
-    _project_dir = project_dir
+    from fin123.logging.sink import (
+        ASYNC_OVERFLOW_POLICIES,
+        MIN_SEGMENT_BYTES,
+        AsyncEventSink,
+        EventSink,
+    )
 
     # Load config for logging options
     fsync = False
     tail_bytes = None
+    segment_bytes = None
+    use_async = False
+    max_buffer = 10_000
+    overflow = "block"
     try:
         from fin123.project import load_project_config
 
@@ -412,10 +430,90 @@ def set_project_dir(project_dir: Any) -> None:
         tb = cfg.get("logging_tail_bytes")
         if tb is not None:
             tail_bytes = int(tb)
+        sb = cfg.get("logging_segment_bytes")
+        if sb is not None:
+            segment_bytes = int(sb)
+            if segment_bytes <= 0:
+                _stderr_warning(
+                    f"logging_segment_bytes must be positive, got {sb!r}; using the default"
+                )
+                segment_bytes = None
+            else:
+                segment_bytes = max(segment_bytes, MIN_SEGMENT_BYTES)
+        if cfg.get("logging_async", False):
+            buf = cfg.get("logging_async_buffer", max_buffer)
+            overflow = str(cfg.get("logging_async_overflow", overflow))
+            try:
+                max_buffer = int(buf)
+            except (TypeError, ValueError):
+                max_buffer = 0
+            if overflow not in ASYNC_OVERFLOW_POLICIES:
+                _stderr_warning(
+                    f"Invalid logging_async_overflow {overflow!r}; expected one of "
+                    f"{list(ASYNC_OVERFLOW_POLICIES)}, logging synchronously"
+                )
+            elif max_buffer < 1:
+                _stderr_warning(
+                    f"logging_async_buffer must be an integer >= 1, got {buf!r}; "
+                    "logging synchronously"
+                )
+            else:
+                use_async = True
     except Exception:
         pass
 
-    _sink = EventSink(project_dir, fsync=fsync, tail_bytes=tail_bytes)
+    _project_dir = project_dir
+    previous = _sink
+    if not use_async:
+        _sink = EventSink(
+            project_dir, fsync=fsync, tail_bytes=tail_bytes, segment_bytes=segment_bytes
+        )
+    elif (
+        isinstance(previous, AsyncEventSink)
+        and not previous._closed
+        and previous.logs_dir == Path(project_dir) / "logs"
+        and (previous._fsync, previous._segment_bytes, previous.max_buffer, previous.overflow)
+        == (fsync, segment_bytes or previous._segment_bytes, max_buffer, overflow)
+    ):
+        # Keep the running flusher (set_project_dir is called per build)
+        previous._tail_bytes = tail_bytes if tail_bytes is not None else previous._tail_bytes
+        return
+    else:
+        _sink = AsyncEventSink(
+            project_dir,
+            fsync=fsync,
+            tail_bytes=tail_bytes,
+            segment_bytes=segment_bytes,
+            max_buffer=max_buffer,
+            overflow=overflow,
+        )
+        _register_exit_flush()
+    if isinstance(previous, AsyncEventSink):
+        previous.close()
+
+
+_exit_flush_registered = False
+
+
+def _register_exit_flush() -> None:
+    """Flush the async sink (if any) when the interpreter exits."""
+    global _exit_flush_registered
+    if _exit_flush_registered:
+        return
+    import atexit
+
+    atexit.register(_close_sink)
+    _exit_flush_registered = True
+
+
+def _close_sink() -> None:
+    """Flush and stop the module-level sink if it buffers events."""
+    close = getattr(_sink, "close", None)
+    if close is not None:
+        try:
+            close()
+        except Exception:
+            pass
 
 
 def _get_sink() -> Any:
@@ -449,6 +547,16 @@ def _stderr_warning(msg: str) -> None:
 # ---------------------------------------------------------------------------
 
 
+# Events after which a buffering sink is flushed
+_FLUSH_EVENT_TYPES = frozenset({
+    EventType.run_completed,
+    EventType.run_failed,
+    EventType.batch_completed,
+    EventType.run_verify_pass,
+    EventType.run_verify_fail,
+})
+
+
 def emit(event: Fin123Event, *, run_id: str | None = None, sync_id: str | None = None) -> None:
     """Write an event to the global log and optionally to a per-run/sync log.
 
@@ -473,6 +581,9 @@ def emit(event: Fin123Event, *, run_id: str | None = None, sync_id: str | None =
         # Validate attribution
         event = _validate_attribution(event)
         sink.write(event, run_id=run_id, sync_id=sync_id)
+        if event.event_type in _FLUSH_EVENT_TYPES and hasattr(sink, "flush"):
+            # Terminal events: make the run's log complete on disk
+            sink.flush()
     except Exception:
         _stderr_warning(f"logging failed: {traceback.format_exc()}")
 
@@ -0,0 +1,188 @@
+"""Sealed segments of the global event log and their sidecar indexes.
+
+The global log is written to ``logs/events.ndjson`` (the active segment).
+Once it grows past the segment size it is sealed: renamed to
+``logs/events/<seq>.ndjson`` next to a ``<seq>.idx.json`` sidecar holding
+the segment's time range, line count, and the byte offsets of the lines
+for each ``event_type``, ``level``, ``run_id``, ``sync_id`` and plugin.
+Sealed segments are immutable, so filtered queries seek straight to the
+matching lines, and retention drops whole segments.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+# Bump when the sidecar layout changes; older sidecars are rebuilt
+INDEX_VERSION = 1
+
+# Query filter name -> how to read it from an event
+_FIELDS: dict[str, tuple[str, ...]] = {
+    "level": ("level",),
+    "event_type": ("event_type",),
+    "plugin": ("context", "plugin_name"),
+    "run_id": ("context", "run_id"),
+    "sync_id": ("context", "sync_id"),
+}
+
+
+def field_value(event: dict[str, Any], name: str) -> Any:
+    """Return the value of filter field *name* in *event*, or None."""
+    value: Any = event
+    for key in _FIELDS[name]:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def matches(event: dict[str, Any], filters: dict[str, str]) -> bool:
+    """Whether *event* satisfies every filter."""
+    return all(field_value(event, name) == want for name, want in filters.items())
+
+
+def index_path(segment: Path) -> Path:
+    """Return the sidecar index path of *segment*."""
+    return segment.with_name(segment.stem + ".idx.json")
+
+
+def list_segments(segments_dir: Path) -> list[Path]:
+    """Return sealed segments, oldest first."""
+    if not segments_dir.exists():
+        return []
+    return sorted(p for p in segments_dir.glob("*.ndjson") if p.stem.isdigit())
+
+
+def next_segment_path(segments_dir: Path) -> Path:
+    """Return the path for the next sealed segment."""
+    existing = list_segments(segments_dir)
+    seq = int(existing[-1].stem) + 1 if existing else 1
+    return segments_dir / f"{seq:08d}.ndjson"
+
+
+def build_index(path: Path) -> dict[str, Any]:
+    """Scan a segment and build its sidecar index.
+
+    Args:
+        path: The NDJSON segment.
+
+    Returns:
+        The index dict.
+    """
+    postings: dict[str, dict[str, list[int]]] = {name: {} for name in _FIELDS}
+    ts_min: str | None = None
+    ts_max: str | None = None
+    count = 0
+    offset = 0
+    with open(path, "rb") as f:
+        for raw in f:
+            line_offset = offset
+            offset += len(raw)
+            if not raw.strip():
+                continue
+            try:
+                event = json.loads(raw)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(event, dict):
+                continue
+            count += 1
+            ts = event.get("ts")
+            if isinstance(ts, str) and ts:
+                ts_min = ts if ts_min is None or ts < ts_min else ts_min
+                ts_max = ts if ts_max is None or ts > ts_max else ts_max
+            for name in _FIELDS:
+                value = field_value(event, name)
+                if isinstance(value, str) and value:
+                    postings[name].setdefault(value, []).append(line_offset)
+    return {
+        "version": INDEX_VERSION,
+        "bytes": offset,
+        "count": count,
+        "ts_min": ts_min,
+        "ts_max": ts_max,
+        "postings": postings,
+    }
+
+
+def write_index(segment: Path, index: dict[str, Any]) -> None:
+    """Atomically write the sidecar index of *segment*."""
+    target = index_path(segment)
+    tmp = target.with_name(target.name + f".tmp-{uuid4().hex}")
+    tmp.write_text(json.dumps(index, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, target)
+
+
+def load_index(segment: Path) -> dict[str, Any]:
+    """Return the sidecar index of *segment*, rebuilding it if missing or stale.
+
+    Raises:
+        FileNotFoundError: If the segment itself is gone (e.g. purged).
+    """
+    try:
+        index = json.loads(index_path(segment).read_text(encoding="utf-8"))
+        if index.get("version") == INDEX_VERSION and index.get("bytes") == segment.stat().st_size:
+            return index
+    except (OSError, ValueError, AttributeError):
+        pass
+    index = build_index(segment)
+    try:
+        write_index(segment, index)
+    except OSError:
+        pass
+    return index
+
+
+def read_segment(segment: Path, filters: dict[str, str]) -> Iterator[dict[str, Any]]:
+    """Yield the events of a sealed segment matching *filters*, newest first.
+
+    With filters, only the lines listed in the index for every filter value
+    are read.  Without filters the segment (bounded by the segment size) is
+    read whole.
+
+    Args:
+        segment: The sealed segment.
+        filters: Mapping of filter name to required value.
+    """
+    try:
+        if not filters:
+            lines = segment.read_bytes().splitlines()
+            for raw in reversed(lines):
+                event = _parse(raw)
+                if event is not None:
+                    yield event
+            return
+
+        index = load_index(segment)
+        offsets: set[int] | None = None
+        for name, want in filters.items():
+            hits = index["postings"].get(name, {}).get(want, [])
+            offsets = set(hits) if offsets is None else offsets & set(hits)
+            if not offsets:
+                return
+        with open(segment, "rb") as f:
+            for offset in sorted(offsets or (), reverse=True):
+                f.seek(offset)
+                event = _parse(f.readline())
+                if event is not None and matches(event, filters):
+                    yield event
+    except FileNotFoundError:
+        # Purged while we were reading
+        return
+
+
+def _parse(raw: bytes) -> dict[str, Any] | None:
+    """Parse one NDJSON line, or None if it is blank or invalid."""
+    raw = raw.strip()
+    if not raw:
+        return None
+    try:
+        event = json.loads(raw)
+    except json.JSONDecodeError:
+        return None
+    return event if isinstance(event, dict) else None
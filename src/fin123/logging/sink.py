@@ -2,17 +2,26 @@
 
 Events are appended as one JSON line per event.  Three log destinations:
 
-- ``logs/events.ndjson``  -- global event log
+- ``logs/events.ndjson``  -- global event log (active segment)
 - ``logs/runs/<run_id>.ndjson``  -- per-run log
 - ``logs/sync/<sync_id>.ndjson`` -- per-sync log
 
 Writes use ``json.dumps(sort_keys=True)`` for deterministic output.
 
+The global log is segmented: when the active file passes the segment size
+it is sealed into ``logs/events/<seq>.ndjson`` with a sidecar index (see
+``fin123.logging.segments``).  ``read_global`` walks the active segment
+and then sealed segments newest first, reading only indexed matching
+lines, so filtered queries see the whole history with bounded memory.
+Retention deletes whole sealed segments.
+
 Concurrency safety:
 
 - Each append acquires an exclusive ``fcntl.flock`` on the target file.
 - Reads acquire a shared lock.
 - Lock duration is kept minimal (single write/read per lock).
+- Sealing happens under the active file's lock; appenders that waited on a
+  sealed file notice the rename and reopen the new active file.
 - On platforms without ``fcntl`` (Windows), locking is skipped with a
   stderr warning.
 """
@@ -22,10 +31,13 @@ from __future__ import annotations
 import json
 import os
 import sys
+import threading
+from collections import deque
 from pathlib import Path
 from typing import Any
 
-from fin123.logging.events import EventLevel, Fin123Event
+from fin123.logging import segments
+from fin123.logging.events import EventLevel, Fin123Event, _stderr_warning
 
 # Try to import fcntl for file locking (Unix only)
 try:
@@ -50,14 +62,40 @@ _DEFAULT_TAIL_BYTES = 2 * 1024 * 1024
 # Default number of newest lines to preserve during global log purge
 _DEFAULT_PRESERVE_LINES = 500
 
+# Default size at which the active global log segment is sealed (8 MB)
+_DEFAULT_SEGMENT_BYTES = 8 * 1024 * 1024
+
+# Smallest segment size accepted from ``logging_segment_bytes`` (64 KB)
+MIN_SEGMENT_BYTES = 64 * 1024
+
+# What AsyncEventSink.write does when its buffer is full
+ASYNC_OVERFLOW_POLICIES = ("block", "drop")
+
+
+def _serialize(event: Fin123Event) -> str:
+    """Render *event* as one NDJSON line."""
+    return json.dumps(event.model_dump(), sort_keys=True, default=str) + "\n"
+
 
 class EventSink:
     """Append-only NDJSON log writer with file locking."""
 
-    def __init__(self, project_dir: Path, *, fsync: bool = False, tail_bytes: int | None = None) -> None:
+    def __init__(
+        self,
+        project_dir: Path,
+        *,
+        fsync: bool = False,
+        tail_bytes: int | None = None,
+        segment_bytes: int | None = None,
+    ) -> None:
         self.logs_dir = project_dir / "logs"
+        self.segments_dir = self.logs_dir / "events"
+        self._global_path = self.logs_dir / "events.ndjson"
         self._fsync = fsync
         self._tail_bytes = tail_bytes if tail_bytes is not None else _DEFAULT_TAIL_BYTES
+        if segment_bytes is not None and segment_bytes < 1:
+            raise ValueError(f"logging_segment_bytes must be >= 1, got {segment_bytes}")
+        self._segment_bytes = segment_bytes if segment_bytes is not None else _DEFAULT_SEGMENT_BYTES
 
         # Eager directory creation (Deliverable F)
         self.logs_dir.mkdir(parents=True, exist_ok=True)
@@ -72,18 +110,23 @@ class EventSink:
         sync_id: str | None = None,
     ) -> None:
         """Append *event* to the global log and optionally a scoped log."""
-        line = json.dumps(event.model_dump(), sort_keys=True, default=str) + "\n"
+        line = _serialize(event)
+        for path in self._paths(run_id, sync_id):
+            self._append(path, line)
 
+    def _paths(self, run_id: str | None, sync_id: str | None) -> list[Path]:
+        """Return the log files an event with these scope ids goes to."""
         # Global log
-        self._append(self.logs_dir / "events.ndjson", line)
+        paths = [self._global_path]
 
         # Per-run log
         if run_id and _SAFE_ID_RE.match(run_id):
-            self._append(self.logs_dir / "runs" / f"{run_id}.ndjson", line)
+            paths.append(self.logs_dir / "runs" / f"{run_id}.ndjson")
 
         # Per-sync log
         if sync_id and _SAFE_ID_RE.match(sync_id):
-            self._append(self.logs_dir / "sync" / f"{sync_id}.ndjson", line)
+            paths.append(self.logs_dir / "sync" / f"{sync_id}.ndjson")
+        return paths
 
     # ------------------------------------------------------------------
     # Query helpers (used by API / CLI)
@@ -101,41 +144,45 @@ class EventSink:
     ) -> list[dict[str, Any]]:
         """Read events from the global log, most-recent-first, with filters.
 
-        Uses tail-style reading to bound memory usage on large log files.
+        Searches the active segment, then sealed segments newest first
+        using their indexes, until *limit* events are found.  Memory is
+        bounded by one segment plus *limit* events.
         """
         limit = min(limit, 2000)
+        filters = {
+            name: value
+            for name, value in (
+                ("level", level),
+                ("event_type", event_type),
+                ("plugin", plugin),
+                ("run_id", run_id),
+                ("sync_id", sync_id),
+            )
+            if value
+        }
+        self._before_read()
 
-        path = self.logs_dir / "events.ndjson"
-        events = self._read_ndjson(path)
-
-        if level:
-            events = [e for e in events if e.get("level") == level]
-        if event_type:
-            events = [e for e in events if e.get("event_type") == event_type]
-        if plugin:
-            events = [
-                e for e in events
-                if e.get("context", {}).get("plugin_name") == plugin
-            ]
-        if run_id:
-            events = [
-                e for e in events
-                if e.get("context", {}).get("run_id") == run_id
-            ]
-        if sync_id:
-            events = [
-                e for e in events
-                if e.get("context", {}).get("sync_id") == sync_id
-            ]
-
-        # Most recent first
-        events.reverse()
-        return events[:limit]
+        events: list[dict[str, Any]] = []
+        if limit <= 0:
+            return events
+        active = self._read_ndjson(self._global_path, max(self._tail_bytes, 2 * self._segment_bytes))
+        for event in reversed(active):
+            if segments.matches(event, filters):
+                events.append(event)
+                if len(events) >= limit:
+                    return events
+        for segment in reversed(segments.list_segments(self.segments_dir)):
+            for event in segments.read_segment(segment, filters):
+                events.append(event)
+                if len(events) >= limit:
+                    return events
+        return events
 
     def read_run_log(self, run_id: str) -> list[dict[str, Any]]:
         """Read all events for a specific run."""
         if not _SAFE_ID_RE.match(run_id):
             return []
+        self._before_read()
         path = self.logs_dir / "runs" / f"{run_id}.ndjson"
         return self._read_ndjson(path)
 
@@ -143,6 +190,7 @@ class EventSink:
         """Read all events for a specific sync."""
         if not _SAFE_ID_RE.match(sync_id):
             return []
+        self._before_read()
         path = self.logs_dir / "sync" / f"{sync_id}.ndjson"
         return self._read_ndjson(path)
 
@@ -157,10 +205,10 @@ class EventSink:
     ) -> int:
         """Delete log files older than *max_days*, preserving retained runs/syncs.
 
-        Global log purge uses an atomic rewrite under exclusive lock,
+        The global log is trimmed by deleting whole sealed segments, always
         preserving the newest *preserve_lines* lines (default 500).
 
-        Returns the number of files deleted.
+        Returns the number of files (including global log segments) deleted.
         """
         import time
 
@@ -193,8 +241,8 @@ class EventSink:
                     f.unlink()
                     deleted += 1
 
-        # Trim global log: atomic rewrite under exclusive lock
-        self._purge_global_log(cutoff, max_bytes=max_bytes, preserve_lines=preserve_lines)
+        # Trim global log: drop whole sealed segments
+        deleted += self._purge_global_log(cutoff, max_bytes=max_bytes, preserve_lines=preserve_lines)
 
         return deleted
 
@@ -204,122 +252,118 @@ class EventSink:
         *,
         max_bytes: int | None = None,
         preserve_lines: int = _DEFAULT_PRESERVE_LINES,
-    ) -> None:
-        """Rewrite events.ndjson keeping only recent lines.
+    ) -> int:
+        """Delete sealed global log segments that are too old or over budget.
 
-        Uses atomic write-to-tmp + os.replace under exclusive lock.
-        """
-        from datetime import datetime, timezone
+        A segment is deleted when its newest event is older than *cutoff*,
+        or when it falls outside the newest *max_bytes* of the global log,
+        unless it is needed to keep the newest *preserve_lines* lines.  The
+        active segment is never deleted.
 
-        global_path = self.logs_dir / "events.ndjson"
-        if not global_path.exists():
-            return
+        Returns:
+            Number of segments deleted.
+        """
+        from datetime import datetime
 
-        # Check if we need to purge at all
         try:
-            file_size = global_path.stat().st_size
+            active_size = self._global_path.stat().st_size
+            kept_lines = sum(1 for _ in self._read_ndjson(self._global_path, 2 * self._segment_bytes))
         except OSError:
-            return
-
-        needs_purge = False
-        if max_bytes and file_size > max_bytes:
-            needs_purge = True
-
-        # Read all lines (under shared lock)
-        all_lines = self._read_raw_lines(global_path)
-        if not all_lines:
-            return
+            active_size, kept_lines = 0, 0
+        kept_bytes = active_size
 
-        # Filter by timestamp
-        kept_lines: list[str] = []
-        for line in all_lines:
-            if not line.strip():
-                continue
+        deleted = 0
+        for segment in reversed(segments.list_segments(self.segments_dir)):
             try:
-                evt = json.loads(line)
-                ts_str = evt.get("ts", "")
-                ts = datetime.fromisoformat(
-                    ts_str.replace("Z", "+00:00")
-                ).timestamp()
-                if ts >= cutoff:
-                    kept_lines.append(line)
-            except (json.JSONDecodeError, ValueError, OSError):
-                # Unparseable lines are kept
-                kept_lines.append(line)
-
-        if not needs_purge and len(kept_lines) == len(all_lines):
-            return  # Nothing to trim
-
-        # Also enforce max_bytes by keeping only newest lines
-        if max_bytes:
-            total = 0
-            trimmed: list[str] = []
-            for line in reversed(kept_lines):
-                total += len(line.encode("utf-8")) + 1  # +1 for newline
-                if total > max_bytes:
-                    break
-                trimmed.append(line)
-            trimmed.reverse()
-            kept_lines = trimmed
-
-        # Always preserve at least the newest N lines
-        if len(kept_lines) < preserve_lines and len(all_lines) >= preserve_lines:
-            # Take the last preserve_lines from the original set
-            kept_lines = [l for l in all_lines[-preserve_lines:] if l.strip()]
-        elif len(kept_lines) > preserve_lines:
-            pass  # keep all that passed the timestamp filter
-
-        # Atomic rewrite under exclusive lock
-        tmp = global_path.with_suffix(".ndjson.tmp")
-        content = "\n".join(kept_lines) + ("\n" if kept_lines else "")
-        tmp.write_text(content, encoding="utf-8")
-
-        if _HAS_FCNTL:
-            fd = os.open(str(global_path), os.O_RDWR | os.O_CREAT)
+                index = segments.load_index(segment)
+            except OSError:
+                continue
+            kept_bytes += index["bytes"]
+            expired = False
             try:
-                fcntl.flock(fd, fcntl.LOCK_EX)
-                os.replace(str(tmp), str(global_path))
-            finally:
-                fcntl.flock(fd, fcntl.LOCK_UN)
-                os.close(fd)
-        else:
-            os.replace(str(tmp), str(global_path))
+                ts_max = index["ts_max"]
+                expired = ts_max is not None and datetime.fromisoformat(
+                    ts_max.replace("Z", "+00:00")
+                ).timestamp() < cutoff
+            except ValueError:
+                pass
+            over_budget = bool(max_bytes) and kept_bytes > max_bytes
+            if (expired or over_budget) and kept_lines >= preserve_lines:
+                for path in (segments.index_path(segment), segment):
+                    try:
+                        path.unlink()
+                    except FileNotFoundError:
+                        pass
+                deleted += 1
+                kept_bytes -= index["bytes"]
+            else:
+                kept_lines += index["count"]
+        return deleted
 
     # ------------------------------------------------------------------
     # Internal
     # ------------------------------------------------------------------
 
+    def _before_read(self) -> None:
+        """Hook run before log queries (buffering sinks flush here)."""
+
     def _append(self, path: Path, line: str) -> None:
-        """Append a single line to *path* under exclusive file lock."""
+        """Append *line* (one or more whole lines) to *path* under exclusive file lock.
+
+        Appends to the global log seal the active segment once it reaches
+        the segment size.
+        """
         path.parent.mkdir(parents=True, exist_ok=True)
+        is_global = path == self._global_path
 
         if _HAS_FCNTL:
-            fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_APPEND)
-            try:
-                fcntl.flock(fd, fcntl.LOCK_EX)
-                os.write(fd, line.encode("utf-8"))
-                if self._fsync:
-                    os.fsync(fd)
-            finally:
-                fcntl.flock(fd, fcntl.LOCK_UN)
-                os.close(fd)
+            while True:
+                fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_APPEND)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                    if is_global and not _is_current(fd, path):
+                        # Sealed while we waited for the lock; reopen
+                        continue
+                    os.write(fd, line.encode("utf-8"))
+                    if self._fsync:
+                        os.fsync(fd)
+                    if is_global and os.fstat(fd).st_size >= self._segment_bytes:
+                        self._seal(path)
+                    return
+                finally:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                    os.close(fd)
         else:
             with open(path, "a", encoding="utf-8") as f:
                 f.write(line)
                 if self._fsync:
                     f.flush()
                     os.fsync(f.fileno())
+            if is_global and path.stat().st_size >= self._segment_bytes:
+                self._seal(path)
+
+    def _seal(self, path: Path) -> None:
+        """Move the active global segment to the sealed segments with its index.
 
-    def _read_ndjson(self, path: Path) -> list[dict[str, Any]]:
+        Called with the active file's exclusive lock held.  The sidecar is
+        written before the rename so a sealed segment always has an index
+        (a missing or stale one is rebuilt on read anyway).
+        """
+        self.segments_dir.mkdir(exist_ok=True)
+        target = segments.next_segment_path(self.segments_dir)
+        segments.write_index(target, segments.build_index(path))
+        os.replace(path, target)
+
+    def _read_ndjson(self, path: Path, max_bytes: int | None = None) -> list[dict[str, Any]]:
         """Read an NDJSON file with tail-bounded reading and shared lock.
 
-        Only reads the last ``self._tail_bytes`` of the file to bound
-        memory usage on large log files.
+        Only reads the last *max_bytes* (default ``self._tail_bytes``) of
+        the file to bound memory usage on large log files.
         """
         if not path.exists():
             return []
 
-        raw = self._read_tail(path)
+        raw = self._read_tail(path, max_bytes)
         events: list[dict[str, Any]] = []
         for line in raw.splitlines():
             line = line.strip()
@@ -331,18 +375,25 @@ class EventSink:
                 continue
         return events
 
-    def _read_tail(self, path: Path) -> str:
-        """Read up to the last ``self._tail_bytes`` of a file under shared lock."""
+    def _read_tail(self, path: Path, max_bytes: int | None = None) -> str:
+        """Read up to the last *max_bytes* of a file under shared lock."""
+        tail_bytes = max_bytes if max_bytes is not None else self._tail_bytes
         if _HAS_FCNTL:
-            fd = os.open(str(path), os.O_RDONLY)
+            try:
+                fd = os.open(str(path), os.O_RDONLY)
+            except FileNotFoundError:
+                return ""
             try:
                 fcntl.flock(fd, fcntl.LOCK_SH)
+                if not _is_current(fd, path):
+                    # Sealed before we got the lock: it is read as a segment
+                    return ""
                 file_size = os.fstat(fd).st_size
-                if file_size <= self._tail_bytes:
+                if file_size <= tail_bytes:
                     data = os.read(fd, file_size)
                 else:
-                    os.lseek(fd, file_size - self._tail_bytes, os.SEEK_SET)
-                    data = os.read(fd, self._tail_bytes)
+                    os.lseek(fd, file_size - tail_bytes, os.SEEK_SET)
+                    data = os.read(fd, tail_bytes)
                     # Drop the first (likely partial) line
                     idx = data.find(b"\n")
                     if idx >= 0:
@@ -357,23 +408,213 @@ class EventSink:
                 file_size = path.stat().st_size
             except OSError:
                 return ""
-            if file_size <= self._tail_bytes:
+            if file_size <= tail_bytes:
                 return path.read_text(encoding="utf-8")
             else:
                 with open(path, "rb") as f:
-                    f.seek(file_size - self._tail_bytes)
+                    f.seek(file_size - tail_bytes)
                     data = f.read()
                     idx = data.find(b"\n")
                     if idx >= 0:
                         data = data[idx + 1:]
                     return data.decode("utf-8", errors="replace")
 
-    def _read_raw_lines(self, path: Path) -> list[str]:
-        """Read all non-empty lines from a file (for purge operations)."""
-        if not path.exists():
-            return []
-        try:
-            text = path.read_text(encoding="utf-8")
-            return [l for l in text.splitlines() if l.strip()]
-        except OSError:
-            return []
+
+def _is_current(fd: int, path: Path) -> bool:
+    """Whether *fd* is still the file at *path* (i.e. it was not sealed)."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False
+    fst = os.fstat(fd)
+    return (st.st_ino, st.st_dev) == (fst.st_ino, fst.st_dev)
+
+
+class AsyncEventSink(EventSink):
+    """EventSink that appends from a background thread in batches.
+
+    ``write()`` only enqueues the event.  A flusher thread drains the
+    queue, serializes the events, joins the lines bound for each file, and
+    appends them with one lock (and one fsync, if enabled) per file per
+    batch.  Events are written in the order they were accepted.
+
+    The buffer is bounded.  When it is full, ``overflow="block"`` makes
+    the caller wait for the flusher (counted in ``delayed``) and
+    ``overflow="drop"`` discards the event (counted in ``dropped``).
+    Reads flush first, so they see every accepted event.
+    """
+
+    def __init__(
+        self,
+        project_dir: Path,
+        *,
+        fsync: bool = False,
+        tail_bytes: int | None = None,
+        segment_bytes: int | None = None,
+        max_buffer: int = 10_000,
+        overflow: str = "block",
+        linger: float = 0.05,
+    ) -> None:
+        """Initialize the sink and start its flusher thread.
+
+        Args:
+            project_dir: Root of the fin123 project.
+            fsync: Fsync each file once per batch.
+            tail_bytes: Read window for per-run/per-sync log queries.
+            segment_bytes: Size at which the global log segment is sealed.
+            max_buffer: Maximum number of queued events.
+            overflow: ``"block"`` or ``"drop"`` when the buffer is full.
+            linger: Seconds the flusher waits for more events before
+                writing a batch (skipped when a flush is requested).
+
+        Raises:
+            ValueError: If *max_buffer* or *overflow* is invalid.
+        """
+        if overflow not in ASYNC_OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Invalid logging_async_overflow {overflow!r}; "
+                f"expected one of {list(ASYNC_OVERFLOW_POLICIES)}"
+            )
+        if max_buffer < 1:
+            raise ValueError(f"logging_async_buffer must be >= 1, got {max_buffer}")
+        super().__init__(
+            project_dir, fsync=fsync, tail_bytes=tail_bytes, segment_bytes=segment_bytes
+        )
+        self.max_buffer = max_buffer
+        self.overflow = overflow
+        self.linger = linger
+        self.dropped = 0
+        self.delayed = 0
+        self.written = 0
+        self._closed = False
+        self._start()
+
+    def _start(self) -> None:
+        """(Re)initialize the queue and start the flusher thread."""
+        self._pid = os.getpid()
+        self._cond = threading.Condition()
+        self._queue: deque[tuple[Fin123Event, str | None, str | None]] = deque()
+        self._accepted = 0
+        self._done = 0
+        self._flush_waiters = 0
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="fin123-event-sink", daemon=True
+        )
+        self._thread.start()
+
+    def write(
+        self,
+        event: Fin123Event,
+        *,
+        run_id: str | None = None,
+        sync_id: str | None = None,
+    ) -> None:
+        """Queue *event* for the global log and optionally a scoped log."""
+        if self._closed:
+            super().write(event, run_id=run_id, sync_id=sync_id)
+            return
+        if os.getpid() != self._pid:
+            # Forked child: the parent's flusher thread does not exist here
+            self._start()
+        with self._cond:
+            if len(self._queue) >= self.max_buffer:
+                if self.overflow == "drop":
+                    self.dropped += 1
+                    _stderr_warning(
+                        f"event buffer full; dropped {self.dropped} event(s) so far"
+                    )
+                    return
+                self.delayed += 1
+                self._cond.wait_for(lambda: len(self._queue) < self.max_buffer)
+            self._queue.append((event, run_id, sync_id))
+            self._accepted += 1
+            self._cond.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every event accepted so far has been written.
+
+        Args:
+            timeout: Maximum seconds to wait (None = no limit).
+
+        Returns:
+            True if everything was written, False on timeout.
+        """
+        if self._closed or os.getpid() != self._pid:
+            return True
+        with self._cond:
+            target = self._accepted
+            self._flush_waiters += 1
+            self._cond.notify_all()
+            try:
+                return self._cond.wait_for(lambda: self._done >= target, timeout)
+            finally:
+                self._flush_waiters -= 1
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """Flush, stop the flusher thread, and write synchronously from now on.
+
+        Args:
+            timeout: Maximum seconds to wait for the final flush.
+        """
+        if self._closed:
+            return
+        self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if os.getpid() == self._pid:
+            self._thread.join(timeout)
+        self._closed = True
+
+    def stats(self) -> dict[str, int]:
+        """Return counters: written, queued, delayed and dropped events."""
+        with self._cond:
+            return {
+                "written": self.written,
+                "queued": len(self._queue),
+                "delayed": self.delayed,
+                "dropped": self.dropped,
+            }
+
+    def _before_read(self) -> None:
+        """Flush pending events so queries see them."""
+        self.flush()
+
+    def _run(self) -> None:
+        """Flusher thread: drain the queue in batches until stopped."""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._stopping)
+                if not self._queue:
+                    return
+                # Give a burst a moment to accumulate into one batch
+                self._cond.wait_for(
+                    lambda: self._flush_waiters
+                    or self._stopping
+                    or len(self._queue) >= self.max_buffer,
+                    self.linger,
+                )
+                batch = list(self._queue)
+                self._queue.clear()
+                self._cond.notify_all()
+            written = 0
+            try:
+                self._write_batch(batch)
+                written = len(batch)
+            except Exception as exc:
+                _stderr_warning(f"logging failed: {exc}")
+            with self._cond:
+                self._done += len(batch)
+                self.written += written
+                self._cond.notify_all()
+
+    def _write_batch(self, batch: list[tuple[Fin123Event, str | None, str | None]]) -> None:
+        """Append a batch with one locked write per file."""
+        chunks: dict[Path, list[str]] = {}
+        for event, run_id, sync_id in batch:
+            line = _serialize(event)
+            for path in self._paths(run_id, sync_id):
+                chunks.setdefault(path, []).append(line)
+        for path, lines in chunks.items():
+            self._append(path, "".join(lines))
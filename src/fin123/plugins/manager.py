@@ -14,13 +14,28 @@ This module is imported by :meth:`Workbook._load_plugins` during build.
 from __future__ import annotations
 
 import importlib.util
+import json
 import logging
+import os
 import sys
+import threading
 from pathlib import Path
 from typing import Any
+from uuid import uuid4
 
 log = logging.getLogger(__name__)
 
+# Plugins already imported by this process, by resolved path.  An entry is
+# reused while the file's SHA-256 and the engine version are unchanged, so
+# repeated builds (batch/sweep workers, the UI server) validate and import
+# each plugin once.
+_loaded: dict[str, dict[str, Any]] = {}
+_lock = threading.Lock()
+
+# Persisted validation verdicts, keyed by plugin SHA-256, so fresh worker
+# processes skip the AST safety scan for plugins already validated
+VERDICT_CACHE = Path("cache") / "plugin_validation.json"
+
 
 def load_active_plugins(
     project_dir: Path,
@@ -34,6 +49,11 @@ def load_active_plugins(
     3. Call the module's ``register()`` if present.
     4. Collect version and SHA-256 hash for run metadata.
 
+    Plugins this process has already loaded from an unchanged file are not
+    re-validated or re-imported; the functions they registered are restored
+    instead.  Validation verdicts are cached in ``cache/plugin_validation.json``
+    by file hash and engine version.
+
     Args:
         project_dir: Root of the fin123 project.
 
@@ -49,10 +69,23 @@ def load_active_plugins(
     if not plugin_files:
         return {}
 
+    with _lock:
+        return _load_plugin_files(project_dir, plugin_files)
+
+
+def _load_plugin_files(
+    project_dir: Path, plugin_files: list[Path]
+) -> dict[str, dict[str, str]]:
+    """Load *plugin_files* (see ``load_active_plugins``); caller holds ``_lock``."""
+    from fin123 import __version__
+    from fin123.functions.registry import restore_functions, snapshot_functions
     from fin123.plugins.validator import validate_plugin_source
-    from fin123.utils.hash import sha256_file
+    from fin123.utils.hash import sha256_bytes
 
     results: dict[str, dict[str, str]] = {}
+    verdicts_path = project_dir / VERDICT_CACHE
+    verdicts: dict[str, dict[str, Any]] | None = None
+    verdicts_dirty = False
 
     for plugin_path in plugin_files:
         stem = plugin_path.stem
@@ -63,13 +96,40 @@ def load_active_plugins(
 
         # ── 1. Read and validate source ──
         try:
-            source = plugin_path.read_text(encoding="utf-8")
+            data = plugin_path.read_bytes()
+            source = data.decode("utf-8")
         except Exception as exc:
             log.warning("Plugin %s: cannot read file: %s", stem, exc)
             _emit_plugin_error(stem, "read_error", str(exc))
             continue
+        file_hash = sha256_bytes(data)
+
+        loaded_key = str(plugin_path.resolve())
+        loaded = _loaded.get(loaded_key)
+        if (
+            loaded is not None
+            and loaded["sha256"] == file_hash
+            and loaded["engine_version"] == __version__
+            and sys.modules.get(loaded["module_name"]) is loaded["module"]
+        ):
+            restore_functions(loaded["scalars"], loaded["tables"])
+            results[loaded["name"]] = {"version": loaded["version"], "sha256": file_hash}
+            _emit_plugin_activate(loaded["name"], loaded["version"], file_hash)
+            continue
+
+        if verdicts is None:
+            verdicts = _read_verdicts(verdicts_path)
+        validation = verdicts.get(file_hash)
+        if validation is None or validation.get("engine_version") != __version__:
+            scan = validate_plugin_source(source)
+            validation = {
+                "engine_version": __version__,
+                "errors": scan["errors"],
+                "warnings": scan["warnings"],
+            }
+            verdicts[file_hash] = validation
+            verdicts_dirty = True
 
-        validation = validate_plugin_source(source)
         if validation["errors"]:
             log.warning(
                 "Plugin %s: validation failed: %s",
@@ -84,6 +144,7 @@ def load_active_plugins(
                 log.info("Plugin %s warning: %s", stem, w.get("reason", w))
 
         # ── 2. Import the module ──
+        scalars_before, tables_before = snapshot_functions()
         module_name = f"fin123._loaded_plugins.{stem}"
         try:
             spec = importlib.util.spec_from_file_location(module_name, plugin_path)
@@ -125,7 +186,17 @@ def load_active_plugins(
                 plugin_version = str(meta.get("version", "unknown"))
 
         # ── 4. Record result ──
-        file_hash = sha256_file(plugin_path)
+        scalars_after, tables_after = snapshot_functions()
+        _loaded[loaded_key] = {
+            "sha256": file_hash,
+            "engine_version": __version__,
+            "module_name": module_name,
+            "module": mod,
+            "name": plugin_name,
+            "version": plugin_version,
+            "scalars": _registered_since(scalars_before, scalars_after),
+            "tables": _registered_since(tables_before, tables_after),
+        }
         results[plugin_name] = {
             "version": plugin_version,
             "sha256": file_hash,
@@ -139,9 +210,37 @@ def load_active_plugins(
         )
         _emit_plugin_activate(plugin_name, plugin_version, file_hash)
 
+    if verdicts_dirty and verdicts is not None:
+        _write_verdicts(verdicts_path, verdicts)
+
     return results
 
 
+def _registered_since(before: dict[str, Any], after: dict[str, Any]) -> dict[str, Any]:
+    """Return the registry entries added or replaced between two snapshots."""
+    return {name: fn for name, fn in after.items() if before.get(name) is not fn}
+
+
+def _read_verdicts(path: Path) -> dict[str, dict[str, Any]]:
+    """Read the persisted validation verdicts, or {} if absent or unreadable."""
+    try:
+        verdicts = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return verdicts if isinstance(verdicts, dict) else {}
+
+
+def _write_verdicts(path: Path, verdicts: dict[str, dict[str, Any]]) -> None:
+    """Persist validation verdicts atomically (best-effort)."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+        tmp_path.write_text(json.dumps(verdicts, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        log.debug("Cannot write plugin verdict cache %s: %s", path, exc)
+
+
 # ── Event helpers (best-effort, non-fatal) ──
 
 
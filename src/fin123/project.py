@@ -35,9 +35,20 @@ DEFAULT_CONFIG = {
     "logging_max_bytes": None,
     "logging_fsync": False,
     "logging_tail_bytes": 2_097_152,  # 2 MB
+    "logging_segment_bytes": 8_388_608,  # 8 MB global log segments
+    "logging_async": False,
+    "logging_async_buffer": 10_000,
+    "logging_async_overflow": "block",  # or "drop"
     "mode": "dev",
     "import_projects_base": None,  # default: ~/Documents/fin123_projects
     "connectors_enabled": None,  # prod mode: list of allowed built-in connectors
+    "export_compression": "zstd",  # parquet codec for run outputs
+    "export_compression_level": None,  # codec default
+    "export_row_group_size": None,  # Polars default
+    "export_max_workers": None,  # default: one thread per table, up to CPU count
+    "table_cache": True,  # reuse materialized tables across builds
+    "max_table_cache_entries": 16,
+    "ui_job_workers": 2,  # background jobs in `fin123 ui`; writers still run one at a time
 }
 
 
@@ -0,0 +1,244 @@
+"""SQLite index of run metadata.
+
+``runs/<run_id>/run_meta.json`` remains the source of truth.  The index at
+``cache/run_index.sqlite`` mirrors it so that listing runs, finding the
+latest run, and filtering by scenario or batch do not read every run's
+metadata file.
+
+Writers (``RunStore.create_run``, run/batch meta amendments, GC) keep the
+index up to date.  Readers reconcile it against the ``runs/`` directory
+listing, which is cheap, so runs added or removed outside fin123 are picked
+up.  A missing, corrupt, or outdated index is rebuilt from disk.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+# Bump when the table layout changes; older indexes are rebuilt
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    timestamp TEXT,
+    scenario_name TEXT,
+    build_batch_id TEXT,
+    meta TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_scenario ON runs (scenario_name, run_id);
+CREATE INDEX IF NOT EXISTS runs_batch ON runs (build_batch_id, run_id);
+"""
+
+
+class RunIndex:
+    """Transactional run metadata index for one project."""
+
+    def __init__(self, project_dir: Path) -> None:
+        """Initialize the index.
+
+        Args:
+            project_dir: Root of the fin123 project.
+        """
+        self.runs_dir = project_dir / "runs"
+        self.db_path = project_dir / "cache" / "run_index.sqlite"
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def upsert(self, meta: dict[str, Any]) -> None:
+        """Record (or replace) the metadata of one run.
+
+        Never raises: on a database error the index is discarded and
+        rebuilt from disk on next use.
+
+        Args:
+            meta: Contents of the run's ``run_meta.json``.
+        """
+        try:
+            with self._transaction() as conn:
+                _insert(conn, meta)
+        except sqlite3.Error:
+            self._discard()
+
+    def remove(self, run_id: str) -> None:
+        """Drop a run from the index.  Never raises.
+
+        Args:
+            run_id: The run directory name.
+        """
+        try:
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+        except sqlite3.Error:
+            self._discard()
+
+    def rebuild(self) -> int:
+        """Recreate the index from every ``run_meta.json`` on disk.
+
+        Returns:
+            Number of runs indexed.
+        """
+        self._discard()
+        with self._transaction() as conn:
+            self._sync(conn)
+            return conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def list_runs(
+        self,
+        limit: int | None = None,
+        offset: int = 0,
+        scenario_name: str | None = None,
+        build_batch_id: str | None = None,
+        newest_first: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Return run metadata ordered by run_id.
+
+        Args:
+            limit: Maximum number of runs (None = all).
+            offset: Number of runs to skip (for pagination).
+            scenario_name: Only runs built under this scenario.
+            build_batch_id: Only runs belonging to this batch.
+            newest_first: Order newest run first instead of oldest first.
+
+        Returns:
+            List of run metadata dicts.
+        """
+        where, args = _filters(scenario_name, build_batch_id)
+        sql = "SELECT meta FROM runs" + where
+        sql += " ORDER BY run_id " + ("DESC" if newest_first else "ASC")
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            args.extend([-1 if limit is None else limit, offset])
+        rows = self._query(sql, args)
+        return [json.loads(meta) for (meta,) in rows]
+
+    def count(
+        self,
+        scenario_name: str | None = None,
+        build_batch_id: str | None = None,
+    ) -> int:
+        """Return the number of indexed runs matching the filters."""
+        where, args = _filters(scenario_name, build_batch_id)
+        return self._query("SELECT COUNT(*) FROM runs" + where, args)[0][0]
+
+    def run_ids(self) -> list[str]:
+        """Return the IDs of all indexed runs, oldest first."""
+        return [run_id for (run_id,) in self._query("SELECT run_id FROM runs ORDER BY run_id", [])]
+
+    def latest(self) -> dict[str, Any] | None:
+        """Return the metadata of the most recent run, or None."""
+        runs = self.list_runs(limit=1, newest_first=True)
+        return runs[0] if runs else None
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating or resetting the schema as needed."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                conn.executescript("DROP TABLE IF EXISTS runs;" + _SCHEMA)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Yield a connection; commit on success, roll back on error, close."""
+        conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _query(self, sql: str, args: list[Any]) -> list[tuple]:
+        """Reconcile with disk, then run a read query.
+
+        A corrupt database is discarded and rebuilt once.
+        """
+        try:
+            with self._transaction() as conn:
+                self._sync(conn)
+                return conn.execute(sql, args).fetchall()
+        except sqlite3.DatabaseError:
+            self._discard()
+        with self._transaction() as conn:
+            self._sync(conn)
+            return conn.execute(sql, args).fetchall()
+
+    def _sync(self, conn: sqlite3.Connection) -> None:
+        """Add runs present on disk but not indexed; drop vanished ones."""
+        on_disk = (
+            {d.name for d in self.runs_dir.iterdir() if d.is_dir()}
+            if self.runs_dir.exists()
+            else set()
+        )
+        indexed = {run_id for (run_id,) in conn.execute("SELECT run_id FROM runs")}
+        for run_id in indexed - on_disk:
+            conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+        for run_id in on_disk - indexed:
+            meta_path = self.runs_dir / run_id / "run_meta.json"
+            if not meta_path.exists():
+                # Still being written (or not a run); picked up later
+                continue
+            try:
+                meta = json.loads(meta_path.read_text())
+            except (json.JSONDecodeError, OSError):
+                continue
+            _insert(conn, meta, run_id)
+
+    def _discard(self) -> None:
+        """Delete the database files so the next use rebuilds from disk."""
+        for suffix in ("", "-wal", "-shm"):
+            path = self.db_path.with_name(self.db_path.name + suffix)
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _filters(scenario_name: str | None, build_batch_id: str | None) -> tuple[str, list[Any]]:
+    """Build the WHERE clause and arguments for the optional run filters."""
+    clauses: list[str] = []
+    args: list[Any] = []
+    if scenario_name is not None:
+        clauses.append("scenario_name = ?")
+        args.append(scenario_name)
+    if build_batch_id is not None:
+        clauses.append("build_batch_id = ?")
+        args.append(build_batch_id)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), args
+
+
+def _insert(conn: sqlite3.Connection, meta: dict[str, Any], run_id: str | None = None) -> None:
+    """Insert or replace one run row from its metadata dict."""
+    conn.execute(
+        "INSERT OR REPLACE INTO runs (run_id, timestamp, scenario_name, build_batch_id, meta) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (
+            run_id or meta["run_id"],
+            meta.get("timestamp"),
+            meta.get("scenario_name"),
+            meta.get("build_batch_id"),
+            json.dumps(meta, sort_keys=True, default=str),
+        ),
+    )
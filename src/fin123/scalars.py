@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections import deque
 from typing import Any
 
 import polars as pl
@@ -14,7 +15,8 @@ class ScalarGraph:
 
     Each node is either a literal value or a function call that depends on
     other named scalars.  Evaluation proceeds in topological order so that
-    every dependency is resolved before it is needed.
+    every dependency is resolved before it is needed.  The order is compiled
+    once (see ``compile()``) and reused across evaluations.
     """
 
     def __init__(self) -> None:
@@ -23,6 +25,8 @@ class ScalarGraph:
         self._formulas: dict[str, dict[str, Any]] = {}
         self._parsed_formulas: dict[str, dict[str, Any]] = {}
         self._table_cache: dict[str, pl.DataFrame] = {}
+        self._plan: list[str] | None = None
+        self._deps: dict[str, set[str]] = {}
 
     def set_value(self, name: str, value: Any) -> None:
         """Set a scalar to a literal value.
@@ -31,6 +35,8 @@ class ScalarGraph:
             name: Scalar name.
             value: The literal value.
         """
+        if name not in self._values:
+            self._plan = None
         self._values[name] = value
 
     def set_formula(self, name: str, func: str, args: dict[str, Any]) -> None:
@@ -43,6 +49,7 @@ class ScalarGraph:
                   starting with ``$`` are treated as references to other scalars.
         """
         self._formulas[name] = {"func": func, "args": args}
+        self._plan = None
 
     def set_parsed_formula(
         self, name: str, tree: Any, deps: set[str]
@@ -55,6 +62,7 @@ class ScalarGraph:
             deps: Set of scalar names this formula depends on.
         """
         self._parsed_formulas[name] = {"tree": tree, "deps": deps}
+        self._plan = None
 
     def set_table_cache(self, cache: dict[str, pl.DataFrame]) -> None:
         """Provide materialized table DataFrames for formula evaluation.
@@ -64,66 +72,220 @@ class ScalarGraph:
         """
         self._table_cache = cache
 
-    def evaluate(self) -> dict[str, Any]:
+    def compile(self) -> list[str]:
+        """Build the dependency index and a topological evaluation order.
+
+        Uses Kahn's algorithm over the ``deps`` of parsed formulas and the
+        ``$ref`` arguments of structured formulas, so each formula is visited
+        exactly once (O(V+E)).  The plan is cached until a formula or a new
+        value name is added, and is reused by every ``evaluate()`` call.
+
+        Returns:
+            Formula names in evaluation order.
+
+        Raises:
+            ValueError: If formulas form a cycle or depend on unknown names.
+                The message names the formulas that cannot be resolved.
+        """
+        if self._plan is not None:
+            return self._plan
+
+        # Parsed formulas take precedence over structured ones of the same name
+        nodes: dict[str, set[str]] = {}
+        for name, spec in self._formulas.items():
+            refs: set[str] = set()
+            _collect_arg_refs(spec["args"], refs)
+            nodes[name] = refs
+        for name, spec in self._parsed_formulas.items():
+            nodes[name] = set(spec["deps"])
+
+        indegree: dict[str, int] = {}
+        dependents: dict[str, list[str]] = {name: [] for name in nodes}
+        missing: set[str] = set()
+        for name, deps in nodes.items():
+            count = 0
+            for dep in deps:
+                if dep in nodes:
+                    dependents[dep].append(name)
+                    count += 1
+                elif dep not in self._values:
+                    missing.add(name)
+            indegree[name] = count
+
+        order: list[str] = []
+        ready = deque(
+            name for name, count in indegree.items()
+            if count == 0 and name not in missing
+        )
+        while ready:
+            name = ready.popleft()
+            order.append(name)
+            for child in dependents[name]:
+                indegree[child] -= 1
+                if indegree[child] == 0 and child not in missing:
+                    ready.append(child)
+
+        if len(order) != len(nodes):
+            done = set(order)
+            unresolved = [name for name in nodes if name not in done]
+            raise ValueError(
+                f"Circular or unresolvable dependencies: {unresolved}"
+            )
+
+        self._plan = order
+        self._deps = nodes
+        return order
+
+    def evaluate(self, overrides: dict[str, Any] | None = None) -> dict[str, Any]:
         """Evaluate all scalars in dependency order.
 
-        Merges structured formulas and parsed formulas into a single
-        iterative pass so they can depend on each other.
+        Structured and parsed formulas share one compiled topological plan
+        so they can depend on each other; each is evaluated exactly once.
+
+        Args:
+            overrides: Optional literal values that replace those set via
+                ``set_value`` for this evaluation only.  The compiled plan is
+                reused, so sweep and surface callers can evaluate many
+                parameter points without rebuilding the graph.
 
         Returns:
             Dict mapping scalar names to their computed values.
         """
         from fin123.formulas.evaluator import evaluate_formula
 
+        order = self.compile()
+
         resolved: dict[str, Any] = dict(self._values)
+        if overrides:
+            resolved.update(overrides)
+
+        for name in order:
+            parsed = self._parsed_formulas.get(name)
+            if parsed is not None:
+                resolved[name] = evaluate_formula(
+                    parsed["tree"], resolved, self._table_cache
+                )
+            else:
+                spec = self._formulas[name]
+                fn = get_scalar_fn(spec["func"])
+                resolved[name] = fn(**self._resolve_args(spec["args"], resolved))
 
-        # Combine both formula types into a single remaining set
-        remaining_structured = dict(self._formulas)
-        remaining_parsed = dict(self._parsed_formulas)
+        return resolved
 
-        total_remaining = len(remaining_structured) + len(remaining_parsed)
-        max_iterations = total_remaining + 1
+    def evaluate_vectorized(
+        self,
+        axes: dict[str, pl.Series],
+        targets: list[str] | None = None,
+    ) -> VectorizedEvaluation:
+        """Evaluate the graph over many parameter points at once.
 
-        for _ in range(max_iterations):
-            if not remaining_structured and not remaining_parsed:
-                break
+        Each axis value is a Series holding one value per point.  Formulas
+        that do not depend on an axis are evaluated once as scalars.  Parsed
+        formulas that do are evaluated with broadcasting via
+        ``compile_vectorized``; nodes that cannot vectorize (structured
+        functions, table lookups keyed on an axis, zero denominators, ...)
+        fall back to per-point evaluation for that node only.
 
-            progress = False
+        Args:
+            axes: Mapping of value names to per-point Series (equal length).
+            targets: Optional scalar names to compute; only their transitive
+                dependencies are evaluated.  ``None`` evaluates everything.
 
-            # Try structured formulas
-            still_structured = {}
-            for name, spec in remaining_structured.items():
-                resolved_args = self._resolve_args(spec["args"], resolved)
-                if resolved_args is None:
-                    still_structured[name] = spec
+        Returns:
+            A ``VectorizedEvaluation`` with values (Series for names that
+            vary across points, plain scalars otherwise) and the names of
+            vectorized and per-point fallback nodes.
+        """
+        from fin123.formulas.evaluator import evaluate_formula
+        from fin123.formulas.vectorized import compile_vectorized
+
+        order = self.compile()
+        if targets is not None:
+            needed = self._ancestors(targets)
+            order = [name for name in order if name in needed]
+
+        resolved: dict[str, Any] = dict(self._values)
+        resolved.update(axes)
+        varying: set[str] = set(axes)
+        result = VectorizedEvaluation(resolved)
+
+        for name in order:
+            deps = self._deps[name]
+            parsed = self._parsed_formulas.get(name)
+            if not deps & varying:
+                if parsed is not None:
+                    resolved[name] = evaluate_formula(
+                        parsed["tree"], resolved, self._table_cache
+                    )
                 else:
+                    spec = self._formulas[name]
                     fn = get_scalar_fn(spec["func"])
-                    resolved[name] = fn(**resolved_args)
-                    progress = True
-            remaining_structured = still_structured
-
-            # Try parsed formulas
-            still_parsed = {}
-            for name, spec in remaining_parsed.items():
-                deps = spec["deps"]
-                if all(dep in resolved for dep in deps):
-                    resolved[name] = evaluate_formula(
-                        spec["tree"], resolved, self._table_cache
+                    resolved[name] = fn(**self._resolve_args(spec["args"], resolved))
+                continue
+
+            if parsed is not None:
+                try:
+                    value = compile_vectorized(parsed["tree"])(
+                        resolved, self._table_cache
                     )
-                    progress = True
+                except Exception:
+                    pass
                 else:
-                    still_parsed[name] = spec
-            remaining_parsed = still_parsed
+                    resolved[name] = value
+                    if isinstance(value, pl.Series):
+                        varying.add(name)
+                    result.vectorized.append(name)
+                    continue
 
-            if not progress and (remaining_structured or remaining_parsed):
-                unresolved = list(remaining_structured.keys()) + list(
-                    remaining_parsed.keys()
-                )
-                raise ValueError(
-                    f"Circular or unresolvable dependencies: {unresolved}"
-                )
+            resolved[name] = self._evaluate_pointwise(name, deps & varying, resolved)
+            varying.add(name)
+            result.fallback.append(name)
 
-        return resolved
+        return result
+
+    def _evaluate_pointwise(
+        self, name: str, varying_deps: set[str], resolved: dict[str, Any]
+    ) -> pl.Series:
+        """Evaluate one formula point by point over its varying dependencies.
+
+        Args:
+            name: Formula name.
+            varying_deps: Dependencies holding per-point Series.
+            resolved: Current values (Series for varying names).
+
+        Returns:
+            Series of per-point results.
+        """
+        from fin123.formulas.evaluator import evaluate_formula
+
+        columns = {dep: resolved[dep].to_list() for dep in varying_deps}
+        n = len(next(iter(columns.values())))
+        ctx = {k: v for k, v in resolved.items() if not isinstance(v, pl.Series)}
+        parsed = self._parsed_formulas.get(name)
+        spec = self._formulas.get(name)
+        fn = get_scalar_fn(spec["func"]) if parsed is None else None
+
+        out: list[Any] = []
+        for i in range(n):
+            for dep, values in columns.items():
+                ctx[dep] = values[i]
+            if parsed is not None:
+                out.append(evaluate_formula(parsed["tree"], ctx, self._table_cache))
+            else:
+                out.append(fn(**self._resolve_args(spec["args"], ctx)))
+        return pl.Series(name, out, strict=False)
+
+    def _ancestors(self, targets: list[str]) -> set[str]:
+        """Return the targets plus every formula they transitively depend on."""
+        seen: set[str] = set()
+        stack = [t for t in targets if t in self._deps]
+        while stack:
+            name = stack.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            stack.extend(dep for dep in self._deps[name] if dep in self._deps)
+        return seen
 
     def _resolve_args(
         self, args: dict[str, Any], resolved: dict[str, Any]
@@ -180,4 +342,38 @@ class ScalarGraph:
         return val
 
 
+class VectorizedEvaluation:
+    """Result of ``ScalarGraph.evaluate_vectorized``.
+
+    Attributes:
+        values: Scalar name to value; a ``pl.Series`` (one entry per point)
+            for names that vary, a plain scalar otherwise.
+        vectorized: Formulas evaluated with broadcasting.
+        fallback: Formulas evaluated point by point.
+    """
+
+    def __init__(self, values: dict[str, Any]) -> None:
+        """Initialize with the (shared, still-filling) values dict."""
+        self.values = values
+        self.vectorized: list[str] = []
+        self.fallback: list[str] = []
+
+
+def _collect_arg_refs(val: Any, refs: set[str]) -> None:
+    """Recursively collect ``$ref`` names from structured formula arguments.
+
+    Args:
+        val: An argument value (scalar, list, or dict).
+        refs: Set to add referenced scalar names to.
+    """
+    if isinstance(val, str) and val.startswith("$"):
+        refs.add(val[1:])
+    elif isinstance(val, list):
+        for item in val:
+            _collect_arg_refs(item, refs)
+    elif isinstance(val, dict):
+        for item in val.values():
+            _collect_arg_refs(item, refs)
+
+
 _UNRESOLVED = object()
@@ -0,0 +1,197 @@
+"""Server-side parameter sweep execution for fin123.
+
+Runs a workbook once per point of a one-dimensional sweep or a 2-D grid.
+Each point is an ordinary build with parameter overrides, so it is persisted
+as a run with its own run_id, and the committed workbook spec is never
+modified.
+
+Tables do not depend on parameters, so the table graph is evaluated once and
+its frames are reused for every point: up front for in-process sweeps, and
+through the warm batch workers' table cache for parallel ones.  Results are
+yielded as points complete, so callers can stream progress.
+"""
+
+from __future__ import annotations
+
+import traceback
+from collections.abc import Iterator
+from concurrent.futures import CancelledError, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+import polars as pl
+
+from fin123.batch import (
+    _acquire_pool,
+    _amend_batch_meta,
+    _discard_pool,
+    _load_spec,
+    _release_pool,
+)
+
+
+def sweep_points(input_name: str, values: list[Any]) -> list[dict[str, Any]]:
+    """Build the override dicts for a one-dimensional sweep.
+
+    Args:
+        input_name: Parameter to vary.
+        values: Values to assign, in order.
+
+    Returns:
+        One ``{input_name: value}`` dict per value.
+    """
+    return [{input_name: v} for v in values]
+
+
+def grid_points(
+    input_x: str,
+    values_x: list[Any],
+    input_y: str,
+    values_y: list[Any],
+) -> list[dict[str, Any]]:
+    """Build the override dicts for a 2-D grid.
+
+    Points are ordered with X as the outer loop and Y as the inner loop.
+
+    Args:
+        input_x: Parameter on the X axis.
+        values_x: X axis values.
+        input_y: Parameter on the Y axis.
+        values_y: Y axis values.
+
+    Returns:
+        One ``{input_x: x, input_y: y}`` dict per grid cell.
+
+    Raises:
+        ValueError: If both axes name the same parameter.
+    """
+    if input_x == input_y:
+        raise ValueError("X and Y inputs must be different parameters")
+    return [{input_x: x, input_y: y} for x in values_x for y in values_y]
+
+
+def iter_sweep(
+    project_dir: Path,
+    points: list[dict[str, Any]],
+    scenario_name: str | None = None,
+    max_workers: int = 1,
+    batch_id: str | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Build the workbook at each point, yielding results as they complete.
+
+    With ``max_workers > 1`` points run on the project's warm batch pool
+    (see :mod:`fin123.batch`) and are yielded in completion order; use
+    the ``index`` key to place them.
+
+    Args:
+        project_dir: Root of the fin123 project.
+        points: Parameter override dicts, one per build.
+        scenario_name: Optional scenario applied beneath each point.
+        max_workers: Number of parallel workers (1 = in-process).
+        batch_id: Batch UUID recorded in each run's metadata.
+
+    Yields:
+        Per-point dicts with index, status, params, and either run_id and
+        scalars or error.
+    """
+    batch_id = batch_id or str(uuid4())
+    if max_workers <= 1:
+        tables = _evaluate_tables(project_dir, scenario_name)
+        for idx, params in enumerate(points):
+            yield _run_point(project_dir, params, scenario_name, batch_id, idx, tables)
+        return
+
+    # Warm workers already hold the parsed spec, plugins and the table
+    # graph in their in-process caches
+    pool = _acquire_pool(project_dir, max_workers)
+    futures = {}
+    try:
+        for idx, params in enumerate(points):
+            args = (str(project_dir), params, scenario_name, batch_id, idx)
+            futures[pool.submit(_run_point_args, args)] = (idx, params)
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except (BrokenProcessPool, CancelledError) as exc:
+                _discard_pool(project_dir, max_workers, pool)
+                idx, params = futures[future]
+                yield {
+                    "index": idx,
+                    "status": "error",
+                    "error": f"Worker process failed: {exc}",
+                    "params": params,
+                }
+    finally:
+        # Abandoned iteration (e.g. a client disconnect) drops queued
+        # points; the pool itself stays warm for later batches
+        for future in futures:
+            future.cancel()
+        _release_pool(project_dir, max_workers, pool)
+
+
+def _evaluate_tables(
+    project_dir: Path, scenario_name: str | None
+) -> dict[str, pl.DataFrame] | None:
+    """Evaluate the table graph once for a series of builds.
+
+    Returns ``None`` on failure so each point evaluates (and reports) the
+    error itself.
+    """
+    try:
+        from fin123.workbook import Workbook
+
+        wb = Workbook(project_dir, scenario_name=scenario_name)
+        # Plugins may register table functions used by plans
+        wb._load_plugins()
+        return wb.evaluate_tables()
+    except Exception:
+        return None
+
+
+def _run_point(
+    project_dir: Path,
+    params: dict[str, Any],
+    scenario_name: str | None,
+    batch_id: str,
+    index: int,
+    table_frames: dict[str, pl.DataFrame] | None,
+) -> dict[str, Any]:
+    """Run a single sweep point as a regular build."""
+    try:
+        from fin123.workbook import Workbook
+
+        raw_yaml, spec = _load_spec(project_dir)
+        wb = Workbook(
+            project_dir, overrides=params, scenario_name=scenario_name,
+            raw_yaml=raw_yaml, spec=spec,
+        )
+        result = wb.run(table_frames=table_frames)
+
+        _amend_batch_meta(result.run_dir, batch_id, index)
+
+        return {
+            "index": index,
+            "status": "ok",
+            "run_id": result.run_dir.name,
+            "params": params,
+            "scalars": result.scalars,
+        }
+    except Exception as exc:
+        return {
+            "index": index,
+            "status": "error",
+            "error": str(exc),
+            "params": params,
+            "tb": traceback.format_exc(),
+        }
+
+
+def _run_point_args(args: tuple) -> dict[str, Any]:
+    """Top-level picklable function for ProcessPoolExecutor.
+
+    Tables come from the warm worker's in-process table cache.
+    """
+    project_dir, params, scenario_name, batch_id, index = args
+    return _run_point(Path(project_dir), params, scenario_name, batch_id, index, None)
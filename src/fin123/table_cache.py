@@ -0,0 +1,164 @@
+"""Content-addressed cache of materialized table graphs.
+
+Tables do not depend on parameters, so every build of the same workbook
+over the same inputs materializes identical frames.  The cache key covers
+everything that can change them: the table and plan specs, the set of
+tables a run materializes, the input file hashes, and the combined engine
+and plugin hash.
+
+Entries live in memory (for repeated builds in one process, e.g. a batch)
+and on disk under ``cache/tables/<key>/`` as uncompressed Arrow IPC files,
+which Polars memory-maps on read.  A ``manifest.json`` written last marks
+an entry complete; entries are published with an atomic directory rename
+so concurrent builds never read a partial entry.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+import polars as pl
+
+from fin123.utils.hash import sha256_dict
+
+# Entries kept in process memory (most recently used last)
+_MEMORY_ENTRIES = 4
+_memory: OrderedDict[tuple[str, str], dict[str, pl.DataFrame]] = OrderedDict()
+
+
+def table_cache_key(
+    spec: dict[str, Any],
+    materialize: set[str] | None,
+    input_hashes: dict[str, str],
+    plugin_hash: str,
+) -> str:
+    """Compute the cache key for a workbook's table graph.
+
+    Args:
+        spec: The parsed workbook spec.
+        materialize: Tables the run materializes (None = all).
+        input_hashes: Mapping of input file paths to SHA-256 hashes.
+        plugin_hash: Combined engine and plugin hash.
+
+    Returns:
+        Hex-encoded SHA-256 key.
+    """
+    return sha256_dict({
+        "tables": spec.get("tables", {}),
+        "plans": spec.get("plans", []),
+        "materialize": sorted(materialize) if materialize is not None else None,
+        "inputs": input_hashes,
+        "plugin_hash": plugin_hash,
+    })
+
+
+class TableCache:
+    """Two-level (memory and disk) cache of materialized table frames."""
+
+    def __init__(self, project_dir: Path, max_entries: int = 16) -> None:
+        """Initialize the cache.
+
+        Args:
+            project_dir: Root of the fin123 project.
+            max_entries: Disk entries kept before the least recently used
+                are evicted.
+        """
+        self.cache_dir = project_dir / "cache" / "tables"
+        self.max_entries = max_entries
+
+    def get(self, key: str) -> dict[str, pl.DataFrame] | None:
+        """Return the cached frames for *key*, or None on a miss.
+
+        Args:
+            key: Key from ``table_cache_key``.
+
+        Returns:
+            Dict of table name to DataFrame, or None.
+        """
+        mem_key = (str(self.cache_dir), key)
+        if mem_key in _memory:
+            _memory.move_to_end(mem_key)
+            return dict(_memory[mem_key])
+
+        entry = self.cache_dir / key
+        manifest_path = entry / "manifest.json"
+        if not manifest_path.exists():
+            return None
+        try:
+            names = json.loads(manifest_path.read_text())["tables"]
+            frames = {name: pl.read_ipc(entry / f"{i}.arrow") for i, name in enumerate(names)}
+        except (OSError, ValueError, KeyError, pl.exceptions.PolarsError):
+            # Damaged entry: drop it and rebuild
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        os.utime(manifest_path)
+        self._remember(mem_key, frames)
+        return dict(frames)
+
+    def put(self, key: str, frames: dict[str, pl.DataFrame]) -> None:
+        """Store frames under *key* in memory and on disk.
+
+        Args:
+            key: Key from ``table_cache_key``.
+            frames: Materialized table frames.
+        """
+        self._remember((str(self.cache_dir), key), frames)
+        entry = self.cache_dir / key
+        if entry.exists():
+            return
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_dir / f".tmp-{uuid4().hex}"
+        tmp.mkdir()
+        try:
+            names = list(frames)
+            # File names are positional so table names need no escaping;
+            # one chunk keeps reloaded frames laid out like fresh ones
+            for i, name in enumerate(names):
+                frames[name].rechunk().write_ipc(tmp / f"{i}.arrow")
+            (tmp / "manifest.json").write_text(json.dumps({"tables": names}))
+            os.rename(tmp, entry)
+        except OSError:
+            # Another process published the same entry first
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+        self._evict()
+
+    def clear(self) -> int:
+        """Delete every disk entry and the in-memory entries for this project.
+
+        Returns:
+            Bytes freed on disk.
+        """
+        freed = 0
+        if self.cache_dir.exists():
+            freed = sum(f.stat().st_size for f in self.cache_dir.rglob("*") if f.is_file())
+            shutil.rmtree(self.cache_dir)
+        for mem_key in [k for k in _memory if k[0] == str(self.cache_dir)]:
+            del _memory[mem_key]
+        return freed
+
+    def _remember(self, mem_key: tuple[str, str], frames: dict[str, pl.DataFrame]) -> None:
+        """Keep *frames* in the in-process LRU."""
+        _memory[mem_key] = dict(frames)
+        _memory.move_to_end(mem_key)
+        while len(_memory) > _MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        """Remove the least recently used disk entries beyond ``max_entries``."""
+        entries = [
+            d for d in self.cache_dir.iterdir()
+            if d.is_dir() and (d / "manifest.json").exists()
+        ]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda d: (d / "manifest.json").stat().st_mtime)
+        for d in entries[: len(entries) - self.max_entries]:
+            shutil.rmtree(d, ignore_errors=True)
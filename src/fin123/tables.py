@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterable
 from pathlib import Path
 from typing import Any
 
@@ -15,7 +16,8 @@ class TableGraph:
 
     Nodes are either source tables (loaded from CSV/Parquet) or derived plans
     that apply registered table functions to upstream tables.  Evaluation
-    materializes all plans into DataFrames in dependency order.
+    materializes plans into DataFrames in a single ``pl.collect_all`` pass so
+    that sources shared by several plans are scanned only once.
     """
 
     def __init__(self, base_dir: Path) -> None:
@@ -56,16 +58,80 @@ class TableGraph:
         """
         self._plans.append({"name": name, "source": source, "steps": steps})
 
-    def evaluate(self) -> dict[str, pl.DataFrame]:
-        """Evaluate all plans and return materialized DataFrames.
+    def evaluate(
+        self,
+        materialize: Iterable[str] | None = None,
+        single_pass: bool = True,
+    ) -> dict[str, pl.DataFrame]:
+        """Evaluate plans and return materialized DataFrames.
 
         Join operations receive a ``_tables`` dict so they can resolve
         references to other named tables.
 
+        In single-pass mode every requested LazyFrame is handed to one
+        ``pl.collect_all`` call, which lets Polars apply common-subplan
+        elimination: a source feeding several plans (or the right side of
+        several joins) is scanned and computed once.
+
+        Args:
+            materialize: Optional table names to materialize.  Tables not
+                listed (e.g. intermediate sources that are neither outputs nor
+                lookup targets) are never collected.  Right-hand tables of
+                validated joins are always materialized.  ``None`` (default)
+                materializes every source and plan.
+            single_pass: If ``True`` (default), collect all frames in one
+                optimized query.  If ``False``, collect each frame separately.
+
         Returns:
             Dict mapping table names to Polars DataFrames.
+
+        Raises:
+            ValueError: If a plan references an unknown source or a requested
+                table does not exist.
+        """
+        frames = self._build_frames()
+
+        if materialize is None:
+            names = list(frames)
+        else:
+            requested = set(materialize)
+            unknown = sorted(requested - set(frames))
+            if unknown:
+                raise ValueError(
+                    f"Cannot materialize unknown table(s) {unknown}. "
+                    f"Available: {sorted(frames)}"
+                )
+            requested.update(
+                right for right, _, _ in self._deferred_join_validations
+            )
+            # Preserve registration order for deterministic results
+            names = [name for name in frames if name in requested]
+
+        if single_pass:
+            dfs = pl.collect_all([frames[name] for name in names])
+            collected = dict(zip(names, dfs))
+        else:
+            collected = {name: frames[name].collect() for name in names}
+
+        # Run deferred join validations on materialized DataFrames
+        from fin123.functions.table import _validate_join_df
+        for right_name, key_cols, validate in self._deferred_join_validations:
+            if right_name in collected:
+                _validate_join_df(collected[right_name], key_cols, validate)
+
+        return collected
+
+    def _build_frames(self) -> dict[str, pl.LazyFrame]:
+        """Compose the LazyFrame for every source and plan.
+
+        Resets and repopulates the deferred join validation list, so a graph
+        can be evaluated more than once.
+
+        Returns:
+            Dict mapping table names to (uncollected) LazyFrames.
         """
         frames: dict[str, pl.LazyFrame] = dict(self._sources)
+        self._deferred_join_validations = []
 
         for plan in self._plans:
             source_name = plan["source"]
@@ -91,15 +157,7 @@ class TableGraph:
                 lf = fn(lf, **kwargs)
             frames[plan["name"]] = lf
 
-        collected = {name: lf.collect() for name, lf in frames.items()}
-
-        # Run deferred join validations on materialized DataFrames
-        from fin123.functions.table import _validate_join_df
-        for right_name, key_cols, validate in self._deferred_join_validations:
-            if right_name in collected:
-                _validate_join_df(collected[right_name], key_cols, validate)
-
-        return collected
+        return frames
 
     @staticmethod
     def _yaml_key_fixup(k: object) -> str:
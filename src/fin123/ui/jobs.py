@@ -0,0 +1,217 @@
+"""Background jobs for the UI server.
+
+Builds, pipelines and other long service calls are submitted as jobs and run
+on a small thread pool, so the event loop keeps serving the grid, status
+ribbon and log tail while they execute.  Threads (not processes) are used
+because jobs operate on the in-memory :class:`ProjectService` working copy;
+Polars releases the GIL for the heavy lifting.
+
+Jobs that write to the project (snapshots, runs, syncs) hold the project's
+writer lock, so two tabs building at once queue instead of interleaving.
+Read-only jobs (surface evaluation, worksheet compilation) run alongside.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+JOB_STATES = ("queued", "running", "succeeded", "failed", "cancelled")
+FINISHED_STATES = frozenset({"succeeded", "failed", "cancelled"})
+
+# Finished jobs kept for status/result queries before the oldest are dropped
+MAX_FINISHED_JOBS = 100
+
+_writer_locks: dict[str, threading.RLock] = {}
+_writer_locks_guard = threading.Lock()
+
+
+def writer_lock(project_dir: Path) -> threading.RLock:
+    """Return the process-wide writer lock for *project_dir*.
+
+    Reentrant, so a locked job may call helpers that take it again.
+    """
+    key = str(Path(project_dir).resolve())
+    with _writer_locks_guard:
+        lock = _writer_locks.get(key)
+        if lock is None:
+            lock = _writer_locks[key] = threading.RLock()
+        return lock
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@dataclass
+class Job:
+    """A unit of background work and its outcome."""
+
+    job_id: str
+    kind: str
+    writes: bool
+    status: str = "queued"
+    created_at: str = field(default_factory=_utc_now)
+    started_at: str | None = None
+    finished_at: str | None = None
+    result: Any = None
+    error: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self) -> dict[str, Any]:
+        """Status summary (without the result payload)."""
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "writes": self.writes,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Queue and run jobs for one project.
+
+    Args:
+        project_dir: Project the jobs operate on (selects the writer lock).
+        max_workers: Jobs that may run at once.  Writers still run one at
+            a time; extra workers let read-only jobs proceed meanwhile.
+        on_change: Called with the job after every state transition
+            (from the submitting or the worker thread).
+    """
+
+    def __init__(
+        self,
+        project_dir: Path,
+        max_workers: int = 2,
+        on_change: Callable[[Job], None] | None = None,
+    ) -> None:
+        self.project_dir = Path(project_dir)
+        self.on_change = on_change
+        self.writer_lock = writer_lock(self.project_dir)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="fin123-job"
+        )
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._futures: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[[], Any], *, writes: bool = True) -> Job:
+        """Queue *fn* as a job and return it immediately.
+
+        Args:
+            kind: Job kind label (e.g. ``"build"``).
+            fn: Zero-argument callable doing the work.
+            writes: Whether the job must hold the project writer lock.
+
+        Returns:
+            The queued :class:`Job`.
+        """
+        job = Job(job_id=uuid.uuid4().hex[:12], kind=kind, writes=writes)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+            # Under the lock, so "queued" is always reported before "running"
+            self._notify(job)
+            self._futures[job.job_id] = self._executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        """Return a job by id, or None if unknown (or already pruned)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> list[Job]:
+        """Return all known jobs, newest first."""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> Job:
+        """Cancel a queued job.
+
+        A running build cannot be interrupted without leaving a partial run
+        behind, so only jobs that have not started can be cancelled.
+
+        Raises:
+            KeyError: If the job is unknown.
+            ValueError: If the job has already started.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise KeyError(job_id)
+            if job.status != "queued":
+                raise ValueError(f"Job {job_id} is {job.status}; only queued jobs can be cancelled")
+            job.status = "cancelled"
+            job.finished_at = _utc_now()
+            future = self._futures.pop(job_id, None)
+        if future is not None:
+            future.cancel()
+        self._notify(job)
+        return job
+
+    def wait(self, job_id: str, timeout: float | None = None) -> Job | None:
+        """Block until a job finishes (for tests and scripted callers)."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None and not future.cancelled():
+            future.result(timeout=timeout)
+        return self.get(job_id)
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop accepting jobs; queued jobs are cancelled."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job: Job, fn: Callable[[], Any]) -> None:
+        with self._lock:
+            if job.status != "queued":
+                return
+            job.status = "running"
+            job.started_at = _utc_now()
+        self._notify(job)
+        try:
+            if job.writes:
+                with self.writer_lock:
+                    result = fn()
+            else:
+                result = fn()
+        except Exception as exc:
+            status, result, error = "failed", None, str(exc) or type(exc).__name__
+        else:
+            # Service calls report expected failures (dirty working copy,
+            # failed pipeline step) in the result rather than raising
+            error = result.get("error") if isinstance(result, dict) else None
+            status = "failed" if error else "succeeded"
+        with self._lock:
+            job.status = status
+            job.result = result
+            job.error = error
+            job.finished_at = _utc_now()
+            self._futures.pop(job.job_id, None)
+        self._notify(job)
+
+    def _notify(self, job: Job) -> None:
+        if self.on_change is not None:
+            try:
+                self.on_change(job)
+            except Exception:
+                pass  # a listener must never fail the job
+
+    def _prune(self) -> None:
+        """Drop the oldest finished jobs beyond :data:`MAX_FINISHED_JOBS`."""
+        finished = [jid for jid, j in self._jobs.items() if j.finished]
+        for jid in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[jid]
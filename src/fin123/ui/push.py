@@ -0,0 +1,307 @@
+"""Server-push channel for the UI (``GET /api/stream``, Server-Sent Events).
+
+One :class:`PushHub` per server replaces per-tab polling of ``/api/status``
+and ``/api/events/tail``.  While at least one tab is connected, a single
+follower thread:
+
+- reads only the bytes appended to ``logs/events.ndjson`` since the last
+  tick (so events from CLI builds and batch workers are seen too),
+- re-derives the status ribbon from disk only after new events arrived,
+  at most every :attr:`PushHub.status_interval` seconds, and
+- compares the in-memory working-copy section (dirty flag, version) on
+  every tick, which costs no I/O.
+
+Changes are broadcast as deltas: a ``status`` message carries only the
+ribbon sections that changed.  Job transitions and recalculated cell
+display values are published directly by the server routes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections.abc import AsyncIterator, Callable
+from pathlib import Path
+from typing import Any
+
+# Per-connection queue bound; a tab that falls this far behind is told to resync
+MAX_QUEUED_MESSAGES = 1000
+
+# Internal message that ends a stream (never sent to the client)
+_CLOSE = "__close__"
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Render one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class _Subscriber:
+    """One connected client: an asyncio queue fed from any thread."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.queue: asyncio.Queue[tuple[str, Any]] = asyncio.Queue(maxsize=MAX_QUEUED_MESSAGES)
+
+    def put(self, message: tuple[str, Any]) -> None:
+        """Enqueue *message*; must run on :attr:`loop`."""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Too far behind for deltas to make sense: start over
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(("resync", {}))
+
+
+class _LogFollower:
+    """Read events appended to the global NDJSON log since the last call."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file: Any = None
+        self._buf = b""
+
+    def open_at_end(self) -> None:
+        """Start following from the current end of the log."""
+        self.close()
+        try:
+            self._file = open(self.path, "rb")
+        except OSError:
+            return
+        self._file.seek(0, os.SEEK_END)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._buf = b""
+
+    def read_new(self) -> list[dict[str, Any]]:
+        """Return complete events appended since the previous call."""
+        events: list[dict[str, Any]] = []
+        if self._file is None:
+            # Log did not exist yet; everything in it now is new
+            try:
+                self._file = open(self.path, "rb")
+            except OSError:
+                return events
+        events.extend(self._drain())
+        # Sealed into a segment: the old handle is drained above, and the
+        # new active file holds only unseen lines, so read it from the start
+        try:
+            replaced = os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except OSError:
+            replaced = False
+        if replaced:
+            self.close()
+            events.extend(self.read_new())
+        return events
+
+    def _drain(self) -> list[dict[str, Any]]:
+        chunk = self._file.read()
+        if not chunk:
+            return []
+        data = self._buf + chunk
+        complete, _, self._buf = data.rpartition(b"\n")
+        events = []
+        for line in complete.splitlines():
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+        return events
+
+
+def status_delta(old: dict[str, Any] | None, new: dict[str, Any]) -> dict[str, Any]:
+    """Return the top-level status sections of *new* that differ from *old*."""
+    if old is None:
+        return dict(new)
+    return {k: v for k, v in new.items() if old.get(k) != v}
+
+
+class PushHub:
+    """Fan out status, log, job and cell messages to connected clients.
+
+    Args:
+        service: The UI :class:`ProjectService`.
+        poll_interval: Seconds between follower ticks.
+        status_interval: Minimum seconds between status re-derivations
+            from disk while events keep arriving.
+        keepalive: Seconds of silence before a keep-alive comment is sent.
+    """
+
+    def __init__(
+        self,
+        service: Any,
+        *,
+        poll_interval: float = 0.5,
+        status_interval: float = 2.0,
+        keepalive: float = 15.0,
+    ) -> None:
+        from fin123.logging.events import display_event_type
+
+        self.service = service
+        self.poll_interval = poll_interval
+        self.status_interval = status_interval
+        self.keepalive = keepalive
+        self._display_type: Callable[[str], str] = display_event_type
+        self._subscribers: set[_Subscriber] = set()
+        self._lock = threading.Lock()
+        self._status: dict[str, Any] | None = None
+        self._status_stale = False
+        self._status_at = 0.0
+        self._follower = _LogFollower(Path(service.project_dir) / "logs" / "events.ndjson")
+        self._tick_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    # -- Status --
+
+    def get_status(self) -> dict[str, Any]:
+        """Return the status ribbon, from memory while the follower runs."""
+        with self._lock:
+            following = self._thread is not None
+            cached = self._status
+        if following and cached is not None:
+            return cached
+        return self.service.get_model_status()
+
+    def refresh_status(self, *, full: bool = True) -> None:
+        """Recompute status and broadcast the sections that changed.
+
+        Args:
+            full: Re-derive every section from disk.  Otherwise only the
+                in-memory working-copy section is compared.
+        """
+        with self._lock:
+            old = self._status
+        if full or old is None:
+            new = self.service.get_model_status()
+            self._status_at = time.monotonic()
+            self._status_stale = False
+        else:
+            new = {**old, "project": self.service.get_project_status()}
+        delta = status_delta(old, new)
+        with self._lock:
+            self._status = new
+        if delta and old is not None:
+            self.publish("status", delta)
+
+    def mark_status_stale(self) -> None:
+        """Schedule a full status refresh on the next follower tick."""
+        self._status_stale = True
+
+    # -- Publishing --
+
+    def publish(self, event: str, data: Any) -> None:
+        """Queue a message for every connected client (thread-safe)."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.put, (event, data))
+            except RuntimeError:
+                # Client's loop has closed; it will unsubscribe on its own
+                pass
+
+    def publish_job(self, job: Any) -> None:
+        """Broadcast a job state change (``JobManager.on_change`` hook)."""
+        self.publish("job", job.to_dict())
+        if job.finished:
+            self.mark_status_stale()
+
+    # -- Subscriptions --
+
+    async def stream(self, is_disconnected: Callable[[], Any]) -> AsyncIterator[str]:
+        """Yield SSE text for one client until it disconnects.
+
+        The first message is the full status; everything after is deltas.
+        """
+        sub = _Subscriber(asyncio.get_running_loop())
+        await asyncio.to_thread(self._subscribe, sub)
+        try:
+            yield format_sse("status", self.get_status())
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(sub.queue.get(), self.keepalive)
+                except asyncio.TimeoutError:
+                    if await is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                if event == _CLOSE:
+                    break
+                if event == "resync":
+                    # Deltas were dropped: send the full status; the
+                    # client reloads its log view
+                    data = self.get_status()
+                yield format_sse(event, data)
+        finally:
+            self._unsubscribe(sub)
+
+    def _subscribe(self, sub: _Subscriber) -> None:
+        with self._lock:
+            self._subscribers.add(sub)
+            thread = None
+            if self._thread is None:
+                # A fresh stop event per thread: a follower still finishing
+                # its last tick must not be revived by this subscription
+                self._stop = threading.Event()
+                thread = self._thread = threading.Thread(
+                    target=self._run, args=(self._stop,), name="fin123-push", daemon=True
+                )
+        if thread is not None:
+            with self._tick_lock:
+                self._follower.open_at_end()
+            self.refresh_status()
+            thread.start()
+
+    def _unsubscribe(self, sub: _Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+            if self._subscribers or self._thread is None:
+                return
+            # Not joined: this runs on the event loop.  The thread exits
+            # after at most one more tick.
+            self._thread = None
+            self._status = None
+            self._stop.set()
+
+    def close(self) -> None:
+        """Stop the follower thread and end every open stream."""
+        self.publish(_CLOSE, None)
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._subscribers.clear()
+        self._stop.set()
+        if thread is not None:
+            thread.join(timeout=5)
+        with self._tick_lock:
+            self._follower.close()
+
+    # -- Follower --
+
+    def _run(self, stop: threading.Event) -> None:
+        while not stop.wait(self.poll_interval):
+            try:
+                with self._tick_lock:
+                    if not stop.is_set():
+                        self.tick()
+            except Exception:
+                # Never let a bad log line or status read kill the channel
+                self.mark_status_stale()
+
+    def tick(self) -> None:
+        """One follower pass: new log events, then status."""
+        events = self._follower.read_new()
+        if events:
+            for evt in events:
+                evt["display_type"] = self._display_type(evt.get("event_type", ""))
+            self.publish("log", events)
+            self._status_stale = True
+        due = time.monotonic() - self._status_at >= self.status_interval
+        self.refresh_status(full=self._status_stale and due)
@@ -1,23 +1,43 @@
 """FastAPI server for the fin123 local browser UI.
 
-Routes are thin wrappers over the shared :class:`ProjectService`.
+Routes are thin wrappers over the shared :class:`ProjectService`.  Long
+calls (builds, pipelines, syncs, sweeps) run off the event loop -- either as
+background jobs (``/api/jobs``) or, on the legacy synchronous routes, in
+Starlette's threadpool -- under the project writer lock.  Reads of the
+working copy run in the threadpool too, under the service's own short
+working-copy lock, so they never wait on a build.
 """
 
 from __future__ import annotations
 
+import hashlib
+import io
+import json
+import queue
+import threading
+from collections.abc import Callable, Iterator
 from pathlib import Path
-from typing import Any
+from typing import Any, TypeVar
 
-from fastapi import FastAPI, File, Form, HTTPException, Query, UploadFile
-from fastapi.responses import FileResponse, JSONResponse
+import polars as pl
+from fastapi import FastAPI, File, Form, HTTPException, Query, Request, UploadFile
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import run_in_threadpool
 
+from fin123.ui.jobs import Job, JobManager
+from fin123.ui.push import PushHub
 from fin123.ui.service import ProjectService, import_xlsx_upload
-from fin123.ui.view_transforms import TableViewRequest
+from fin123.ui.view_transforms import TablePageRequest, TableViewRequest
 
-# The singleton service is set at startup by ``create_app()``.
+# The singleton service, job manager and push hub are set at startup by
+# ``create_app()``.
 _service: ProjectService | None = None
+_jobs: JobManager | None = None
+_push: PushHub | None = None
+
+T = TypeVar("T")
 
 
 def create_app(project_dir: Path) -> FastAPI:
@@ -29,8 +49,20 @@ def create_app(project_dir: Path) -> FastAPI:
     Returns:
         Configured FastAPI instance.
     """
-    global _service
+    global _service, _jobs, _push
     _service = ProjectService(project_dir=project_dir)
+    if _jobs is not None:
+        _jobs.shutdown()
+    if _push is not None:
+        _push.close()
+    from fin123.project import load_project_config
+
+    _push = PushHub(_service)
+    _jobs = JobManager(
+        project_dir,
+        max_workers=load_project_config(project_dir).get("ui_job_workers", 2),
+        on_change=_push.publish_job,
+    )
 
     from fin123 import __version__
 
@@ -51,6 +83,43 @@ def create_app(project_dir: Path) -> FastAPI:
     return app
 
 
+def _ndjson_response(events: Iterator[dict[str, Any]]) -> StreamingResponse:
+    """Stream progress events as newline-delimited JSON.
+
+    Starlette iterates sync generators in a worker thread, so long-running
+    sweeps do not block the event loop.
+    """
+    return StreamingResponse(
+        (json.dumps(event, default=str) + "\n" for event in events),
+        media_type="application/x-ndjson",
+    )
+
+
+def _arrow_ipc_bytes(frame: pl.DataFrame) -> bytes:
+    """Serialize a DataFrame as an Arrow IPC file."""
+    buf = io.BytesIO()
+    frame.write_ipc(buf)
+    return buf.getvalue()
+
+
+def _etag_json(request: Request, content: Any) -> Response:
+    """JSON response tagged with a hash of its body.
+
+    Returns 304 Not Modified when the client already holds this exact body
+    (``If-None-Match``), so re-polled unchanged viewports cost no transfer
+    or client-side re-parse.
+    """
+    resp = JSONResponse(content, headers={"Cache-Control": "no-cache"})
+    etag = '"' + hashlib.blake2b(resp.body, digest_size=16).hexdigest() + '"'
+    client_tags = {
+        t.strip().removeprefix("W/") for t in request.headers.get("if-none-match", "").split(",")
+    }
+    if etag in client_tags or "*" in client_tags:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    resp.headers["ETag"] = etag
+    return resp
+
+
 def _svc() -> ProjectService:
     """Get the singleton service, raising if not initialised."""
     if _service is None:
@@ -58,6 +127,84 @@ def _svc() -> ProjectService:
     return _service
 
 
+def _job_manager() -> JobManager:
+    """Get the singleton job manager, raising if not initialised."""
+    if _jobs is None:
+        raise HTTPException(500, "Service not initialised")
+    return _jobs
+
+
+def _push_hub() -> PushHub:
+    """Get the singleton push hub, raising if not initialised."""
+    if _push is None:
+        raise HTTPException(500, "Service not initialised")
+    return _push
+
+
+async def _offload(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a slow read-only service call in the threadpool."""
+    return await run_in_threadpool(fn, *args, **kwargs)
+
+
+async def _offload_write(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a project-writing service call in the threadpool, under the writer lock.
+
+    Working-copy edits go through here too, so a commit or build on a
+    worker thread never interleaves with an edit (nor marks it clean).
+    """
+    lock = _job_manager().writer_lock
+
+    def call() -> T:
+        with lock:
+            return fn(*args, **kwargs)
+
+    return await run_in_threadpool(call)
+
+
+def _writer_stream(events: Iterator[T]) -> Iterator[T]:
+    """Drive a project-writing event stream under the writer lock.
+
+    Starlette may resume a streamed generator on a different worker thread
+    each time, and a lock must be released by the thread that took it, so
+    the stream runs on a dedicated producer thread holding the lock from
+    the first event to the last.  Closing the returned iterator (client
+    disconnect) stops the producer after the event in flight.
+    """
+    lock = _job_manager().writer_lock
+    out: queue.Queue[tuple[bool, Any]] = queue.Queue()
+    stop = threading.Event()
+
+    def produce() -> None:
+        try:
+            with lock:
+                try:
+                    for event in events:
+                        out.put((True, event))
+                        if stop.is_set():
+                            break
+                finally:
+                    close = getattr(events, "close", None)
+                    if close is not None:
+                        close()
+        except Exception as exc:
+            out.put((False, exc))
+        finally:
+            out.put((False, None))
+
+    threading.Thread(target=produce, name="fin123-writer-stream", daemon=True).start()
+    try:
+        while True:
+            ok, item = out.get()
+            if ok:
+                yield item
+            elif item is None:
+                return
+            else:
+                raise item
+    finally:
+        stop.set()
+
+
 # ---------------------------------------------------------------------------
 # Request/response models
 # ---------------------------------------------------------------------------
@@ -202,6 +349,27 @@ class SurfaceEvalRequest(BaseModel):
     output: str
 
 
+class SweepRunRequest(BaseModel):
+    input: str
+    values: list[Any]
+    outputs: list[str] | None = None
+    max_workers: int = 1
+
+
+class GridRunRequest(BaseModel):
+    input_x: str
+    values_x: list[Any]
+    input_y: str
+    values_y: list[Any]
+    output: str
+    max_workers: int = 1
+
+
+class JobSubmitRequest(BaseModel):
+    kind: str
+    params: dict[str, Any] = {}
+
+
 # ---------------------------------------------------------------------------
 # Router
 # ---------------------------------------------------------------------------
@@ -216,55 +384,64 @@ def _api_router():
 
     @router.get("/project")
     async def get_project() -> dict[str, Any]:
-        return _svc().get_project_info()
+        return await _offload(_svc().get_project_info)
 
     # -- Sheet --
 
     @router.get("/sheet")
     async def get_sheet(
+        request: Request,
         sheet: str = Query("Sheet1"),
         r0: int = Query(0, ge=0),
         c0: int = Query(0, ge=0),
         rows: int = Query(30, ge=1, le=500),
         cols: int = Query(15, ge=1, le=200),
-    ) -> dict[str, Any]:
+    ) -> Response:
         try:
-            return _svc().get_sheet_viewport(sheet, r0, c0, rows, cols)
+            viewport = await _offload(_svc().get_sheet_viewport, sheet, r0, c0, rows, cols)
         except ValueError as exc:
             raise HTTPException(400, str(exc))
+        return _etag_json(request, viewport)
 
     @router.post("/sheet/cells")
-    async def update_cells(req: CellUpdateRequest) -> dict[str, Any]:
+    async def update_cells(req: CellUpdateRequest, request: Request) -> dict[str, Any]:
         edits = [e.model_dump() for e in req.edits]
         try:
-            return _svc().update_cells(req.sheet, edits)
+            result = await _offload_write(_svc().update_cells, req.sheet, edits)
         except ValueError as exc:
             raise HTTPException(400, str(exc))
+        if result["changed"]:
+            _push_hub().publish("cells", {
+                "origin": request.headers.get("x-client-id"),
+                "sheet": req.sheet,
+                "changed": result["changed"],
+            })
+        return result
 
     # -- Sheet CRUD --
 
     @router.get("/sheets")
     async def list_sheets() -> list[dict[str, Any]]:
-        return _svc().list_sheets()
+        return await _offload(_svc().list_sheets)
 
     @router.post("/sheets")
     async def add_sheet(req: AddSheetRequest) -> dict[str, Any]:
         try:
-            return _svc().add_sheet(req.name)
+            return await _offload_write(_svc().add_sheet, req.name)
         except ValueError as exc:
             raise HTTPException(400, str(exc))
 
     @router.delete("/sheets")
     async def delete_sheet(req: DeleteSheetRequest) -> dict[str, Any]:
         try:
-            return _svc().delete_sheet(req.name)
+            return await _offload_write(_svc().delete_sheet, req.name)
         except ValueError as exc:
             raise HTTPException(400, str(exc))
 
     @router.patch("/sheets")
     async def rename_sheet(req: RenameSheetRequest) -> dict[str, Any]:
         try:
-            return _svc().rename_sheet(req.old_name, req.new_name)
+            return await _offload_write(_svc().rename_sheet, req.old_name, req.new_name)
         except ValueError as exc:
             raise HTTPException(400, str(exc))
 
@@ -273,7 +450,8 @@ def _api_router():
     @router.post("/sheet/format")
     async def update_format(req: CellFormatRequest) -> dict[str, Any]:
         try:
-            return _svc().update_cell_format(req.sheet, [u.model_dump() for u in req.updates])
+            updates = [u.model_dump() for u in req.updates]
+            return await _offload_write(_svc().update_cell_format, req.sheet, updates)
         except ValueError as exc:
             raise HTTPException(400, str(exc))
 
@@ -282,28 +460,28 @@ def _api_router():
     @router.post("/sheet/rows/insert")
     async def insert_rows(req: RowInsertRequest) -> dict[str, Any]:
         try:
-            return _svc().insert_rows(req.sheet, req.row_idx, req.count)
+            return await _offload_write(_svc().insert_rows, req.sheet, req.row_idx, req.count)
         except ValueError as exc:
             raise HTTPException(400, str(exc))
 
     @router.post("/sheet/rows/delete")
     async def delete_rows(req: RowDeleteRequest) -> dict[str, Any]:
         try:
-            return _svc().delete_rows(req.sheet, req.row_idx, req.count)
+            return await _offload_write(_svc().delete_rows, req.sheet, req.row_idx, req.count)
         except ValueError as exc:
             raise HTTPException(400, str(exc))
 
     @router.post("/sheet/cols/insert")
     async def insert_cols(req: ColInsertRequest) -> dict[str, Any]:
         try:
-            return _svc().insert_cols(req.sheet, req.col_idx, req.count)
+            return await _offload_write(_svc().insert_cols, req.sheet, req.col_idx, req.count)
         except ValueError as exc:
             raise HTTPException(400, str(exc))
 
     @router.post("/sheet/cols/delete")
     async def delete_cols(req: ColDeleteRequest) -> dict[str, Any]:
         try:
-            return _svc().delete_cols(req.sheet, req.col_idx, req.count)
+            return await _offload_write(_svc().delete_cols, req.sheet, req.col_idx, req.count)
         except ValueError as exc:
             raise HTTPException(400, str(exc))
 
@@ -317,7 +495,7 @@ def _api_router():
 
     @router.post("/pipeline/run")
     async def run_pipeline() -> dict[str, Any]:
-        result = _svc().run_pipeline()
+        result = await _offload_write(_svc().run_pipeline)
         if result.get("status") == "error" and result.get("error", "").startswith("Working copy"):
             raise HTTPException(409, result["error"])
         return result
@@ -326,24 +504,24 @@ def _api_router():
 
     @router.post("/commit")
     async def commit() -> dict[str, Any]:
-        return _svc().save_snapshot()
+        return await _offload_write(_svc().save_snapshot)
 
     @router.post("/save")
     async def save() -> dict[str, Any]:
-        return _svc().save_snapshot()
+        return await _offload_write(_svc().save_snapshot)
 
     # -- Build (canonical) / Run (legacy) --
 
     @router.post("/build")
     async def build_workbook() -> dict[str, Any]:
-        result = _svc().build_workbook()
+        result = await _offload_write(_svc().build_workbook)
         if "error" in result:
             raise HTTPException(409, result["error"])
         return result
 
     @router.post("/run")
     async def run_workbook() -> dict[str, Any]:
-        result = _svc().build_workbook()
+        result = await _offload_write(_svc().build_workbook)
         if "error" in result:
             raise HTTPException(409, result["error"])
         return result
@@ -353,22 +531,120 @@ def _api_router():
     @router.post("/sync")
     async def sync(req: SyncRequest | None = None) -> dict[str, Any]:
         table_name = req.table_name if req else None
-        return _svc().run_sync(table_name)
+        return await _offload_write(_svc().run_sync, table_name)
 
     # -- Workflow --
 
     @router.post("/workflow/run")
     async def workflow_run(req: WorkflowRunRequest) -> dict[str, Any]:
         try:
-            return _svc().run_workflow(req.workflow_name)
+            return await _offload_write(_svc().run_workflow, req.workflow_name)
         except Exception as exc:
             raise HTTPException(400, str(exc))
 
+    # -- Jobs --
+
+    def _final_record(events: Iterator[dict[str, Any]]) -> dict[str, Any] | None:
+        """Drain a sweep/grid event stream and return its saved record."""
+        record = None
+        for event in events:
+            if event.get("event") == "completed":
+                record = event.get("data")
+        return record
+
+    def _job_call(svc: ProjectService, req: JobSubmitRequest) -> tuple[Callable[[], Any], bool]:
+        """Map a job request onto a service call and whether it writes."""
+        kind, params = req.kind, req.params
+        if kind in ("build", "run"):
+            return svc.build_workbook, True
+        if kind == "pipeline":
+            return svc.run_pipeline, True
+        if kind == "commit":
+            return svc.save_snapshot, True
+        if kind == "sync":
+            sync_req = SyncRequest(**params)
+            return lambda: svc.run_sync(sync_req.table_name), True
+        if kind == "workflow":
+            wf_req = WorkflowRunRequest(**params)
+            return lambda: svc.run_workflow(wf_req.workflow_name), True
+        if kind == "sweep":
+            sweep_req = SweepRunRequest(**params)
+            events = svc.sweep_run(
+                sweep_req.input, sweep_req.values,
+                selected_outputs=sweep_req.outputs, max_workers=sweep_req.max_workers,
+            )
+            return lambda: _final_record(events), True
+        if kind == "grid":
+            grid_req = GridRunRequest(**params)
+            events = svc.grid_run(
+                grid_req.input_x, grid_req.values_x, grid_req.input_y, grid_req.values_y,
+                display_output=grid_req.output, max_workers=grid_req.max_workers,
+            )
+            return lambda: _final_record(events), True
+        if kind == "verify":
+            verify_req = VerifyRunRequest(**params)
+            if not _SAFE_LOG_ID.match(verify_req.run_id):
+                raise ValueError("Invalid run_id")
+            return lambda: svc.build_verify(verify_req.run_id), False
+        if kind == "surface":
+            surface_req = SurfaceEvalRequest(**params)
+            return lambda: svc.evaluate_surface(**surface_req.model_dump()), False
+        if kind == "worksheet_compile":
+            ws_req = WorksheetCompileRequest(**params)
+            return lambda: svc.compile_worksheet_from_run(**ws_req.model_dump()), False
+        raise ValueError(f"Unknown job kind: {kind!r}")
+
+    def _get_job(job_id: str) -> Job:
+        job = _job_manager().get(job_id)
+        if job is None:
+            raise HTTPException(404, f"Job {job_id!r} not found")
+        return job
+
+    @router.post("/jobs", status_code=202)
+    async def submit_job(req: JobSubmitRequest) -> dict[str, Any]:
+        """Queue a build, pipeline, sync, ... and return its job id at once."""
+        try:
+            fn, writes = _job_call(_svc(), req)
+        except ValidationError as exc:
+            raise HTTPException(422, exc.errors(include_url=False))
+        except ValueError as exc:
+            raise HTTPException(400, str(exc))
+        return _job_manager().submit(req.kind, fn, writes=writes).to_dict()
+
+    @router.get("/jobs")
+    async def list_jobs() -> list[dict[str, Any]]:
+        return [job.to_dict() for job in _job_manager().list_jobs()]
+
+    @router.get("/jobs/{job_id}")
+    async def get_job(job_id: str) -> dict[str, Any]:
+        return _get_job(job_id).to_dict()
+
+    @router.get("/jobs/{job_id}/result")
+    async def get_job_result(job_id: str) -> dict[str, Any]:
+        job = _get_job(job_id)
+        if not job.finished:
+            raise HTTPException(409, f"Job {job_id!r} is {job.status}")
+        return {**job.to_dict(), "result": job.result}
+
+    @router.post("/jobs/{job_id}/cancel")
+    async def cancel_job(job_id: str) -> dict[str, Any]:
+        try:
+            return _job_manager().cancel(job_id).to_dict()
+        except KeyError:
+            raise HTTPException(404, f"Job {job_id!r} not found")
+        except ValueError as exc:
+            raise HTTPException(409, str(exc))
+
     # -- Runs --
 
     @router.get("/runs")
-    async def list_runs(limit: int = Query(50, ge=1, le=500)) -> list[dict[str, Any]]:
-        return _svc().list_runs(limit)
+    async def list_runs(
+        limit: int = Query(50, ge=1, le=500),
+        offset: int = Query(0, ge=0),
+        scenario: str | None = Query(None),
+        batch_id: str | None = Query(None),
+    ) -> list[dict[str, Any]]:
+        return _svc().list_runs(limit, offset, scenario_name=scenario, build_batch_id=batch_id)
 
     @router.get("/run/latest")
     async def latest_run() -> dict[str, Any]:
@@ -389,7 +665,7 @@ def _api_router():
         run_id: str | None = Query(None),
         limit: int = Query(5000, ge=1, le=50000),
     ) -> dict[str, Any]:
-        result = _svc().get_table_output(name, run_id, limit)
+        result = await _offload(_svc().get_table_output, name, run_id, limit)
         if "error" in result:
             raise HTTPException(404, result["error"])
         return result
@@ -397,26 +673,65 @@ def _api_router():
     @router.post("/outputs/table/view")
     async def view_table(req: TableViewRequest) -> dict[str, Any]:
         """Apply view-only sort/filter transforms to a table output."""
-        from fin123.ui.view_transforms import apply_view_transforms
-
-        result = _svc().get_table_output(req.name, req.run_id, limit=50000)
+        try:
+            result = await _offload(
+                _svc().query_table_output,
+                req.name, req.run_id, limit=req.limit, sorts=req.sorts, filters=req.filters,
+            )
+        except ValueError as exc:
+            raise HTTPException(400, str(exc))
         if "error" in result:
             raise HTTPException(404, result["error"])
 
-        import polars as _pl
+        page = result["page"]
+        return {
+            "table": req.name,
+            "columns": page.columns,
+            "rows": await _offload(page.to_dicts),
+            "total_rows": result["total_rows"],
+            "limited": result["total_rows"] > req.limit,
+        }
+
+    @router.post("/outputs/table/page")
+    async def page_table(req: TablePageRequest) -> Response:
+        """Return one sorted/filtered page of a table output as JSON or Arrow IPC."""
+        try:
+            result = await _offload(
+                _svc().query_table_output,
+                req.name, req.run_id, offset=req.offset, limit=req.limit,
+                sorts=req.sorts, filters=req.filters, columns=req.columns,
+            )
+        except ValueError as exc:
+            raise HTTPException(400, str(exc))
+        if "error" in result:
+            raise HTTPException(404, result["error"])
 
-        df = _pl.DataFrame(result["rows"])
-        df = apply_view_transforms(df, sorts=req.sorts, filters=req.filters)
-        total_rows = len(df)
-        df = df.head(req.limit)
+        page = result["page"]
+        total_rows = result["total_rows"]
+        has_more = req.offset + page.height < total_rows
+        if req.format == "arrow":
+            return Response(
+                await _offload(_arrow_ipc_bytes, page),
+                media_type="application/vnd.apache.arrow.file",
+                headers={
+                    "X-Total-Rows": str(total_rows),
+                    "X-Offset": str(req.offset),
+                    "X-Has-More": "true" if has_more else "false",
+                },
+            )
 
-        return {
+        # Rows are serialized by Polars directly; the envelope is spliced around them
+        envelope = json.dumps({
             "table": req.name,
-            "columns": df.columns,
-            "rows": df.to_dicts(),
+            "columns": page.columns,
+            "offset": req.offset,
+            "limit": req.limit,
             "total_rows": total_rows,
-            "limited": total_rows > req.limit,
-        }
+            "has_more": has_more,
+        })
+        rows_json = await _offload(page.write_json)
+        body = envelope[:-1] + ', "rows": ' + rows_json + "}"
+        return Response(body, media_type="application/json")
 
     @router.get("/outputs/table/download")
     async def download_table(
@@ -454,12 +769,12 @@ def _api_router():
 
     @router.get("/names")
     async def list_names() -> dict[str, dict[str, str]]:
-        return _svc().list_names()
+        return await _offload(_svc().list_names)
 
     @router.post("/names")
     async def create_name(req: NameRequest) -> dict[str, Any]:
         try:
-            return _svc().set_name(req.name, req.sheet, req.start, req.end)
+            return await _offload_write(_svc().set_name, req.name, req.sheet, req.start, req.end)
         except (ValueError, KeyError) as exc:
             raise HTTPException(400, str(exc))
 
@@ -467,7 +782,7 @@ def _api_router():
     async def update_name(name: str, req: NameUpdateRequest) -> dict[str, Any]:
         updates = {k: v for k, v in req.model_dump().items() if v is not None}
         try:
-            return _svc().update_name(name, **updates)
+            return await _offload_write(_svc().update_name, name, **updates)
         except KeyError as exc:
             raise HTTPException(404, str(exc))
         except ValueError as exc:
@@ -476,7 +791,7 @@ def _api_router():
     @router.delete("/names/{name}")
     async def delete_name(name: str) -> dict[str, Any]:
         try:
-            return _svc().delete_name(name)
+            return await _offload_write(_svc().delete_name, name)
         except KeyError as exc:
             raise HTTPException(404, str(exc))
 
@@ -491,7 +806,7 @@ def _api_router():
     @router.post("/unbind-param")
     async def unbind_param(req: UnbindParamRequest) -> dict[str, Any]:
         try:
-            return _svc().unbind_param(req.sheet, req.addr)
+            return await _offload_write(_svc().unbind_param, req.sheet, req.addr)
         except ValueError as exc:
             raise HTTPException(400, str(exc))
 
@@ -508,25 +823,25 @@ def _api_router():
     @router.post("/model/select")
     async def select_model_version(req: SelectVersionRequest) -> dict[str, Any]:
         try:
-            return _svc().select_model_version(req.version)
+            return await _offload_write(_svc().select_model_version, req.version)
         except FileNotFoundError as exc:
             raise HTTPException(404, str(exc))
 
     @router.post("/model/pin")
     async def pin_model_version(req: PinVersionRequest) -> dict[str, Any]:
-        _svc().pin_model_version(req.version)
+        await _offload_write(_svc().pin_model_version, req.version)
         return {"ok": True, "version": req.version, "pinned": True}
 
     @router.post("/model/unpin")
     async def unpin_model_version(req: PinVersionRequest) -> dict[str, Any]:
-        _svc().unpin_model_version(req.version)
+        await _offload_write(_svc().unpin_model_version, req.version)
         return {"ok": True, "version": req.version, "pinned": False}
 
     # -- Clear cache --
 
     @router.post("/clear-cache")
     async def clear_cache(req: ClearCacheRequest) -> dict[str, Any]:
-        return _svc().clear_cache(dry_run=req.dry_run)
+        return await _offload_write(_svc().clear_cache, dry_run=req.dry_run)
 
     # -- Import reports --
 
@@ -567,14 +882,14 @@ def _api_router():
     @router.post("/import/review/todo")
     async def mark_import_todo(req: ImportTodoRequest) -> dict[str, Any]:
         try:
-            return _svc().mark_import_todo(req.sheet, req.addr)
+            return await _offload_write(_svc().mark_import_todo, req.sheet, req.addr)
         except ValueError as exc:
             raise HTTPException(400, str(exc))
 
     @router.post("/import/review/convert-value")
     async def convert_import_to_value(req: ImportConvertRequest) -> dict[str, Any]:
         try:
-            return _svc().convert_to_value(req.sheet, req.addr)
+            return await _offload_write(_svc().convert_to_value, req.sheet, req.addr)
         except ValueError as exc:
             raise HTTPException(400, str(exc))
 
@@ -710,27 +1025,36 @@ def _api_router():
         """Run verification on a completed build."""
         if not _SAFE_LOG_ID.match(req.run_id):
             raise HTTPException(400, "Invalid run_id")
-        return _svc().build_verify(req.run_id)
+        return await _offload(_svc().build_verify, req.run_id)
 
     @router.post("/run/verify")
     async def verify_run(req: VerifyRunRequest) -> dict[str, Any]:
         """Legacy endpoint — use /api/build/verify instead."""
         if not _SAFE_LOG_ID.match(req.run_id):
             raise HTTPException(400, "Invalid run_id")
-        return _svc().build_verify(req.run_id)
+        return await _offload(_svc().build_verify, req.run_id)
 
     # -- Health --
 
     @router.get("/health")
     async def get_project_health() -> dict[str, Any]:
-        return _svc().get_project_health()
+        return await _offload(_svc().get_project_health)
 
     # -- Model status ribbon --
 
     @router.get("/status")
     async def get_model_status() -> dict[str, Any]:
         """Compact status for the UI ribbon: dirty, datasheets, build, verify."""
-        return _svc().get_model_status()
+        return await _offload(_push_hub().get_status)
+
+    @router.get("/stream")
+    async def stream(request: Request) -> StreamingResponse:
+        """Server-Sent Events: status deltas, log events, jobs and cell changes."""
+        return StreamingResponse(
+            _push_hub().stream(request.is_disconnected),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
     # -- Latest table output --
 
@@ -751,14 +1075,14 @@ def _api_router():
     @router.post("/registry/push")
     async def registry_push(req: RegistryPushRequest | None = None) -> dict[str, Any]:
         versions = req.versions if req else None
-        result = _svc().registry_push_versions(versions)
+        result = await _offload_write(_svc().registry_push_versions, versions)
         if "error" in result:
             raise HTTPException(400, result["error"])
         return result
 
     @router.post("/registry/pull")
     async def registry_pull(req: RegistryPullRequest) -> dict[str, Any]:
-        result = _svc().registry_pull_version(req.model_id, req.version)
+        result = await _offload_write(_svc().registry_pull_version, req.model_id, req.version)
         if "error" in result:
             raise HTTPException(400, result["error"])
         return result
@@ -772,7 +1096,8 @@ def _api_router():
     @router.post("/worksheet/compile")
     async def compile_worksheet(req: WorksheetCompileRequest) -> dict[str, Any]:
         try:
-            return _svc().compile_worksheet_from_run(
+            return await _offload(
+                _svc().compile_worksheet_from_run,
                 spec_file=req.spec_file,
                 table_name=req.table_name,
                 run_id=req.run_id,
@@ -804,14 +1129,15 @@ def _api_router():
 
     @router.post("/scenarios")
     async def save_scenario(req: ScenarioSaveRequest) -> dict[str, Any]:
-        return _svc().scenario_save(
+        return await _offload_write(
+            _svc().scenario_save,
             name=req.name, inputs=req.inputs, outputs=req.outputs,
             run_id=req.run_id, notes=req.notes,
         )
 
     @router.delete("/scenarios/{name}")
     async def delete_scenario(name: str) -> dict[str, Any]:
-        ok = _svc().scenario_delete(name)
+        ok = await _offload_write(_svc().scenario_delete, name)
         if not ok:
             raise HTTPException(404, f"Scenario '{name}' not found")
         return {"ok": True, "deleted": name}
@@ -825,7 +1151,7 @@ def _api_router():
     @router.post("/params/update")
     async def update_param(req: UpdateParamRequest) -> dict[str, Any]:
         try:
-            return _svc().update_param(req.name, req.value)
+            return await _offload_write(_svc().update_param, req.name, req.value)
         except ValueError as exc:
             raise HTTPException(400, str(exc))
 
@@ -848,9 +1174,20 @@ def _api_router():
 
     @router.post("/sweeps")
     async def save_sweep(req: SweepSaveRequest) -> dict[str, Any]:
-        path = _svc().sweep_save(req.sweep_id, req.data)
+        path = await _offload_write(_svc().sweep_save, req.sweep_id, req.data)
         return {"ok": True, "path": str(path)}
 
+    @router.post("/sweeps/run")
+    async def run_sweep(req: SweepRunRequest):
+        try:
+            events = _svc().sweep_run(
+                req.input, req.values,
+                selected_outputs=req.outputs, max_workers=req.max_workers,
+            )
+        except ValueError as exc:
+            raise HTTPException(400, str(exc))
+        return _ndjson_response(_writer_stream(events))
+
     @router.get("/sweeps/{sweep_id}/csv")
     async def export_sweep_csv(sweep_id: str):
         csv_data = _svc().sweep_export_csv(sweep_id)
@@ -882,9 +1219,20 @@ def _api_router():
 
     @router.post("/grids")
     async def save_grid(req: GridSaveRequest) -> dict[str, Any]:
-        path = _svc().grid_save(req.grid_id, req.data)
+        path = await _offload_write(_svc().grid_save, req.grid_id, req.data)
         return {"ok": True, "path": str(path)}
 
+    @router.post("/grids/run")
+    async def run_grid(req: GridRunRequest):
+        try:
+            events = _svc().grid_run(
+                req.input_x, req.values_x, req.input_y, req.values_y,
+                display_output=req.output, max_workers=req.max_workers,
+            )
+        except ValueError as exc:
+            raise HTTPException(400, str(exc))
+        return _ndjson_response(_writer_stream(events))
+
     @router.get("/grids/{grid_id}/csv")
     async def export_grid_csv(grid_id: str):
         csv_data = _svc().grid_export_csv(grid_id)
@@ -902,7 +1250,8 @@ def _api_router():
     @router.post("/surface/evaluate")
     async def surface_evaluate(req: SurfaceEvalRequest) -> dict[str, Any]:
         try:
-            return _svc().evaluate_surface(
+            return await _offload(
+                _svc().evaluate_surface,
                 x_param=req.x_param,
                 x_range=req.x_range,
                 y_param=req.y_param,
@@ -947,7 +1296,8 @@ def _api_router():
 
     @router.post("/drafts")
     async def save_draft(req: DraftSaveRequest) -> dict[str, Any]:
-        return _svc().draft_save(
+        return await _offload_write(
+            _svc().draft_save,
             artifact_type=req.artifact_type,
             prompt=req.prompt,
             code=req.code,
@@ -959,7 +1309,7 @@ def _api_router():
 
     @router.delete("/drafts/{draft_id}")
     async def delete_draft(draft_id: str) -> dict[str, Any]:
-        ok = _svc().draft_delete(draft_id)
+        ok = await _offload_write(_svc().draft_delete, draft_id)
         if not ok:
             raise HTTPException(404, f"Draft '{draft_id}' not found")
         return {"ok": True, "deleted": draft_id}
@@ -967,14 +1317,14 @@ def _api_router():
     @router.post("/drafts/{draft_id}/validate")
     async def validate_draft(draft_id: str) -> dict[str, Any]:
         try:
-            return _svc().draft_validate(draft_id)
+            return await _offload_write(_svc().draft_validate, draft_id)
         except ValueError as exc:
             raise HTTPException(400, str(exc))
 
     @router.post("/drafts/{draft_id}/promote")
     async def promote_draft(draft_id: str) -> dict[str, Any]:
         try:
-            return _svc().draft_apply(draft_id)
+            return await _offload_write(_svc().draft_apply, draft_id)
         except ValueError as exc:
             raise HTTPException(400, str(exc))
 
@@ -982,13 +1332,13 @@ def _api_router():
     async def apply_draft(draft_id: str) -> dict[str, Any]:
         """Backward-compatible alias for promote."""
         try:
-            return _svc().draft_apply(draft_id)
+            return await _offload_write(_svc().draft_apply, draft_id)
         except ValueError as exc:
             raise HTTPException(400, str(exc))
 
     @router.post("/drafts/{draft_id}/reject")
     async def reject_draft(draft_id: str) -> dict[str, Any]:
-        result = _svc().draft_update_status(draft_id, "rejected")
+        result = await _offload_write(_svc().draft_update_status, draft_id, "rejected")
         if result is None:
             raise HTTPException(404, f"Draft '{draft_id}' not found")
         return result
@@ -1024,10 +1374,12 @@ def _api_router():
             display = req.display or ""
             if not formula and req.ref:
                 try:
-                    info = _svc().get_project_info()
+                    info = await _offload(_svc().get_project_info)
                     sheets = info.get("sheets", [])
                     active_sheet = sheets[0] if sheets else "Sheet1"
-                    viewport = _svc().get_sheet_viewport(active_sheet, 0, 0, 200, 40)
+                    viewport = await _offload(
+                        _svc().get_sheet_viewport, active_sheet, 0, 0, 200, 40
+                    )
                     for cell in viewport.get("cells", []):
                         if cell.get("addr", "").upper() == req.ref.upper():
                             formula = cell.get("raw", "")
@@ -1041,7 +1393,7 @@ def _api_router():
             context = req.context or ""
             if not context:
                 try:
-                    info = _svc().get_project_info()
+                    info = await _offload(_svc().get_project_info)
                     params = info.get("params", {})
                     if params:
                         context = "Workbook parameters: " + ", ".join(
@@ -1069,7 +1421,7 @@ def _api_router():
             context = req.context or ""
             if not context:
                 try:
-                    info = _svc().get_project_info()
+                    info = await _offload(_svc().get_project_info)
                     params = info.get("params", {})
                     outputs_spec = [
                         o for o in info.get("_spec", {}).get("outputs", [])
@@ -1099,7 +1451,8 @@ def _api_router():
             return result
 
         # Save as draft artifact
-        draft = _svc().draft_save(
+        draft = await _offload_write(
+            _svc().draft_save,
             artifact_type="scalar_plugin",
             prompt=req.description,
             code=result.get("code", result.get("content", "")),
@@ -1138,7 +1491,8 @@ def _api_router():
             return result
 
         # Save as new draft with revision_of link
-        draft = _svc().draft_save(
+        draft = await _offload_write(
+            _svc().draft_save,
             artifact_type=parent.get("artifact_type", "scalar_plugin"),
             prompt=req.instruction,
             code=result.get("code", result.get("content", "")),
@@ -11,16 +11,21 @@ from __future__ import annotations
 import json
 import os
 import re
+import threading
 import time
+from functools import wraps
 from pathlib import Path
-from typing import Any
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from typing import Any, TypeVar
 
 import polars as pl
 import yaml
 
 from fin123 import __version__
 from fin123.project import ensure_model_id, load_project_config
-from fin123.versioning import ArtifactStore, RunStore, SnapshotStore
+from fin123.versioning import ArtifactStore, RunStore, SnapshotStore, phase_total
+
+T = TypeVar("T")
 
 
 # ---------------------------------------------------------------------------
@@ -159,6 +164,37 @@ def rewrite_formula_refs(
     return "".join(result_parts)
 
 
+def _shift_index(pos: int, index: int, count: int) -> int | None:
+    """Return where row/col *pos* ends up after a shift; None if deleted."""
+    if pos < index:
+        return pos
+    if count < 0 and pos < index - count:
+        return None
+    return pos + count
+
+
+def _iter_formulas(
+    cells: dict[str, Any],
+) -> Iterator[tuple[int | None, int | None, str, str | None]]:
+    """Yield ``(row, col, addr, shape)`` for the formula cells of a sheet.
+
+    ``SheetCells`` stores report each formula's shared shape; plain dicts
+    report None (no shape).  Row and col are None for keys that are not
+    A1 addresses.
+    """
+    if hasattr(cells, "iter_formulas"):
+        yield from cells.iter_formulas()
+        return
+    for addr_key, cell in cells.items():
+        if not cell.get("formula"):
+            continue
+        try:
+            row, col = parse_addr(addr_key)
+        except ValueError:
+            row = col = None
+        yield row, col, addr_key, None
+
+
 def _remap_addresses(
     addr_dict: dict[str, Any],
     axis: str,
@@ -244,6 +280,54 @@ def make_addr(row: int, col: int) -> str:
     return f"{index_to_col_letter(col)}{row + 1}"
 
 
+def _union_keys(dicts: Iterable[dict[str, Any]]) -> list[str]:
+    """Return the keys of several dicts in first-seen order."""
+    keys: dict[str, None] = {}
+    for d in dicts:
+        keys.update(dict.fromkeys(d))
+    return list(keys)
+
+
+class _RunTables(Mapping[str, pl.DataFrame]):
+    """Output tables of one run, each read from parquet on first use.
+
+    Passed to the sheet ``CellGraph`` so SUMIFS/COUNTIFS and lookups in
+    cells can reach tables without loading every output up front.
+    """
+
+    def __init__(self, outputs_dir: Path) -> None:
+        self._paths = {p.stem: p for p in sorted(outputs_dir.glob("*.parquet"))}
+        self._frames: dict[str, pl.DataFrame] = {}
+
+    def __getitem__(self, name: str) -> pl.DataFrame:
+        frame = self._frames.get(name)
+        if frame is None:
+            frame = self._frames[name] = pl.read_parquet(self._paths[name])
+        return frame
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+
+def _holds_working_copy(method: Callable[..., T]) -> Callable[..., T]:
+    """Run a :class:`ProjectService` method under its working-copy lock.
+
+    Edits arrive on threadpool threads while viewports and summaries are
+    served from others; the lock keeps a reader from iterating sheets,
+    spatial indexes or the cell graph mid-mutation.
+    """
+
+    @wraps(method)
+    def locked(self: ProjectService, *args: Any, **kwargs: Any) -> T:
+        with self._working_copy_lock:
+            return method(self, *args, **kwargs)
+
+    return locked
+
+
 # ---------------------------------------------------------------------------
 # ProjectService
 # ---------------------------------------------------------------------------
@@ -283,6 +367,10 @@ class ProjectService:
         # Read-only flag — set when viewing old versions
         self._read_only = False
 
+        # Guards sheets, names, params, indexes and the cell graph; writers
+        # additionally hold the project writer lock
+        self._working_copy_lock = threading.RLock()
+
         # Working copy of sheets (in-memory, potentially dirty)
         self._sheets: list[dict[str, Any]] = self._load_sheets()
         self._names: dict[str, dict[str, str]] = dict(self._spec.get("names", {}))
@@ -298,6 +386,9 @@ class ProjectService:
         # Lazy CellGraph — rebuilt when needed
         self._cell_graph = None
 
+        # Per-sheet spatial indexes of occupied cells, built on first viewport
+        self._sheet_indexes: dict[str, Any] = {}
+
     # ------------------------------------------------------------------
     # Read-only guard
     # ------------------------------------------------------------------
@@ -319,28 +410,53 @@ class ProjectService:
 
         If the spec doesn't have a ``sheets`` key, create a default Sheet1.
         Each sheet dict has: name, n_rows, n_cols, cells, fmt (optional).
+        Cells are held in a compact :class:`SheetCells` store; the spec's
+        own copy is replaced by the working sheets so the parsed YAML cell
+        dicts are not kept alive alongside it.
         """
+        from fin123.ui.sheet_store import SheetCells
+
         raw_sheets = self._spec.get("sheets")
         if raw_sheets:
             sheets = []
             for s in raw_sheets:
                 d = dict(s)
-                d.setdefault("cells", {})
+                d["cells"] = SheetCells(d.get("cells") or {})
                 d.setdefault("fmt", {})
                 d.setdefault("n_rows", 200)
                 d.setdefault("n_cols", 40)
                 sheets.append(d)
+            self._spec["sheets"] = sheets
             return sheets
         return [
             {
                 "name": "Sheet1",
                 "n_rows": 200,
                 "n_cols": 40,
-                "cells": {},
+                "cells": SheetCells(),
                 "fmt": {},
             }
         ]
 
+    def _spec_document(self) -> dict[str, Any]:
+        """Return the workbook spec with the working-copy sheets as plain data.
+
+        This is what ``workbook.yaml`` holds and what the workbook hash is
+        computed over.  Empty fmt maps are stripped for cleaner YAML.
+        """
+        sheets = []
+        for s in self._sheets:
+            sd = dict(s)
+            cells = sd.get("cells")
+            if hasattr(cells, "to_dict"):
+                sd["cells"] = cells.to_dict()
+            if not sd.get("fmt"):
+                sd.pop("fmt", None)
+            sheets.append(sd)
+        doc = dict(self._spec)
+        doc["sheets"] = sheets
+        return doc
+
     def _latest_snapshot_version(self) -> str | None:
         """Return the latest snapshot version string, or None."""
         snap_dir = self.project_dir / "snapshots" / "workbook"
@@ -353,9 +469,8 @@ class ProjectService:
 
     def _latest_run_id(self) -> str | None:
         """Return the most recent run_id, or None."""
-        store = RunStore(self.project_dir)
-        runs = store.list_runs()
-        return runs[-1]["run_id"] if runs else None
+        latest = RunStore(self.project_dir).latest_run()
+        return latest["run_id"] if latest else None
 
     def _get_sheet(self, sheet_name: str) -> dict[str, Any]:
         """Get sheet dict by name, raising ValueError if missing."""
@@ -364,10 +479,34 @@ class ProjectService:
                 return s
         raise ValueError(f"Sheet {sheet_name!r} not found")
 
+    def _sheet_index(self, sheet: dict[str, Any]):
+        """Return the spatial index for *sheet*, rebuilding it if stale.
+
+        Indexes are tied to the sheet's ``cells``/``fmt`` dicts, so an
+        operation that replaces them (row/col insert, version switch) gets
+        a fresh index automatically; in-place edits call ``_touch_cells``.
+        """
+        from fin123.ui.sheet_index import SheetIndex
+
+        cells = sheet.setdefault("cells", {})
+        fmt = sheet.setdefault("fmt", {})
+        index = self._sheet_indexes.get(sheet["name"])
+        if index is None or not index.covers(cells, fmt):
+            index = self._sheet_indexes[sheet["name"]] = SheetIndex(cells, fmt)
+        return index
+
+    def _touch_cells(self, sheet: dict[str, Any], addrs: Iterable[str]) -> None:
+        """Keep an existing spatial index in step with in-place cell edits."""
+        index = self._sheet_indexes.get(sheet["name"])
+        if index is not None and index.covers(sheet.get("cells"), sheet.get("fmt")):
+            for addr in addrs:
+                index.touch(addr)
+
     # ------------------------------------------------------------------
     # Sheet management (CRUD)
     # ------------------------------------------------------------------
 
+    @_holds_working_copy
     def list_sheets(self) -> list[dict[str, Any]]:
         """Return list of sheet summaries (name, n_rows, n_cols)."""
         return [
@@ -375,16 +514,19 @@ class ProjectService:
             for s in self._sheets
         ]
 
+    @_holds_working_copy
     def add_sheet(self, name: str) -> dict[str, Any]:
         """Add a new empty sheet.  Raises ValueError on duplicate name."""
         self._check_writable()
         if any(s["name"] == name for s in self._sheets):
             raise ValueError(f"Sheet {name!r} already exists")
+        from fin123.ui.sheet_store import SheetCells
+
         sheet = {
             "name": name,
             "n_rows": 200,
             "n_cols": 40,
-            "cells": {},
+            "cells": SheetCells(),
             "fmt": {},
         }
         self._sheets.append(sheet)
@@ -392,6 +534,7 @@ class ProjectService:
         self._cell_graph = None
         return {"name": name, "n_rows": 200, "n_cols": 40}
 
+    @_holds_working_copy
     def delete_sheet(self, name: str) -> dict[str, Any]:
         """Delete a sheet by name.  Must keep at least one sheet."""
         self._check_writable()
@@ -405,10 +548,12 @@ class ProjectService:
         if idx is None:
             raise ValueError(f"Sheet {name!r} not found")
         self._sheets.pop(idx)
+        self._sheet_indexes.pop(name, None)
         self._dirty = True
         self._cell_graph = None
         return {"deleted": name, "remaining": [s["name"] for s in self._sheets]}
 
+    @_holds_working_copy
     def rename_sheet(self, old_name: str, new_name: str) -> dict[str, Any]:
         """Rename a sheet.  Raises ValueError on duplicate or missing."""
         self._check_writable()
@@ -416,6 +561,9 @@ class ProjectService:
             raise ValueError(f"Sheet {new_name!r} already exists")
         sheet = self._get_sheet(old_name)
         sheet["name"] = new_name
+        index = self._sheet_indexes.pop(old_name, None)
+        if index is not None:
+            self._sheet_indexes[new_name] = index
         self._dirty = True
         self._cell_graph = None
         return {"old_name": old_name, "new_name": new_name}
@@ -440,22 +588,45 @@ class ProjectService:
             count: Positive for insert, negative for delete.
         """
         sheet = self._get_sheet(sheet_name)
+        from fin123.formulas.shared import follows_shift
 
-        # 1. Remap cells and fmt address keys in the affected sheet
-        sheet["cells"] = _remap_addresses(sheet.get("cells", {}), axis, index, count)
-        sheet["fmt"] = _remap_addresses(sheet.get("fmt", {}), axis, index, count)
-
-        # 2. Rewrite formulas in ALL sheets (cross-sheet refs may point here)
+        # 1. Rewrite formulas in ALL sheets (cross-sheet refs may point
+        #    here), from their text before the shift.  Shared formulas
+        #    whose refs all move with the cell need no rewriting: the
+        #    shared record moves with it.
+        rewrites: list[tuple[Any, str, str]] = []
         for s in self._sheets:
             cells_map = s.get("cells", {})
-            for addr_key, cell in list(cells_map.items()):
-                formula = cell.get("formula")
-                if formula:
-                    new_formula = rewrite_formula_refs(
-                        formula, sheet_name, s["name"], axis, index, count
-                    )
-                    if new_formula != formula:
-                        cells_map[addr_key] = {"formula": new_formula}
+            for row, col, addr_key, shape in _iter_formulas(cells_map):
+                if row is None:
+                    new_addr = addr_key  # kept verbatim by the remap
+                elif s["name"] == sheet_name:
+                    pos = _shift_index(row if axis == "row" else col, index, count)
+                    if pos is None:
+                        continue  # deleted with its row/col
+                    new_addr = make_addr(pos, col) if axis == "row" else make_addr(row, pos)
+                else:
+                    new_addr = addr_key
+                if shape is not None and follows_shift(
+                    shape, row, col, s["name"], sheet_name, axis, index, count
+                ):
+                    continue
+                formula = cells_map[addr_key]["formula"]
+                new_formula = rewrite_formula_refs(
+                    formula, sheet_name, s["name"], axis, index, count
+                )
+                if shape is not None or new_formula != formula:
+                    rewrites.append((s, new_addr, new_formula))
+
+        # 2. Remap cells and fmt address keys in the affected sheet
+        cells = sheet.get("cells", {})
+        if hasattr(cells, "shifted"):
+            sheet["cells"] = cells.shifted(axis, index, count)
+        else:
+            sheet["cells"] = _remap_addresses(cells, axis, index, count)
+        sheet["fmt"] = _remap_addresses(sheet.get("fmt", {}), axis, index, count)
+        for s, addr_key, new_formula in rewrites:
+            s["cells"][addr_key] = {"formula": new_formula}
 
         # 3. Shift named range start/end addresses on affected sheet
         for _name, defn in self._names.items():
@@ -497,6 +668,7 @@ class ProjectService:
         self._dirty = True
         self._cell_graph = None
 
+    @_holds_working_copy
     def insert_rows(
         self, sheet_name: str, row_idx: int, count: int = 1
     ) -> dict[str, Any]:
@@ -520,6 +692,7 @@ class ProjectService:
         self._shift_sheet(sheet_name, "row", row_idx, count)
         return {"ok": True, "n_rows": sheet["n_rows"], "n_cols": sheet["n_cols"], "dirty": self._dirty}
 
+    @_holds_working_copy
     def delete_rows(
         self, sheet_name: str, row_idx: int, count: int = 1
     ) -> dict[str, Any]:
@@ -544,6 +717,7 @@ class ProjectService:
         self._shift_sheet(sheet_name, "row", row_idx, -count)
         return {"ok": True, "n_rows": sheet["n_rows"], "n_cols": sheet["n_cols"], "dirty": self._dirty}
 
+    @_holds_working_copy
     def insert_cols(
         self, sheet_name: str, col_idx: int, count: int = 1
     ) -> dict[str, Any]:
@@ -567,6 +741,7 @@ class ProjectService:
         self._shift_sheet(sheet_name, "col", col_idx, count)
         return {"ok": True, "n_rows": sheet["n_rows"], "n_cols": sheet["n_cols"], "dirty": self._dirty}
 
+    @_holds_working_copy
     def delete_cols(
         self, sheet_name: str, col_idx: int, count: int = 1
     ) -> dict[str, Any]:
@@ -595,16 +770,19 @@ class ProjectService:
     # Named ranges (CRUD)
     # ------------------------------------------------------------------
 
+    @_holds_working_copy
     def list_names(self) -> dict[str, dict[str, str]]:
         """Return all named ranges."""
         return dict(self._names)
 
+    @_holds_working_copy
     def get_name(self, name: str) -> dict[str, str]:
         """Get a named range definition.  Raises KeyError if missing."""
         if name not in self._names:
             raise KeyError(f"Named range {name!r} not found")
         return dict(self._names[name])
 
+    @_holds_working_copy
     def set_name(self, name: str, sheet: str, start: str, end: str) -> dict[str, Any]:
         """Create or overwrite a named range.
 
@@ -629,6 +807,7 @@ class ProjectService:
         self._cell_graph = None  # invalidate
         return {"name": name, **self._names[name]}
 
+    @_holds_working_copy
     def update_name(self, name: str, **updates: str) -> dict[str, Any]:
         """Update fields of an existing named range.
 
@@ -658,6 +837,7 @@ class ProjectService:
         self._cell_graph = None
         return {"name": name, **defn}
 
+    @_holds_working_copy
     def delete_name(self, name: str) -> dict[str, Any]:
         """Delete a named range.  Raises KeyError if missing."""
         self._check_writable()
@@ -697,7 +877,13 @@ class ProjectService:
         else:
             merged = params
 
-        self._cell_graph = CellGraph(sheets_data, self._names, params=merged)
+        # Tables come from the same build, for SUMIFS/COUNTIFS and lookups
+        run_dir = self._resolve_run_dir(None)
+        tables = _RunTables(run_dir / "outputs") if run_dir is not None else None
+
+        self._cell_graph = CellGraph(
+            sheets_data, self._names, params=merged, table_cache=tables
+        )
         return self._cell_graph
 
     def _get_cell_graph(self):
@@ -710,6 +896,7 @@ class ProjectService:
     # Public API
     # ------------------------------------------------------------------
 
+    @_holds_working_copy
     def get_project_info(self) -> dict[str, Any]:
         """Return project metadata for the UI."""
         from fin123.project import get_project_mode
@@ -738,6 +925,7 @@ class ProjectService:
             "mode": get_project_mode(self.project_dir),
         }
 
+    @_holds_working_copy
     def get_sheet_viewport(
         self,
         sheet_name: str = "Sheet1",
@@ -756,38 +944,35 @@ class ProjectService:
         Formulas are evaluated via CellGraph to produce computed display values.
         """
         sheet = self._get_sheet(sheet_name)
-        cells_map = sheet.get("cells", {})
-        fmt_map = sheet.get("fmt", {})
+        index = self._sheet_index(sheet)
+        cells_map = index.cells
+        fmt_map = index.fmt
         n_rows = sheet.get("n_rows", 200)
         n_cols = sheet.get("n_cols", 40)
 
         cg = self._get_cell_graph()
 
+        # Only occupied cells are visited, however large the window
         cells = []
-        for r in range(r0, min(r0 + rows, n_rows)):
-            for c in range(c0, min(c0 + cols, n_cols)):
-                addr = make_addr(r, c)
-                has_cell = addr in cells_map
-                has_fmt = addr in fmt_map
-                if not has_cell and not has_fmt:
-                    continue
-                entry: dict[str, Any] = {
-                    "addr": addr,
-                    "row": r,
-                    "col": c,
-                }
-                if has_cell:
-                    cell = cells_map[addr]
-                    raw = cell.get("formula") or cell.get("value", "")
-                    entry["raw"] = str(raw)
-                    # Use CellGraph for computed display values
-                    entry["display"] = cg.get_display_value(sheet_name, addr)
-                else:
-                    entry["raw"] = ""
-                    entry["display"] = ""
-                if has_fmt:
-                    entry["fmt"] = fmt_map[addr]
-                cells.append(entry)
+        for r, c, addr in index.query(r0, min(r0 + rows, n_rows), c0, min(c0 + cols, n_cols)):
+            entry: dict[str, Any] = {
+                "addr": addr,
+                "row": r,
+                "col": c,
+            }
+            cell = cells_map.get(addr)
+            if cell is not None:
+                raw = cell.get("formula") or cell.get("value", "")
+                entry["raw"] = str(raw)
+                # Use CellGraph for computed display values
+                entry["display"] = cg.get_display_value(sheet_name, addr)
+            else:
+                entry["raw"] = ""
+                entry["display"] = ""
+            fmt = fmt_map.get(addr)
+            if fmt is not None:
+                entry["fmt"] = fmt
+            cells.append(entry)
 
         return {
             "sheet": sheet_name,
@@ -800,6 +985,7 @@ class ProjectService:
             "cells": cells,
         }
 
+    @_holds_working_copy
     def update_cells(
         self,
         sheet_name: str,
@@ -811,14 +997,20 @@ class ProjectService:
             sheet_name: Target sheet name.
             edits: List of dicts with ``addr`` and either ``value`` or ``formula``.
 
+        Only the edited cells and their transitive dependents are
+        recomputed; the rest of the cell graph stays cached.
+
         Returns:
-            Dict with ``ok``, ``dirty``, ``errors`` (per-cell structured errors).
+            Dict with ``ok``, ``dirty``, ``errors`` (per-cell structured errors)
+            and ``changed`` (``{sheet, addr, display}`` for every cell whose
+            computed value changed, so the grid can repaint just those).
             Each error has: addr, code, message, and optionally position.
         """
         self._check_writable()
         sheet = self._get_sheet(sheet_name)
         cells_map = sheet.setdefault("cells", {})
         errors: list[dict[str, Any]] = []
+        edited: list[str] = []
 
         for edit in edits:
             addr = edit.get("addr", "").upper()
@@ -841,8 +1033,8 @@ class ProjectService:
             elif raw_str.startswith("="):
                 # Validate formula parse
                 try:
-                    from fin123.formulas import parse_formula
-                    parse_formula(raw_str)
+                    from fin123.formulas.shared import parse_at
+                    parse_at(raw_str, *parse_addr(addr))
                 except Exception as exc:
                     err: dict[str, Any] = {
                         "addr": addr,
@@ -865,16 +1057,24 @@ class ProjectService:
                         cells_map[addr] = {"value": num}
                 except ValueError:
                     cells_map[addr] = {"value": raw_str}
+            edited.append(addr)
 
         self._dirty = True
-        self._cell_graph = None  # invalidate computed values
+        self._touch_cells(sheet, edited)
+        cg = self._get_cell_graph()
+        changed = cg.recalculate(sheet_name, edited, cells=cells_map)
 
         return {
             "ok": len(errors) == 0,
             "dirty": self._dirty,
             "errors": errors,
+            "changed": [
+                {"sheet": s, "addr": a, "display": cg.get_display_value(s, a)}
+                for s, a in changed
+            ],
         }
 
+    @_holds_working_copy
     def update_cell_format(
         self,
         sheet_name: str,
@@ -904,6 +1104,7 @@ class ProjectService:
                 fmt_map[addr_str] = {"color": color}
             else:
                 fmt_map.pop(addr_str, None)
+            self._touch_cells(sheet, [addr_str])
 
         self._dirty = True
         return {"ok": True, "dirty": self._dirty}
@@ -949,49 +1150,47 @@ class ProjectService:
         """
         self._check_writable()
 
-        # Scan PARAM() bindings — reject duplicates
-        from fin123.cell_graph import scan_param_bindings
+        # Render the working copy under its lock; the disk writes below need
+        # only the writer lock the caller holds
+        with self._working_copy_lock:
+            # Scan PARAM() bindings — reject duplicates
+            from fin123.cell_graph import scan_param_bindings
 
-        bindings, binding_errors = scan_param_bindings(self._sheets)
-        if binding_errors:
-            raise ValueError(
-                "Cannot commit: duplicate PARAM bindings — " + "; ".join(binding_errors)
-            )
+            bindings, binding_errors = scan_param_bindings(self._sheets)
+            if binding_errors:
+                raise ValueError(
+                    "Cannot commit: duplicate PARAM bindings — " + "; ".join(binding_errors)
+                )
 
-        # Store bindings in spec (or remove if empty)
-        if bindings:
-            self._spec["bindings"] = {
-                name: {"sheet": loc[0], "addr": loc[1]}
-                for name, loc in bindings.items()
-            }
-        else:
-            self._spec.pop("bindings", None)
+            # Store bindings in spec (or remove if empty)
+            if bindings:
+                self._spec["bindings"] = {
+                    name: {"sheet": loc[0], "addr": loc[1]}
+                    for name, loc in bindings.items()
+                }
+            else:
+                self._spec.pop("bindings", None)
 
-        # Auto-declare params: if a PARAM proxy name is not in spec.params, add it
-        params = self._spec.setdefault("params", {})
-        cg = self._get_cell_graph()
-        for param_name, (sheet_name, addr) in bindings.items():
-            if param_name not in params:
-                display = cg.get_display_value(sheet_name, addr)
-                params[param_name] = self._parse_literal(display)
+            # Auto-declare params: if a PARAM proxy name is not in spec.params, add it
+            params = self._spec.setdefault("params", {})
+            cg = self._get_cell_graph()
+            for param_name, (sheet_name, addr) in bindings.items():
+                if param_name not in params:
+                    display = cg.get_display_value(sheet_name, addr)
+                    params[param_name] = self._parse_literal(display)
 
-        # Update sheets in spec — strip empty fmt maps for cleaner YAML
-        sheets_to_save = []
-        for s in self._sheets:
-            sd = dict(s)
-            if not sd.get("fmt"):
-                sd.pop("fmt", None)
-            sheets_to_save.append(sd)
-        self._spec["sheets"] = sheets_to_save
+            # Keep the sheets' place in the spec; _spec_document() renders them
+            self._spec["sheets"] = self._sheets
 
-        # Persist named ranges (strip if empty for cleaner YAML)
-        if self._names:
-            self._spec["names"] = dict(self._names)
-        else:
-            self._spec.pop("names", None)
+            # Persist named ranges (strip if empty for cleaner YAML)
+            if self._names:
+                self._spec["names"] = dict(self._names)
+            else:
+                self._spec.pop("names", None)
 
-        # Write back to workbook.yaml
-        new_yaml = yaml.dump(self._spec, default_flow_style=False, sort_keys=False)
+            # Write back to workbook.yaml
+            doc = self._spec_document()
+            new_yaml = yaml.dump(doc, default_flow_style=False, sort_keys=False)
         (self.project_dir / "workbook.yaml").write_text(new_yaml)
         self._raw_yaml = new_yaml
 
@@ -1003,7 +1202,7 @@ class ProjectService:
 
         from fin123.utils.hash import sha256_dict
 
-        workbook_hash = sha256_dict(self._spec)
+        workbook_hash = sha256_dict(doc)
 
         # Push to registry if enabled
         self._registry_push_version(version, new_yaml, workbook_hash)
@@ -1014,6 +1213,7 @@ class ProjectService:
             "dirty": False,
         }
 
+    @_holds_working_copy
     def unbind_param(self, sheet_name: str, addr: str) -> dict[str, Any]:
         """Replace =PARAM("name") with its current literal value.
 
@@ -1063,6 +1263,9 @@ class ProjectService:
 
         wb = Workbook(self.project_dir)
         result = wb.run()
+        # Cells read scalars and tables from the latest build
+        with self._working_copy_lock:
+            self._cell_graph = None
 
         run_id = result.run_dir.name
 
@@ -1072,7 +1275,7 @@ class ProjectService:
         self._registry_push_run(
             run_id=run_id,
             model_version_id=self._snapshot_version or "",
-            workbook_hash=sha256_dict(self._spec),
+            workbook_hash=sha256_dict(self._spec_document()),
             run_meta={
                 "run_id": run_id,
                 "scalars": {k: str(v) for k, v in result.scalars.items()},
@@ -1156,6 +1359,7 @@ class ProjectService:
         self._save_scenarios(scenarios)
         return True
 
+    @_holds_working_copy
     def update_param(self, name: str, value: Any) -> dict[str, Any]:
         """Update a workbook parameter default value in-memory.
 
@@ -1304,6 +1508,184 @@ class ProjectService:
             ])
         return buf.getvalue()
 
+    # ── Server-side sweep execution ──
+
+    _SWEEP_MAX_POINTS = 1000
+
+    def _check_sweep_inputs(self, names: list[str], n_points: int) -> None:
+        """Validate sweep parameters against the committed workbook."""
+        if self._dirty:
+            raise ValueError("Working copy has uncommitted edits. Commit before running a sweep.")
+        params = self._spec.get("params", {})
+        for name in names:
+            if name not in params:
+                raise ValueError(f"Unknown parameter: {name}")
+        if n_points == 0:
+            raise ValueError("No sweep values provided")
+        if n_points > self._SWEEP_MAX_POINTS:
+            raise ValueError(
+                f"Sweep too large: {n_points} points exceeds maximum of "
+                f"{self._SWEEP_MAX_POINTS}"
+            )
+
+    def sweep_run(
+        self,
+        input_name: str,
+        values: list[Any],
+        selected_outputs: list[str] | None = None,
+        max_workers: int = 1,
+    ) -> Iterator[dict[str, Any]]:
+        """Run a one-dimensional sweep server-side.
+
+        Each point is built from the committed workbook with a parameter
+        override, so it is persisted as a real run while the working copy's
+        params are left untouched.  Inputs are validated before the first
+        event is produced.
+
+        Args:
+            input_name: Parameter to vary.
+            values: Values to assign, in order.
+            selected_outputs: Output keys to highlight when displayed.
+            max_workers: Number of parallel build workers.
+
+        Returns:
+            Iterator of progress events: ``started``, one ``point`` per
+            completed build, then ``completed`` carrying the persisted sweep
+            (same format as :meth:`sweep_save`).
+
+        Raises:
+            ValueError: If the working copy is dirty, the parameter is
+                unknown, or the number of values is out of bounds.
+        """
+        from fin123.sweep import sweep_points
+
+        self._check_sweep_inputs([input_name], len(values))
+        sweep_id = f"sweep_{input_name}_{int(time.time() * 1000)}"
+        return self._sweep_events(
+            "sweep", sweep_id, sweep_points(input_name, values), max_workers,
+            lambda point: {"value": point["params"][input_name]},
+            lambda results, duration_ms: {
+                "sweep_id": sweep_id,
+                "input": input_name,
+                "values": values,
+                "results": results,
+                "output_keys": _union_keys(r["outputs"] for r in results),
+                "selected_outputs": selected_outputs,
+                "duration_ms": duration_ms,
+            },
+        )
+
+    def grid_run(
+        self,
+        input_x: str,
+        values_x: list[Any],
+        input_y: str,
+        values_y: list[Any],
+        display_output: str,
+        max_workers: int = 1,
+    ) -> Iterator[dict[str, Any]]:
+        """Run a 2-D grid sweep server-side.
+
+        Same execution model as :meth:`sweep_run`; cells are ordered with X
+        as the outer loop.
+
+        Args:
+            input_x: Parameter on the X axis.
+            values_x: X axis values.
+            input_y: Parameter on the Y axis.
+            values_y: Y axis values.
+            display_output: Output scalar shown in each cell.
+            max_workers: Number of parallel build workers.
+
+        Returns:
+            Iterator of progress events, ending with ``completed`` carrying
+            the persisted grid (same format as :meth:`grid_save`).
+
+        Raises:
+            ValueError: If the working copy is dirty, a parameter is unknown
+                or repeated, or the grid size is out of bounds.
+        """
+        from fin123.sweep import grid_points
+
+        points = grid_points(input_x, values_x, input_y, values_y)
+        self._check_sweep_inputs([input_x, input_y], len(points))
+        grid_id = f"grid_{input_x}_{input_y}_{int(time.time() * 1000)}"
+        return self._sweep_events(
+            "grid", grid_id, points, max_workers,
+            lambda point: {
+                "x": point["params"][input_x],
+                "y": point["params"][input_y],
+                "display_value": point["outputs"].get(display_output),
+            },
+            lambda cells, duration_ms: {
+                "grid_id": grid_id,
+                "input_x": input_x,
+                "values_x": values_x,
+                "input_y": input_y,
+                "values_y": values_y,
+                "display_output": display_output,
+                "cells": cells,
+                "duration_ms": duration_ms,
+            },
+        )
+
+    def _sweep_events(
+        self,
+        kind: str,
+        sweep_id: str,
+        points: list[dict[str, Any]],
+        max_workers: int,
+        point_fields: Callable[[dict[str, Any]], dict[str, Any]],
+        build_record: Callable[[list[dict[str, Any]], int], dict[str, Any]],
+    ) -> Iterator[dict[str, Any]]:
+        """Drive the sweep engine and persist the result.
+
+        Args:
+            kind: ``"sweep"`` or ``"grid"``.
+            sweep_id: Identifier for the persisted result.
+            points: Parameter override dicts.
+            max_workers: Number of parallel build workers.
+            point_fields: Maps an engine result (with ``outputs``) to the
+                kind-specific fields of a persisted point.
+            build_record: Builds the persisted dict from the ordered points
+                and the duration in ms.
+        """
+        from datetime import datetime, timezone
+
+        from fin123.sweep import iter_sweep
+
+        created_at = datetime.now(timezone.utc).isoformat()
+        max_workers = max(1, min(max_workers, os.cpu_count() or 1))
+        total = len(points)
+        t0 = time.monotonic()
+        yield {"event": "started", "kind": kind, "id": sweep_id, "total": total}
+
+        by_index: dict[int, dict[str, Any]] = {}
+        for result in iter_sweep(self.project_dir, points, max_workers=max_workers):
+            result["outputs"] = result.get("scalars", {})
+            entry = point_fields(result)
+            if result["status"] == "ok":
+                entry.update(outputs=result["outputs"], run_id=result["run_id"], status="success")
+            else:
+                entry.update(outputs={}, run_id=None, status="error", error=result["error"])
+            by_index[result["index"]] = entry
+            yield {"event": "point", "index": result["index"], "done": len(by_index),
+                   "total": total, **entry}
+
+        ordered = [by_index[i] for i in range(total)]
+        successes = sum(1 for e in ordered if e["status"] == "success")
+        record = build_record(ordered, round((time.monotonic() - t0) * 1000))
+        record.update(
+            created_at=created_at,
+            success_count=successes,
+            failure_count=total - successes,
+        )
+        if kind == "grid":
+            self.grid_save(sweep_id, record)
+        else:
+            self.sweep_save(sweep_id, record)
+        yield {"event": "completed", "kind": kind, "id": sweep_id, "data": record}
+
     # ── Result inspection ──
 
     def inspect_result(self, result_id: str) -> dict[str, Any]:
@@ -1355,10 +1737,13 @@ class ProjectService:
 
         Read-only.  No runs, snapshots, or artifacts are created.
         Tables are evaluated once and reused as a lookup cache for all
-        grid points.  Only the scalar DAG is re-evaluated per point.
+        grid points.  The scalar DAG is compiled once and evaluated over the
+        whole grid in one vectorized pass; only nodes that cannot vectorize
+        (e.g. lookups keyed on an axis param) are evaluated per point.
 
         Returns dict with grid values, axis arrays, min/max, base-case
-        anchor, and evaluation timing.
+        anchor, evaluation timing with a per-phase ``timings_ms`` breakdown,
+        and which nodes were vectorized or evaluated per point.
         """
         import math
         import time as _time
@@ -1368,7 +1753,7 @@ class ProjectService:
         t0 = _time.monotonic()
 
         # Clamp steps
-        steps = max(5, min(50, steps))
+        steps = max(5, min(200, steps))
 
         # Validate params exist in spec
         spec_params = self._spec.get("params", {})
@@ -1401,6 +1786,8 @@ class ProjectService:
         ys = [y_range[0] + i * (y_range[1] - y_range[0]) / (steps - 1)
               for i in range(steps)]
 
+        timings_ms: dict[str, float] = {}
+
         # Build a Workbook instance for access to graph-building methods.
         # This reads workbook.yaml but does NOT run/persist anything.
         wb = Workbook(self.project_dir)
@@ -1411,29 +1798,46 @@ class ProjectService:
 
         # Evaluate tables once — they don't depend on axis params in the
         # demo model (benchmark_dcf).  Held in memory only; not exported.
+        t1 = _time.monotonic()
         tg = wb._build_table_graph(base_params)
         tf = tg.evaluate()
+        timings_ms["eval_tables"] = round((_time.monotonic() - t1) * 1000, 2)
 
-        # Evaluate base case (current workbook params, no axis override)
+        t1 = _time.monotonic()
         sg_base = wb._build_scalar_graph(dict(base_params), table_cache=tf)
+        sg_base.compile()
+        timings_ms["compile"] = round((_time.monotonic() - t1) * 1000, 2)
+
+        # Evaluate base case (current workbook params, no axis override)
+        t1 = _time.monotonic()
         base_scalars = sg_base.evaluate()
         base_value = base_scalars.get(output, 0.0)
         if not math.isfinite(base_value):
             base_value = 0.0
+        timings_ms["eval_base"] = round((_time.monotonic() - t1) * 1000, 2)
 
-        # Evaluate the full grid
-        grid: list[list[float]] = []
-        for yv in ys:
+        # Evaluate the full grid in one vectorized pass (row-major: x varies
+        # fastest).  Nodes that cannot vectorize fall back to per-point.
+        t1 = _time.monotonic()
+        evaluation = sg_base.evaluate_vectorized(
+            {
+                x_param: pl.Series(x_param, xs * steps, dtype=pl.Float64),
+                y_param: pl.Series(y_param, [yv for yv in ys for _ in xs], dtype=pl.Float64),
+            },
+            targets=[output],
+        )
+        out = evaluation.values.get(output, 0.0)
+        flat = out.to_list() if isinstance(out, pl.Series) else [out] * (steps * steps)
+        timings_ms["eval_grid"] = round((_time.monotonic() - t1) * 1000, 2)
+
+        t1 = _time.monotonic()
+        grid: list[list[float | None]] = []
+        for r in range(steps):
             row: list[float | None] = []
-            for xv in xs:
-                pp = dict(base_params)
-                pp[x_param] = xv
-                pp[y_param] = yv
-                sg = wb._build_scalar_graph(pp, table_cache=tf)
-                scalars = sg.evaluate()
-                v = scalars.get(output, 0.0)
-                row.append(v if math.isfinite(v) else None)
-            grid.append(row)  # type: ignore[arg-type]
+            for v in flat[r * steps:(r + 1) * steps]:
+                finite = isinstance(v, (int, float)) and math.isfinite(v)
+                row.append(v if finite else None)
+            grid.append(row)
 
         # Compute min/max over finite values, then clamp non-finite
         finite_vals = [v for row in grid for v in row if v is not None]
@@ -1449,6 +1853,7 @@ class ProjectService:
                 if v is None:
                     row[i] = clamp_hi
 
+        timings_ms["postprocess"] = round((_time.monotonic() - t1) * 1000, 2)
         elapsed = round((_time.monotonic() - t0) * 1000, 1)
 
         return {
@@ -1461,6 +1866,9 @@ class ProjectService:
             "base_y": spec_params.get(y_param, ys[0]),
             "base_value": round(base_value, 2),
             "eval_ms": elapsed,
+            "timings_ms": timings_ms,
+            "vectorized_nodes": evaluation.vectorized,
+            "fallback_nodes": evaluation.fallback,
         }
 
     # ── AI Workbench: draft artifact persistence ──
@@ -1723,18 +2131,26 @@ class ProjectService:
             "status": "completed",
         }
 
-    def list_runs(self, limit: int = 50) -> list[dict[str, Any]]:
-        """Return recent runs (newest first)."""
+    def list_runs(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        scenario_name: str | None = None,
+        build_batch_id: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Return recent runs (newest first), optionally filtered."""
         store = RunStore(self.project_dir)
-        runs = store.list_runs()
-        # Newest first, limited
-        return list(reversed(runs[-limit:]))
+        return store.list_runs(
+            limit=limit,
+            offset=offset,
+            scenario_name=scenario_name,
+            build_batch_id=build_batch_id,
+            newest_first=True,
+        )
 
     def get_latest_run(self) -> dict[str, Any] | None:
         """Return metadata for the latest run, or None."""
-        store = RunStore(self.project_dir)
-        runs = store.list_runs()
-        return runs[-1] if runs else None
+        return RunStore(self.project_dir).latest_run()
 
     def get_scalar_outputs(self, run_id: str | None = None) -> dict[str, Any]:
         """Return scalar outputs for a run (default latest)."""
@@ -1754,6 +2170,55 @@ class ProjectService:
         limit: int = 5000,
     ) -> dict[str, Any]:
         """Return table output as JSON-serializable rows (limited)."""
+        result = self.query_table_output(table_name, run_id, limit=limit)
+        if "error" in result:
+            return result
+        page = result["page"]
+        return {
+            "table": table_name,
+            "columns": page.columns,
+            "rows": page.to_dicts(),
+            "total_rows": result["total_rows"],
+            "limited": result["total_rows"] > limit,
+        }
+
+    def query_table_output(
+        self,
+        table_name: str,
+        run_id: str | None = None,
+        *,
+        offset: int = 0,
+        limit: int = 5000,
+        sorts: list[Any] | None = None,
+        filters: list[Any] | None = None,
+        columns: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """Return one page of a table output, sorted and filtered.
+
+        The view transforms are compiled into a ``pl.scan_parquet`` query,
+        so filters and column selection are pushed down to the parquet
+        reader and only the requested page is materialized.  ``total_rows``
+        counts every row matching the filters (answered from the parquet
+        footer when there are none).
+
+        Args:
+            table_name: Output table name.
+            run_id: Run to read; defaults to the latest run.
+            offset: Index of the first row of the page.
+            limit: Maximum rows in the page.
+            sorts: ``SortSpec`` list.
+            filters: ``FilterSpec`` list.
+            columns: Columns to return; defaults to all.
+
+        Returns:
+            Dict with table, columns, page (a DataFrame), offset, and
+            total_rows, or ``{"error": ...}`` if the run or table is missing.
+
+        Raises:
+            ValueError: If a sort, filter or requested column does not exist.
+        """
+        from fin123.ui.view_transforms import view_query
+
         run_dir = self._resolve_run_dir(run_id)
         if run_dir is None:
             return {"error": "No runs found"}
@@ -1762,16 +2227,18 @@ class ProjectService:
         if not parquet_path.exists():
             return {"error": f"Table {table_name!r} not found in run outputs"}
 
-        df = pl.read_parquet(parquet_path)
-        total_rows = len(df)
-        df = df.head(limit)
+        rows, filtered = view_query(
+            pl.scan_parquet(parquet_path), sorts=sorts, filters=filters, columns=columns
+        )
+        total_rows = int(filtered.select(pl.len()).collect().item())
+        page = rows.slice(offset, limit).collect()
 
         return {
             "table": table_name,
-            "columns": df.columns,
-            "rows": df.to_dicts(),
+            "columns": page.columns,
+            "page": page,
+            "offset": offset,
             "total_rows": total_rows,
-            "limited": total_rows > limit,
         }
 
     def get_table_download_path(
@@ -1878,6 +2345,7 @@ class ProjectService:
         index = store.load_index()
         return index.get("versions", [])
 
+    @_holds_working_copy
     def select_model_version(self, version: str) -> dict[str, Any]:
         """Load a specific snapshot version into memory.
 
@@ -2010,6 +2478,7 @@ class ProjectService:
                 return trace
         return None
 
+    @_holds_working_copy
     def mark_import_todo(self, sheet_name: str, addr: str) -> dict[str, Any]:
         """Mark a cell as TODO for import review.
 
@@ -2023,11 +2492,13 @@ class ProjectService:
         parse_addr(addr)  # validate
 
         fmt_map[addr] = {"color": "#f59e0b"}
+        self._touch_cells(sheet, [addr])
         if addr in cells_map:
-            cells_map[addr]["comment"] = "TODO: review imported formula"
+            cells_map[addr] = {**cells_map[addr], "comment": "TODO: review imported formula"}
         self._dirty = True
         return {"ok": True}
 
+    @_holds_working_copy
     def convert_to_value(self, sheet_name: str, addr: str) -> dict[str, Any]:
         """Replace a formula cell with its cached computed value.
 
@@ -2164,9 +2635,11 @@ class ProjectService:
 
         # 3. Formula errors from CellGraph
         try:
-            cg = self._get_cell_graph()
-            if hasattr(cg, "_errors") and cg._errors:
-                for key, err in cg._errors.items():
+            with self._working_copy_lock:
+                cg = self._get_cell_graph()
+                formula_errors = dict(getattr(cg, "_errors", None) or {})
+            if formula_errors:
+                for key, err in formula_errors.items():
                     target = key if isinstance(key, str) else str(key)
                     code = "formula_parse_error"
                     msg = str(err)
@@ -2236,6 +2709,19 @@ class ProjectService:
     # Model status (compact ribbon data)
     # ------------------------------------------------------------------
 
+    def get_project_status(self) -> dict[str, Any]:
+        """Return the working-copy section of the status ribbon.
+
+        Read from memory only, so it is cheap enough to check on every
+        push-channel tick.
+        """
+        return {
+            "dirty": self._dirty,
+            "model_id": self._model_id,
+            "model_version_id": self._snapshot_version,
+            "read_only": self._read_only,
+        }
+
     def get_model_status(self) -> dict[str, Any]:
         """Return a compact status snapshot for the UI status ribbon.
 
@@ -2246,12 +2732,7 @@ class ProjectService:
             Dict with project, datasheets, build, and verify sections.
         """
         # -- Project section --
-        project_section = {
-            "dirty": self._dirty,
-            "model_id": self._model_id,
-            "model_version_id": self._snapshot_version,
-            "read_only": self._read_only,
-        }
+        project_section = self.get_project_status()
 
         # -- Datasheets section --
         counts: dict[str, int] = {"fresh": 0, "stale": 0, "fail": 0, "unknown": 0}
@@ -2302,7 +2783,7 @@ class ProjectService:
                     build_section["built_at"] = meta.get("timestamp")
                     timings = meta.get("timings_ms")
                     if isinstance(timings, dict):
-                        build_section["duration_ms"] = sum(timings.values())
+                        build_section["duration_ms"] = phase_total(timings)
                     # Determine build status from assertions
                     a_status = meta.get("assertions_status", "")
                     a_failed = meta.get("assertions_failed_count", 0)
@@ -2514,11 +2995,13 @@ class ProjectService:
         # Update index
         wb_spec = yaml.safe_load(workbook_yaml) or {}
         content_hash = sha256_dict(wb_spec)
-        index = store.load_index()
-        existing = [
-            v for v in index["versions"] if v["model_version_id"] == version_id
-        ]
-        if not existing:
+
+        def add_version(index: dict) -> None:
+            existing = [
+                v for v in index["versions"] if v["model_version_id"] == version_id
+            ]
+            if existing:
+                return
             from datetime import datetime, timezone
 
             index["versions"].append({
@@ -2532,7 +3015,8 @@ class ProjectService:
             index["versions"].sort(
                 key=lambda v: parse_version_ordinal(v["model_version_id"])
             )
-            store._write_index(index)
+
+        store._update_index(add_version)
 
         return {"ok": True, "version": version_id}
 
@@ -3183,11 +3667,10 @@ class ProjectService:
             return d if d.exists() else None
 
         # Latest
-        store = RunStore(self.project_dir)
-        runs = store.list_runs()
-        if not runs:
+        latest = RunStore(self.project_dir).latest_run()
+        if latest is None:
             return None
-        return runs_dir / runs[-1]["run_id"]
+        return runs_dir / latest["run_id"]
 
 
 # ---------------------------------------------------------------------------
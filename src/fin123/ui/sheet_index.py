@@ -0,0 +1,112 @@
+"""Spatial index of occupied cells for viewport queries.
+
+Sheets are stored sparsely as ``{addr: cell}`` dicts, so answering "which
+cells fall inside rows r0..r1, cols c0..c1" by probing every address in the
+window costs ``rows * cols`` lookups regardless of how few cells exist.
+:class:`SheetIndex` keeps the occupied addresses bucketed by row, with each
+row's columns sorted, so a viewport query touches only occupied cells.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from fin123.ui.service import parse_addr
+
+
+class SheetIndex:
+    """Row-bucketed, column-sorted index over a sheet's cells and formats.
+
+    The index remembers the ``cells`` and ``fmt`` dicts it was built from;
+    :meth:`covers` tells whether it still describes a sheet (a sheet whose
+    dicts were replaced, e.g. by a row insert, needs a new index).  In-place
+    edits are applied with :meth:`touch`.
+
+    Args:
+        cells: The sheet's ``{addr: cell}`` dict.
+        fmt: The sheet's ``{addr: format}`` dict.
+    """
+
+    def __init__(self, cells: dict[str, Any], fmt: dict[str, Any]) -> None:
+        self.cells = cells
+        self.fmt = fmt
+        # row -> (sorted cols, addrs in the same order)
+        self._rows: dict[int, tuple[list[int], list[str]]] = {}
+        self._row_keys: list[int] = []
+        for addr in _occupied(cells, fmt):
+            self._add(addr)
+
+    def covers(self, cells: dict[str, Any], fmt: dict[str, Any]) -> bool:
+        """Return True if the index was built over these exact dicts."""
+        return self.cells is cells and self.fmt is fmt
+
+    def __len__(self) -> int:
+        return sum(len(cols) for cols, _ in self._rows.values())
+
+    def touch(self, addr: str) -> None:
+        """Re-sync one address after it was set or removed in place."""
+        if addr in self.cells or addr in self.fmt:
+            self._add(addr)
+        else:
+            self._discard(addr)
+
+    def query(self, r0: int, r1: int, c0: int, c1: int) -> Iterator[tuple[int, int, str]]:
+        """Yield ``(row, col, addr)`` for occupied cells in the half-open window.
+
+        Rows ``r0 <= row < r1`` and columns ``c0 <= col < c1``, in row-major
+        order.
+        """
+        keys = self._row_keys
+        for i in range(bisect_left(keys, r0), bisect_left(keys, r1)):
+            row = keys[i]
+            cols, addrs = self._rows[row]
+            for j in range(bisect_left(cols, c0), bisect_left(cols, c1)):
+                yield row, cols[j], addrs[j]
+
+    def _add(self, addr: str) -> None:
+        pos = _parse(addr)
+        if pos is None:
+            return
+        row, col = pos
+        bucket = self._rows.get(row)
+        if bucket is None:
+            self._rows[row] = ([col], [addr])
+            insort(self._row_keys, row)
+            return
+        cols, addrs = bucket
+        j = bisect_left(cols, col)
+        if j < len(cols) and cols[j] == col:
+            return
+        cols.insert(j, col)
+        addrs.insert(j, addr)
+
+    def _discard(self, addr: str) -> None:
+        pos = _parse(addr)
+        if pos is None or pos[0] not in self._rows:
+            return
+        row, col = pos
+        cols, addrs = self._rows[row]
+        j = bisect_left(cols, col)
+        if j < len(cols) and cols[j] == col:
+            del cols[j]
+            del addrs[j]
+            if not cols:
+                del self._rows[row]
+                del self._row_keys[bisect_left(self._row_keys, row)]
+
+
+def _occupied(cells: dict[str, Any], fmt: dict[str, Any]) -> Iterable[str]:
+    yield from cells
+    for addr in fmt:
+        if addr not in cells:
+            yield addr
+
+
+def _parse(addr: str) -> tuple[int, int] | None:
+    """Parse an address, or None for keys that are not A1 addresses."""
+    try:
+        return parse_addr(addr)
+    except ValueError:
+        return None
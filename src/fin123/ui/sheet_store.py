@@ -0,0 +1,282 @@
+"""Compact in-memory storage for a sheet's cells.
+
+The workbook spec stores a sheet as ``{"A1": {"formula": "=..."}, ...}``.
+Held that way in the UI server, every cell costs an address string, a
+one-entry dict and its payload, which puts a large imported workbook in
+the gigabytes.  :class:`SheetCells` keeps the same mapping interface but
+stores each cell under an integer ``(row, col)`` key, as the bare literal
+for value cells or a ``__slots__`` :class:`_Formula` record for formula
+cells, with repeated strings interned.  Filled-down formulas are stored
+once: a formula is canonicalized to its relative shape
+(:mod:`fin123.formulas.shared`) and every cell with that shape points at
+one shared :class:`_SharedFormula` record.
+
+Cell dicts are materialized on access, so a returned dict is a copy for
+plain value/formula cells: assign a new dict to change a cell rather than
+mutating the one you read.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+import weakref
+from collections.abc import ItemsView, Iterator, Mapping, MutableMapping
+from typing import Any
+
+from fin123.formulas.shared import canonicalize, instantiate
+
+# Columns take the low bits of the packed key; three letters reach ZZZ
+_COL_BITS = 15
+_COL_MASK = (1 << _COL_BITS) - 1
+
+# Canonical addresses only (no lowercase, no leading zeros), so iteration
+# round-trips every key exactly; anything else is kept verbatim
+_match_canonical_addr = re.compile(r"([A-Z]{1,3})([1-9]\d*)").fullmatch
+
+_MISSING = object()
+
+
+def _col_letters(col: int) -> str:
+    result = ""
+    n = col + 1
+    while n > 0:
+        n, rem = divmod(n - 1, 26)
+        result = chr(65 + rem) + result
+    return result
+
+
+# Column letters up to ZZ, both ways; three-letter columns are computed
+_LETTERS = [_col_letters(i) for i in range(702)]
+_COLS = {letters: i for i, letters in enumerate(_LETTERS)}
+
+
+class _Formula:
+    """A formula-only cell (``{"formula": text}``)."""
+
+    __slots__ = ("text",)
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+class _SharedFormula:
+    """A formula-only cell stored as its relative shape.
+
+    One record per distinct shape, shared by every cell holding it.
+    """
+
+    __slots__ = ("shape", "__weakref__")
+
+    def __init__(self, shape: str) -> None:
+        self.shape = shape
+
+
+# Live shared records by shape, so equal shapes share one record
+_shared: weakref.WeakValueDictionary[str, _SharedFormula] = weakref.WeakValueDictionary()
+
+
+def _shared_formula(shape: str) -> _SharedFormula:
+    record = _shared.get(shape)
+    if record is None:
+        record = _shared[shape] = _SharedFormula(sys.intern(shape))
+    return record
+
+
+def _pack(addr: str) -> int | None:
+    """Return the integer key for a canonical A1 address, else None."""
+    m = _match_canonical_addr(addr) if type(addr) is str else None
+    if m is None:
+        return None
+    letters, digits = m.groups()
+    col = _COLS.get(letters)
+    if col is None:
+        col = (ord(letters[0]) - 64) * 676 + _COLS[letters[1:]]
+    return (int(digits) - 1) << _COL_BITS | col
+
+
+def _unpack(key: int) -> str:
+    col = key & _COL_MASK
+    letters = _LETTERS[col] if col < 702 else _col_letters(col)
+    return f"{letters}{(key >> _COL_BITS) + 1}"
+
+
+def _encode(cell: Any, key: int) -> Any:
+    """Compact form of a cell dict; unusual shapes are stored as given."""
+    if type(cell) is dict and len(cell) == 1:
+        if "formula" in cell:
+            text = cell["formula"]
+            if type(text) is str:
+                if text.startswith("="):
+                    shape = canonicalize(text, key >> _COL_BITS, key & _COL_MASK)
+                    if shape is not None:
+                        return _shared_formula(shape)
+                return _Formula(sys.intern(text))
+        elif "value" in cell:
+            value = cell["value"]
+            if type(value) is str:
+                return sys.intern(value)
+            if value is None or type(value) in (int, float, bool):
+                return value
+    return cell
+
+
+def _decode(stored: Any, key: int) -> Any:
+    kind = type(stored)
+    if kind is _SharedFormula:
+        return {"formula": instantiate(stored.shape, key >> _COL_BITS, key & _COL_MASK)}
+    if kind is _Formula:
+        return {"formula": stored.text}
+    if kind is dict:
+        return stored
+    return {"value": stored}
+
+
+class SheetCells(MutableMapping):
+    """Mapping of cell address to cell dict with compact storage.
+
+    Behaves like the ``{addr: cell}`` dict it replaces (lookups,
+    membership, insertion-ordered iteration, equality with dicts), so
+    :class:`~fin123.cell_graph.CellGraph`, the viewport and snapshot code
+    read it unchanged.
+
+    Args:
+        cells: Initial ``{addr: cell}`` contents.
+    """
+
+    __slots__ = ("_cells", "_other")
+
+    def __init__(self, cells: Mapping[str, Any] | None = None) -> None:
+        self._cells: dict[int, Any] = {}
+        # Keys that are not canonical A1 addresses, kept as-is
+        self._other: dict[str, Any] = {}
+        if cells:
+            for addr, cell in cells.items():
+                self[addr] = cell
+
+    def __getitem__(self, addr: str) -> Any:
+        key = _pack(addr)
+        if key is None:
+            return self._other[addr]
+        return _decode(self._cells[key], key)
+
+    def get(self, addr: str, default: Any = None) -> Any:
+        key = _pack(addr)
+        if key is None:
+            return self._other.get(addr, default)
+        stored = self._cells.get(key, _MISSING)
+        return default if stored is _MISSING else _decode(stored, key)
+
+    def __setitem__(self, addr: str, cell: Any) -> None:
+        key = _pack(addr)
+        if key is None:
+            self._other[addr] = cell
+        else:
+            self._cells[key] = _encode(cell, key)
+
+    def __delitem__(self, addr: str) -> None:
+        key = _pack(addr)
+        if key is None:
+            del self._other[addr]
+        else:
+            del self._cells[key]
+
+    def __contains__(self, addr: object) -> bool:
+        key = _pack(addr)  # type: ignore[arg-type]
+        return addr in self._other if key is None else key in self._cells
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._cells:
+            yield _unpack(key)
+        yield from self._other
+
+    def __len__(self) -> int:
+        return len(self._cells) + len(self._other)
+
+    def __repr__(self) -> str:
+        return f"SheetCells({len(self)} cells)"
+
+    def items(self) -> ItemsView:
+        return _SheetCellsItems(self)
+
+    def positions(self) -> Iterator[tuple[int, int, str]]:
+        """Yield ``(row, col, addr)`` for every A1-addressed cell."""
+        for key in self._cells:
+            yield key >> _COL_BITS, key & _COL_MASK, _unpack(key)
+
+    def formula_shape(self, addr: str) -> str | None:
+        """Return the shared shape of a formula cell, or None if it has none."""
+        key = _pack(addr)
+        stored = self._cells.get(key) if key is not None else None
+        return stored.shape if type(stored) is _SharedFormula else None
+
+    def iter_formulas(self) -> Iterator[tuple[int | None, int | None, str, str | None]]:
+        """Yield ``(row, col, addr, shape)`` for every formula cell.
+
+        *shape* is None for formulas stored as written; *row* and *col*
+        are None for keys that are not A1 addresses.
+        """
+        for key, stored in self._cells.items():
+            kind = type(stored)
+            if kind is _SharedFormula:
+                shape = stored.shape
+            elif kind is _Formula or (kind is dict and "formula" in stored):
+                shape = None
+            else:
+                continue
+            yield key >> _COL_BITS, key & _COL_MASK, _unpack(key), shape
+        for addr, cell in self._other.items():
+            if type(cell) is dict and "formula" in cell:
+                yield None, None, addr, None
+
+    def copy(self) -> SheetCells:
+        new = SheetCells()
+        new._cells = dict(self._cells)
+        new._other = dict(self._other)
+        return new
+
+    def to_dict(self) -> dict[str, Any]:
+        """Plain ``{addr: cell}`` dict, as stored in ``workbook.yaml``."""
+        return dict(self.items())
+
+    def shifted(self, axis: str, index: int, count: int) -> SheetCells:
+        """Return a copy with rows or columns inserted or deleted.
+
+        Same semantics as :func:`fin123.ui.service._remap_addresses`, but
+        working on the integer keys without re-parsing addresses.  Shared
+        formula records move with their cells, so their relative references
+        move too; callers rewrite formulas whose references should not.
+
+        Args:
+            axis: "row" or "col".
+            index: 0-based index where insertion/deletion starts.
+            count: Positive for insert, negative for delete.
+        """
+        new = SheetCells()
+        cells = new._cells
+        for key, stored in self._cells.items():
+            row, col = key >> _COL_BITS, key & _COL_MASK
+            pos = row if axis == "row" else col
+            if pos >= index:
+                if count < 0 and pos < index - count:
+                    continue  # deleted
+                pos += count
+                if axis == "row":
+                    row = pos
+                else:
+                    col = pos
+            cells[row << _COL_BITS | col] = stored
+        new._other = dict(self._other)
+        return new
+
+
+class _SheetCellsItems(ItemsView):
+    """``items()`` that decodes in one pass instead of re-parsing keys."""
+
+    _mapping: SheetCells
+
+    def __iter__(self) -> Iterator[tuple[str, Any]]:
+        store = self._mapping
+        for key, stored in store._cells.items():
+            yield _unpack(key), _decode(stored, key)
+        yield from store._other.items()
@@ -256,8 +256,11 @@ function selRect() {
 }
 
 // ── API helpers ──
+// Identifies this tab, so it can skip its own edits echoed over /api/stream
+const CLIENT_ID = Math.random().toString(36).slice(2, 12);
+
 async function api(method, path, body) {
-  const opts = { method, headers: {} };
+  const opts = { method, headers: { "X-Client-Id": CLIENT_ID } };
   if (body !== undefined) {
     opts.headers["Content-Type"] = "application/json";
     opts.body = JSON.stringify(body);
@@ -272,6 +275,36 @@ async function api(method, path, body) {
   return resp.json();
 }
 
+async function apiStream(method, path, body, onEvent) {
+  // POST a request and dispatch each newline-delimited JSON event
+  const resp = await fetch("/api" + path, {
+    method,
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(body),
+  });
+  if (!resp.ok) {
+    const text = await resp.text();
+    let detail = text;
+    try { detail = JSON.parse(text).detail || text; } catch(_) {}
+    throw new Error(detail);
+  }
+  const reader = resp.body.getReader();
+  const decoder = new TextDecoder();
+  let buf = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buf += decoder.decode(value, { stream: true });
+    let nl;
+    while ((nl = buf.indexOf("\n")) >= 0) {
+      const line = buf.slice(0, nl).trim();
+      buf = buf.slice(nl + 1);
+      if (line) onEvent(JSON.parse(line));
+    }
+  }
+  if (buf.trim()) onEvent(JSON.parse(buf));
+}
+
 // ── Canvas drawing ──
 let _resizeTimer = null;
 function resizeCanvas() {
@@ -633,12 +666,22 @@ function commitEdit() {
       log("Error: " + res.errors[0].message, "error");
     }
     updateStatus();
-    // Reload viewport to get computed display values
-    loadSheet();
+    applyChangedCells(res.changed);
   }).catch(err => log("Error: " + err.message, "error"));
   draw();
 }
 
+// Repaint only the cells whose computed values changed after an edit
+function applyChangedCells(changed) {
+  if (!changed) { loadSheet(); return; }
+  for (const c of changed) {
+    if (c.sheet !== S.activeSheet) continue;
+    const cell = S.cells[c.addr];
+    if (cell) cell.display = c.display;
+  }
+  draw();
+}
+
 function cancelEdit() {
   S.editing = false;
   editor.style.display = "none";
@@ -671,7 +714,7 @@ fbar.addEventListener("keydown", e => {
         log("Error: " + res.errors[0].message, "error");
       }
       updateStatus();
-      loadSheet();
+      applyChangedCells(res.changed);
     }).catch(err => log("Error: " + err.message, "error"));
     draw();
     canvas.focus();
@@ -795,6 +838,7 @@ async function doPaste() {
         addErrors(res.errors);
       }
       updateStatus();
+      applyChangedCells(res.changed);
       const msg = "Pasted " + edits.length + " cell(s)";
       log(clipped ? msg + " (clipped to sheet size)" : msg, "success");
     } catch (err) { log("Paste error: " + err.message, "error"); }
@@ -997,7 +1041,7 @@ canvas.addEventListener("keydown", e => {
         api("POST", "/sheet/cells", {
           sheet: S.activeSheet,
           edits: [{ addr: a, value: "" }]
-        }).then(res => { S.dirty = res.dirty; updateStatus(); })
+        }).then(res => { S.dirty = res.dirty; updateStatus(); applyChangedCells(res.changed); })
           .catch(err => log("Error: " + err.message, "error"));
         fbar.value = "";
         draw();
@@ -2393,26 +2437,49 @@ async function loadLogs() {
     const events = await api("GET", url);
     listEl.innerHTML = "";
     if (!events.length) {
-      listEl.innerHTML = '<div style="color:var(--fg-dim);font-size:10px;padding:4px 0;">No events</div>';
+      listEl.innerHTML = '<div class="log-empty" style="color:var(--fg-dim);font-size:10px;padding:4px 0;">No events</div>';
       return;
     }
-    for (const evt of events) {
-      const entry = document.createElement("div");
-      entry.className = "log-entry";
-      const ts = (evt.ts || "").substring(11, 19);
-      const level = (evt.level || "").toLowerCase();
-      const levelCls = "log-level log-level-" + level;
-      const displayType = evt.display_type || evt.event_type || "";
-      entry.innerHTML =
-        `<span class="log-ts">${esc(ts)}</span> ` +
-        `<span class="${levelCls}">${esc((evt.level || "").toUpperCase().substring(0, 4))}</span> ` +
-        `<span class="log-type">${esc(displayType)}</span> ` +
-        `<span class="log-msg">${esc(evt.message || "")}</span>`;
-      listEl.appendChild(entry);
-    }
+    for (const evt of events) listEl.appendChild(renderLogEntry(evt));
   } catch (_) {}
 }
 
+function renderLogEntry(evt) {
+  const entry = document.createElement("div");
+  entry.className = "log-entry";
+  const ts = (evt.ts || "").substring(11, 19);
+  const level = (evt.level || "").toLowerCase();
+  const levelCls = "log-level log-level-" + level;
+  const displayType = evt.display_type || evt.event_type || "";
+  entry.innerHTML =
+    `<span class="log-ts">${esc(ts)}</span> ` +
+    `<span class="${levelCls}">${esc((evt.level || "").toUpperCase().substring(0, 4))}</span> ` +
+    `<span class="log-type">${esc(displayType)}</span> ` +
+    `<span class="log-msg">${esc(evt.message || "")}</span>`;
+  return entry;
+}
+
+// Append events pushed over /api/stream that match the current log scope
+function appendLiveLogs(events) {
+  const scopeEl = document.getElementById("log-scope");
+  const scopeIdEl = document.getElementById("log-scope-id");
+  const listEl = document.getElementById("log-list");
+  if (!scopeEl || !listEl) return;
+  const scope = scopeEl.value;
+  const scopeId = scopeIdEl.value.trim();
+  const ctxKey = scope === "sync" ? "sync_id" : "run_id";
+  const matches = events.filter(evt => {
+    if (scope === "global") return true;
+    if (scope === "import") return (evt.event_type || "").startsWith("import");
+    return scopeId && (evt.context || {})[ctxKey] === scopeId;
+  });
+  if (!matches.length) return;
+  const empty = listEl.querySelector(".log-empty");
+  if (empty) empty.remove();
+  for (const evt of matches) listEl.appendChild(renderLogEntry(evt));
+  while (listEl.children.length > 200) listEl.removeChild(listEl.firstChild);
+}
+
 function setupLogControls() {
   const scopeEl = document.getElementById("log-scope");
   const scopeIdEl = document.getElementById("log-scope-id");
@@ -2431,6 +2498,7 @@ function setupLogControls() {
 
 function startLogPolling() {
   stopLogPolling();
+  if (_pushLive) return;  // events arrive over /api/stream
   _logPollTimer = setInterval(loadLogs, 3000);
 }
 
@@ -2510,8 +2578,20 @@ async function loadChecks(runId) {
     // Timings
     timingsEl.innerHTML = "<h4>Timings</h4>";
     if (data.timings_ms) {
+      const timingRow = (label, value) =>
+        `<div class="check-item"><span class="check-icon" style="color:var(--fg-dim);">\u23F1</span><span class="check-label">${label}</span><span class="check-value">${value}</span></div>`;
       for (const [phase, ms] of Object.entries(data.timings_ms)) {
-        timingsEl.innerHTML += `<div class="check-item"><span class="check-icon" style="color:var(--fg-dim);">\u23F1</span><span class="check-label">${esc(phase)}</span><span class="check-value">${Number(ms).toFixed(1)} ms</span></div>`;
+        if (typeof ms !== "number") continue;
+        timingsEl.innerHTML += timingRow(esc(phase), `${ms.toFixed(1)} ms`);
+        if (phase === "export_outputs") {
+          for (const [table, tms] of Object.entries(data.timings_ms.export_tables || {})) {
+            timingsEl.innerHTML += timingRow(`&nbsp;&nbsp;${esc(table)}`, `${Number(tms).toFixed(1)} ms`);
+          }
+        }
+      }
+      const cacheStats = data.timings_ms.table_cache;
+      if (cacheStats) {
+        timingsEl.innerHTML += timingRow("table_cache", `${cacheStats.hits} hits, ${cacheStats.misses} misses`);
       }
     } else {
       timingsEl.innerHTML += '<div style="color:var(--fg-dim);font-size:10px;">No timing data</div>';
@@ -2599,7 +2679,15 @@ async function loadIncidents(runId) {
 // ── Status Ribbon ──
 async function loadStatus() {
   try {
-    const data = await api("GET", "/status");
+    _status = await api("GET", "/status");
+    renderStatus(_status);
+  } catch (_) {}
+}
+
+let _status = null;
+
+function renderStatus(data) {
+  try {
     const srDirty = document.getElementById("sr-dirty");
     const srDs = document.getElementById("sr-datasheets");
     const srBuild = document.getElementById("sr-build");
@@ -2678,13 +2766,67 @@ async function loadStatus() {
   } catch (_) {}
 }
 
-// Poll status every 3 seconds
+// Poll status every 3 seconds (fallback when the push channel is down)
 let _statusTimer = null;
 function startStatusPolling() {
-  if (_statusTimer) clearInterval(_statusTimer);
+  stopStatusPolling();
+  if (_pushLive) return;
   _statusTimer = setInterval(loadStatus, 3000);
 }
 
+function stopStatusPolling() {
+  if (_statusTimer) { clearInterval(_statusTimer); _statusTimer = null; }
+}
+
+// ── Push channel (/api/stream, Server-Sent Events) ──
+// Status deltas, new log events, job progress and recalculated cells are
+// pushed by the server; polling only runs while the stream is down.
+let _pushLive = false;
+
+function logsTabActive() {
+  const tab = document.querySelector('.tab[data-tab="logs"]');
+  return !!(tab && tab.classList.contains("active"));
+}
+
+function startPushChannel() {
+  if (!window.EventSource) return;
+  const es = new EventSource("/api/stream");
+  const on = (name, fn) => es.addEventListener(name, e => fn(JSON.parse(e.data)));
+
+  es.onopen = () => {
+    _pushLive = true;
+    stopStatusPolling();
+    stopLogPolling();
+  };
+  es.onerror = () => {
+    // EventSource reconnects by itself; poll until it does
+    if (!_pushLive) return;
+    _pushLive = false;
+    startStatusPolling();
+    if (logsTabActive()) startLogPolling();
+  };
+  on("status", delta => {
+    _status = Object.assign(_status || {}, delta);
+    renderStatus(_status);
+  });
+  on("resync", full => {
+    _status = full;
+    renderStatus(_status);
+    loadLogs();
+  });
+  on("log", appendLiveLogs);
+  on("cells", msg => {
+    if (msg.origin === CLIENT_ID) return;
+    // Another tab edited this sheet: reload for raw values, else repaint
+    if (msg.sheet === S.activeSheet) loadSheet();
+    else applyChangedCells(msg.changed);
+  });
+  on("job", job => {
+    if (job.status === "succeeded") log("Job " + job.kind + " finished");
+    else if (job.status === "failed") log("Job " + job.kind + " failed: " + (job.error || ""), "error");
+  });
+}
+
 // ── Open Latest Table ──
 async function openLatestTable(runId) {
   try {
@@ -3404,7 +3546,10 @@ registerCmd("inspect", {
 
       // Timing
       if (d.timings_ms && Object.keys(d.timings_ms).length > 0) {
-        const total = Object.values(d.timings_ms).reduce((a, b) => a + b, 0);
+        // Nested entries (export_tables, table_cache) are not phases
+        const total = Object.values(d.timings_ms)
+          .filter((v) => typeof v === "number")
+          .reduce((a, b) => a + b, 0);
         html += '<div class="term-compare-meta" style="padding-top:6px;">' + total.toFixed(0) + ' ms total</div>';
       }
 
@@ -3923,7 +4068,6 @@ registerCmd("sweep", {
         termError("'" + inputName + "' is not a declared parameter. Use 'inputs' to list parameters.");
         return;
       }
-      const originalValue = params[inputName];
       const t0 = performance.now();
 
       // Start block
@@ -3934,68 +4078,39 @@ registerCmd("sweep", {
         ...(selectedOutputs ? [["outputs", selectedOutputs.join(", ")]] : []),
       ]);
 
-      const results = [];
-      let allOutputKeys = new Set();
-
-      for (let i = 0; i < values.length; i++) {
-        const val = values[i];
-        termProgress(i, values.length, inputName + " = " + _fmtVal(val));
-        try {
-          await api("POST", "/params/update", { name: inputName, value: val });
-          const buildResult = await _doCommitBuild();
-          for (const k of Object.keys(buildResult.scalars)) allOutputKeys.add(k);
-          results.push({
-            value: val,
-            outputs: buildResult.scalars,
-            run_id: buildResult.run_id,
-            status: "success",
-          });
-        } catch (err) {
-          results.push({
-            value: val,
-            outputs: {},
-            run_id: null,
-            status: "error",
-            error: err.message,
-          });
-        }
+      // Points are built server-side from the committed workbook; the
+      // working copy's params are never touched.
+      if (S.dirty) {
+        const cres = await api("POST", "/commit");
+        S.dirty = false;
+        S.snapVer = cres.snapshot_version;
+        updateStatus();
       }
+      let sweepData = null;
+      await apiStream("POST", "/sweeps/run",
+        { input: inputName, values: values, outputs: selectedOutputs },
+        ev => {
+          if (ev.event === "point") {
+            termProgress(ev.done, ev.total, inputName + " = " + _fmtVal(ev.value));
+          } else if (ev.event === "completed") {
+            sweepData = ev.data;
+          }
+        });
       termProgressDone();
+      if (!sweepData) { termError("Sweep did not complete."); return; }
+      loadRuns();
 
-      // Restore
-      try {
-        await api("POST", "/params/update", { name: inputName, value: originalValue });
-        await loadSheet();
-        draw();
-      } catch (_) {}
-
+      const results = sweepData.results;
+      const sweepId = sweepData.sweep_id;
       const durationMs = Math.round(performance.now() - t0);
-      const successes = results.filter(r => r.status === "success").length;
-      const failures = results.length - successes;
-      const outputKeys = _selectOutputKeys(allOutputKeys, selectedOutputs, 6);
+      const successes = sweepData.success_count;
+      const failures = sweepData.failure_count;
+      const outputKeys = _selectOutputKeys(new Set(sweepData.output_keys), selectedOutputs, 6);
 
       // Result table
       termSection("Results");
       _renderSweepTable(inputName, outputKeys, results);
 
-      // Persist
-      const sweepId = "sweep_" + inputName + "_" + Date.now();
-      const sweepData = {
-        sweep_id: sweepId,
-        input: inputName,
-        values: values,
-        results: results,
-        output_keys: Array.from(allOutputKeys),
-        selected_outputs: selectedOutputs,
-        created_at: new Date().toISOString(),
-        duration_ms: durationMs,
-        success_count: successes,
-        failure_count: failures,
-      };
-      try {
-        await api("POST", "/sweeps", { sweep_id: sweepId, data: sweepData });
-      } catch (_) {}
-
       // Completion block
       const statusLabel = failures > 0 ? "SWEEP COMPLETE WITH ERRORS" : "SWEEP COMPLETE";
       const rows = [
@@ -4216,8 +4331,6 @@ registerCmd("grid", {
       if (!(inputX in params)) { termError("'" + inputX + "' is not a declared parameter."); return; }
       if (!(inputY in params)) { termError("'" + inputY + "' is not a declared parameter."); return; }
       if (inputX === inputY) { termError("X and Y inputs must be different parameters."); return; }
-      const origX = params[inputX];
-      const origY = params[inputY];
       const t0 = performance.now();
 
       // Start block
@@ -4228,73 +4341,38 @@ registerCmd("grid", {
         ["points", String(totalCells)],
       ]);
 
-      const cells = [];
-      let done = 0;
-
-      for (const x of valuesX) {
-        for (const y of valuesY) {
-          done++;
-          termProgress(done, totalCells, inputX + "=" + _fmtVal(x) + ", " + inputY + "=" + _fmtVal(y));
-          try {
-            await api("POST", "/params/update", { name: inputX, value: x });
-            await api("POST", "/params/update", { name: inputY, value: y });
-            const buildResult = await _doCommitBuild();
-            const dispVal = buildResult.scalars[displayOutput];
-            cells.push({
-              x: x, y: y,
-              run_id: buildResult.run_id,
-              status: "success",
-              display_value: dispVal != null ? dispVal : null,
-              outputs: buildResult.scalars,
-            });
-          } catch (err) {
-            cells.push({
-              x: x, y: y,
-              run_id: null,
-              status: "error",
-              display_value: null,
-              error: err.message,
-            });
-          }
-        }
+      // Cells are built server-side from the committed workbook; the
+      // working copy's params are never touched.
+      if (S.dirty) {
+        const cres = await api("POST", "/commit");
+        S.dirty = false;
+        S.snapVer = cres.snapshot_version;
+        updateStatus();
       }
+      let gridData = null;
+      await apiStream("POST", "/grids/run",
+        { input_x: inputX, values_x: valuesX, input_y: inputY, values_y: valuesY, output: displayOutput },
+        ev => {
+          if (ev.event === "point") {
+            termProgress(ev.done, ev.total, inputX + "=" + _fmtVal(ev.x) + ", " + inputY + "=" + _fmtVal(ev.y));
+          } else if (ev.event === "completed") {
+            gridData = ev.data;
+          }
+        });
       termProgressDone();
+      if (!gridData) { termError("Grid did not complete."); return; }
+      loadRuns();
 
-      // Restore
-      try {
-        await api("POST", "/params/update", { name: inputX, value: origX });
-        await api("POST", "/params/update", { name: inputY, value: origY });
-        await loadSheet();
-        draw();
-      } catch (_) {}
-
+      const cells = gridData.cells;
+      const gridId = gridData.grid_id;
       const durationMs = Math.round(performance.now() - t0);
-      const successes = cells.filter(c => c.status === "success").length;
-      const failures = cells.length - successes;
+      const successes = gridData.success_count;
+      const failures = gridData.failure_count;
 
       // Matrix render
       termSection(displayOutput);
       _renderGridMatrix(inputX, valuesX, inputY, valuesY, cells, displayOutput);
 
-      // Persist
-      const gridId = "grid_" + inputX + "_" + inputY + "_" + Date.now();
-      const gridData = {
-        grid_id: gridId,
-        input_x: inputX,
-        values_x: valuesX,
-        input_y: inputY,
-        values_y: valuesY,
-        display_output: displayOutput,
-        cells: cells,
-        created_at: new Date().toISOString(),
-        duration_ms: durationMs,
-        success_count: successes,
-        failure_count: failures,
-      };
-      try {
-        await api("POST", "/grids", { grid_id: gridId, data: gridData });
-      } catch (_) {}
-
       // Completion
       const statusLabel = failures > 0 ? "GRID COMPLETE WITH ERRORS" : "GRID COMPLETE";
       termStatus(statusLabel, [
@@ -5814,6 +5892,7 @@ window.addEventListener("resize", resizeSurface);
   loadIncidents();
   loadStatus();
   startStatusPolling();
+  startPushChannel();
   renderErrors();
   updateCellInfo();
   canvas.focus();
@@ -1,7 +1,9 @@
 """View-only table sort/filter transforms for the browser UI.
 
-Provides Pydantic models and a pure Polars transform function.
+Provides Pydantic models and pure Polars transform functions.
 The underlying data is never mutated — transforms produce new DataFrames.
+``view_query`` compiles the same specs into a lazy query, so a parquet
+scan pushes filters and column selection down to the reader.
 """
 
 from __future__ import annotations
@@ -9,7 +11,7 @@ from __future__ import annotations
 from typing import Any, Literal
 
 import polars as pl
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 # ────────────────────────────────────────────────────────────────
@@ -72,11 +74,22 @@ FilterSpec = NumericFilter | BetweenFilter | TextFilter | ValueListFilter | Blan
 class TableViewRequest(BaseModel):
     name: str
     run_id: str | None = None
-    limit: int = 5000
+    limit: int = Field(5000, ge=1, le=50000)
     sorts: list[SortSpec] = []
     filters: list[FilterSpec] = []
 
 
+class TablePageRequest(BaseModel):
+    name: str
+    run_id: str | None = None
+    offset: int = Field(0, ge=0)
+    limit: int = Field(5000, ge=1, le=50000)
+    sorts: list[SortSpec] = []
+    filters: list[FilterSpec] = []
+    columns: list[str] | None = None
+    format: Literal["json", "arrow"] = "json"
+
+
 # ────────────────────────────────────────────────────────────────
 # Transform engine
 # ────────────────────────────────────────────────────────────────
@@ -127,8 +140,66 @@ def apply_view_transforms(
     return result.drop(_ROW_IDX_COL)
 
 
+def view_query(
+    lf: pl.LazyFrame,
+    sorts: list[SortSpec] | None = None,
+    filters: list[FilterSpec] | None = None,
+    columns: list[str] | None = None,
+) -> tuple[pl.LazyFrame, pl.LazyFrame]:
+    """Compile view transforms into lazy queries.
+
+    Produces the same rows in the same order as ``apply_view_transforms``
+    (a stable sort stands in for the row-index tie-breaker), but as one
+    filter predicate and an optional projection that a scan can push down.
+
+    Args:
+        lf: Source query (typically ``pl.scan_parquet``).
+        sorts: Sort specifications (applied in order).
+        filters: Filter specifications (combined with AND).
+        columns: Columns to return; defaults to all.
+
+    Returns:
+        Tuple of (rows query, filtered-but-unsorted query for counting).
+
+    Raises:
+        ValueError: If a sort, filter or requested column does not exist.
+    """
+    sorts = sorts or []
+    filters = filters or []
+    schema = lf.collect_schema()
+    referenced = [s.column for s in sorts] + [f.column for f in filters] + list(columns or [])
+    missing = sorted({c for c in referenced if c not in schema})
+    if missing:
+        raise ValueError(f"Unknown column(s): {', '.join(missing)}")
+
+    filtered = lf
+    predicate = None
+    for f in filters:
+        expr = _filter_expr(f)
+        predicate = expr if predicate is None else predicate & expr
+    if predicate is not None:
+        filtered = lf.filter(predicate)
+
+    rows = filtered
+    if sorts:
+        rows = rows.sort(
+            by=[s.column for s in sorts],
+            descending=[s.descending for s in sorts],
+            nulls_last=True,
+            maintain_order=True,
+        )
+    if columns is not None:
+        rows = rows.select(columns)
+    return rows, filtered
+
+
 def _apply_filter(df: pl.DataFrame, spec: FilterSpec) -> pl.DataFrame:
     """Apply a single filter spec to a DataFrame."""
+    return df.filter(_filter_expr(spec))
+
+
+def _filter_expr(spec: FilterSpec) -> pl.Expr:
+    """Compile a single filter spec to a predicate expression."""
     if isinstance(spec, NumericFilter):
         ops = {
             "=": lambda c, v: pl.col(c) == v,
@@ -138,12 +209,10 @@ def _apply_filter(df: pl.DataFrame, spec: FilterSpec) -> pl.DataFrame:
             ">=": lambda c, v: pl.col(c) >= v,
             "<=": lambda c, v: pl.col(c) <= v,
         }
-        return df.filter(ops[spec.op](spec.column, spec.value))
+        return ops[spec.op](spec.column, spec.value)
 
     if isinstance(spec, BetweenFilter):
-        return df.filter(
-            (pl.col(spec.column) >= spec.low) & (pl.col(spec.column) <= spec.high)
-        )
+        return (pl.col(spec.column) >= spec.low) & (pl.col(spec.column) <= spec.high)
 
     if isinstance(spec, TextFilter):
         col = pl.col(spec.column).cast(pl.Utf8)
@@ -152,22 +221,20 @@ def _apply_filter(df: pl.DataFrame, spec: FilterSpec) -> pl.DataFrame:
             col = col.str.to_lowercase()
             val = val.lower()
         if spec.op == "contains":
-            return df.filter(col.str.contains(val, literal=True))
+            return col.str.contains(val, literal=True)
         if spec.op == "starts_with":
-            return df.filter(col.str.starts_with(val))
+            return col.str.starts_with(val)
         if spec.op == "ends_with":
-            return df.filter(col.str.ends_with(val))
-        if spec.op == "equals":
-            return df.filter(col == val)
-        return df  # Unreachable, but defensive
+            return col.str.ends_with(val)
+        return col == val
 
     if isinstance(spec, ValueListFilter):
-        return df.filter(pl.col(spec.column).is_in(spec.values))
+        return pl.col(spec.column).is_in(spec.values)
 
     if isinstance(spec, BlanksFilter):
         if spec.show_blanks:
-            return df.filter(pl.col(spec.column).is_null())
+            return pl.col(spec.column).is_null()
         else:
-            return df.filter(pl.col(spec.column).is_not_null())
+            return pl.col(spec.column).is_not_null()
 
-    return df
+    return pl.lit(True)
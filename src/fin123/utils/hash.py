@@ -4,8 +4,43 @@ from __future__ import annotations
 
 import hashlib
 import json
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
+from uuid import uuid4
+
+# Read buffer for files that cannot be memory-mapped
+_CHUNK_SIZE = 1 << 20
+
+# Upper bound on threads used to hash independent files
+_MAX_HASH_WORKERS = 8
+
+
+def _update_from_file(h: Any, path: Path) -> None:
+    """Feed the contents of *path* into hash object *h* without loading it.
+
+    The file is memory-mapped so ``h.update`` reads straight from the page
+    cache (hashlib releases the GIL for large buffers).  Empty files and
+    files that cannot be mapped are streamed in fixed-size chunks instead.
+
+    Args:
+        h: A ``hashlib`` hash object.
+        path: Path to the file.
+    """
+    with open(path, "rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                h.update(mapped)
+            return
+        except (ValueError, OSError):
+            # Empty file, or a filesystem without mmap support
+            f.seek(0)
+        buf = bytearray(_CHUNK_SIZE)
+        view = memoryview(buf)
+        while n := f.readinto(buf):
+            h.update(view[:n])
 
 
 def sha256_file(path: Path) -> str:
@@ -18,12 +53,30 @@ def sha256_file(path: Path) -> str:
         Hex-encoded SHA-256 digest.
     """
     h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
+    _update_from_file(h, path)
     return h.hexdigest()
 
 
+def sha256_files(paths: list[Path], max_workers: int | None = None) -> dict[Path, str]:
+    """Compute SHA-256 hex digests of several files concurrently.
+
+    Hashing releases the GIL, so independent files are hashed in a thread
+    pool.
+
+    Args:
+        paths: Paths to hash.
+        max_workers: Thread count (default: one per file, at most 8).
+
+    Returns:
+        Dict mapping each path to its hex digest, in input order.
+    """
+    if len(paths) <= 1:
+        return {p: sha256_file(p) for p in paths}
+    workers = max_workers or min(len(paths), _MAX_HASH_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(paths, pool.map(sha256_file, paths)))
+
+
 def sha256_bytes(data: bytes) -> str:
     """Compute SHA-256 hex digest of raw bytes.
 
@@ -140,6 +193,7 @@ def compute_export_hash(outputs_dir: Path) -> str:
     """Compute a SHA-256 over all exported artifacts in a run outputs directory.
 
     Hashes scalars.json and all .parquet files in sorted filename order.
+    File contents are streamed, so large exports are never held in memory.
 
     Args:
         outputs_dir: Path to the run's outputs/ directory.
@@ -152,7 +206,7 @@ def compute_export_hash(outputs_dir: Path) -> str:
     for f in files:
         if f.is_file() and (f.suffix in (".json", ".parquet")):
             h.update(f.name.encode("utf-8"))
-            h.update(f.read_bytes())
+            _update_from_file(h, f)
     return h.hexdigest()
 
 
@@ -246,21 +300,43 @@ class InputHashCache:
         return file_hash
 
     def save(self) -> None:
-        """Persist the cache to disk."""
+        """Persist the cache to disk.
+
+        Written to a uniquely named temp file and renamed, so concurrent builds
+        never observe a partially written cache.
+        """
         self.cache_path.parent.mkdir(parents=True, exist_ok=True)
-        self.cache_path.write_text(json.dumps(self._entries, indent=2))
+        tmp_path = self.cache_path.with_name(f"{self.cache_path.name}.{uuid4().hex}.tmp")
+        tmp_path.write_text(json.dumps(self._entries, indent=2))
+        os.replace(tmp_path, self.cache_path)
 
     def hashes_for(self, paths: list[Path]) -> dict[str, str]:
         """Compute hashes for multiple files and return a mapping.
 
+        Files whose cached entry is stale are hashed concurrently.
+
         Args:
             paths: List of file paths.
 
         Returns:
             Dict mapping resolved path strings to their SHA-256 hex digests.
         """
-        result = {}
+        stats: dict[str, os.stat_result] = {}
+        stale: list[Path] = []
         for p in paths:
-            result[str(p.resolve())] = self.get_hash(p)
+            key = str(p.resolve())
+            stat = p.stat()
+            stats[key] = stat
+            cached = self._entries.get(key)
+            if not (cached and cached["size"] == stat.st_size and cached["mtime"] == stat.st_mtime):
+                stale.append(p)
+
+        for p, file_hash in sha256_files(stale).items():
+            stat = stats[str(p.resolve())]
+            self._entries[str(p.resolve())] = {
+                "size": stat.st_size, "mtime": stat.st_mtime, "hash": file_hash,
+            }
+
+        result = {key: self._entries[key]["hash"] for key in stats}
         self.save()
         return result
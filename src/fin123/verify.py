@@ -6,26 +6,36 @@ The ``verify_run`` function checks:
 - plugin_hash matches recomputed hash
 - export_hash matches recomputed hash of exported artifacts
 - row-order determinism: sorted_exports and export_row_counts are correct
+
+Row counts are read from the parquet footers and the export hash is
+streamed, so verification never loads an output table into memory.
+``verify_runs`` verifies many runs across a process pool.
 """
 
 from __future__ import annotations
 
 import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any
 
 import polars as pl
 
+from fin123.run_index import RunIndex
 from fin123.utils.hash import (
+    InputHashCache,
     compute_export_hash,
     compute_params_hash,
     compute_plugin_hash_combined,
     sha256_dict,
-    sha256_file,
+    sha256_files,
 )
 
 
-def verify_run(project_dir: Path, run_id: str) -> dict[str, Any]:
+def verify_run(
+    project_dir: Path, run_id: str, *, use_hash_cache: bool = False
+) -> dict[str, Any]:
     """Verify the integrity of a completed run.
 
     Recomputes all hashes and compares against run_meta.json.
@@ -34,6 +44,10 @@ def verify_run(project_dir: Path, run_id: str) -> dict[str, Any]:
     Args:
         project_dir: Root of the fin123 project.
         run_id: The run directory name.
+        use_hash_cache: Take input hashes from the project's hash cache
+            (``cache/hashes.json``) when the file's size and mtime are
+            unchanged, instead of re-hashing every input.  Faster for large
+            inputs, but trusts file metadata rather than content.
 
     Returns:
         Report dict with status ("pass" or "fail"), failures list,
@@ -60,7 +74,10 @@ def verify_run(project_dir: Path, run_id: str) -> dict[str, Any]:
     _check_workbook_hash(project_dir, meta, failures, recomputed)
 
     # 2. Input hashes
-    _check_input_hashes(meta, failures, recomputed)
+    hash_cache = (
+        InputHashCache(project_dir / "cache" / "hashes.json") if use_hash_cache else None
+    )
+    _check_input_hashes(meta, failures, recomputed, hash_cache)
 
     # 3. Plugin hash
     _check_plugin_hash(project_dir, meta, failures, recomputed)
@@ -198,16 +215,23 @@ def _check_input_hashes(
     meta: dict[str, Any],
     failures: list[str],
     recomputed: dict[str, str],
+    hash_cache: InputHashCache | None = None,
 ) -> None:
-    """Verify input file hashes by recomputing from disk."""
+    """Verify input file hashes by recomputing from disk (or the hash cache)."""
     stored_hashes = meta.get("input_hashes", {})
+    present = [Path(p) for p in stored_hashes if Path(p).exists()]
+    if hash_cache is not None:
+        cached = hash_cache.hashes_for(present)
+        computed_hashes = {p: cached[str(p.resolve())] for p in present}
+    else:
+        computed_hashes = sha256_files(present)
     for file_path_str, stored_hash in stored_hashes.items():
         file_path = Path(file_path_str)
-        if not file_path.exists():
+        if file_path not in computed_hashes:
             failures.append(f"Input file missing: {file_path_str}")
             continue
 
-        computed = sha256_file(file_path)
+        computed = computed_hashes[file_path]
         recomputed[f"input:{file_path.name}"] = computed
 
         if computed != stored_hash:
@@ -270,7 +294,10 @@ def _check_row_counts(
     meta: dict[str, Any],
     failures: list[str],
 ) -> None:
-    """Verify export_row_counts match actual parquet row counts."""
+    """Verify export_row_counts match actual parquet row counts.
+
+    Counts come from the parquet footer; no table data is read.
+    """
     stored_counts = meta.get("export_row_counts", {})
     outputs_dir = run_dir / "outputs"
 
@@ -283,8 +310,7 @@ def _check_row_counts(
             failures.append(f"Table parquet missing: {table_name}.parquet")
             continue
 
-        df = pl.read_parquet(parquet_path)
-        actual = len(df)
+        actual = parquet_row_count(parquet_path)
         if actual != expected_count:
             failures.append(
                 f"Row count mismatch for {table_name}: "
@@ -300,6 +326,18 @@ def _check_row_counts(
             pass  # Presence in sorted_exports is the contract
 
 
+def parquet_row_count(path: Path) -> int:
+    """Return the number of rows in a parquet file from its footer metadata.
+
+    Args:
+        path: Path to the parquet file.
+
+    Returns:
+        The row count.
+    """
+    return int(pl.scan_parquet(path).select(pl.len()).collect().item())
+
+
 def _check_params_hash(
     meta: dict[str, Any],
     failures: list[str],
@@ -405,3 +443,87 @@ def _emit_verify_events(
             )
     except Exception:
         pass
+
+
+def list_verifiable_runs(project_dir: Path) -> list[str]:
+    """Return the IDs of all runs with a run_meta.json, oldest first.
+
+    Served from the run index rather than reading the ``runs/`` directory.
+
+    Args:
+        project_dir: Root of the fin123 project.
+    """
+    return RunIndex(project_dir).run_ids()
+
+
+def verify_runs(
+    project_dir: Path,
+    run_ids: list[str] | None = None,
+    *,
+    max_workers: int = 1,
+    use_hash_cache: bool = False,
+) -> dict[str, Any]:
+    """Verify many runs, optionally in parallel.
+
+    Each run is verified exactly as by ``verify_run`` (and gets its own
+    verify_report.json).  A run that cannot be verified at all, e.g.
+    because its run_meta.json is corrupt, is reported as failed rather
+    than aborting the others.
+
+    Args:
+        project_dir: Root of the fin123 project.
+        run_ids: Runs to verify; defaults to every run in the project.
+        max_workers: Number of worker processes (1 = sequential).
+        use_hash_cache: Passed through to ``verify_run``.
+
+    Returns:
+        Summary dict with total, passed, failed, and a per-run list of
+        run_id, status and failures in ``run_ids`` order.
+    """
+    if run_ids is None:
+        run_ids = list_verifiable_runs(project_dir)
+
+    args_list = [(str(project_dir), run_id, use_hash_cache) for run_id in run_ids]
+    if max_workers <= 1 or len(args_list) <= 1:
+        reports = [_verify_run_args(args) for args in args_list]
+    else:
+        # Forking a process with live Polars thread pools can deadlock
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(str(project_dir),),
+        ) as executor:
+            reports = list(executor.map(_verify_run_args, args_list))
+
+    runs = [
+        {"run_id": run_id, "status": report["status"], "failures": report["failures"]}
+        for run_id, report in zip(run_ids, reports)
+    ]
+    passed = sum(1 for r in runs if r["status"] == "pass")
+    return {
+        "total": len(runs),
+        "passed": passed,
+        "failed": len(runs) - passed,
+        "runs": runs,
+    }
+
+
+def _init_worker(project_dir: str) -> None:
+    """Process pool initializer: route this worker's events to the project log."""
+    from fin123.logging.events import set_project_dir
+
+    set_project_dir(Path(project_dir))
+
+
+def _verify_run_args(args: tuple) -> dict[str, Any]:
+    """Top-level picklable function for ProcessPoolExecutor."""
+    project_dir, run_id, use_hash_cache = args
+    try:
+        return verify_run(Path(project_dir), run_id, use_hash_cache=use_hash_cache)
+    except Exception as exc:
+        return {
+            "status": "fail",
+            "failures": [f"could not verify run {run_id}: {type(exc).__name__}: {exc}"],
+            "hashes": {},
+        }
@@ -4,15 +4,26 @@ from __future__ import annotations
 
 import json
 import os
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
+from uuid import uuid4
 
 import polars as pl
 import yaml
 
 from fin123 import __version__
-from fin123.utils.hash import sha256_dict
+from fin123.run_index import RunIndex
+from fin123.utils.hash import sha256_bytes, sha256_dict
+
+try:
+    import fcntl
+except ImportError:  # Windows: snapshot index locking is skipped
+    fcntl = None  # type: ignore[assignment]
 
 
 def _atomic_json_write(path: Path, data: Any) -> None:
@@ -24,7 +35,7 @@ def _atomic_json_write(path: Path, data: Any) -> None:
         path: Destination file path.
         data: JSON-serializable data.
     """
-    tmp_path = path.with_suffix(".json.tmp")
+    tmp_path = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
     tmp_path.write_text(json.dumps(data, indent=2, sort_keys=True))
     os.replace(str(tmp_path), str(path))
 
@@ -34,6 +45,23 @@ def _utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+@contextmanager
+def _file_lock(path: Path, exclusive: bool = True) -> Iterator[None]:
+    """Hold an advisory ``flock`` on *path* (created if missing).
+
+    A no-op where ``fcntl`` is unavailable.
+    """
+    if fcntl is None:
+        yield
+        return
+    fd = os.open(str(path), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+    finally:
+        os.close(fd)
+
+
 def _next_version(directory: Path) -> str:
     """Determine the next monotonic version string (v0001, v0002, ...).
 
@@ -54,6 +82,27 @@ def _next_version(directory: Path) -> str:
     return f"v{last_num + 1:04d}"
 
 
+def _version_number(version: str) -> int:
+    """Return the number of a version string (``v0012`` -> 12), or 0."""
+    try:
+        return int(version[1:])
+    except ValueError:
+        return 0
+
+
+def _bump_version(version: str) -> str:
+    """Return the version string after *version*."""
+    return f"v{_version_number(version) + 1:04d}"
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """Hard-link *src* to *dst*, copying where links are unsupported."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        dst.write_bytes(src.read_bytes())
+
+
 def _deterministic_sort(df: pl.DataFrame) -> pl.DataFrame:
     """Sort a DataFrame by all columns in alphabetical order.
 
@@ -72,6 +121,85 @@ def _deterministic_sort(df: pl.DataFrame) -> pl.DataFrame:
     return df.sort(sort_cols, nulls_last=True)
 
 
+PARQUET_COMPRESSIONS = ("uncompressed", "snappy", "gzip", "brotli", "lz4", "zstd")
+
+
+def export_options_from_config(config: dict[str, Any]) -> dict[str, Any]:
+    """Build parquet export options from the project configuration.
+
+    Reads ``export_compression``, ``export_compression_level``,
+    ``export_row_group_size`` and ``export_max_workers`` from ``fin123.yaml``.
+
+    Args:
+        config: Merged project configuration (see ``load_project_config``).
+
+    Returns:
+        Dict with ``compression``, ``compression_level``, ``row_group_size``
+        and ``max_workers`` keys.
+
+    Raises:
+        ValueError: If a setting has an invalid value.
+    """
+    compression = str(config.get("export_compression") or "zstd").lower()
+    if compression not in PARQUET_COMPRESSIONS:
+        raise ValueError(
+            f"Invalid export_compression {compression!r}; "
+            f"expected one of {', '.join(PARQUET_COMPRESSIONS)}"
+        )
+    options: dict[str, Any] = {"compression": compression}
+    for key, option in (
+        ("export_compression_level", "compression_level"),
+        ("export_row_group_size", "row_group_size"),
+        ("export_max_workers", "max_workers"),
+    ):
+        value = config.get(key)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+            raise ValueError(f"{key} must be an integer, got {value!r}")
+        if value is not None and key != "export_compression_level" and value < 1:
+            raise ValueError(f"{key} must be at least 1, got {value}")
+        options[option] = value
+    return options
+
+
+def phase_total(timings_ms: dict[str, Any]) -> float:
+    """Sum the phase timings of a run's ``timings_ms``.
+
+    Top-level numbers are phases.  Nested dicts are left out of the total:
+    ``export_tables`` breaks a phase down further and ``table_cache``
+    holds counts, not milliseconds.
+
+    Args:
+        timings_ms: The ``timings_ms`` dict of a run.
+
+    Returns:
+        Total time in milliseconds.
+    """
+    return sum(v for v in timings_ms.values() if isinstance(v, (int, float)))
+
+
+def _export_table(
+    df: pl.DataFrame,
+    path: Path,
+    auto_sort: bool,
+    options: dict[str, Any],
+) -> float:
+    """Sort (if needed) and write one output table, returning elapsed ms.
+
+    Polars releases the GIL while sorting and writing, so tables are
+    exported concurrently from a thread pool.
+    """
+    t0 = time.monotonic()
+    if auto_sort:
+        df = _deterministic_sort(df)
+    df.write_parquet(
+        path,
+        compression=options.get("compression", "zstd"),
+        compression_level=options.get("compression_level"),
+        row_group_size=options.get("row_group_size"),
+    )
+    return round((time.monotonic() - t0) * 1000, 2)
+
+
 class RunStore:
     """Manages the ``runs/`` directory inside a project."""
 
@@ -83,6 +211,7 @@ class RunStore:
         """
         self.runs_dir = project_dir / "runs"
         self.runs_dir.mkdir(parents=True, exist_ok=True)
+        self.index = RunIndex(project_dir)
 
     def create_run(
         self,
@@ -95,12 +224,15 @@ class RunStore:
         model_id: str | None = None,
         model_version_id: str | None = None,
         plugins: dict[str, dict[str, str]] | None = None,
+        export_options: dict[str, Any] | None = None,
+        timings_ms: dict[str, Any] | None = None,
     ) -> Path:
         """Create a new run directory with full metadata and outputs.
 
         Tables without an explicit sort step are sorted by all columns in
         alphabetical order at export time to guarantee deterministic parquet
-        output.  The plan itself is not mutated.
+        output.  The plan itself is not mutated.  Output tables are sorted
+        and written concurrently.
 
         Args:
             workbook_spec: The parsed workbook YAML as a dict.
@@ -111,6 +243,12 @@ class RunStore:
             sorted_tables: Set of table names that already have an explicit
                 sort step.  Other tables receive a deterministic secondary sort.
             plugins: Mapping of plugin names to ``{"version": ..., "sha256": ...}``.
+            export_options: Parquet options from ``export_options_from_config``.
+                Defaults to zstd with Polars' default level and row groups.
+            timings_ms: Optional dict that receives the per-table write
+                times under ``export_tables``.  They break down the caller's
+                ``export_outputs`` phase, so they are nested rather than
+                added as phases of their own.
 
         Returns:
             Path to the created run directory.
@@ -119,9 +257,16 @@ class RunStore:
         now = _utc_now()
         run_count = len(list(self.runs_dir.iterdir())) + 1
         ts = now.strftime("%Y%m%d_%H%M%S")
-        run_dir_name = f"{ts}_run_{run_count}"
-        run_dir = self.runs_dir / run_dir_name
-        run_dir.mkdir(parents=True)
+        # Concurrent builds (parallel batches and sweeps) can race for the
+        # same name; mkdir is atomic, so claim the next free counter.
+        while True:
+            run_dir_name = f"{ts}_run_{run_count}"
+            run_dir = self.runs_dir / run_dir_name
+            try:
+                run_dir.mkdir(parents=True)
+                break
+            except FileExistsError:
+                run_count += 1
 
         # Write in-progress marker so GC skips this directory
         in_progress_marker = run_dir / ".in_progress"
@@ -136,11 +281,27 @@ class RunStore:
         auto_sorted: list[str] = []
         for table_name, df in table_outputs.items():
             if table_name not in sorted_tables:
-                df = _deterministic_sort(df)
                 auto_sorted.append(table_name)
-            df.write_parquet(outputs_dir / f"{table_name}.parquet")
             export_row_counts[table_name] = len(df)
 
+        options = export_options or {}
+        workers = min(len(table_outputs), options.get("max_workers") or os.cpu_count() or 1)
+        if table_outputs:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    table_name: pool.submit(
+                        _export_table,
+                        df,
+                        outputs_dir / f"{table_name}.parquet",
+                        table_name not in sorted_tables,
+                        options,
+                    )
+                    for table_name, df in table_outputs.items()
+                }
+                table_timings = {name: f.result() for name, f in futures.items()}
+            if timings_ms is not None:
+                timings_ms["export_tables"] = table_timings
+
         run_meta = {
             "run_id": run_dir_name,
             "timestamp": now.isoformat(),
@@ -156,6 +317,7 @@ class RunStore:
             "plugins": plugins or {},
         }
         _atomic_json_write(run_dir / "run_meta.json", run_meta)
+        self.index.upsert(run_meta)
 
         # Remove in-progress marker — run is now complete
         if in_progress_marker.exists():
@@ -163,18 +325,40 @@ class RunStore:
 
         return run_dir
 
-    def list_runs(self) -> list[dict[str, Any]]:
-        """List all runs with their metadata, sorted oldest first.
+    def list_runs(
+        self,
+        limit: int | None = None,
+        offset: int = 0,
+        scenario_name: str | None = None,
+        build_batch_id: str | None = None,
+        newest_first: bool = False,
+    ) -> list[dict[str, Any]]:
+        """List runs with their metadata, sorted oldest first.
+
+        Served from the run index rather than reading every
+        ``run_meta.json``.
+
+        Args:
+            limit: Maximum number of runs (None = all).
+            offset: Number of runs to skip (for pagination).
+            scenario_name: Only runs built under this scenario.
+            build_batch_id: Only runs belonging to this batch.
+            newest_first: Order newest run first instead.
 
         Returns:
             List of run metadata dicts.
         """
-        runs = []
-        for d in sorted(self.runs_dir.iterdir()):
-            meta_path = d / "run_meta.json"
-            if meta_path.exists():
-                runs.append(json.loads(meta_path.read_text()))
-        return runs
+        return self.index.list_runs(
+            limit=limit,
+            offset=offset,
+            scenario_name=scenario_name,
+            build_batch_id=build_batch_id,
+            newest_first=newest_first,
+        )
+
+    def latest_run(self) -> dict[str, Any] | None:
+        """Return the metadata of the most recent run, or None."""
+        return self.index.latest()
 
     def dir_size(self, run_dir: Path) -> int:
         """Compute the total size in bytes of a run directory.
@@ -430,7 +614,17 @@ class ArtifactStore:
 
 
 class SnapshotStore:
-    """Manages workbook spec snapshots in ``snapshots/workbook/``."""
+    """Manages workbook spec snapshots in ``snapshots/workbook/``.
+
+    Snapshot content is stored once per distinct YAML, by SHA-256, under
+    ``objects/``; each version directory ``vNNNN/workbook.yaml`` is a hard
+    link to its object (a copy where links are unsupported).  ``head.json``
+    records the latest version and its content hash, so saving an
+    unchanged spec returns the latest version without touching disk, and
+    the next version number is known without listing the directory.
+    ``index.json`` is only ever replaced atomically, under an advisory
+    lock shared by every writer.
+    """
 
     def __init__(self, project_dir: Path) -> None:
         """Initialize the snapshot store.
@@ -441,47 +635,145 @@ class SnapshotStore:
         self.project_dir = project_dir
         self.snapshot_dir = project_dir / "snapshots" / "workbook"
         self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        self.objects_dir = self.snapshot_dir / "objects"
+        self.head_path = self.snapshot_dir / "head.json"
+        self._lock_path = self.snapshot_dir / ".index.lock"
 
     def save_snapshot(self, workbook_yaml: str) -> str:
         """Save a workbook YAML snapshot and update the index.
 
+        If *workbook_yaml* is identical to the latest snapshot, the latest
+        version is returned and nothing is written.
+
         Args:
             workbook_yaml: Raw YAML content of the workbook spec.
 
         Returns:
             The version string assigned to this snapshot.
         """
-        version = _next_version(self.snapshot_dir)
-        version_dir = self.snapshot_dir / version
-        version_dir.mkdir()
-        (version_dir / "workbook.yaml").write_text(workbook_yaml)
+        data = workbook_yaml.encode("utf-8")
+        digest = sha256_bytes(data)
+        head = self._read_head()
+        if head is not None and head.get("sha256") == digest:
+            version = head["model_version_id"]
+            if (self.snapshot_dir / version / "workbook.yaml").exists() and not (
+                self.snapshot_dir / _bump_version(version)
+            ).exists():
+                return version
 
-        # Update index.json
         spec_dict = yaml.safe_load(workbook_yaml) or {}
-        content_hash = sha256_dict(spec_dict)
-        now = _utc_now()
 
-        index = self.load_index()
-        # Guard against duplicate entries (rebuild_index may have found
-        # the version dir we just created above)
-        existing_ids = {v["model_version_id"] for v in index["versions"]}
-        if version not in existing_ids:
-            index["versions"].append({
+        # Store, claim, link and index under one lock: an index rebuild must
+        # never see a version directory whose entry is still to be appended,
+        # and prune_objects must never see the object before it is linked
+        with _file_lock(self._lock_path):
+            obj_path = self._store_object(digest, data)
+            head = self._read_head()
+            version = _bump_version(head["model_version_id"]) if head else _next_version(self.snapshot_dir)
+            while True:
+                version_dir = self.snapshot_dir / version
+                try:
+                    version_dir.mkdir()
+                    break
+                except FileExistsError:
+                    # Claimed outside save_snapshot (or head is stale)
+                    version = _bump_version(version)
+            _link_or_copy(obj_path, version_dir / "workbook.yaml")
+
+            entry = {
                 "model_version_id": version,
-                "created_at": now.isoformat(),
-                "hash": content_hash,
+                "created_at": _utc_now().isoformat(),
+                "hash": sha256_dict(spec_dict),
                 "pinned": False,
-            })
-        self._write_index(index)
-
+            }
+            self._append_index_entry(entry)
+            self._write_head(version, digest)
         return version
 
+    def _read_head(self) -> dict[str, Any] | None:
+        """Return head.json, or None if missing or unreadable."""
+        try:
+            head = json.loads(self.head_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(head, dict) or not str(head.get("model_version_id", "")).startswith("v"):
+            return None
+        return head
+
+    def _write_head(self, version: str, digest: str) -> None:
+        """Point head.json at *version* (caller holds the index lock)."""
+        tmp_path = self.snapshot_dir / f"head.json.{uuid4().hex}.tmp"
+        tmp_path.write_text(json.dumps({"model_version_id": version, "sha256": digest}))
+        os.replace(tmp_path, self.head_path)
+
+    def _store_object(self, digest: str, data: bytes) -> Path:
+        """Write snapshot content under its hash (once) and return its path."""
+        obj_path = self.objects_dir / f"{digest}.yaml"
+        if not obj_path.exists():
+            self.objects_dir.mkdir(exist_ok=True)
+            tmp_path = self.objects_dir / f"{digest}.{uuid4().hex}.tmp"
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, obj_path)
+        return obj_path
+
+    def prune_objects(self, dry_run: bool = False) -> int:
+        """Delete snapshot objects no version links to any more.
+
+        Args:
+            dry_run: If True, only report what would be freed.
+
+        Returns:
+            Bytes freed (or that would be freed).
+        """
+        if not self.objects_dir.exists():
+            return 0
+        freed = 0
+        # Under the index lock: save_snapshot stores and links an object
+        # under it, so a just-written object is never seen unlinked
+        with _file_lock(self._lock_path):
+            for obj_path in self.objects_dir.glob("*.yaml"):
+                stat = obj_path.stat()
+                if stat.st_nlink > 1:
+                    continue
+                # Unlinked (or copied) everywhere: versions keep their own file
+                freed += stat.st_size
+                if not dry_run:
+                    obj_path.unlink(missing_ok=True)
+        return freed
+
+    def _append_index_entry(self, entry: dict[str, Any]) -> None:
+        """Add a version entry to index.json.
+
+        The index is rewritten through a temporary file and ``os.replace``,
+        never edited in place, so a crash cannot leave a truncated index
+        (whose rebuild would drop every pin).  Only a changed spec gets
+        here, so the rewrite stays off the build path.  Caller holds the
+        index lock.
+        """
+        index = self._load_index_unlocked()
+        existing_ids = {v["model_version_id"] for v in index["versions"]}
+        if entry["model_version_id"] not in existing_ids:
+            index["versions"].append(entry)
+        self._write_index_unlocked(index)
+
     def load_index(self) -> dict:
         """Read index.json or rebuild from disk if missing.
 
         Returns:
             Index dict with model_id and versions list.
         """
+        with _file_lock(self._lock_path, exclusive=False):
+            index_path = self.snapshot_dir / "index.json"
+            if index_path.exists():
+                try:
+                    return json.loads(index_path.read_text())
+                except (json.JSONDecodeError, OSError):
+                    pass
+        with _file_lock(self._lock_path):
+            return self._load_index_unlocked()
+
+    def _load_index_unlocked(self) -> dict:
+        """``load_index`` for callers already holding the index lock."""
         index_path = self.snapshot_dir / "index.json"
         if index_path.exists():
             try:
@@ -495,7 +787,7 @@ class SnapshotStore:
         if spec_path.exists():
             spec = yaml.safe_load(spec_path.read_text()) or {}
             model_id = spec.get("model_id")
-        return self.rebuild_index(model_id or "unknown")
+        return self._rebuild_index_unlocked(model_id or "unknown")
 
     def rebuild_index(self, model_id: str) -> dict:
         """Scan disk and rebuild index.json (migration path).
@@ -506,6 +798,11 @@ class SnapshotStore:
         Returns:
             Rebuilt index dict.
         """
+        with _file_lock(self._lock_path):
+            return self._rebuild_index_unlocked(model_id)
+
+    def _rebuild_index_unlocked(self, model_id: str) -> dict:
+        """``rebuild_index`` for callers already holding the index lock."""
         versions = []
         if self.snapshot_dir.exists():
             for d in sorted(self.snapshot_dir.iterdir()):
@@ -529,7 +826,7 @@ class SnapshotStore:
                 })
 
         index = {"model_id": model_id, "versions": versions}
-        self._write_index(index)
+        self._write_index_unlocked(index)
         return index
 
     def load_version(self, version: str) -> dict:
@@ -564,12 +861,7 @@ class SnapshotStore:
         Args:
             version: Version string to pin.
         """
-        index = self.load_index()
-        for v in index["versions"]:
-            if v["model_version_id"] == version:
-                v["pinned"] = True
-                break
-        self._write_index(index)
+        self._set_pinned(version, True)
 
     def unpin_version(self, version: str) -> None:
         """Unpin a version in the index.
@@ -577,20 +869,46 @@ class SnapshotStore:
         Args:
             version: Version string to unpin.
         """
-        index = self.load_index()
-        for v in index["versions"]:
-            if v["model_version_id"] == version:
-                v["pinned"] = False
-                break
-        self._write_index(index)
+        self._set_pinned(version, False)
+
+    def _set_pinned(self, version: str, pinned: bool) -> None:
+        """Set the ``pinned`` flag of *version* in the index."""
+
+        def update(index: dict) -> None:
+            for v in index["versions"]:
+                if v["model_version_id"] == version:
+                    v["pinned"] = pinned
+                    break
+
+        self._update_index(update)
 
-    def _write_index(self, index: dict) -> None:
+    def _update_index(self, update: Callable[[dict], None]) -> dict:
+        """Read, modify and write the index under one exclusive lock.
+
+        Holding the lock across the read means a version saved
+        concurrently cannot be lost by writing back a stale index.
+
+        Args:
+            update: Called with the current index dict to modify in place.
+
+        Returns:
+            The updated index.
+        """
+        with _file_lock(self._lock_path):
+            index = self._load_index_unlocked()
+            update(index)
+            self._write_index_unlocked(index)
+        return index
+
+    def _write_index_unlocked(self, index: dict) -> None:
         """Atomic write of index.json (write to .tmp then rename).
 
+        Caller holds the index lock.
+
         Args:
             index: Index dict to write.
         """
         index_path = self.snapshot_dir / "index.json"
-        tmp_path = self.snapshot_dir / "index.json.tmp"
+        tmp_path = self.snapshot_dir / f"index.json.{uuid4().hex}.tmp"
         tmp_path.write_text(json.dumps(index, indent=2))
         os.replace(str(tmp_path), str(index_path))
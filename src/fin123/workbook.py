@@ -10,6 +10,7 @@ import json
 import time
 from pathlib import Path
 from typing import Any
+from uuid import uuid4
 
 import polars as pl
 import yaml
@@ -18,11 +19,14 @@ import yaml
 import fin123.functions.scalar  # noqa: F401
 import fin123.functions.table  # noqa: F401
 from fin123.formulas import parse_formula, extract_refs
-from fin123.project import ensure_model_id
+from fin123.formulas.evaluator import TABLE_ARG_POSITIONS
+from fin123.project import ensure_model_id, load_project_config
+from fin123.run_index import RunIndex
 from fin123.scalars import ScalarGraph
+from fin123.table_cache import TableCache, table_cache_key
 from fin123.tables import TableGraph
 from fin123.utils.hash import InputHashCache
-from fin123.versioning import RunStore, SnapshotStore
+from fin123.versioning import RunStore, SnapshotStore, export_options_from_config
 
 
 def _resolve_cache_path(project_dir: Path, cache_rel_path: str) -> Path:
@@ -49,6 +53,33 @@ def _resolve_cache_path(project_dir: Path, cache_rel_path: str) -> Path:
     return cache_path
 
 
+def _formula_table_refs(tree: Any) -> set[str] | None:
+    """Collect table names read by table functions in a parsed formula.
+
+    Args:
+        tree: Lark parse tree from ``parse_formula()``.
+
+    Returns:
+        Set of table names passed as string literals, or ``None`` if any
+        table argument is computed (so the referenced table is unknown).
+    """
+    names: set[str] = set()
+    for node in tree.find_data("func_call"):
+        func_name = str(node.children[0]).upper()
+        pos = TABLE_ARG_POSITIONS.get(func_name)
+        if pos is None:
+            continue
+        args = node.children[1].children
+        if pos >= len(args):
+            continue
+        arg = args[pos]
+        if getattr(arg, "data", None) != "string":
+            return None
+        raw = str(arg.children[0])
+        names.add(raw[1:-1].replace('\\"', '"').replace("\\\\", "\\"))
+    return names
+
+
 class WorkbookResult:
     """Container for the outputs of a workbook run.
 
@@ -57,6 +88,9 @@ class WorkbookResult:
         tables: Computed table DataFrames.
         run_dir: Path to the persisted run directory.
         timings_ms: Phase timing dict (eval_tables, eval_scalars, etc.).
+            ``export_tables`` nests per-table write times under
+            ``export_outputs``; ``table_cache`` holds table cache hit and
+            miss counts.
     """
 
     def __init__(
@@ -64,7 +98,7 @@ class WorkbookResult:
         scalars: dict[str, Any],
         tables: dict[str, pl.DataFrame],
         run_dir: Path,
-        timings_ms: dict[str, float] | None = None,
+        timings_ms: dict[str, Any] | None = None,
     ) -> None:
         """Initialize a WorkbookResult.
 
@@ -95,6 +129,8 @@ class Workbook:
         project_dir: Path,
         overrides: dict[str, Any] | None = None,
         scenario_name: str | None = None,
+        raw_yaml: str | None = None,
+        spec: dict[str, Any] | None = None,
     ) -> None:
         """Initialize a Workbook from a project directory.
 
@@ -102,14 +138,20 @@ class Workbook:
             project_dir: Path to the project root containing ``workbook.yaml``.
             overrides: Optional parameter overrides (e.g. from CLI ``--set``).
             scenario_name: Optional scenario name from workbook.yaml scenarios.
+            raw_yaml: ``workbook.yaml`` text already read by the caller.
+            spec: The parsed *raw_yaml*, owned by this workbook from now on.
+                Batch workers pass both to skip re-parsing the spec per build.
         """
         self.project_dir = project_dir.resolve()
         self.spec_path = self.project_dir / "workbook.yaml"
         if not self.spec_path.exists():
             raise FileNotFoundError(f"No workbook.yaml found in {self.project_dir}")
 
-        self.raw_yaml = self.spec_path.read_text()
-        self.spec: dict[str, Any] = yaml.safe_load(self.raw_yaml)
+        if raw_yaml is None or spec is None:
+            raw_yaml = self.spec_path.read_text()
+            spec = yaml.safe_load(raw_yaml)
+        self.raw_yaml = raw_yaml
+        self.spec: dict[str, Any] = spec
         self.overrides = overrides or {}
         self.scenario_name = scenario_name or ""
 
@@ -125,7 +167,7 @@ class Workbook:
         # Ensure model_id exists
         ensure_model_id(self.spec, self.spec_path)
 
-    def run(self) -> WorkbookResult:
+    def run(self, table_frames: dict[str, pl.DataFrame] | None = None) -> WorkbookResult:
         """Execute the workbook: evaluate scalars and tables, persist results.
 
         Tables are evaluated first so that their materialized DataFrames can
@@ -134,6 +176,11 @@ class Workbook:
         Active plugins are loaded before evaluation so that plugin-registered
         scalar functions are available in the formula engine.
 
+        Args:
+            table_frames: Optional frames from a prior ``evaluate_tables()``
+                call on the same spec.  Tables do not depend on parameters,
+                so sweeps build many points against one evaluation.
+
         Returns:
             A WorkbookResult with all computed outputs.
         """
@@ -144,7 +191,7 @@ class Workbook:
         set_project_dir(self.project_dir)
 
         run_id: str | None = None
-        timings_ms: dict[str, float] = {}
+        timings_ms: dict[str, Any] = {}
 
         # Compute overlay hash early for the build-start event
         scenario_overlay_hash_early = overlay_hash(self.scenario_name, self._scenario_overrides)
@@ -187,13 +234,12 @@ class Workbook:
 
             # Build and evaluate table graph first (needed for lookup_scalar cache)
             t0 = time.monotonic()
-            table_graph = self._build_table_graph(params)
-            table_frames = table_graph.evaluate()
+            if table_frames is None:
+                table_frames = self._evaluate_tables_cached(
+                    params, input_hashes, plugins_info, timings_ms
+                )
             timings_ms["eval_tables"] = round((time.monotonic() - t0) * 1000, 2)
 
-            # Enforce primary_key uniqueness on tables that declare one
-            self._enforce_primary_keys(table_frames)
-
             # Build and evaluate scalar graph with table cache for lookups
             t0 = time.monotonic()
             scalar_graph = self._build_scalar_graph(params, table_cache=table_frames)
@@ -228,6 +274,7 @@ class Workbook:
             assertion_report = self._evaluate_assertions(scalar_values, run_id)
 
             # Persist run
+            export_options = export_options_from_config(load_project_config(self.project_dir))
             t0 = time.monotonic()
             run_store = RunStore(self.project_dir)
             run_dir = run_store.create_run(
@@ -239,12 +286,17 @@ class Workbook:
                 model_id=self.spec.get("model_id"),
                 model_version_id=snapshot_version,
                 plugins=plugins_info,
+                export_options=export_options,
+                timings_ms=timings_ms,
             )
             run_id = run_dir.name
 
+            timings_ms["export_outputs"] = round((time.monotonic() - t0) * 1000, 2)
+
             # Compute export hash and amend run_meta.json with new fields
+            t0 = time.monotonic()
             export_hash = compute_export_hash(run_dir / "outputs")
-            timings_ms["export_outputs"] = round((time.monotonic() - t0) * 1000, 2)
+            timings_ms["hash_exports"] = round((time.monotonic() - t0) * 1000, 2)
 
             self._amend_run_meta(
                 run_dir,
@@ -510,6 +562,92 @@ class Workbook:
 
         return sg
 
+    def evaluate_tables(self, params: dict[str, Any] | None = None) -> dict[str, pl.DataFrame]:
+        """Evaluate the table graph and enforce declared primary keys.
+
+        Args:
+            params: Resolved parameters.  Defaults to the spec params with
+                overrides applied.
+
+        Returns:
+            Dict of the materialized table DataFrames a run needs.
+
+        Raises:
+            ValueError: If a plan is invalid or a primary key is violated.
+        """
+        if params is None:
+            params = dict(self.spec.get("params", {}))
+            params.update(self.overrides)
+        table_graph = self._build_table_graph(params)
+        table_frames = table_graph.evaluate(materialize=self._required_table_names())
+
+        # Enforce primary_key uniqueness on tables that declare one
+        self._enforce_primary_keys(table_frames)
+        return table_frames
+
+    def warm_up(self) -> None:
+        """Load plugins and materialize tables exactly as a build would.
+
+        Used by long-lived worker processes: the plugins stay imported and
+        the tables stay in the in-process table cache, so later builds in
+        the process skip both while plugin files and inputs are unchanged.
+        Nothing is persisted as a run.
+        """
+        plugins_info = self._load_plugins()
+        params = dict(self.spec.get("params", {}))
+        params.update(self.overrides)
+        hash_cache = InputHashCache(self.project_dir / "cache" / "hashes.json")
+        input_hashes = hash_cache.hashes_for(self._collect_input_paths())
+        self._evaluate_tables_cached(params, input_hashes, plugins_info, {})
+
+    def _evaluate_tables_cached(
+        self,
+        params: dict[str, Any],
+        input_hashes: dict[str, str],
+        plugins_info: dict[str, dict[str, str]],
+        timings_ms: dict[str, Any],
+    ) -> dict[str, pl.DataFrame]:
+        """Evaluate the table graph, reusing a cached materialization.
+
+        The cache is keyed by the table and plan specs, the input file
+        hashes, and the engine and plugin hash (see ``table_cache.py``).
+        Hit and miss counts (in tables, not milliseconds) are recorded in
+        *timings_ms* under ``table_cache``.
+        Disabled with ``table_cache: false`` in ``fin123.yaml``.
+
+        Args:
+            params: Resolved parameters.
+            input_hashes: Input file hashes for this build.
+            plugins_info: Active plugin versions and hashes.
+            timings_ms: Phase timing dict to record cache stats in.
+
+        Returns:
+            Dict of the materialized table DataFrames a run needs.
+        """
+        config = load_project_config(self.project_dir)
+        if not config.get("table_cache", True):
+            return self.evaluate_tables(params)
+
+        from fin123 import __version__
+        from fin123.utils.hash import compute_plugin_hash_combined
+
+        key = table_cache_key(
+            self.spec,
+            self._required_table_names(),
+            input_hashes,
+            compute_plugin_hash_combined(__version__, plugins_info),
+        )
+        cache = TableCache(self.project_dir, max_entries=int(config.get("max_table_cache_entries", 16)))
+        table_frames = cache.get(key)
+        if table_frames is not None:
+            timings_ms["table_cache"] = {"hits": len(table_frames), "misses": 0}
+            return table_frames
+
+        table_frames = self.evaluate_tables(params)
+        cache.put(key, table_frames)
+        timings_ms["table_cache"] = {"hits": 0, "misses": len(table_frames)}
+        return table_frames
+
     def _build_table_graph(self, params: dict[str, Any]) -> TableGraph:
         """Construct the table graph from the workbook spec.
 
@@ -560,6 +698,51 @@ class Workbook:
 
         return tg
 
+    def _required_table_names(self) -> set[str] | None:
+        """Return the tables a run must materialize.
+
+        These are the declared table outputs, tables with a ``primary_key``
+        to enforce, and lookup targets of ``lookup_scalar`` and formula
+        table functions.  Intermediate tables are left to the query
+        optimizer and never collected.
+
+        Returns:
+            Set of table names, or ``None`` when every table must be
+            materialized (no table outputs declared, or a lookup target
+            cannot be determined statically).
+        """
+        names: set[str] = set()
+        has_table_outputs = False
+        for output_spec in self.spec.get("outputs", []):
+            if output_spec.get("type") == "table":
+                has_table_outputs = True
+                names.add(output_spec["name"])
+            elif output_spec.get("type") == "scalar":
+                formulas = [
+                    text for text in (output_spec.get("formula"), output_spec.get("value"))
+                    if isinstance(text, str) and text.startswith("=")
+                ]
+                if formulas:
+                    refs = _formula_table_refs(parse_formula(formulas[0]))
+                    if refs is None:
+                        return None
+                    names.update(refs)
+                elif output_spec.get("func") == "lookup_scalar":
+                    table_name = output_spec.get("args", {}).get("table_name")
+                    if not isinstance(table_name, str) or table_name.startswith("$"):
+                        return None
+                    names.add(table_name)
+        if not has_table_outputs:
+            return None
+
+        for name, table_spec in self.spec.get("tables", {}).items():
+            if table_spec.get("primary_key"):
+                names.add(name)
+
+        known = set(self.spec.get("tables", {}))
+        known.update(p["name"] for p in self.spec.get("plans", []))
+        return names & known
+
     def _enforce_primary_keys(self, table_frames: dict[str, pl.DataFrame]) -> None:
         """Validate primary key uniqueness on tables that declare one.
 
@@ -731,7 +914,7 @@ class Workbook:
         overlay_hash: str,
         plugin_hash: str,
         export_hash: str,
-        timings_ms: dict[str, float],
+        timings_ms: dict[str, Any],
         assertion_report: dict[str, Any],
         params_hash: str = "",
         effective_params: dict[str, Any] | None = None,
@@ -771,6 +954,7 @@ class Workbook:
             meta["plugin_lock_hash"] = plugin_lock_hash
             meta["plugin_lock_hash_mode"] = plugin_lock_hash_mode
         # Atomic write: tmp file then os.replace
-        tmp_path = meta_path.with_suffix(".json.tmp")
+        tmp_path = meta_path.with_name(f"run_meta.json.{uuid4().hex}.tmp")
         tmp_path.write_text(json.dumps(meta, indent=2, sort_keys=True))
         os.replace(str(tmp_path), str(meta_path))
+        RunIndex(run_dir.parent.parent).upsert(meta)
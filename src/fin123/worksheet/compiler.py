@@ -4,8 +4,8 @@ Pipeline:
   1. Validate spec against ViewTable
   2. Parse derived expressions, extract references, build dependency graph
   3. Topologically order derived column evaluation (cycles → hard error)
-  4. For each row: project source columns, evaluate derived columns in
-     dependency order, evaluate flags
+  4. Evaluate derived columns in dependency order and flags as Polars
+     expressions (row-by-row fallback for untranslatable expressions)
   5. Apply sorts
   6. Build provenance and error summary
   7. Assemble CompiledWorksheet
@@ -38,6 +38,14 @@ from fin123.worksheet.compiled import (
     SortEntry,
     ViewTableProvenance,
 )
+from fin123.formulas.vectorized import VectorizeError
+from fin123.worksheet.eval_expr import (
+    RowExpr,
+    column_kind,
+    kind_dtype,
+    translate_row_tree,
+    truthy,
+)
 from fin123.worksheet.eval_row import (
     _error_code,
     evaluate_row_tree,
@@ -177,55 +185,14 @@ def compile_worksheet(
     # 5. Determine output column names (spec order) and the full
     #    set of ViewTable columns needed (may include non-projected ones)
     output_names = spec.canonical_names()
-    vt_columns = view_table.columns
 
     # 6. Build compiled column metadata
     compiled_columns = _build_compiled_columns(spec, view_table)
 
-    # 7. Evaluate rows
-    df = view_table.df
-    rows: list[dict[str, Any]] = []
-    all_flags: list[list[CompiledFlag]] = []
-    error_counts: dict[str, int] = {}
-
-    for row_idx in range(len(df)):
-        # Start with all ViewTable columns as the row context
-        row_context: dict[str, Any] = {
-            col: _native_value(df[col][row_idx]) for col in vt_columns
-        }
-
-        # Evaluate derived columns in dependency order
-        for name in eval_order:
-            tree = derived_trees[name]
-            try:
-                value = evaluate_row_tree(tree, row_context)
-            except ENGINE_ERRORS as exc:
-                value = {"error": _error_code(exc)}
-                error_counts[name] = error_counts.get(name, 0) + 1
-            row_context[name] = value
-
-        # Build output row in spec column order
-        out_row: dict[str, Any] = {}
-        for col_name in output_names:
-            out_row[col_name] = row_context.get(col_name)
-
-        rows.append(out_row)
-
-        # Evaluate flags
-        row_flags: list[CompiledFlag] = []
-        for flag_spec, flag_tree in flag_trees:
-            try:
-                result = evaluate_row_tree(flag_tree, row_context)
-                if result:
-                    row_flags.append(CompiledFlag(
-                        name=flag_spec.name,
-                        severity=flag_spec.severity,
-                        message=flag_spec.message,
-                    ))
-            except ENGINE_ERRORS:
-                pass  # Flag eval errors are silent — flag just doesn't trigger
-
-        all_flags.append(row_flags)
+    # 7. Evaluate derived columns and flags
+    rows, all_flags, error_counts = _evaluate(
+        view_table.df, eval_order, derived_trees, flag_trees, output_names
+    )
 
     # 8. Apply sorts
     sorts_applied = [
@@ -290,18 +257,207 @@ def compile_worksheet(
 
 
 # ────────────────────────────────────────────────────────────────
-# Helpers
+# Evaluation
 # ────────────────────────────────────────────────────────────────
 
+# Hidden per-column bookkeeping in the working frame
+_ERR_COL = "__fin123_err__{}"
+_RAISED_COL = "__fin123_raised__{}"
+_FLAG_COL = "__fin123_flag__{}"
+
+
+def _evaluate(
+    df: pl.DataFrame,
+    eval_order: list[str],
+    derived_trees: dict[str, Tree],
+    flag_trees: list[tuple[FlagSpec, Tree]],
+    output_names: list[str],
+) -> tuple[list[dict[str, Any]], list[list[CompiledFlag]], dict[str, int]]:
+    """Evaluate derived columns and flags over all rows.
+
+    Derived columns are translated to Polars expressions and computed with
+    ``with_columns`` in dependency order.  Expressions with no exact
+    translation (and everything that depends on them) fall back to the
+    row-by-row evaluator.
+
+    Returns:
+        Output rows in spec column order, triggered flags per row, and error
+        counts per derived column (in first-occurrence order).
+    """
+    columns: dict[str, RowExpr] = {
+        name: RowExpr(pl.col(name), column_kind(dtype))
+        for name, dtype in df.schema.items()
+    }
+    frame = df
+    vectorized: list[str] = []
+    fallback: list[str] = []
+    error_cols: dict[str, str] = {}
+    raised_cols: dict[str, str] = {}
+
+    for name in eval_order:
+        tree = derived_trees[name]
+        if extract_refs(tree) & set(fallback):
+            fallback.append(name)
+            continue
+        try:
+            term = translate_row_tree(tree, columns)
+            exprs, err_col, raised_col = _derived_exprs(name, term)
+            frame = frame.with_columns(exprs)
+        except (VectorizeError, pl.exceptions.PolarsError):
+            fallback.append(name)
+            continue
+        vectorized.append(name)
+        carried = None
+        if err_col is not None:
+            error_cols[name] = err_col
+            carried = pl.col(err_col)
+        if raised_col is not None:
+            raised_cols[name] = raised_col
+        columns[name] = RowExpr(pl.col(name), term.kind, carried=carried)
+
+    fallback_flags: list[int] = []
+    for idx, (_, flag_tree) in enumerate(flag_trees):
+        if extract_refs(flag_tree) & set(fallback):
+            fallback_flags.append(idx)
+            continue
+        try:
+            term = translate_row_tree(flag_tree, columns)
+            fires = truthy(term)
+            if term.raised is not None:
+                # Flag eval errors are silent — flag just doesn't trigger
+                fires = fires & term.raised.is_null()
+            frame = frame.with_columns(fires.alias(_FLAG_COL.format(idx)))
+        except (VectorizeError, pl.exceptions.PolarsError):
+            fallback_flags.append(idx)
+
+    # (first error row, eval position, count) per erroring column
+    error_stats: dict[str, tuple[int, int, int]] = {}
+    for name, raised_col in raised_cols.items():
+        hits = frame[raised_col].arg_true()
+        if len(hits):
+            error_stats[name] = (hits[0], eval_order.index(name), len(hits))
+
+    flag_objs = [
+        CompiledFlag(name=f.name, severity=f.severity, message=f.message)
+        for f, _ in flag_trees
+    ]
+    fired: dict[int, list[int]] = {
+        idx: frame[_FLAG_COL.format(idx)].arg_true().to_list()
+        for idx in range(len(flag_trees))
+        if idx not in fallback_flags
+    }
+
+    if fallback or fallback_flags:
+        contexts = frame.select(list(df.columns) + vectorized).to_dicts()
+        _apply_error_values(contexts, frame, error_cols)
+        _evaluate_rows(
+            contexts,
+            [(name, derived_trees[name]) for name in fallback],
+            [(idx, flag_trees[idx][1]) for idx in fallback_flags],
+            eval_order,
+            error_stats,
+            fired,
+        )
+        rows = [{col: ctx.get(col) for col in output_names} for ctx in contexts]
+    else:
+        present = set(frame.columns)
+        rows = frame.select(
+            pl.col(col) if col in present else pl.lit(None).alias(col)
+            for col in output_names
+        ).to_dicts()
+        _apply_error_values(
+            rows, frame, {n: c for n, c in error_cols.items() if n in output_names}
+        )
+
+    all_flags: list[list[CompiledFlag]] = [[] for _ in range(len(rows))]
+    for idx in range(len(flag_trees)):
+        for row_idx in fired[idx]:
+            all_flags[row_idx].append(flag_objs[idx])
+
+    error_counts = {
+        name: count
+        for name, (_, _, count) in sorted(error_stats.items(), key=lambda kv: kv[1][:2])
+    }
+    return rows, all_flags, error_counts
 
-def _native_value(val: Any) -> Any:
-    """Convert Polars scalar to native Python type."""
-    if val is None:
-        return None
-    # Polars returns numpy-like types; convert to native Python
-    if hasattr(val, "item"):
-        return val.item()
-    return val
+
+def _derived_exprs(
+    name: str, term: RowExpr
+) -> tuple[list[pl.Expr], str | None, str | None]:
+    """Expressions materializing a translated derived column.
+
+    Rows that errored hold null, with the error code in a hidden column.
+    """
+    value = term.value
+    dtype = kind_dtype(term.kind)
+    if dtype is not None:
+        value = value.cast(dtype)
+    exprs: list[pl.Expr] = []
+    err_col = raised_col = None
+    code = term.raised if term.carried is None else (
+        term.carried if term.raised is None else pl.coalesce(term.raised, term.carried)
+    )
+    if code is not None:
+        err_col = _ERR_COL.format(name)
+        value = pl.when(code.is_null()).then(value)
+        exprs.append(code.alias(err_col))
+    if term.raised is not None:
+        raised_col = _RAISED_COL.format(name)
+        exprs.append(term.raised.is_not_null().alias(raised_col))
+    exprs.append(value.alias(name))
+    return exprs, err_col, raised_col
+
+
+def _apply_error_values(
+    rows: list[dict[str, Any]],
+    frame: pl.DataFrame,
+    error_cols: dict[str, str],
+) -> None:
+    """Replace errored cells with ``{"error": code}`` in place."""
+    for name, err_col in error_cols.items():
+        codes = frame[err_col]
+        for row_idx in codes.is_not_null().arg_true().to_list():
+            rows[row_idx][name] = {"error": codes[row_idx]}
+
+
+def _evaluate_rows(
+    contexts: list[dict[str, Any]],
+    derived: list[tuple[str, Tree]],
+    flags: list[tuple[int, Tree]],
+    eval_order: list[str],
+    error_stats: dict[str, tuple[int, int, int]],
+    fired: dict[int, list[int]],
+) -> None:
+    """Row-by-row fallback for expressions with no Polars translation.
+
+    Evaluates *derived* into each row context in place, records error stats
+    and the rows on which each flag fires.
+    """
+    for idx, _ in flags:
+        fired[idx] = []
+    for row_idx, row_context in enumerate(contexts):
+        for name, tree in derived:
+            try:
+                value = evaluate_row_tree(tree, row_context)
+            except ENGINE_ERRORS as exc:
+                value = {"error": _error_code(exc)}
+                first, pos, count = error_stats.get(
+                    name, (row_idx, eval_order.index(name), 0)
+                )
+                error_stats[name] = (first, pos, count + 1)
+            row_context[name] = value
+
+        for idx, tree in flags:
+            try:
+                if evaluate_row_tree(tree, row_context):
+                    fired[idx].append(row_idx)
+            except ENGINE_ERRORS:
+                pass  # Flag eval errors are silent — flag just doesn't trigger
+
+
+# ────────────────────────────────────────────────────────────────
+# Helpers
+# ────────────────────────────────────────────────────────────────
 
 
 def _build_compiled_columns(
@@ -0,0 +1,567 @@
+"""Polars expression translation for row-local worksheet expressions.
+
+Translates a parse tree from ``parse_row_expression()`` into Polars
+expressions, so a derived column is computed for every row in one
+``with_columns`` pass instead of one tree walk per row.
+
+Each translated node carries three expressions:
+
+- ``value``: the computed value.
+- ``raised``: the error code (``#DIV/0!``, ``#ERR!``, ...) the row evaluator
+  would raise at this row, or null.  Python's left-to-right evaluation order
+  is kept, so the first error wins.
+- ``carried``: the code of an error *value* passed through a reference to a
+  derived column that errored (the row evaluator stores ``{"error": code}``
+  in the row and only fails when an operator touches it).
+
+Results match ``evaluate_row_tree()`` including null handling, NaN
+comparisons and the lazy branches of ``IF``/``IFERROR``/``ISERROR``, with one
+deliberate difference: numeric branches of ``IF``/``IFERROR`` and mixed
+``MIN``/``MAX`` arguments are promoted to a common dtype (``1`` may come back
+as ``1.0``).  Anything that cannot be reproduced exactly raises
+``VectorizeError`` and the caller falls back to row-by-row evaluation:
+date functions, string arithmetic, mixed-type comparisons, and ``^`` with a
+non-literal or negative exponent.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+
+import polars as pl
+from lark import Token, Tree
+
+from fin123.formulas.evaluator import _eval_token, _parse_number
+from fin123.formulas.vectorized import VectorizeError
+
+# Value kinds tracked at translation time
+_NUMERIC = frozenset({"int", "float", "bool"})
+
+_ERR = "#ERR!"
+_DIV0 = "#DIV/0!"
+
+
+@dataclass(frozen=True)
+class RowExpr:
+    """A translated row-local expression.
+
+    ``raised`` and ``carried`` are ``None`` when statically never set.
+    """
+
+    value: pl.Expr
+    kind: str
+    raised: pl.Expr | None = None
+    carried: pl.Expr | None = None
+
+
+def column_kind(dtype: pl.DataType) -> str:
+    """Map a Polars dtype to a translation kind."""
+    if dtype == pl.Boolean:
+        return "bool"
+    if dtype.is_integer():
+        return "int"
+    if dtype.is_float():
+        return "float"
+    if dtype == pl.String:
+        return "str"
+    return "other"
+
+
+def kind_dtype(kind: str) -> pl.DataType | None:
+    """Return the dtype a derived column of *kind* is materialized as."""
+    return {
+        "int": pl.Int64,
+        "float": pl.Float64,
+        "bool": pl.Boolean,
+        "str": pl.String,
+    }.get(kind)
+
+
+def translate_row_tree(
+    tree: Tree | Token,
+    columns: dict[str, RowExpr],
+) -> RowExpr:
+    """Translate a row-local parse tree into Polars expressions.
+
+    Args:
+        tree: Parse tree from ``parse_row_expression()``.
+        columns: Referenceable names mapped to their translated form
+            (source columns and already-materialized derived columns).
+
+    Returns:
+        The translated expression.
+
+    Raises:
+        VectorizeError: If the expression has no exact Polars equivalent.
+    """
+    return _translate(tree, columns)
+
+
+def truthy(term: RowExpr) -> pl.Expr:
+    """Python truthiness of a translated value, as a non-null Boolean."""
+    v = term.value
+    if term.kind == "bool":
+        base = v.fill_null(False)
+    elif term.kind in ("int", "float"):
+        # NaN is truthy in Python; Polars also treats NaN != 0
+        base = (v != 0).fill_null(False)
+    elif term.kind == "str":
+        base = (v.str.len_bytes() > 0).fill_null(False)
+    else:
+        raise VectorizeError(f"Truthiness of {term.kind!r} values")
+    if term.carried is not None:
+        # An error dict is a non-empty dict, hence truthy
+        base = base | term.carried.is_not_null()
+    return base
+
+
+# ---------------------------------------------------------------------------
+# Expression helpers
+# ---------------------------------------------------------------------------
+
+
+def _null_code() -> pl.Expr:
+    return pl.lit(None, dtype=pl.String)
+
+
+def _first_error(*codes: pl.Expr | None) -> pl.Expr | None:
+    """Coalesce error codes in evaluation order."""
+    present = [c for c in codes if c is not None]
+    if not present:
+        return None
+    if len(present) == 1:
+        return present[0]
+    return pl.coalesce(present)
+
+
+def _error_if(cond: pl.Expr, code: str) -> pl.Expr:
+    return pl.when(cond).then(pl.lit(code)).otherwise(_null_code())
+
+
+def _pick(cond: pl.Expr, a: pl.Expr | None, b: pl.Expr | None) -> pl.Expr | None:
+    """Per-row choice between two optional code expressions."""
+    if a is None and b is None:
+        return None
+    return (
+        pl.when(cond)
+        .then(a if a is not None else _null_code())
+        .otherwise(b if b is not None else _null_code())
+    )
+
+
+def _unusable(*terms: RowExpr) -> pl.Expr:
+    """Rows where an operand is None or an error dict (a TypeError)."""
+    cond = terms[0].value.is_null()
+    for t in terms[1:]:
+        cond = cond | t.value.is_null()
+    for t in terms:
+        if t.carried is not None:
+            cond = cond | t.carried.is_not_null()
+    return cond
+
+
+def _num(term: RowExpr) -> pl.Expr:
+    """Numeric value, with booleans as integers as in Python."""
+    if term.kind not in _NUMERIC:
+        raise VectorizeError(f"Arithmetic on {term.kind!r} values")
+    if term.kind == "bool":
+        return term.value.cast(pl.Int64)
+    return term.value
+
+
+def _numeric_kind(*terms: RowExpr) -> str:
+    return "float" if any(t.kind == "float" for t in terms) else "int"
+
+
+def _is_nan(term: RowExpr) -> pl.Expr | None:
+    if term.kind != "float":
+        return None
+    return term.value.is_nan().fill_null(False)
+
+
+def _comparable(a: RowExpr, b: RowExpr) -> tuple[pl.Expr, pl.Expr]:
+    """Operands for a comparison, or VectorizeError if kinds differ."""
+    if a.kind in _NUMERIC and b.kind in _NUMERIC:
+        return _num(a), _num(b)
+    if a.kind == b.kind == "str":
+        return a.value, b.value
+    raise VectorizeError(f"Comparison between {a.kind!r} and {b.kind!r}")
+
+
+def _python_lt(a: RowExpr, b: RowExpr) -> pl.Expr:
+    """``a < b`` with Python NaN semantics (any NaN compares False)."""
+    left, right = _comparable(a, b)
+    result = left < right
+    for nan in (_is_nan(a), _is_nan(b)):
+        if nan is not None:
+            result = result & ~nan
+    return result
+
+
+def _combine_kinds(a: RowExpr, b: RowExpr) -> str:
+    """Kind of a value chosen per row from two branches."""
+    if a.kind == b.kind and a.kind != "other":
+        return a.kind
+    if a.kind in ("int", "float") and b.kind in ("int", "float"):
+        return "float"
+    raise VectorizeError(f"Branches of kinds {a.kind!r} and {b.kind!r}")
+
+
+# ---------------------------------------------------------------------------
+# Translation
+# ---------------------------------------------------------------------------
+
+
+def _translate(node: Tree | Token, columns: dict[str, RowExpr]) -> RowExpr:
+    if isinstance(node, Token):
+        return _literal(_eval_token(node))
+
+    rule = node.data
+    children = node.children
+
+    if rule == "start":
+        return _translate(children[0], columns)
+    if rule == "number":
+        return _literal(_parse_number(children[0]))
+    if rule == "boolean":
+        return _literal(str(children[0]) == "TRUE")
+    if rule == "string":
+        raw = str(children[0])
+        return _literal(raw[1:-1].replace('\\"', '"').replace("\\\\", "\\"))
+
+    if rule in ("ref_bare", "ref_dollar"):
+        name = str(children[0])
+        if name not in columns:
+            raise VectorizeError(f"Unknown column {name!r}")
+        return columns[name]
+
+    if rule in _ARITHMETIC:
+        return _arithmetic(rule, _translate(children[0], columns), _translate(children[1], columns))
+    if rule == "div":
+        return _divide(_translate(children[0], columns), _translate(children[1], columns))
+    if rule == "pow":
+        return _power(_translate(children[0], columns), children[1])
+    if rule in _ORDERING:
+        return _ordering(rule, _translate(children[0], columns), _translate(children[1], columns))
+    if rule in ("eq", "neq"):
+        return _equality(rule, _translate(children[0], columns), _translate(children[1], columns))
+
+    if rule == "pos":
+        return _translate(children[0], columns)
+    if rule == "neg":
+        inner = _translate(children[0], columns)
+        return RowExpr(
+            value=-_num(inner),
+            kind=_numeric_kind(inner),
+            raised=_first_error(inner.raised, _error_if(_unusable(inner), _ERR)),
+        )
+    if rule == "percent":
+        inner = _translate(children[0], columns)
+        return RowExpr(
+            value=_true_divide(_num(inner), pl.lit(100)),
+            kind="float",
+            raised=_first_error(inner.raised, _error_if(_unusable(inner), _ERR)),
+        )
+
+    if rule == "func_call":
+        return _translate_func(node, columns)
+
+    raise VectorizeError(f"Node type {rule!r} cannot be translated")
+
+
+def _literal(value: object) -> RowExpr:
+    if isinstance(value, bool):
+        kind = "bool"
+    elif isinstance(value, int):
+        kind = "int"
+    elif isinstance(value, float):
+        kind = "float"
+    elif isinstance(value, str):
+        kind = "str"
+    else:
+        raise VectorizeError(f"Literal of type {type(value).__name__}")
+    return RowExpr(value=pl.lit(value), kind=kind)
+
+
+_ARITHMETIC: dict[str, Callable[[pl.Expr, pl.Expr], pl.Expr]] = {
+    "add": lambda a, b: a + b,
+    "sub": lambda a, b: a - b,
+    "mul": lambda a, b: a * b,
+}
+
+
+def _arithmetic(rule: str, a: RowExpr, b: RowExpr) -> RowExpr:
+    value = _ARITHMETIC[rule](_num(a), _num(b))
+    return RowExpr(
+        value=value,
+        kind=_numeric_kind(a, b),
+        raised=_first_error(a.raised, b.raised, _error_if(_unusable(a, b), _ERR)),
+    )
+
+
+def _true_divide(left: pl.Expr, right: pl.Expr) -> pl.Expr:
+    """``left / right`` with Python's rounding for every row.
+
+    Polars divides a column by a scalar as a multiply by its reciprocal,
+    which is not exact (``1.75 / 2.5`` gives ``0.7000000000000001``).  The
+    denominator is always materialized as a full column first, since one
+    that references a column can still reduce to a literal in some rows
+    (``IF(a > 5, a, 2.5)``), so each row is a true division.
+    """
+    return left / (pl.int_range(pl.len()) * 0 + right)
+
+
+def _divide(a: RowExpr, b: RowExpr) -> RowExpr:
+    left, right = _num(a), _num(b)
+    # The evaluator checks for a zero denominator before the operand types
+    zero = right == 0
+    if b.carried is not None:
+        zero = zero & b.carried.is_null()
+    return RowExpr(
+        value=_true_divide(left, right),
+        kind="float",
+        raised=_first_error(
+            a.raised, b.raised, _error_if(zero, _DIV0), _error_if(_unusable(a, b), _ERR),
+        ),
+    )
+
+
+def _power(base: RowExpr, exp_node: Tree | Token) -> RowExpr:
+    # int ** negative int is a float in Python; only non-negative integer
+    # literal exponents keep Python's result type
+    if not (isinstance(exp_node, Tree) and exp_node.data == "number"):
+        raise VectorizeError("Non-literal exponent")
+    exponent = _parse_number(exp_node.children[0])
+    if not isinstance(exponent, int) or exponent < 0:
+        raise VectorizeError("Exponent must be a non-negative integer literal")
+    value = _num(base)
+    if base.kind == "float":
+        # A literal power of a float column takes Polars' repeated-multiply
+        # kernel, which is not bit-identical to Python's ``**``; a broadcast
+        # exponent column takes the same pow() as per-row evaluation
+        value = value.pow(pl.int_range(pl.len()) * 0 + exponent)
+    else:
+        value = value.pow(exponent)
+    return RowExpr(
+        value=value,
+        kind=_numeric_kind(base),
+        raised=_first_error(base.raised, _error_if(_unusable(base), _ERR)),
+    )
+
+
+_ORDERING = ("gt", "lt", "gte", "lte")
+
+
+def _ordering(rule: str, a: RowExpr, b: RowExpr) -> RowExpr:
+    if rule == "gt":
+        value = _python_lt(b, a)
+    elif rule == "lt":
+        value = _python_lt(a, b)
+    else:
+        left, right = _comparable(a, b)
+        value = left >= right if rule == "gte" else left <= right
+        for nan in (_is_nan(a), _is_nan(b)):
+            if nan is not None:
+                value = value & ~nan
+    return RowExpr(
+        value=value,
+        kind="bool",
+        raised=_first_error(a.raised, b.raised, _error_if(_unusable(a, b), _ERR)),
+    )
+
+
+def _equality(rule: str, a: RowExpr, b: RowExpr) -> RowExpr:
+    left, right = _comparable(a, b)
+    # None == None is True in Python; NaN never equals anything
+    value = left.eq_missing(right)
+    for nan in (_is_nan(a), _is_nan(b)):
+        if nan is not None:
+            value = value & ~nan
+    if a.carried is not None or b.carried is not None:
+        ca = a.carried if a.carried is not None else _null_code()
+        cb = b.carried if b.carried is not None else _null_code()
+        value = (
+            pl.when(ca.is_not_null() | cb.is_not_null())
+            .then(ca.eq_missing(cb))
+            .otherwise(value)
+        )
+    if rule == "neq":
+        value = ~value
+    return RowExpr(value=value, kind="bool", raised=_first_error(a.raised, b.raised))
+
+
+# ---------------------------------------------------------------------------
+# Functions
+# ---------------------------------------------------------------------------
+
+
+def _translate_func(node: Tree, columns: dict[str, RowExpr]) -> RowExpr:
+    func_name = str(node.children[0]).upper()
+    args_node = node.children[1]
+    raw_args = list(args_node.children) if args_node.children else []
+
+    if func_name == "IF":
+        return _translate_if(raw_args, columns)
+    if func_name == "IFERROR":
+        return _translate_iferror(raw_args, columns)
+    if func_name == "ISERROR":
+        if len(raw_args) != 1:
+            raise VectorizeError("ISERROR arity")
+        inner = _translate(raw_args[0], columns)
+        value = inner.raised.is_not_null() if inner.raised is not None else pl.lit(False)
+        return RowExpr(value=value, kind="bool")
+
+    if func_name == "ROUND":
+        return _translate_round(raw_args, columns)
+
+    impl = _FUNCTIONS.get(func_name)
+    if impl is None:
+        raise VectorizeError(f"{func_name} cannot be translated")
+    args = [_translate(arg, columns) for arg in raw_args]
+    if not args:
+        raise VectorizeError(f"{func_name} arity")
+    return impl(args)
+
+
+def _translate_if(raw_args: list, columns: dict[str, RowExpr]) -> RowExpr:
+    if len(raw_args) not in (2, 3):
+        raise VectorizeError("IF arity")
+    cond = _translate(raw_args[0], columns)
+    then = _translate(raw_args[1], columns)
+    other = _translate(raw_args[2], columns) if len(raw_args) == 3 else _literal(False)
+    taken = truthy(cond)
+    return RowExpr(
+        value=pl.when(taken).then(then.value).otherwise(other.value),
+        kind=_combine_kinds(then, other),
+        raised=_first_error(cond.raised, _pick(taken, then.raised, other.raised)),
+        carried=_pick(taken, then.carried, other.carried),
+    )
+
+
+def _translate_iferror(raw_args: list, columns: dict[str, RowExpr]) -> RowExpr:
+    if len(raw_args) != 2:
+        raise VectorizeError("IFERROR arity")
+    value = _translate(raw_args[0], columns)
+    fallback = _translate(raw_args[1], columns)
+    if value.raised is None:
+        return value
+    failed = value.raised.is_not_null()
+    return RowExpr(
+        value=pl.when(failed).then(fallback.value).otherwise(value.value),
+        kind=_combine_kinds(value, fallback),
+        raised=_pick(failed, fallback.raised, None),
+        carried=_pick(failed, fallback.carried, value.carried),
+    )
+
+
+def _eager_raised(args: list[RowExpr], numeric: bool = True) -> pl.Expr | None:
+    """Errors of an eager call: argument errors, then operand TypeErrors."""
+    arg_errors = [a.raised for a in args]
+    if numeric:
+        arg_errors.append(_error_if(_unusable(*args), _ERR))
+    return _first_error(*arg_errors)
+
+
+def _fn_sum(args: list[RowExpr]) -> RowExpr:
+    # sum() starts from 0, so a lone boolean becomes an int
+    total = _num(args[0])
+    for a in args[1:]:
+        total = total + _num(a)
+    return RowExpr(value=total, kind=_numeric_kind(*args), raised=_eager_raised(args))
+
+
+def _fn_average(args: list[RowExpr]) -> RowExpr:
+    total = _fn_sum(args)
+    return RowExpr(
+        value=_true_divide(total.value, pl.lit(len(args))), kind="float", raised=total.raised,
+    )
+
+
+def _min_max(args: list[RowExpr], smaller: bool) -> RowExpr:
+    # Python's min/max keep the running best and replace it only on a
+    # strict comparison, which NaN never satisfies
+    if len(args) == 1:
+        # min() of a single value returns it untouched, even None
+        return args[0]
+    for a in args:
+        _num(a)
+    best = args[0]
+    for a in args[1:]:
+        replace = _python_lt(a, best) if smaller else _python_lt(best, a)
+        best = RowExpr(
+            value=pl.when(replace).then(_num(a)).otherwise(_num(best)),
+            kind=_numeric_kind(a, best),
+        )
+    kind = "int" if best.kind == "bool" else best.kind
+    return RowExpr(value=_num(best), kind=kind, raised=_eager_raised(args))
+
+
+def _fn_abs(args: list[RowExpr]) -> RowExpr:
+    if len(args) != 1:
+        raise VectorizeError("ABS arity")
+    return RowExpr(value=_num(args[0]).abs(), kind=_numeric_kind(args[0]), raised=_eager_raised(args))
+
+
+def _translate_round(raw_args: list, columns: dict[str, RowExpr]) -> RowExpr:
+    # Python's round() is correctly rounded (half-even on the exact binary
+    # value); Polars rounds the scaled value.  Apply round() per element so
+    # results match exactly; this is still far cheaper than a tree walk.
+    if len(raw_args) not in (1, 2):
+        raise VectorizeError("ROUND arity")
+    digits = 0
+    if len(raw_args) == 2:
+        node = raw_args[1]
+        if not (isinstance(node, Tree) and node.data == "number"):
+            raise VectorizeError("ROUND digits must be a literal")
+        digits = int(_parse_number(node.children[0]))
+    return _round(_translate(raw_args[0], columns), digits)
+
+
+def _round(arg: RowExpr, digits: int) -> RowExpr:
+    kind = "float" if arg.kind == "float" else "int"
+    dtype = kind_dtype(kind)
+
+    def apply(s: pl.Series) -> pl.Series:
+        return pl.Series(
+            [None if v is None else round(v, digits) for v in s.to_list()],
+            dtype=dtype,
+        )
+
+    return RowExpr(
+        value=_num(arg).map_batches(apply, return_dtype=dtype),
+        kind=kind,
+        raised=_eager_raised([arg]),
+    )
+
+
+def _fn_and(args: list[RowExpr]) -> RowExpr:
+    value = truthy(args[0])
+    for a in args[1:]:
+        value = value & truthy(a)
+    return RowExpr(value=value, kind="bool", raised=_eager_raised(args, numeric=False))
+
+
+def _fn_or(args: list[RowExpr]) -> RowExpr:
+    value = truthy(args[0])
+    for a in args[1:]:
+        value = value | truthy(a)
+    return RowExpr(value=value, kind="bool", raised=_eager_raised(args, numeric=False))
+
+
+def _fn_not(args: list[RowExpr]) -> RowExpr:
+    if len(args) != 1:
+        raise VectorizeError("NOT arity")
+    return RowExpr(value=~truthy(args[0]), kind="bool", raised=_eager_raised(args, numeric=False))
+
+
+_FUNCTIONS: dict[str, Callable[[list[RowExpr]], RowExpr]] = {
+    "SUM": _fn_sum,
+    "AVERAGE": _fn_average,
+    "MIN": lambda args: _min_max(args, smaller=True),
+    "MAX": lambda args: _min_max(args, smaller=False),
+    "ABS": _fn_abs,
+    "AND": _fn_and,
+    "OR": _fn_or,
+    "NOT": _fn_not,
+}
@@ -23,6 +23,7 @@ from typing import Any
 from lark import Visitor, Tree
 
 from fin123.formulas.parser import parse_formula
+from fin123.formulas.shared import parse_at
 from fin123.formulas.evaluator import _FUNC_TABLE
 
 
@@ -143,9 +144,15 @@ def _format_non_ascii(chars: list[tuple[str, str, int]]) -> str:
     return ", ".join(parts)
 
 
-def classify_formula(formula_str: str) -> dict[str, Any]:
+def classify_formula(
+    formula_str: str, origin: tuple[int, int] | None = None
+) -> dict[str, Any]:
     """Classify a formula string into one of 5 categories.
 
+    When *origin* (0-based row, col of the holding cell) is given, the
+    formula is parsed through its shared relative shape, so a
+    filled-down column is parsed once rather than once per row.
+
     Returns dict with:
         classification: "supported" | "unsupported_function" | "parse_error"
                        | "external_link" | "plugin_formula"
@@ -177,7 +184,10 @@ def classify_formula(formula_str: str) -> dict[str, Any]:
 
     # 3. Attempt parse
     try:
-        tree = parse_formula(formula_str)
+        if origin is not None:
+            tree = parse_at(formula_str, *origin)
+        else:
+            tree = parse_formula(formula_str)
         funcs = _extract_function_names_ast(tree)
         result["functions_used"] = funcs
         unsupported = [f for f in funcs if f not in _SUPPORTED_FUNCTIONS]
@@ -409,7 +419,7 @@ def import_xlsx(
 
                     # Classify formula (Part A)
                     stored_formula = cells[addr]["formula"]
-                    cls = classify_formula(stored_formula)
+                    cls = classify_formula(stored_formula, (row_idx - 1, col_idx - 1))
                     cls_entry = {
                         "sheet": sheet_name,
                         "addr": addr,
@@ -0,0 +1,176 @@
+"""Tests for the buffered background event sink."""
+
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+
+import pytest
+import yaml
+
+import fin123.logging.events as events_mod
+from fin123.logging.events import (
+    EventLevel,
+    EventType,
+    Fin123Event,
+    emit,
+    make_run_event,
+    set_project_dir,
+)
+from fin123.logging.sink import AsyncEventSink, EventSink
+from fin123.workbook import Workbook
+
+
+def _event(i: int) -> Fin123Event:
+    return Fin123Event(
+        level=EventLevel.info,
+        event_type=EventType.assertion_pass,
+        message=f"event {i}",
+        context={"run_id": "r1", "i": i},
+    )
+
+
+def _lines(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.fixture
+def restore_sink():
+    old = events_mod._sink
+    yield
+    events_mod._close_sink()
+    events_mod._sink = old
+
+
+class TestAsyncEventSink:
+    def test_batches_preserve_order(self, tmp_path: Path) -> None:
+        sink = AsyncEventSink(tmp_path)
+        appends: list[Path] = []
+        original = sink._append
+
+        def counting(path, data):
+            appends.append(path)
+            original(path, data)
+
+        sink._append = counting
+        for i in range(200):
+            sink.write(_event(i), run_id="r1")
+        assert sink.flush(timeout=10)
+
+        for path in (tmp_path / "logs" / "events.ndjson", tmp_path / "logs" / "runs" / "r1.ndjson"):
+            assert [e["context"]["i"] for e in _lines(path)] == list(range(200))
+        # Coalesced: far fewer appends than 2 per event
+        assert len(appends) < 200
+        assert sink.stats() == {"written": 200, "queued": 0, "delayed": 0, "dropped": 0}
+        sink.close()
+
+    def test_output_matches_sync_sink(self, tmp_path: Path) -> None:
+        sync_dir, async_dir = tmp_path / "s", tmp_path / "a"
+        sync, buffered = EventSink(sync_dir), AsyncEventSink(async_dir)
+        for i in range(20):
+            event = _event(i)
+            sync.write(event, run_id="r1", sync_id="s1")
+            buffered.write(event, run_id="r1", sync_id="s1")
+        buffered.close()
+        for rel in ("events.ndjson", "runs/r1.ndjson", "sync/s1.ndjson"):
+            assert (async_dir / "logs" / rel).read_bytes() == (sync_dir / "logs" / rel).read_bytes()
+
+    def test_reads_see_queued_events(self, tmp_path: Path) -> None:
+        sink = AsyncEventSink(tmp_path, linger=10)
+        sink.write(_event(1), run_id="r1")
+        assert [e["message"] for e in sink.read_run_log("r1")] == ["event 1"]
+        sink.close()
+
+    def _stalled(self, tmp_path: Path, overflow: str) -> tuple[AsyncEventSink, threading.Event]:
+        sink = AsyncEventSink(tmp_path, max_buffer=2, overflow=overflow, linger=0)
+        release = threading.Event()
+        original = sink._write_batch
+
+        def slow(batch):
+            release.wait(10)
+            original(batch)
+
+        sink._write_batch = slow
+        return sink, release
+
+    def test_drop_policy(self, tmp_path: Path) -> None:
+        sink, release = self._stalled(tmp_path, "drop")
+        for i in range(10):
+            sink.write(_event(i))
+        release.set()
+        sink.close()
+        stats = sink.stats()
+        assert stats["dropped"] > 0
+        assert stats["written"] + stats["dropped"] == 10
+        assert len(_lines(tmp_path / "logs" / "events.ndjson")) == stats["written"]
+
+    def test_block_policy(self, tmp_path: Path) -> None:
+        sink, release = self._stalled(tmp_path, "block")
+        writer = threading.Thread(target=lambda: [sink.write(_event(i)) for i in range(10)])
+        writer.start()
+        writer.join(0.3)
+        assert writer.is_alive()  # backpressure: waiting for buffer space
+        release.set()
+        writer.join(10)
+        sink.close()
+        stats = sink.stats()
+        assert stats["delayed"] > 0 and stats["dropped"] == 0
+        assert len(_lines(tmp_path / "logs" / "events.ndjson")) == 10
+
+    def test_invalid_options(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match="logging_async_overflow"):
+            AsyncEventSink(tmp_path, overflow="spill")
+        with pytest.raises(ValueError, match="logging_async_buffer"):
+            AsyncEventSink(tmp_path, max_buffer=0)
+
+    def test_writes_synchronously_after_close(self, tmp_path: Path) -> None:
+        sink = AsyncEventSink(tmp_path)
+        sink.close()
+        sink.write(_event(1))
+        assert len(_lines(tmp_path / "logs" / "events.ndjson")) == 1
+
+
+class TestAsyncLoggingConfig:
+    def test_opt_in_and_reused(self, tmp_path: Path, restore_sink) -> None:
+        set_project_dir(tmp_path)
+        assert type(events_mod._sink) is EventSink
+
+        (tmp_path / "fin123.yaml").write_text(yaml.dump({"logging_async": True}))
+        set_project_dir(tmp_path)
+        first = events_mod._sink
+        assert isinstance(first, AsyncEventSink)
+        set_project_dir(tmp_path)
+        assert events_mod._sink is first
+
+    def test_run_completed_flushes(self, tmp_path: Path, restore_sink) -> None:
+        (tmp_path / "fin123.yaml").write_text(yaml.dump({"logging_async": True}))
+        set_project_dir(tmp_path)
+        events_mod._sink.linger = 10
+        emit(make_run_event(
+            EventType.run_completed, EventLevel.info, "done", run_id="r1", model_id="m"
+        ), run_id="r1")
+        assert events_mod._sink.stats()["queued"] == 0
+        assert len(_lines(tmp_path / "logs" / "runs" / "r1.ndjson")) == 1
+
+    def test_build_log_complete_on_return(self, tmp_path: Path, restore_sink) -> None:
+        spec = {"params": {"x": 1}, "outputs": [{"name": "y", "type": "scalar", "formula": "=x + 1"}]}
+        (tmp_path / "workbook.yaml").write_text(yaml.dump(spec))
+        (tmp_path / "fin123.yaml").write_text(yaml.dump({"logging_async": True}))
+        result = Workbook(tmp_path).run()
+        run_log = _lines(tmp_path / "logs" / "runs" / f"{result.run_dir.name}.ndjson")
+        assert run_log[-1]["event_type"] == "run_completed"
+
+    def test_invalid_options_fall_back_to_sync(self, tmp_path: Path, restore_sink) -> None:
+        spec = {"params": {"x": 1}, "outputs": [{"name": "y", "type": "scalar", "formula": "=x + 1"}]}
+        (tmp_path / "workbook.yaml").write_text(yaml.dump(spec))
+        for options in (
+            {"logging_async_overflow": "drop_oldest"},
+            {"logging_async_buffer": 0},
+            {"logging_async_buffer": "lots"},
+        ):
+            (tmp_path / "fin123.yaml").write_text(yaml.dump({"logging_async": True, **options}))
+            assert Workbook(tmp_path).run().scalars["y"] == 2
+            assert type(events_mod._sink) is EventSink
+            assert events_mod._project_dir == tmp_path
+
@@ -0,0 +1,168 @@
+"""Tests for the warm worker pool behind parallel batch builds."""
+
+from __future__ import annotations
+
+import json
+from concurrent.futures import Future
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+from fin123 import batch as batch_mod
+from fin123 import table_cache as table_cache_mod
+from fin123.batch import run_batch
+from fin123.workbook import Workbook
+
+
+@pytest.fixture
+def project_dir(tmp_path: Path) -> Path:
+    from fin123.project import scaffold_project
+
+    return scaffold_project(tmp_path / "proj")
+
+
+@pytest.fixture
+def pools():
+    yield batch_mod._pools
+    batch_mod.shutdown_pools()
+
+
+def _rows(n: int) -> list[dict]:
+    return [{"discount_rate": 0.05 + i / 100} for i in range(n)]
+
+
+def _meta(project_dir: Path, run_id: str) -> dict:
+    return json.loads((project_dir / "runs" / run_id / "run_meta.json").read_text())
+
+
+class TestParallelBatch:
+    def test_matches_sequential(self, project_dir: Path, pools) -> None:
+        rows = _rows(10)
+        progress: list[tuple[int, int]] = []
+        parallel = run_batch(
+            project_dir, rows, max_workers=3,
+            on_progress=lambda r, done, total: progress.append((done, total)),
+        )
+        sequential = run_batch(project_dir, rows)
+
+        assert parallel["ok"] == sequential["ok"] == 10
+        assert [r["index"] for r in parallel["results"]] == list(range(10))
+        assert [r["params"] for r in parallel["results"]] == rows
+        assert progress == [(i, 10) for i in range(1, 11)]
+        for par, seq in zip(parallel["results"], sequential["results"]):
+            par_meta, seq_meta = _meta(project_dir, par["run_id"]), _meta(project_dir, seq["run_id"])
+            assert par_meta["export_hash"] == seq_meta["export_hash"]
+            assert par_meta["build_batch_id"] == parallel["build_batch_id"]
+            assert par_meta["batch_index"] == par["index"]
+
+    def test_run_ids_unique(self, project_dir: Path, pools) -> None:
+        summary = run_batch(project_dir, _rows(16), max_workers=4)
+        run_ids = [r["run_id"] for r in summary["results"]]
+        assert len(set(run_ids)) == 16
+        assert all((project_dir / "runs" / rid / "run_meta.json").exists() for rid in run_ids)
+
+    def test_pool_reused_and_sees_input_changes(self, project_dir: Path, pools) -> None:
+        first = run_batch(project_dir, _rows(2), max_workers=2)
+        pool = next(iter(pools.values()))
+
+        prices = project_dir / "inputs" / "prices.csv"
+        prices.write_text(prices.read_text().rstrip("\n") + "\n" + prices.read_text().splitlines()[1] + "\n")
+        second = run_batch(project_dir, _rows(2), max_workers=2)
+
+        assert next(iter(pools.values())) is pool and len(pools) == 1
+        before = _meta(project_dir, first["results"][0]["run_id"])
+        after = _meta(project_dir, second["results"][0]["run_id"])
+        assert before["input_hashes"] != after["input_hashes"]
+        assert before["export_hash"] != after["export_hash"]
+
+    def test_progress_events(self, project_dir: Path, pools) -> None:
+        summary = run_batch(project_dir, _rows(4), max_workers=2)
+        events = [
+            json.loads(line)
+            for line in (project_dir / "logs" / "events.ndjson").read_text().splitlines()
+        ]
+        progress = [
+            e for e in events
+            if e["event_type"] == "batch_progress"
+            and e["context"]["build_batch_id"] == summary["build_batch_id"]
+        ]
+        assert progress and progress[-1]["context"]["ok"] == 4
+
+
+class TestPoolLifetime:
+    def test_busy_pool_is_not_evicted(self, tmp_path: Path, pools, monkeypatch) -> None:
+        monkeypatch.setattr(batch_mod, "_MAX_POOLS", 1)
+        first = batch_mod._acquire_pool(tmp_path / "a", 2)
+        second = batch_mod._acquire_pool(tmp_path / "b", 2)
+        # Both in use: the limit is exceeded rather than cancelling work
+        assert list(pools.values()) == [first, second]
+        assert not first._shutdown_thread
+
+        batch_mod._release_pool(tmp_path / "a", 2, first)
+        assert list(pools.values()) == [second] and first._shutdown_thread
+        batch_mod._release_pool(tmp_path / "b", 2, second)
+        assert list(pools.values()) == [second] and not second._shutdown_thread
+
+    def test_cancelled_rows_are_reported(self, project_dir: Path, pools, monkeypatch) -> None:
+        real_acquire = batch_mod._acquire_pool
+
+        def acquire_cancelling(*args):
+            # As if the pool were shut down before the chunks ran
+            pool = real_acquire(*args)
+
+            def submit(*a, **kw) -> Future:
+                future: Future = Future()
+                future.cancel()
+                future.set_running_or_notify_cancel()
+                return future
+
+            monkeypatch.setattr(pool, "submit", submit)
+            return pool
+
+        monkeypatch.setattr(batch_mod, "_acquire_pool", acquire_cancelling)
+        summary = run_batch(project_dir, _rows(3), max_workers=2)
+        assert summary["total"] == 3 and summary["failed"] == 3
+        assert all("Worker process failed" in r["error"] for r in summary["results"])
+
+
+class TestSpecCache:
+    def test_spec_parsed_once_per_text(self, project_dir: Path, monkeypatch) -> None:
+        spec_path = project_dir / "workbook.yaml"
+        parsed: list[str] = []
+
+        def counting_load(stream):
+            parsed.append(stream)
+            return yaml.safe_load(stream)
+
+        monkeypatch.setattr(batch_mod, "_spec_cache", None)
+        monkeypatch.setattr(batch_mod, "yaml", SimpleNamespace(safe_load=counting_load))
+        assert run_batch(project_dir, _rows(3))["ok"] == 3
+        assert len(parsed) == 1
+
+        spec = yaml.safe_load(spec_path.read_text())
+        spec["params"]["discount_rate"] = 0.5
+        spec_path.write_text(yaml.safe_dump(spec))
+        summary = run_batch(project_dir, [{}])
+        assert len(parsed) == 2
+        assert _meta(project_dir, summary["results"][0]["run_id"])["effective_params"]["discount_rate"] == 0.5
+
+    def test_builds_get_private_spec_copies(self, project_dir: Path, monkeypatch) -> None:
+        monkeypatch.setattr(batch_mod, "_spec_cache", None)
+        _, first = batch_mod._load_spec(project_dir)
+        first["params"].clear()
+        _, second = batch_mod._load_spec(project_dir)
+        assert second["params"]
+
+
+class TestWarmUp:
+    def test_worker_init_fills_table_cache(self, project_dir: Path, monkeypatch) -> None:
+        monkeypatch.setattr(table_cache_mod, "_memory", type(table_cache_mod._memory)())
+        batch_mod._init_worker(str(project_dir))
+        result = Workbook(project_dir, overrides={"discount_rate": 0.2}).run()
+        assert result.timings_ms["table_cache"]["hits"] > 0
+        assert result.timings_ms["table_cache"]["misses"] == 0
+
+    def test_worker_init_tolerates_broken_project(self, tmp_path: Path) -> None:
+        batch_mod._init_worker(str(tmp_path / "missing"))
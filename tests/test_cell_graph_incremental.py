@@ -0,0 +1,142 @@
+"""Tests for incremental CellGraph recalculation."""
+
+from __future__ import annotations
+
+import random
+from pathlib import Path
+from typing import Any
+
+import pytest
+import yaml
+
+import fin123.cell_graph as cell_graph_mod
+from fin123.cell_graph import CellGraph
+from fin123.ui.service import ProjectService
+
+
+def _sheets() -> dict[str, dict[str, Any]]:
+    return {
+        "Inputs": {
+            "A1": {"value": 10},
+            "A2": {"value": 20},
+            "A3": {"value": 30},
+            "B1": {"value": 5},
+        },
+        "Calc": {
+            "A1": {"formula": "=Inputs!A1 * 2"},
+            "A2": {"formula": "=A1 + 1"},
+            "A3": {"formula": "=SUM(block)"},
+            "A4": {"formula": "=IF(Inputs!B1 > 0, 1, 0)"},
+            "A5": {"formula": "=Inputs!B1 + 100"},
+        },
+    }
+
+
+_NAMES = {"block": {"sheet": "Inputs", "start": "A2", "end": "A3"}}
+
+
+@pytest.fixture
+def counting(monkeypatch) -> list[str]:
+    """Record every formula evaluated by CellGraph."""
+    calls: list[str] = []
+    original = cell_graph_mod.evaluate_formula
+
+    def spy(tree, *args, **kwargs):
+        calls.append(kwargs.get("current_sheet"))
+        return original(tree, *args, **kwargs)
+
+    monkeypatch.setattr(cell_graph_mod, "evaluate_formula", spy)
+    return calls
+
+
+class TestRecalculate:
+    def test_only_dependents_recompute(self, counting: list[str]) -> None:
+        sheets = _sheets()
+        cg = CellGraph(sheets, _NAMES)
+        cg.evaluate_all()
+        counting.clear()
+
+        sheets["Inputs"]["A1"] = {"value": 11}
+        changed = cg.recalculate("Inputs", ["A1"])
+        assert changed == [("Calc", "A1"), ("Calc", "A2"), ("Inputs", "A1")]
+        assert len(counting) == 2
+        assert cg.evaluate_cell("Calc", "A2") == 23
+
+    def test_named_range_membership(self) -> None:
+        sheets = _sheets()
+        cg = CellGraph(sheets, _NAMES)
+        cg.evaluate_all()
+
+        sheets["Inputs"]["A3"] = {"value": 31}
+        assert cg.recalculate("Inputs", ["A3"]) == [("Calc", "A3"), ("Inputs", "A3")]
+        assert cg.evaluate_cell("Calc", "A3") == 51
+        assert cg.dependents_of("Inputs", "A2") == {("Calc", "A3")}
+
+    def test_unchanged_results_are_not_reported(self) -> None:
+        sheets = _sheets()
+        cg = CellGraph(sheets, _NAMES)
+        cg.evaluate_all()
+
+        sheets["Inputs"]["B1"] = {"value": 6}
+        assert cg.recalculate("Inputs", ["B1"]) == [("Calc", "A5"), ("Inputs", "B1")]
+
+    def test_formula_edit_rewires_precedents(self) -> None:
+        sheets = _sheets()
+        cg = CellGraph(sheets, _NAMES)
+        cg.evaluate_all()
+
+        sheets["Calc"]["A2"] = {"formula": "=Inputs!B1"}
+        assert ("Calc", "A2") in cg.recalculate("Calc", ["A2"])
+        assert cg.dependents_of("Calc", "A1") == set()
+        assert cg.dependents_of("Inputs", "B1") == {("Calc", "A2"), ("Calc", "A4"), ("Calc", "A5")}
+
+    def test_cycle_introduced_by_edit(self) -> None:
+        sheets = _sheets()
+        cg = CellGraph(sheets, _NAMES)
+        cg.evaluate_all()
+
+        sheets["Inputs"]["A1"] = {"formula": "=Calc!A2"}
+        changed = cg.recalculate("Inputs", ["A1"])
+        assert ("Calc", "A2") in changed
+        assert cg.get_display_value("Calc", "A2") == "#CIRC!"
+
+    def test_matches_full_rebuild(self) -> None:
+        rng = random.Random(7)
+        sheets = _sheets()
+        cg = CellGraph(sheets, _NAMES)
+        cg.evaluate_all()
+        for _ in range(40):
+            addr = rng.choice(["A1", "A2", "A3", "B1"])
+            sheets["Inputs"][addr] = {"value": rng.randint(-5, 50)}
+            cg.recalculate("Inputs", [addr])
+            assert cg.evaluate_all() == CellGraph(sheets, _NAMES).evaluate_all()
+
+
+class TestServiceUpdateCells:
+    def test_changed_cells_returned(self, tmp_path: Path) -> None:
+        spec = {
+            "sheets": [{
+                "name": "Sheet1",
+                "n_rows": 20,
+                "n_cols": 5,
+                "cells": {
+                    "A1": {"value": 1},
+                    "B1": {"formula": "=A1 * 10"},
+                    "C1": {"formula": "=5"},
+                },
+            }],
+            "params": {},
+            "outputs": [],
+        }
+        (tmp_path / "workbook.yaml").write_text(yaml.dump(spec))
+        svc = ProjectService(project_dir=tmp_path)
+        svc.get_sheet_viewport("Sheet1")
+
+        result = svc.update_cells("Sheet1", [{"addr": "A1", "value": "2"}])
+        assert result["changed"] == [
+            {"sheet": "Sheet1", "addr": "A1", "display": "2"},
+            {"sheet": "Sheet1", "addr": "B1", "display": "20"},
+        ]
+
+        result = svc.update_cells("Sheet1", [{"addr": "A1", "value": ""}])
+        assert {c["addr"]: c["display"] for c in result["changed"]} == {"A1": "", "B1": "#ERR!"}
@@ -0,0 +1,166 @@
+"""Tests for the SUMIFS/COUNTIFS criteria index."""
+
+from __future__ import annotations
+
+import random
+
+import polars as pl
+import pytest
+
+from fin123.cell_graph import CellGraph
+from fin123.formulas import criteria_index as criteria_index_mod
+from fin123.formulas import parse_formula
+from fin123.formulas.criteria_index import indexed_countifs, indexed_sumifs
+from fin123.formulas.evaluator import evaluate_formula
+from fin123.scalars import ScalarGraph
+
+
+def _facts(n: int = 2000) -> pl.DataFrame:
+    rng = random.Random(3)
+    return pl.DataFrame({
+        "region": [rng.choice(["N", "S", "E", None]) for _ in range(n)],
+        "year": [rng.randint(2018, 2025) for _ in range(n)],
+        "score": [rng.choice([None, -0.0, 0.0, 1.5, 2.5, 10.0]) for _ in range(n)],
+        "amount": [rng.gauss(0, 1) * 1e6 for _ in range(n)],
+        "units": [rng.randint(0, 9) for _ in range(n)],
+    })
+
+
+def _filtered(df: pl.DataFrame, criteria: list[tuple]) -> pl.DataFrame:
+    ops = {
+        "=": lambda c, v: pl.col(c) == v,
+        ">": lambda c, v: pl.col(c) > v,
+        ">=": lambda c, v: pl.col(c) >= v,
+        "<": lambda c, v: pl.col(c) < v,
+        "<=": lambda c, v: pl.col(c) <= v,
+    }
+    for col, op, val in criteria:
+        df = df.filter(ops[op](col, val))
+    return df
+
+
+@pytest.fixture
+def builds(monkeypatch) -> list[tuple]:
+    """Record every criteria index built."""
+    calls: list[tuple] = []
+    original = criteria_index_mod.CriteriaIndex.__init__
+
+    def spy(self, df, eq_cols, range_col):
+        calls.append((eq_cols, range_col))
+        original(self, df, eq_cols, range_col)
+
+    monkeypatch.setattr(criteria_index_mod.CriteriaIndex, "__init__", spy)
+    return calls
+
+
+class TestParity:
+    @pytest.mark.parametrize(
+        "criteria",
+        [
+            [("region", "=", "N")],
+            [("region", "=", "Z")],
+            [("region", "=", "S"), ("year", "=", 2020)],
+            [("year", "=", 2021.0), ("region", "=", "E")],
+            [("year", ">=", 2020), ("year", "<", 2023)],
+            [("region", "=", "N"), ("year", ">", 2019.5)],
+            [("score", "=", 0.0)],
+            [("score", "=", 0), ("region", "=", "N")],
+            [("score", "<=", 0.0), ("region", "=", "S")],
+            [("region", ">", "M")],
+            [("year", "=", 2022), ("year", "<=", 2022)],
+            [("year", ">", 2030)],
+            [("year", ">", 2024), ("year", "<", 2019)],
+        ],
+    )
+    def test_matches_chained_filters(self, criteria: list[tuple]) -> None:
+        df = _facts()
+        expected = _filtered(df, criteria)
+        assert indexed_countifs(df, criteria) == len(expected)
+        # Same rows in the same order: bit-identical float sums
+        assert indexed_sumifs(df, "amount", criteria) == float(expected["amount"].sum())
+        assert indexed_sumifs(df, "units", criteria) == float(expected["units"].sum())
+
+    @pytest.mark.parametrize(
+        "criteria",
+        [
+            [("region", "<>", "N")],
+            [("year", ">", 2019), ("units", "<", 5)],
+            [("year", "=", "2020")],
+            [("region", "=", None)],
+            [("year", ">", True)],
+            [("region", "=", "N"), ("region", "=", "S")],
+            [("missing", "=", 1)],
+        ],
+    )
+    def test_unsupported_criteria_fall_back(self, criteria: list[tuple]) -> None:
+        assert indexed_countifs(_facts(), criteria) is None
+
+    def test_nan_in_range_column_falls_back(self) -> None:
+        df = pl.DataFrame({"x": [1.0, float("nan"), 3.0], "v": [1, 2, 3]})
+        assert indexed_countifs(df, [("x", ">", 2)]) is None
+        tree = parse_formula('=COUNTIFS("t", "x", ">", 2)')
+        assert evaluate_formula(tree, {}, {"t": df}) == 2
+
+
+class TestSharing:
+    def test_one_index_per_table_and_columns(self, builds: list[tuple]) -> None:
+        tc = {"facts": _facts()}
+        for region in ("N", "S", "E"):
+            for year in (2019, 2020):
+                tree = parse_formula(
+                    f'=SUMIFS("facts", "amount", "year", "=", {year}, "region", "=", "{region}")'
+                )
+                evaluate_formula(tree, {}, tc)
+                tree = parse_formula(
+                    f'=COUNTIFS("facts", "region", "=", "{region}", "year", "=", {year})'
+                )
+                evaluate_formula(tree, {}, tc)
+        assert builds == [(("region", "year"), None)]
+
+    def test_scalar_graph(self, builds: list[tuple]) -> None:
+        df = _facts()
+        sg = ScalarGraph()
+        sg.set_table_cache({"facts": df})
+        for i, year in enumerate(range(2018, 2026)):
+            text = f'=SUMIFS("facts", "units", "year", "<=", {year})'
+            sg.set_parsed_formula(f"y{i}", parse_formula(text), set())
+        values = sg.evaluate()
+        assert values["y7"] == float(df["units"].sum())
+        assert len(builds) == 1
+
+    def test_cell_graph(self, builds: list[tuple]) -> None:
+        df = _facts()
+        sheets = {
+            "Calc": {
+                "A1": {"value": "N"},
+                "A2": {"formula": '=COUNTIFS("facts", "region", "=", A1)'},
+                "A3": {"formula": '=SUMIFS("facts", "units", "region", "=", "S")'},
+            }
+        }
+        cg = CellGraph(sheets, table_cache={"facts": df})
+        results = cg.evaluate_all()
+        assert results["Calc"]["A2"] == len(_filtered(df, [("region", "=", "N")]))
+        assert results["Calc"]["A3"] == float(_filtered(df, [("region", "=", "S")])["units"].sum())
+        assert builds == [(("region",), None)]
+
+
+class TestService:
+    def test_sheet_cells_reach_latest_build_tables(self, tmp_path, builds: list[tuple]) -> None:
+        from fin123.project import scaffold_project
+        from fin123.ui.service import ProjectService
+
+        svc = ProjectService(scaffold_project(tmp_path / "proj"))
+        run_id = svc.build_workbook()["run_id"]
+        formula = '=SUMIFS("filtered_prices", "revenue", "category", "=", A1)'
+        svc.update_cells("Sheet1", [
+            {"addr": "A1", "value": "electronics"},
+            {"addr": "B1", "formula": formula},
+        ])
+
+        prices = pl.read_parquet(
+            svc.project_dir / "runs" / run_id / "outputs" / "filtered_prices.parquet"
+        )
+        expected = float(_filtered(prices, [("category", "=", "electronics")])["revenue"].sum())
+        assert expected > 0
+        assert svc._get_cell_graph().evaluate_cell("Sheet1", "B1") == expected
+        assert builds
@@ -0,0 +1,173 @@
+"""Tests for the segmented, indexed global event log."""
+
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+
+import pytest
+import yaml
+
+import fin123.logging.events as events_mod
+from fin123.logging import segments as segments_mod
+from fin123.logging.events import EventLevel, EventType, Fin123Event
+from fin123.logging.sink import _DEFAULT_SEGMENT_BYTES, MIN_SEGMENT_BYTES, EventSink
+
+
+def _event(i: int, ts: str | None = None) -> Fin123Event:
+    kinds = [EventType.run_started, EventType.assertion_pass, EventType.run_completed]
+    extra = {"ts": ts} if ts else {}
+    return Fin123Event(
+        level=EventLevel.error if i % 7 == 0 else EventLevel.info,
+        event_type=kinds[i % 3],
+        message=f"event {i}",
+        context={"run_id": f"r{i % 5}", "plugin_name": "p" if i % 4 == 0 else "q", "i": i},
+        **extra,
+    )
+
+
+def _all_lines(sink: EventSink) -> list[dict]:
+    paths = segments_mod.list_segments(sink.segments_dir) + [sink.logs_dir / "events.ndjson"]
+    return [json.loads(line) for p in paths if p.exists() for line in p.read_text().splitlines()]
+
+
+@pytest.fixture
+def sink(tmp_path: Path) -> EventSink:
+    sink = EventSink(tmp_path, segment_bytes=4096)
+    for i in range(300):
+        sink.write(_event(i))
+    return sink
+
+
+class TestSegments:
+    def test_rotation_keeps_every_event(self, sink: EventSink) -> None:
+        sealed = segments_mod.list_segments(sink.segments_dir)
+        assert len(sealed) > 5
+        assert all(segments_mod.index_path(s).exists() for s in sealed)
+        assert all(s.stat().st_size < 4096 + 512 for s in sealed)
+        assert [e["context"]["i"] for e in _all_lines(sink)] == list(range(300))
+
+    @pytest.mark.parametrize(
+        "filters",
+        [
+            {},
+            {"run_id": "r3"},
+            {"event_type": "assertion_pass"},
+            {"level": "error", "plugin": "p"},
+            {"run_id": "r1", "event_type": "run_completed"},
+            {"run_id": "missing"},
+        ],
+    )
+    def test_queries_cover_all_segments(self, sink: EventSink, filters: dict) -> None:
+        expected = [
+            e["context"]["i"] for e in reversed(_all_lines(sink))
+            if segments_mod.matches(e, filters)
+        ]
+        got = sink.read_global(limit=2000, **filters)
+        assert [e["context"]["i"] for e in got] == expected
+        assert [e["context"]["i"] for e in sink.read_global(limit=7, **filters)] == expected[:7]
+
+    def test_filtered_query_reads_only_matching_lines(self, sink: EventSink, monkeypatch) -> None:
+        parsed: list[int] = []
+        original = segments_mod._parse
+
+        def spy(raw):
+            parsed.append(1)
+            return original(raw)
+
+        monkeypatch.setattr(segments_mod, "_parse", spy)
+        sealed_ids = {
+            json.loads(line)["context"]["i"]
+            for s in segments_mod.list_segments(sink.segments_dir)
+            for line in s.read_text().splitlines()
+        }
+        events = sink.read_global(run_id="r2", event_type="run_started", limit=2000)
+        from_sealed = [e for e in events if e["context"]["i"] in sealed_ids]
+        assert from_sealed and len(parsed) == len(from_sealed)
+
+    def test_missing_or_stale_index_is_rebuilt(self, sink: EventSink) -> None:
+        first = segments_mod.list_segments(sink.segments_dir)[0]
+        segments_mod.index_path(first).unlink()
+        expected = [e for e in sink.read_global(limit=2000) if e["context"]["run_id"] == "r4"]
+        assert sink.read_global(run_id="r4", limit=2000) == expected
+        assert segments_mod.index_path(first).exists()
+
+    def test_legacy_log_is_sealed(self, tmp_path: Path) -> None:
+        legacy = EventSink(tmp_path)
+        for i in range(50):
+            legacy.write(_event(i))
+        sink = EventSink(tmp_path, segment_bytes=4096)
+        sink.write(_event(50))
+        assert len(segments_mod.list_segments(sink.segments_dir)) == 1
+        assert not (tmp_path / "logs" / "events.ndjson").exists()
+        assert [e["context"]["i"] for e in sink.read_global(limit=100)] == list(range(50, -1, -1))
+
+    def test_concurrent_writers_lose_nothing(self, tmp_path: Path) -> None:
+        barrier = threading.Barrier(4)
+
+        def writer(t: int) -> None:
+            sink = EventSink(tmp_path, segment_bytes=2048)
+            barrier.wait()
+            for i in range(50):
+                sink.write(_event(t * 1000 + i))
+
+        threads = [threading.Thread(target=writer, args=(t,)) for t in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        ids = [e["context"]["i"] for e in _all_lines(EventSink(tmp_path))]
+        assert sorted(ids) == sorted(t * 1000 + i for t in range(4) for i in range(50))
+
+
+class TestSegmentPurge:
+    def test_drops_whole_old_segments(self, tmp_path: Path) -> None:
+        sink = EventSink(tmp_path, segment_bytes=4096)
+        for i in range(200):
+            sink.write(_event(i, ts="2020-01-01T00:00:00.000000Z"))
+        active = tmp_path / "logs" / "events.ndjson"
+        i = 200
+        while i < 260 or not active.exists():
+            sink.write(_event(i))
+            i += 1
+        inode = active.stat().st_ino
+        before = segments_mod.list_segments(sink.segments_dir)
+
+        deleted = sink.purge_old_logs(30, set(), set(), preserve_lines=10)
+        after = segments_mod.list_segments(sink.segments_dir)
+        assert deleted == len(before) - len(after) > 0
+        assert active.stat().st_ino == inode  # never rewritten
+        remaining = [e["context"]["i"] for e in _all_lines(sink)]
+        assert i - 1 in remaining and 0 not in remaining
+        assert all(segments_mod.index_path(s).exists() for s in after)
+
+    def test_preserves_newest_lines(self, tmp_path: Path) -> None:
+        sink = EventSink(tmp_path, segment_bytes=4096)
+        for i in range(200):
+            sink.write(_event(i, ts="2020-01-01T00:00:00.000000Z"))
+        sink.purge_old_logs(30, set(), set(), preserve_lines=150)
+        assert len(_all_lines(sink)) >= 150
+
+
+class TestSegmentSizeConfig:
+    @pytest.fixture(autouse=True)
+    def _restore_sink(self):
+        old = events_mod._sink
+        yield
+        events_mod._sink = old
+
+    @pytest.mark.parametrize(
+        ("configured", "expected"),
+        [(0, _DEFAULT_SEGMENT_BYTES), (-5, _DEFAULT_SEGMENT_BYTES), (100, MIN_SEGMENT_BYTES),
+         (1 << 20, 1 << 20)],
+    )
+    def test_config_is_range_checked(self, tmp_path: Path, configured: int, expected: int) -> None:
+        (tmp_path / "fin123.yaml").write_text(yaml.dump({"logging_segment_bytes": configured}))
+        events_mod.set_project_dir(tmp_path)
+        assert events_mod._sink._segment_bytes == expected
+
+    def test_constructor_rejects_non_positive(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match="logging_segment_bytes"):
+            EventSink(tmp_path, segment_bytes=0)
+
@@ -0,0 +1,137 @@
+"""Tests for the formula closure compiler (fin123.formulas.compiler)."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import polars as pl
+import pytest
+
+from fin123.formulas import (
+    ENGINE_ERRORS,
+    FormulaFunctionError,
+    FormulaRefError,
+    compile_formula,
+    evaluate_formula,
+    parse_formula,
+)
+from fin123.formulas.evaluator import _eval
+
+
+class _Resolver:
+    """Minimal CellResolver for compiler/tree-walker parity checks."""
+
+    def __init__(self) -> None:
+        self.cells = {("Sheet1", "A1"): 2, ("Sheet1", "B2"): 5, ("Other Sheet", "C3"): 7}
+        self.names = {"rng": [1, 2, 3]}
+
+    def resolve_cell(self, sheet: str, addr: str) -> Any:
+        return self.cells.get((sheet, addr))
+
+    def resolve_range(self, name: str) -> list[Any]:
+        return self.names[name]
+
+    def has_named_range(self, name: str) -> bool:
+        return name in self.names
+
+
+CTX = {"a": 10, "b": 4, "rate": 0.1, "flag": True, "name": "x"}
+TC = {"t": pl.DataFrame({"k": ["a", "b", "c"], "v": [1.0, 2.0, 3.0]})}
+
+PARITY_FORMULAS = [
+    "=1 + 2 * 3",
+    "=-2^2",
+    "=a * (1 - rate)",
+    "=$a / b",
+    "=50%",
+    "=a% + 1",
+    "=a > b",
+    "=a <> b",
+    "=a = 10",
+    '="he said \\"hi\\""',
+    "=TRUE",
+    "=SUM(a, b, 1)",
+    "=SUM(rng)",
+    "=AVERAGE(rng, a)",
+    "=MAX(1, a, b)",
+    "=ROUND(a / 3, 2)",
+    "=IF(flag, a, 1/0)",
+    "=IF(a < b, 1)",
+    "=IFERROR(1/0, -1)",
+    "=ISERROR(missing)",
+    "=AND(flag, a > 1)",
+    "=NPV(rate, 100, 100, 100)",
+    '=VLOOKUP("b", "t", "k", "v")',
+    '=SUMIFS("t", "v", "v", ">", 1)',
+    '=COUNTIFS("t", "k", "<>", "a")',
+    '=XLOOKUP("c", "t", "k", "v")',
+    "=A1 * B2",
+    "='Other Sheet'!C3 + Sheet1!A1",
+    '=PARAM("a")',
+]
+
+
+class TestCompilerParity:
+    @pytest.mark.parametrize("formula", PARITY_FORMULAS)
+    def test_matches_tree_walker(self, formula: str) -> None:
+        tree = parse_formula(formula)
+        resolver = _Resolver()
+        expected = _eval(tree, CTX, TC, resolver, "Sheet1")
+        got = compile_formula(tree)(CTX, TC, resolver, "Sheet1")
+        assert got == expected
+
+    def test_compiled_closure_cached_per_tree(self) -> None:
+        tree = parse_formula("=a + b")
+        assert compile_formula(tree) is compile_formula(tree)
+
+    def test_evaluate_formula_uses_compiler(self) -> None:
+        assert evaluate_formula(parse_formula("=a * b"), CTX) == 40
+
+
+class TestCompilerErrors:
+    def test_unknown_ref(self) -> None:
+        with pytest.raises(FormulaRefError, match="missing"):
+            evaluate_formula(parse_formula("=missing + 1"), CTX)
+
+    def test_division_by_zero_deferred_to_evaluation(self) -> None:
+        # Constant folding must not raise at compile time
+        fn = compile_formula(parse_formula("=1/0"))
+        with pytest.raises(ZeroDivisionError):
+            fn({}, {}, None, None)
+
+    def test_division_by_zero_from_context(self) -> None:
+        with pytest.raises(ZeroDivisionError):
+            evaluate_formula(parse_formula("=a / 0"), CTX)
+
+    def test_unknown_function(self) -> None:
+        with pytest.raises(FormulaFunctionError, match="NOPE"):
+            evaluate_formula(parse_formula("=NOPE(1)"), CTX)
+
+    def test_unknown_function_arg_errors_first(self) -> None:
+        with pytest.raises(FormulaRefError):
+            evaluate_formula(parse_formula("=NOPE(missing)"), CTX)
+
+    def test_if_arity_error_is_catchable(self) -> None:
+        assert evaluate_formula(parse_formula("=IFERROR(IF(1), 3)"), CTX) == 3
+
+    def test_type_error_is_engine_error(self) -> None:
+        with pytest.raises(ENGINE_ERRORS):
+            evaluate_formula(parse_formula('="a" + 1'), CTX)
+
+
+class TestCompilerLaziness:
+    def test_if_does_not_evaluate_untaken_branch(self) -> None:
+        calls: list[str] = []
+
+        class Tracking(_Resolver):
+            def resolve_cell(self, sheet: str, addr: str) -> Any:
+                calls.append(addr)
+                return 1
+
+        evaluate_formula(
+            parse_formula("=IF(TRUE, A1, B2)"), {}, resolver=Tracking(), current_sheet="S"
+        )
+        assert calls == ["A1"]
+
+    def test_iferror_fallback_not_evaluated_on_success(self) -> None:
+        assert evaluate_formula(parse_formula("=IFERROR(a, missing)"), CTX) == 10
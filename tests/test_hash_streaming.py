@@ -0,0 +1,119 @@
+"""Tests for streaming and concurrent file hashing."""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import threading
+from pathlib import Path
+
+import polars as pl
+
+from fin123.utils import hash as hash_mod
+from fin123.utils.hash import InputHashCache, compute_export_hash, sha256_file, sha256_files
+
+
+def _reference_export_hash(outputs_dir: Path) -> str:
+    """The original whole-file implementation."""
+    h = hashlib.sha256()
+    for f in sorted(outputs_dir.iterdir()):
+        if f.is_file() and f.suffix in (".json", ".parquet"):
+            h.update(f.name.encode("utf-8"))
+            h.update(f.read_bytes())
+    return h.hexdigest()
+
+
+def _outputs(tmp_path: Path) -> Path:
+    out = tmp_path / "outputs"
+    out.mkdir()
+    (out / "scalars.json").write_text('{"a": 1}')
+    pl.DataFrame({"x": list(range(50_000))}).write_parquet(out / "big.parquet")
+    pl.DataFrame({"y": [1.5]}).write_parquet(out / "small.parquet")
+    (out / "empty.json").write_bytes(b"")
+    (out / "notes.txt").write_text("ignored")
+    return out
+
+
+class TestStreamingHash:
+    def test_export_hash_unchanged(self, tmp_path: Path) -> None:
+        out = _outputs(tmp_path)
+        assert compute_export_hash(out) == _reference_export_hash(out)
+
+    def test_sha256_file(self, tmp_path: Path) -> None:
+        data = os.urandom(3 * hash_mod._CHUNK_SIZE + 17)
+        path = tmp_path / "blob.bin"
+        path.write_bytes(data)
+        assert sha256_file(path) == hashlib.sha256(data).hexdigest()
+
+        empty = tmp_path / "empty.bin"
+        empty.write_bytes(b"")
+        assert sha256_file(empty) == hashlib.sha256(b"").hexdigest()
+
+    def test_chunked_fallback_without_mmap(self, tmp_path: Path, monkeypatch) -> None:
+        data = os.urandom(2 * hash_mod._CHUNK_SIZE + 5)
+        path = tmp_path / "blob.bin"
+        path.write_bytes(data)
+
+        def no_mmap(*args, **kwargs):
+            raise OSError("mmap unsupported")
+
+        monkeypatch.setattr(mmap, "mmap", no_mmap)
+        assert sha256_file(path) == hashlib.sha256(data).hexdigest()
+
+    def test_sha256_files_preserves_order(self, tmp_path: Path) -> None:
+        paths = []
+        for i in range(5):
+            p = tmp_path / f"f{i}.bin"
+            p.write_bytes(bytes([i]) * 1000)
+            paths.append(p)
+        result = sha256_files(list(reversed(paths)))
+        assert list(result) == list(reversed(paths))
+        assert all(result[p] == sha256_file(p) for p in paths)
+
+
+class TestInputHashCacheParallel:
+    def test_hashes_only_stale_files(self, tmp_path: Path, monkeypatch) -> None:
+        files = []
+        for i in range(3):
+            p = tmp_path / f"in{i}.csv"
+            p.write_text(f"a\n{i}\n")
+            files.append(p)
+        cache = InputHashCache(tmp_path / "cache" / "hashes.json")
+        first = cache.hashes_for(files)
+        assert list(first) == [str(p.resolve()) for p in files]
+
+        files[1].write_text("a\nchanged\n")
+        os.utime(files[1], (1, 1))
+        hashed: list[list[Path]] = []
+        original = hash_mod.sha256_files
+
+        def spy(paths, max_workers=None):
+            hashed.append(list(paths))
+            return original(paths, max_workers)
+
+        monkeypatch.setattr(hash_mod, "sha256_files", spy)
+        second = InputHashCache(tmp_path / "cache" / "hashes.json").hashes_for(files)
+        assert hashed == [[files[1]]]
+        assert second[str(files[1].resolve())] == sha256_file(files[1])
+        assert second[str(files[0].resolve())] == first[str(files[0].resolve())]
+
+    def test_concurrent_saves_in_one_process(self, tmp_path: Path) -> None:
+        cache_path = tmp_path / "cache" / "hashes.json"
+        errors: list[BaseException] = []
+
+        def save() -> None:
+            cache = InputHashCache(cache_path)
+            for _ in range(50):
+                try:
+                    cache.save()
+                except OSError as exc:
+                    errors.append(exc)
+
+        threads = [threading.Thread(target=save) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+        assert list(cache_path.parent.iterdir()) == [cache_path]
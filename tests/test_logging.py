@@ -87,7 +87,7 @@ class TestFin123Event:
             "assertion_pass", "assertion_warn", "assertion_fail",
             "run_verify_pass", "run_verify_fail",
             "run_timing", "lookup_violation", "mode_block",
-            "batch_started", "batch_completed",
+            "batch_started", "batch_progress", "batch_completed",
             "release_created", "release_set_created",
         }
         actual = {e.value for e in EventType}
@@ -917,7 +917,7 @@ class TestTailRead:
         assert len(events) == 5
 
     def test_tail_read_large_file_bounded(self, project_dir):
-        """Large files should only return events from the tail."""
+        """Large per-run logs should only return events from the tail."""
         from fin123.logging.events import EventLevel, EventType, Fin123Event
         from fin123.logging.sink import EventSink
 
@@ -930,12 +930,14 @@ class TestTailRead:
                 level=EventLevel.info,
                 event_type=EventType.run_started,
                 message=f"event {i:04d}",
-            ))
+            ), run_id="r1")
 
-        events = sink.read_global()
+        events = sink.read_run_log("r1")
         # Should get fewer than 20 events since we bounded the read
         assert len(events) < 20
         assert len(events) > 0
+        # The global log is segmented and indexed, not tail-bounded
+        assert len(sink.read_global()) == 20
 
     def test_limit_capped_at_2000(self, project_dir):
         """read_global should cap limit at 2000."""
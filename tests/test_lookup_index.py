@@ -0,0 +1,141 @@
+"""Tests for hash-indexed table lookups."""
+
+from __future__ import annotations
+
+import gc
+import math
+
+import polars as pl
+import pytest
+
+from fin123.formulas import parse_formula
+from fin123.formulas.errors import FormulaFunctionError
+from fin123.formulas.evaluator import evaluate_formula
+from fin123.formulas.fn_lookup import _fn_match, _fn_xlookup
+from fin123.functions import lookup_index as lookup_index_mod
+from fin123.functions.lookup_index import get_lookup_index
+from fin123.functions.scalar import scalar_lookup
+
+
+def _tables() -> dict[str, pl.DataFrame]:
+    return {
+        "px": pl.DataFrame({
+            "ticker": ["AAA", "BBB", "AAA", "CCC", None],
+            "id": [1, 2, 1, 3, 4],
+            "price": [10.0, 20.0, 11.0, 30.0, 40.0],
+            "flag": [True, False, True, False, None],
+            "w": [0.5, float("nan"), 0.25, 0.5, 1.0],
+        })
+    }
+
+
+def _reference(df: pl.DataFrame, key_col: str, value) -> tuple[int | None, int]:
+    """The pre-index filter semantics: (first row, match count)."""
+    hits = df.with_row_index("_r").filter(pl.col(key_col) == value)
+    return (hits["_r"][0] if len(hits) else None), len(hits)
+
+
+@pytest.fixture
+def builds(monkeypatch) -> list[str]:
+    """Record every index built."""
+    calls: list[str] = []
+    original = lookup_index_mod.LookupIndex.__init__
+
+    def spy(self, series):
+        calls.append(series.name)
+        original(self, series)
+
+    monkeypatch.setattr(lookup_index_mod.LookupIndex, "__init__", spy)
+    return calls
+
+
+class TestLookupIndex:
+    @pytest.mark.parametrize(
+        "key_col,value",
+        [
+            ("ticker", "AAA"), ("ticker", "BBB"), ("ticker", "ZZZ"),
+            ("id", 1), ("id", 3.0), ("id", 2.5), ("id", 99),
+            ("price", 20), ("price", 30.0),
+            ("flag", True), ("flag", False),
+            ("w", 0.5), ("w", 1),
+        ],
+    )
+    def test_matches_filter(self, key_col: str, value) -> None:
+        df = _tables()["px"]
+        assert get_lookup_index(df, key_col).find(value) == _reference(df, key_col, value)
+
+    def test_built_once_and_shared(self, builds: list[str]) -> None:
+        tc = _tables()
+        for ticker in ("BBB", "CCC", "BBB"):
+            scalar_lookup("px", "ticker", "price", ticker, _table_cache=tc)
+        # A second consumer of the same frames (e.g. a sweep point)
+        scalar_lookup("px", "ticker", "price", "CCC", _table_cache=dict(tc))
+        _fn_xlookup(["CCC", "px", "ticker", "price"], {}, tc, None)
+        assert builds == ["ticker"]
+
+    def test_dropped_with_frame(self) -> None:
+        df = _tables()["px"]
+        get_lookup_index(df, "id")
+        frame_id = id(df)
+        assert frame_id in lookup_index_mod._indexes
+        del df
+        gc.collect()
+        assert frame_id not in lookup_index_mod._indexes
+
+
+class TestScalarLookup:
+    def test_values(self) -> None:
+        tc = _tables()
+        assert scalar_lookup("px", "ticker", "price", "CCC", _table_cache=tc) == 30.0
+        assert scalar_lookup("px", "id", "ticker", 2.0, _table_cache=tc) == "BBB"
+        assert scalar_lookup(
+            "px", "ticker", "price", "AAA", on_duplicate="first", _table_cache=tc
+        ) == 10.0
+        assert scalar_lookup(
+            "px", "ticker", "price", "ZZZ", on_missing="none", _table_cache=tc
+        ) is None
+
+    def test_error_messages_unchanged(self) -> None:
+        tc = _tables()
+        with pytest.raises(ValueError, match=r"Available keys \(up to 10\): \[None, 'AAA'"):
+            scalar_lookup("px", "ticker", "price", "ZZZ", _table_cache=tc)
+        with pytest.raises(ValueError, match="2 rows found .* Use on_duplicate='first'"):
+            scalar_lookup("px", "ticker", "price", "AAA", _table_cache=tc)
+        with pytest.raises(ValueError, match="2 rows found"):
+            scalar_lookup("px", "id", "price", 1, _table_cache=tc)
+
+    def test_unindexable_values_use_filter(self, builds: list[str]) -> None:
+        tc = _tables()
+        # Polars treats NaN as equal to NaN; Python equality does not
+        assert scalar_lookup("px", "w", "ticker", math.nan, _table_cache=tc) == "BBB"
+        # bool against a numeric column is Polars' comparison, not Python's
+        assert scalar_lookup(
+            "px", "id", "ticker", True, on_duplicate="first", _table_cache=tc
+        ) == "AAA"
+        assert builds == []
+
+    def test_vlookup_formula(self) -> None:
+        tc = _tables()
+        tree = parse_formula('=VLOOKUP("CCC", "px", "ticker", "price")')
+        assert evaluate_formula(tree, {}, tc) == 30.0
+
+
+class TestMatchAndXlookup:
+    def test_match_first_row(self) -> None:
+        tc = _tables()
+        assert _fn_match(["AAA", "px", "ticker"], {}, tc, None) == 1
+        assert _fn_match([3, "px", "id"], {}, tc, None) == 4
+        assert _fn_match([None, "px", "ticker"], {}, tc, None) == 5
+
+    def test_match_not_found(self) -> None:
+        tc = _tables()
+        for value, col in (("ZZZ", "ticker"), ("1", "id"), (math.nan, "w")):
+            with pytest.raises(FormulaFunctionError, match="not found"):
+                _fn_match([value, "px", col], {}, tc, None)
+
+    def test_xlookup(self) -> None:
+        tc = _tables()
+        assert _fn_xlookup(["AAA", "px", "ticker", "price"], {}, tc, None) == 10.0
+        assert _fn_xlookup(["ZZZ", "px", "ticker", "price", -1], {}, tc, None) == -1
+        with pytest.raises(FormulaFunctionError, match="not found"):
+            _fn_xlookup(["ZZZ", "px", "ticker", "price"], {}, tc, None)
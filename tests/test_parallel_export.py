@@ -0,0 +1,136 @@
+"""Tests for concurrent parquet export of run outputs."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import polars as pl
+import pytest
+import yaml
+
+from fin123.versioning import RunStore, _deterministic_sort, export_options_from_config
+from fin123.workbook import Workbook
+
+
+def _tables() -> dict[str, pl.DataFrame]:
+    return {
+        f"t{i}": pl.DataFrame({"b": [3, 1, 2] * 1000, "a": [f"k{j % 7}" for j in range(3000)]})
+        for i in range(4)
+    }
+
+
+def _create(tmp_path: Path, **kwargs) -> Path:
+    return RunStore(tmp_path).create_run(
+        workbook_spec={},
+        input_hashes={},
+        scalar_outputs={"x": 1},
+        table_outputs=_tables(),
+        sorted_tables={"t0"},
+        **kwargs,
+    )
+
+
+class TestParallelExport:
+    def test_output_matches_sequential_write(self, tmp_path: Path) -> None:
+        timings: dict[str, float] = {}
+        run_dir = _create(tmp_path, timings_ms=timings)
+        reference = tmp_path / "ref.parquet"
+        for name, df in _tables().items():
+            expected = df if name == "t0" else _deterministic_sort(df)
+            expected.write_parquet(reference)
+            assert (run_dir / "outputs" / f"{name}.parquet").read_bytes() == reference.read_bytes()
+        assert set(timings) == {"export_tables"}
+        assert set(timings["export_tables"]) == {"t0", "t1", "t2", "t3"}
+
+        meta = json.loads((run_dir / "run_meta.json").read_text())
+        assert meta["sorted_exports"] == ["t1", "t2", "t3"]
+        assert meta["export_row_counts"] == {f"t{i}": 3000 for i in range(4)}
+
+    def test_export_options_applied(self, tmp_path: Path) -> None:
+        default = _create(tmp_path / "a")
+        plain = _create(
+            tmp_path / "b",
+            export_options={"compression": "uncompressed", "row_group_size": 500, "max_workers": 1},
+        )
+        size = lambda d: (d / "outputs" / "t1.parquet").stat().st_size  # noqa: E731
+        assert size(plain) > size(default)
+        assert pl.read_parquet(plain / "outputs" / "t1.parquet").equals(
+            pl.read_parquet(default / "outputs" / "t1.parquet")
+        )
+
+
+class TestExportConfig:
+    def test_defaults(self) -> None:
+        assert export_options_from_config({}) == {
+            "compression": "zstd",
+            "compression_level": None,
+            "row_group_size": None,
+            "max_workers": None,
+        }
+
+    @pytest.mark.parametrize(
+        "config",
+        [
+            {"export_compression": "zip"},
+            {"export_row_group_size": 0},
+            {"export_compression_level": "high"},
+            {"export_max_workers": True},
+        ],
+    )
+    def test_invalid(self, config: dict) -> None:
+        with pytest.raises(ValueError, match="export_"):
+            export_options_from_config(config)
+
+    def test_build_uses_project_config(self, tmp_path: Path) -> None:
+        (tmp_path / "inputs").mkdir()
+        (tmp_path / "inputs" / "p.csv").write_text("k,v\na,1\nb,2\n")
+        spec = {
+            "version": 1,
+            "tables": {"p": {"source": "inputs/p.csv", "format": "csv"}},
+            "outputs": [{"name": "p", "type": "table"}],
+        }
+        (tmp_path / "workbook.yaml").write_text(yaml.dump(spec))
+        (tmp_path / "fin123.yaml").write_text("export_compression: uncompressed\n")
+
+        result = Workbook(tmp_path).run()
+        meta = json.loads((result.run_dir / "run_meta.json").read_text())
+        assert "p" in meta["timings_ms"]["export_tables"]
+
+        (tmp_path / "fin123.yaml").write_text("export_compression: nope\n")
+        with pytest.raises(ValueError, match="export_compression"):
+            Workbook(tmp_path).run()
+
+
+class TestInspectTimings:
+    def test_inspect_total_is_sum_of_phases(self, tmp_path: Path) -> None:
+        from click.testing import CliRunner
+
+        from fin123.cli_core import main
+
+        (tmp_path / "workbook.yaml").write_text(
+            yaml.dump({
+                "version": 1,
+                "params": {"n": 3},
+                "outputs": [{"name": "x", "type": "scalar", "formula": "=$n * 2"}],
+            })
+        )
+        run_dir = Workbook(tmp_path).run().run_dir
+        meta_path = run_dir / "run_meta.json"
+        meta = json.loads(meta_path.read_text())
+        # Fixed timings so the rendered total is exact
+        meta["timings_ms"] = {
+            "eval_tables": 40.0,
+            "table_cache": {"hits": 2, "misses": 1},
+            "export_tables": {"a": 25.0, "b": 30.0},
+            "export_outputs": 35.0,
+        }
+        meta_path.write_text(json.dumps(meta))
+
+        result = CliRunner().invoke(
+            main, ["inspect", run_dir.name, "--project", str(tmp_path)]
+        )
+        assert result.exit_code == 0, result.output
+        assert "Timing: 75 ms total" in result.output
+        assert "  export_outputs: 35.0 ms\n    a: 25.0 ms\n    b: 30.0 ms" in result.output
+        assert "  table_cache: 2 hits, 1 misses" in result.output
@@ -513,6 +513,58 @@ class TestScalarGraphIntegration:
         with pytest.raises(ValueError, match="Circular"):
             sg.evaluate()
 
+    def test_cycle_error_names_only_unresolvable_nodes(self) -> None:
+        sg = ScalarGraph()
+        sg.set_value("x", 1)
+        sg.set_parsed_formula("ok", parse_formula("=x + 1"), {"x"})
+        sg.set_parsed_formula("a", parse_formula("=b + 1"), {"b"})
+        sg.set_parsed_formula("b", parse_formula("=a + 1"), {"a"})
+        sg.set_parsed_formula("c", parse_formula("=a * 2"), {"a"})
+        with pytest.raises(ValueError, match="Circular") as exc_info:
+            sg.evaluate()
+        message = str(exc_info.value)
+        assert "'a'" in message and "'b'" in message and "'c'" in message
+        assert "'ok'" not in message
+
+    def test_unknown_dependency_is_unresolvable(self) -> None:
+        sg = ScalarGraph()
+        sg.set_parsed_formula("r", parse_formula("=missing + 1"), {"missing"})
+        with pytest.raises(ValueError, match="unresolvable"):
+            sg.evaluate()
+
+    def test_long_chain_evaluates_in_order(self) -> None:
+        sg = ScalarGraph()
+        sg.set_value("s0", 0)
+        # Register in reverse so insertion order is the worst case
+        for i in range(2000, 0, -1):
+            tree = parse_formula(f"=s{i - 1} + 1")
+            sg.set_parsed_formula(f"s{i}", tree, extract_refs(tree))
+        values = sg.evaluate()
+        assert values["s2000"] == 2000
+
+    def test_compiled_plan_reused_with_overrides(self) -> None:
+        sg = ScalarGraph()
+        sg.set_value("rate", 0.1)
+        tree = parse_formula("=rate * 100")
+        sg.set_parsed_formula("pct", tree, extract_refs(tree))
+        sg.set_formula("twice", "multiply", {"a": "$pct", "b": 2})
+        plan = sg.compile()
+        assert plan == ["pct", "twice"]
+        assert sg.evaluate()["twice"] == pytest.approx(20.0)
+        assert sg.evaluate({"rate": 0.25})["twice"] == pytest.approx(50.0)
+        assert sg.compile() is plan
+        # Base values are untouched by overrides
+        assert sg.evaluate()["pct"] == pytest.approx(10.0)
+
+    def test_adding_formula_invalidates_plan(self) -> None:
+        sg = ScalarGraph()
+        sg.set_value("a", 1)
+        sg.set_parsed_formula("b", parse_formula("=a + 1"), {"a"})
+        first = sg.compile()
+        sg.set_parsed_formula("c", parse_formula("=b + 1"), {"b"})
+        assert sg.compile() is not first
+        assert sg.evaluate()["c"] == 3
+
 
 # ────────────────────────────────────────────────────────────────
 # Workbook integration tests
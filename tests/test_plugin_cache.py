@@ -0,0 +1,131 @@
+"""Tests for the process-level plugin registry and persisted validation verdicts."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+import fin123
+from fin123.functions import registry
+from fin123.plugins import manager
+from fin123.plugins import validator as validator_mod
+from fin123.plugins.manager import load_active_plugins
+
+PLUGIN = '''
+from fin123.functions.registry import register_scalar
+
+PLUGIN_META = {{"version": 1, "deterministic": True}}
+
+
+@register_scalar("cache_test_scale")
+def scale(x):
+    return x * FACTOR
+
+
+FACTOR = {factor}
+
+
+def register():
+    return {{"name": "scaler", "version": {factor}}}
+'''
+
+BAD_PLUGIN = '''
+PLUGIN_META = {"version": 1, "deterministic": True}
+result = eval("1 + 1")
+'''
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setattr(manager, "_loaded", {})
+    (tmp_path / "plugins").mkdir()
+    _write_plugin(tmp_path, 2)
+    yield tmp_path
+    registry._SCALAR_FUNCTIONS.pop("cache_test_scale", None)
+    for stem in ("scaler", "bad"):
+        sys.modules.pop(f"fin123._loaded_plugins.{stem}", None)
+
+
+@pytest.fixture
+def calls(monkeypatch) -> dict[str, int]:
+    """Count AST scans and module imports."""
+    counts = {"validate": 0, "import": 0}
+    validate = validator_mod.validate_plugin_source
+    spec_from_file = importlib.util.spec_from_file_location
+
+    def spy_validate(source):
+        counts["validate"] += 1
+        return validate(source)
+
+    def spy_spec(*args, **kwargs):
+        counts["import"] += 1
+        return spec_from_file(*args, **kwargs)
+
+    monkeypatch.setattr(validator_mod, "validate_plugin_source", spy_validate)
+    monkeypatch.setattr(importlib.util, "spec_from_file_location", spy_spec)
+    return counts
+
+
+def _write_plugin(project: Path, factor: int) -> None:
+    (project / "plugins" / "scaler.py").write_text(PLUGIN.format(factor=factor))
+
+
+class TestProcessRegistry:
+    def test_unchanged_plugin_loaded_once(self, project: Path, calls: dict) -> None:
+        first = load_active_plugins(project)
+        for _ in range(5):
+            assert load_active_plugins(project) == first
+        assert first["scaler"]["version"] == "2"
+        assert calls == {"validate": 1, "import": 1}
+
+    def test_registration_restored(self, project: Path, calls: dict) -> None:
+        load_active_plugins(project)
+        fn = registry.get_scalar_fn("cache_test_scale")
+        registry._SCALAR_FUNCTIONS.pop("cache_test_scale")
+        load_active_plugins(project)
+        assert registry.get_scalar_fn("cache_test_scale") is fn
+        assert fn(5) == 10
+
+    def test_changed_plugin_reloaded(self, project: Path, calls: dict) -> None:
+        first = load_active_plugins(project)
+        _write_plugin(project, 3)
+        second = load_active_plugins(project)
+        assert second["scaler"]["sha256"] != first["scaler"]["sha256"]
+        assert second["scaler"]["version"] == "3"
+        assert registry.get_scalar_fn("cache_test_scale")(5) == 15
+        assert calls == {"validate": 2, "import": 2}
+
+    def test_engine_upgrade_reloads(self, project: Path, calls: dict, monkeypatch) -> None:
+        load_active_plugins(project)
+        monkeypatch.setattr(fin123, "__version__", "99.0.0")
+        load_active_plugins(project)
+        assert calls == {"validate": 2, "import": 2}
+
+
+class TestVerdictCache:
+    def test_fresh_process_skips_scan(self, project: Path, calls: dict, monkeypatch) -> None:
+        expected = load_active_plugins(project)
+        verdicts = json.loads((project / manager.VERDICT_CACHE).read_text())
+        assert verdicts[expected["scaler"]["sha256"]]["errors"] == []
+
+        monkeypatch.setattr(manager, "_loaded", {})  # as in a new worker
+        assert load_active_plugins(project) == expected
+        assert calls == {"validate": 1, "import": 2}
+
+    def test_rejection_cached(self, project: Path, calls: dict) -> None:
+        (project / "plugins" / "bad.py").write_text(BAD_PLUGIN)
+        for _ in range(3):
+            assert set(load_active_plugins(project)) == {"scaler"}
+        assert calls["validate"] == 2
+        assert "fin123._loaded_plugins.bad" not in sys.modules
+
+    def test_corrupt_cache_ignored(self, project: Path, calls: dict) -> None:
+        path = project / manager.VERDICT_CACHE
+        path.parent.mkdir()
+        path.write_text("{not json")
+        assert set(load_active_plugins(project)) == {"scaler"}
+        assert json.loads(path.read_text())
@@ -0,0 +1,240 @@
+"""Tests for the UI server-push channel (``/api/stream``)."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from fin123.ui import push as push_mod
+from fin123.ui.push import PushHub, _LogFollower, _Subscriber, status_delta
+
+
+def _line(ts: str, event_type: str = "run_started", **context) -> str:
+    return json.dumps({"ts": ts, "event_type": event_type, "context": context, "message": ""}) + "\n"
+
+
+def _parse_sse(text: str) -> list[tuple[str, object]]:
+    messages = []
+    for block in text.split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in lines:
+            messages.append((lines["event"], json.loads(lines["data"])))
+    return messages
+
+
+class TestLogFollower:
+    def test_reads_only_new_complete_lines(self, tmp_path: Path) -> None:
+        log = tmp_path / "events.ndjson"
+        log.write_text(_line("2024-01-01T00:00:01Z"))
+        follower = _LogFollower(log)
+        follower.open_at_end()
+        assert follower.read_new() == []
+
+        with open(log, "a") as f:
+            f.write(_line("2024-01-01T00:00:02Z") + _line("2024-01-01T00:00:03Z")[:20])
+        assert [e["ts"] for e in follower.read_new()] == ["2024-01-01T00:00:02Z"]
+        with open(log, "a") as f:
+            f.write(_line("2024-01-01T00:00:03Z")[20:])
+        assert [e["ts"] for e in follower.read_new()] == ["2024-01-01T00:00:03Z"]
+
+    def test_follows_across_seal(self, tmp_path: Path) -> None:
+        log = tmp_path / "events.ndjson"
+        log.write_text("")
+        follower = _LogFollower(log)
+        follower.open_at_end()
+        with open(log, "a") as f:
+            f.write(_line("2024-01-01T00:00:01Z"))
+        os.replace(log, tmp_path / "000001.ndjson")  # sealed before the next tick
+        log.write_text(_line("2024-01-01T00:00:02Z"))
+        assert [e["ts"] for e in follower.read_new()] == [
+            "2024-01-01T00:00:01Z", "2024-01-01T00:00:02Z",
+        ]
+
+    def test_seal_keeps_events_with_older_timestamps(self, tmp_path: Path) -> None:
+        log = tmp_path / "events.ndjson"
+        log.write_text("")
+        follower = _LogFollower(log)
+        follower.open_at_end()
+        with open(log, "a") as f:
+            f.write(_line("2024-01-01T00:00:05Z"))
+        assert len(follower.read_new()) == 1
+        # Another process with a slightly behind clock writes after the seal
+        os.replace(log, tmp_path / "000001.ndjson")
+        log.write_text(_line("2024-01-01T00:00:04Z") + _line("2024-01-01T00:00:05Z"))
+        assert [e["ts"] for e in follower.read_new()] == [
+            "2024-01-01T00:00:04Z", "2024-01-01T00:00:05Z",
+        ]
+
+    def test_missing_log(self, tmp_path: Path) -> None:
+        follower = _LogFollower(tmp_path / "events.ndjson")
+        follower.open_at_end()
+        assert follower.read_new() == []
+        (tmp_path / "events.ndjson").write_text(_line("2024-01-01T00:00:01Z"))
+        assert len(follower.read_new()) == 1
+
+
+class TestStatus:
+    def test_delta(self) -> None:
+        old = {"project": {"dirty": False}, "build": {"run_id": "a"}}
+        new = {"project": {"dirty": True}, "build": {"run_id": "a"}}
+        assert status_delta(old, new) == {"project": {"dirty": True}}
+        assert status_delta(None, new) == new
+
+    @pytest.fixture
+    def hub(self, tmp_path: Path, monkeypatch):
+        from fin123.project import scaffold_project
+        from fin123.ui.service import ProjectService
+
+        svc = ProjectService(scaffold_project(tmp_path / "proj"))
+        hub = PushHub(svc, status_interval=0.0)
+        hub.published = []
+        monkeypatch.setattr(hub, "publish", lambda event, data: hub.published.append((event, data)))
+        hub.calls = 0
+        real = svc.get_model_status
+
+        def counting():
+            hub.calls += 1
+            return real()
+
+        monkeypatch.setattr(svc, "get_model_status", counting)
+        hub._follower.open_at_end()
+        hub.refresh_status()
+        hub._thread = threading.current_thread()  # mark as following
+        hub.published.clear()
+        hub.calls = 0
+        yield hub
+        hub._thread = None
+
+    def test_quiet_ticks_do_no_disk_io(self, hub: PushHub) -> None:
+        for _ in range(5):
+            hub.tick()
+        assert hub.calls == 0 and hub.published == []
+        hub.get_status()
+        assert hub.calls == 0
+
+    def test_edit_pushes_project_delta(self, hub: PushHub) -> None:
+        hub.service.update_cells("Sheet1", [{"addr": "A1", "value": "3"}])
+        hub.tick()
+        assert hub.published == [("status", {"project": hub.service.get_project_status()})]
+        assert hub.calls == 0
+
+    def test_build_pushes_events_and_build_status(self, hub: PushHub) -> None:
+        result = hub.service.build_workbook()
+        hub.tick()
+        kinds = [k for k, _ in hub.published]
+        assert kinds == ["log", "status"]
+        events = hub.published[0][1]
+        assert {"run_started", "run_completed"} <= {e["event_type"] for e in events}
+        assert all("display_type" in e for e in events)
+        assert hub.published[1][1]["build"]["run_id"] == result["run_id"]
+        assert hub.get_status()["build"]["run_id"] == result["run_id"]
+        assert hub.calls == 1
+
+    def test_status_refresh_throttled(self, hub: PushHub) -> None:
+        hub.status_interval = 60.0
+        hub._status_at = time.monotonic()
+        hub.service.build_workbook()
+        hub.tick()
+        assert [k for k, _ in hub.published] == ["log"]
+        assert hub.calls == 0
+        hub._status_at -= 61
+        hub.tick()
+        assert hub.calls == 1 and hub.published[-1][0] == "status"
+
+
+class TestSubscriber:
+    def test_overflow_resyncs(self, monkeypatch) -> None:
+        monkeypatch.setattr(push_mod, "MAX_QUEUED_MESSAGES", 3)
+
+        async def fill():
+            sub = _Subscriber(asyncio.get_running_loop())
+            for i in range(5):
+                sub.put(("log", i))
+            return [sub.queue.get_nowait() for _ in range(sub.queue.qsize())]
+
+        assert asyncio.run(fill()) == [("resync", {}), ("log", 4)]
+
+
+class TestStreamEndpoint:
+    @pytest.fixture
+    def app_client(self, tmp_path: Path):
+        from fastapi.testclient import TestClient
+
+        from fin123.project import scaffold_project
+        from fin123.ui import server
+
+        app = server.create_app(scaffold_project(tmp_path / "proj"))
+        server._push.poll_interval = 0.02
+        server._push.status_interval = 0.0
+        with TestClient(app) as client:
+            yield client, server._push
+
+    def _collect(self, client, hub: PushHub, actions) -> list[tuple[str, object]]:
+        """Open the stream, run *actions*, then close the hub and parse."""
+        out: dict = {}
+        reader = threading.Thread(target=lambda: out.setdefault("resp", client.get("/api/stream")))
+        reader.start()
+        deadline = time.monotonic() + 5
+        while not hub._subscribers and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)  # initial status sent
+        actions()
+        time.sleep(0.3)  # a few follower ticks
+        hub.close()
+        reader.join(10)
+        resp = out["resp"]
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        return _parse_sse(resp.text)
+
+    def test_stream_messages(self, app_client) -> None:
+        client, hub = app_client
+
+        def actions():
+            client.post(
+                "/api/sheet/cells",
+                json={"sheet": "Sheet1", "edits": [{"addr": "B2", "value": "7"}]},
+                headers={"X-Client-Id": "tab-1"},
+            )
+            client.post("/api/commit")
+            job_id = client.post("/api/jobs", json={"kind": "build"}).json()["job_id"]
+            for _ in range(200):
+                if client.get(f"/api/jobs/{job_id}").json()["status"] == "succeeded":
+                    break
+                time.sleep(0.02)
+
+        messages = self._collect(client, hub, actions)
+        kinds = [k for k, _ in messages]
+        assert kinds[0] == "status" and set(messages[0][1]) == {"project", "datasheets", "build", "verify"}
+
+        cells = [d for k, d in messages if k == "cells"]
+        assert cells == [{
+            "origin": "tab-1", "sheet": "Sheet1",
+            "changed": [{"sheet": "Sheet1", "addr": "B2", "display": "7"}],
+        }]
+        assert [d["status"] for k, d in messages if k == "job"] == ["queued", "running", "succeeded"]
+        logged = {e["event_type"] for k, d in messages if k == "log" for e in d}
+        assert "run_completed" in logged
+        build = [d["build"] for k, d in messages if k == "status" and "build" in d]
+        assert build and build[-1]["has_build"]
+        assert all(set(d) < {"project", "datasheets", "build", "verify"} for k, d in messages[1:] if k == "status")
+
+    def test_status_endpoint_served_from_memory(self, app_client, monkeypatch) -> None:
+        client, hub = app_client
+        expected = client.get("/api/status").json()
+        seen = {}
+
+        def actions():
+            monkeypatch.setattr(
+                hub.service, "get_model_status",
+                lambda: pytest.fail("status re-derived from disk while following"),
+            )
+            seen["status"] = client.get("/api/status").json()
+
+        self._collect(client, hub, actions)
+        assert seen["status"] == expected
@@ -0,0 +1,101 @@
+"""Tests for the SQLite run index."""
+
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+
+import yaml
+
+from fin123.batch import _amend_batch_meta
+from fin123.gc import run_gc
+from fin123.run_index import RunIndex
+from fin123.versioning import RunStore
+from fin123.workbook import Workbook
+
+
+def _project(tmp_path: Path) -> Path:
+    spec = {
+        "version": 1,
+        "params": {"x": 1},
+        "outputs": [{"name": "y", "type": "scalar", "formula": "=x * 2"}],
+        "scenarios": {"hi": {"overrides": {"x": 5}}},
+    }
+    (tmp_path / "workbook.yaml").write_text(yaml.dump(spec))
+    return tmp_path
+
+
+def _build(project: Path, n: int, scenario: str | None = None) -> list[str]:
+    return [
+        Workbook(project, scenario_name=scenario).run().run_dir.name for _ in range(n)
+    ]
+
+
+def _disk_runs(project: Path) -> list[dict]:
+    return [
+        json.loads((d / "run_meta.json").read_text())
+        for d in sorted((project / "runs").iterdir())
+    ]
+
+
+class TestRunIndex:
+    def test_matches_disk(self, tmp_path: Path) -> None:
+        project = _project(tmp_path)
+        _build(project, 3)
+        store = RunStore(project)
+        assert store.list_runs() == _disk_runs(project)
+        assert store.latest_run() == _disk_runs(project)[-1]
+        assert store.latest_run()["timings_ms"]
+
+    def test_served_from_index(self, tmp_path: Path) -> None:
+        project = _project(tmp_path)
+        run_id = _build(project, 1)[0]
+        RunStore(project).list_runs()
+        (project / "runs" / run_id / "run_meta.json").write_text("not json")
+        assert RunStore(project).latest_run()["run_id"] == run_id
+
+    def test_pagination_and_filters(self, tmp_path: Path) -> None:
+        project = _project(tmp_path)
+        base = _build(project, 3)
+        hi = _build(project, 2, scenario="hi")
+        store = RunStore(project)
+
+        page = store.list_runs(limit=2, offset=1, newest_first=True)
+        assert [r["run_id"] for r in page] == [hi[0], base[2]]
+        assert [r["run_id"] for r in store.list_runs(scenario_name="hi")] == hi
+        assert store.index.count(scenario_name="") == 3
+
+        _amend_batch_meta(project / "runs" / base[1], "batch-1", 0)
+        batch = store.list_runs(build_batch_id="batch-1")
+        assert [(r["run_id"], r["batch_index"]) for r in batch] == [(base[1], 0)]
+
+    def test_rebuilds_when_missing_or_corrupt(self, tmp_path: Path) -> None:
+        project = _project(tmp_path)
+        ids = _build(project, 2)
+        index = RunIndex(project)
+
+        index._discard()
+        assert [r["run_id"] for r in RunStore(project).list_runs()] == ids
+
+        index._discard()
+        index.db_path.write_bytes(b"this is not a sqlite database" * 100)
+        assert [r["run_id"] for r in RunStore(project).list_runs()] == ids
+        assert index.rebuild() == 2
+
+    def test_reconciles_with_runs_dir(self, tmp_path: Path) -> None:
+        project = _project(tmp_path)
+        ids = _build(project, 3)
+        RunStore(project).list_runs()
+
+        shutil.rmtree(project / "runs" / ids[0])
+        in_progress = project / "runs" / "99990101_000000_run_99"
+        in_progress.mkdir()
+        assert [r["run_id"] for r in RunStore(project).list_runs()] == ids[1:]
+
+    def test_gc_removes_entries(self, tmp_path: Path) -> None:
+        project = _project(tmp_path)
+        (project / "fin123.yaml").write_text("max_runs: 2\n")
+        ids = _build(project, 4)
+        run_gc(project)
+        assert [r["run_id"] for r in RunIndex(project).list_runs()] == ids[2:]
@@ -0,0 +1,195 @@
+"""Tests for shared-formula canonicalization (``formulas/shared.py``)."""
+
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+import pytest
+
+from fin123.cell_graph import CellGraph
+from fin123.formulas import parse_formula
+from fin123.formulas.errors import FormulaParseError
+from fin123.formulas.shared import (
+    canonicalize,
+    follows_shift,
+    instantiate,
+    parse_at,
+    shape_refs,
+)
+from fin123.ui.service import ProjectService, make_addr
+from fin123.ui.sheet_store import SheetCells
+from fin123.xlsx_import import classify_formula
+
+
+class TestCanonicalize:
+    @pytest.mark.parametrize(
+        "text, row, col, shape",
+        [
+            ("=B2*C2", 1, 3, "=R[0]C[-2]*R[0]C[-1]"),
+            ("=SUM(A1, A2) + x", 2, 0, "=SUM(R[-2]C[0], R[-1]C[0]) + x"),
+            ("=Sheet2!A1+'My Sheet'!B3", 0, 0, "=Sheet2!R[0]C[0]+'My Sheet'!R[2]C[1]"),
+            ('=IF(A1>0, "A1 is B2", A1)', 4, 2, '=IF(R[-4]C[-2]>0, "A1 is B2", R[-4]C[-2])'),
+            ("=rate*2.5e3", 7, 7, "=rate*2.5e3"),
+        ],
+    )
+    def test_round_trip(self, text: str, row: int, col: int, shape: str) -> None:
+        assert canonicalize(text, row, col) == shape
+        assert instantiate(shape, row, col) == text
+
+    @pytest.mark.parametrize("text", ["=A0+1", "=A01"])
+    def test_left_as_written(self, text: str) -> None:
+        assert canonicalize(text, 3, 3) is None
+        assert parse_at(text, 3, 3) == parse_formula(text)
+
+    def test_brackets_left_as_written(self) -> None:
+        assert canonicalize('=LOOKUP("x", t[A1])', 0, 0) is None
+
+    def test_off_sheet_instantiates_ref_error(self) -> None:
+        assert instantiate("=R[-1]C[0]+Other!R[0]C[-3]", 0, 1) == "=#REF!+Other!#REF!"
+
+    def test_random_round_trip(self) -> None:
+        rng = random.Random(5)
+        for _ in range(300):
+            row, col = rng.randrange(1000), rng.randrange(100)
+            refs = [make_addr(rng.randrange(1000), rng.randrange(800)) for _ in range(3)]
+            text = f"=IF({refs[0]}>0, Data!{refs[1]}, \"{refs[2]}\") * {refs[2]}"
+            assert instantiate(canonicalize(text, row, col), row, col) == text
+
+
+class TestParse:
+    def test_filled_down_copies_share_a_tree(self) -> None:
+        trees = {id(parse_at(f"=B{r + 1}*C{r + 1}+1", r, 3)) for r in range(50)}
+        assert len(trees) == 1
+
+    def test_errors_match_parse_formula(self) -> None:
+        with pytest.raises(FormulaParseError) as shaped:
+            parse_at("=A1+*B1", 0, 2)
+        with pytest.raises(FormulaParseError) as plain:
+            parse_formula("=A1+*B1")
+        assert str(shaped.value) == str(plain.value)
+
+    def test_relative_refs_cannot_be_typed(self) -> None:
+        with pytest.raises(FormulaParseError):
+            parse_at("=R[0]C[1]", 0, 0)
+
+    def test_shape_refs(self) -> None:
+        scalars, offsets = shape_refs("=R[0]C[-1]*rate+'S 2'!R[1]C[0]+R[0]C[-1]")
+        assert scalars == {"rate"}
+        assert offsets == ((None, 0, -1), ("S 2", 1, 0))
+
+
+class TestEvaluation:
+    def _cells(self, n: int) -> dict:
+        cells: dict = {}
+        for r in range(n):
+            cells[f"A{r + 1}"] = {"value": r + 1}
+            cells[f"B{r + 1}"] = {"formula": f"=A{r + 1}*rate+Other!A{r + 1}"}
+            if r:
+                cells[f"C{r + 1}"] = {"formula": f"=C{r}+B{r + 1}"}
+        cells["C1"] = {"formula": "=B1"}
+        return cells
+
+    def test_store_matches_plain_dicts(self) -> None:
+        other = {f"A{r + 1}": {"value": 10 * r} for r in range(20)}
+        plain = CellGraph({"S": self._cells(20), "Other": other}, params={"rate": 2})
+        shared = CellGraph(
+            {"S": SheetCells(self._cells(20)), "Other": SheetCells(other)}, params={"rate": 2}
+        )
+        for r in range(20):
+            for c in "BC":
+                addr = f"{c}{r + 1}"
+                assert shared.evaluate_cell("S", addr) == plain.evaluate_cell("S", addr)
+        assert shared.get_display_value("S", "C20") == "2320"
+
+    def test_dependencies_follow_offsets(self) -> None:
+        cells = SheetCells(self._cells(5))
+        other = SheetCells({f"A{r}": {"value": int(r == 3)} for r in range(1, 6)})
+        cg = CellGraph({"S": cells, "Other": other}, params={"rate": 1})
+        assert cg.get_display_value("S", "C5") == "16"
+        other["A3"] = {"value": 101}
+        changed = cg.recalculate("Other", ["A3"])
+        assert changed == [("Other", "A3"), ("S", "B3"), ("S", "C3"), ("S", "C4"), ("S", "C5")]
+        assert cg.get_display_value("S", "C5") == "116"
+
+
+class TestFollowsShift:
+    def test_insert(self) -> None:
+        shape = canonicalize("=A5+B5", 4, 2)  # held in C5
+        assert follows_shift(shape, 4, 2, "S", "S", "row", 0, 3)  # all move
+        assert follows_shift(shape, 4, 2, "S", "S", "row", 9, 3)  # none move
+        assert not follows_shift(shape, 4, 2, "S", "S", "col", 1, 1)  # B moves, A stays
+        assert follows_shift(shape, 4, 2, "S", "T", "row", 0, 3)  # other sheet
+
+    def test_cross_sheet_and_delete(self) -> None:
+        shape = canonicalize("=T!A5", 4, 0)
+        assert not follows_shift(shape, 4, 0, "S", "T", "row", 0, 1)
+        assert not follows_shift(shape, 4, 0, "S", "S", "row", 0, 1)
+        assert follows_shift(shape, 4, 0, "S", "S", "row", 9, -2)
+        assert not follows_shift(canonicalize("=A3", 4, 0), 4, 0, "S", "S", "row", 2, -1)
+
+
+class TestService:
+    @pytest.fixture
+    def svc(self, tmp_path: Path) -> ProjectService:
+        from fin123.project import scaffold_project
+
+        return ProjectService(scaffold_project(tmp_path / "proj"))
+
+    def _fill(self, svc: ProjectService) -> None:
+        edits = [{"addr": "A1", "value": "100"}]
+        for r in range(2, 8):
+            edits += [
+                {"addr": f"B{r}", "value": str(r)},
+                {"addr": f"C{r}", "formula": f"=B{r}*2+A1"},
+            ]
+        svc.update_cells("Sheet1", edits)
+        svc.add_sheet("Other")
+        svc.update_cells("Other", [{"addr": "A1", "formula": "=Sheet1!C4"}])
+
+    def _plain(self, svc: ProjectService) -> dict:
+        return {s["name"]: dict(s["cells"].items()) for s in svc._sheets}
+
+    @pytest.mark.parametrize(
+        "op, args",
+        [
+            ("insert_rows", (3, 2)),
+            ("insert_rows", (0, 1)),
+            ("delete_rows", (2, 2)),
+            ("insert_cols", (1, 1)),
+            ("delete_cols", (0, 1)),
+        ],
+    )
+    def test_shift_matches_plain_rewrite(self, svc: ProjectService, op: str, args: tuple) -> None:
+        self._fill(svc)
+        svc.save_snapshot()
+        # The same edit applied to plain dict cells rewrites every formula
+        reference = ProjectService(svc.project_dir)
+        for s in reference._sheets:
+            s["cells"] = dict(s["cells"].items())
+        getattr(svc, op)("Sheet1", *args)
+        getattr(reference, op)("Sheet1", *args)
+        assert self._plain(svc) == {s["name"]: s["cells"] for s in reference._sheets}
+
+    def test_filled_down_column_stays_shared(self, svc: ProjectService) -> None:
+        self._fill(svc)
+        svc.update_cells("Sheet1", [{"addr": f"D{r}", "formula": f"=C{r}-B{r}"} for r in range(2, 8)])
+        svc.insert_rows("Sheet1", 3, 1)
+        cells = svc._get_sheet("Sheet1")["cells"]
+        # Relative refs moved with their cells; the absolute-style A1 did not
+        assert cells["D3"] == {"formula": "=C3-B3"} and cells["D8"] == {"formula": "=C8-B8"}
+        assert cells.formula_shape("D3") == cells.formula_shape("D8") == "=R[0]C[-1]-R[0]C[-2]"
+        assert cells["C3"] == {"formula": "=B3*2+A1"} and cells["C8"] == {"formula": "=B8*2+A1"}
+        assert svc._get_cell_graph().get_display_value("Other", "A1") == "108"
+
+    def test_update_cells_reports_a1_parse_error(self, svc: ProjectService) -> None:
+        result = svc.update_cells("Sheet1", [{"addr": "D4", "formula": "=C4+"}])
+        assert [e["code"] for e in result["errors"]] == ["parse_error"]
+
+
+def test_classify_with_origin() -> None:
+    plain = classify_formula("=SUM(B2, C2) + FOO(B2)")
+    shaped = classify_formula("=SUM(B2, C2) + FOO(B2)", (1, 3))
+    assert shaped == plain
+    assert shaped["classification"] == "unsupported_function"
+    assert shaped["unsupported_functions"] == ["FOO"]
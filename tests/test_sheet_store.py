@@ -0,0 +1,133 @@
+"""Tests for the compact sheet cell store (``ui/sheet_store.py``)."""
+
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+import pytest
+import yaml
+
+from fin123.cell_graph import CellGraph
+from fin123.ui.service import ProjectService, _remap_addresses, make_addr
+from fin123.ui.sheet_store import SheetCells
+
+
+def _sample_cells() -> dict:
+    return {
+        "B2": {"value": 1.5},
+        "A1": {"formula": "=B2*2"},
+        "ZZZ9": {"value": "label"},
+        "XFD1048576": {"value": True},
+        "C3": {"value": None},
+        "D4": {"value": 7, "comment": "TODO: review imported formula"},
+        "a5": {"value": "lowercase key"},
+        "A01": {"value": "leading zero"},
+    }
+
+
+class TestMapping:
+    def test_behaves_like_dict(self) -> None:
+        plain = _sample_cells()
+        store = SheetCells(plain)
+        assert store == plain and plain == store
+        assert list(store) == [k for k in plain if k not in ("a5", "A01")] + ["a5", "A01"]
+        assert dict(store.items()) == plain == store.to_dict()
+        assert len(store) == len(plain)
+        for addr, cell in plain.items():
+            assert addr in store
+            assert store[addr] == cell and store.get(addr) == cell
+        assert "A5" not in store and "A2" not in store and 42 not in store
+        assert store.get("A2") is None and store.get("A2", {}) == {}
+        with pytest.raises(KeyError):
+            store["A2"]
+
+    def test_set_and_delete(self) -> None:
+        store = SheetCells({"A1": {"value": 1}})
+        store["A1"] = {"formula": "=1+1"}
+        store["B1"] = {"value": 2}
+        del store["A1"]
+        assert store == {"B1": {"value": 2}}
+        store.pop("B1")
+        assert len(store) == 0 and store == {}
+        with pytest.raises(KeyError):
+            del store["B1"]
+
+    def test_copies_and_sharing(self) -> None:
+        f1, f2 = "".join(["=A1", "*2"]), "".join(["=A1*", "2"])
+        assert f1 == f2 and f1 is not f2
+        store = SheetCells({"B1": {"formula": f1}, "B2": {"formula": "=A2*2"}, "C9": {"formula": f2}})
+        # Filled-down formulas share one record; same text elsewhere does not
+        records = list(store._cells.values())
+        assert records[0] is records[1] and records[0] is not records[2]
+        assert store.formula_shape("B2") == "=R[0]C[-1]*2"
+        assert store["B2"] == {"formula": "=A2*2"} and store["C9"] == {"formula": f1}
+        # Plain cells are materialized on read: mutate by assigning
+        store["B1"]["formula"] = "=0"
+        assert store["B1"] == {"formula": f1}
+        copy = store.copy()
+        copy["B1"] = {"value": 0}
+        assert store["B1"] == {"formula": f1}
+
+    def test_cell_graph_reads_store(self) -> None:
+        cells = SheetCells({"A1": {"value": 4}, "A2": {"formula": "=A1*A1"}, "A3": {"formula": "=A1+A2"}})
+        cg = CellGraph({"S": cells})
+        assert cg.get_display_value("S", "A3") == "20"
+        cells["A1"] = {"value": 5}
+        cg.recalculate("S", ["A1"])
+        assert cg.get_display_value("S", "A3") == "30"
+
+
+class TestShift:
+    @pytest.mark.parametrize("axis", ["row", "col"])
+    @pytest.mark.parametrize("count", [3, -2])
+    def test_matches_remap(self, axis: str, count: int) -> None:
+        rng = random.Random(11)
+        plain = {make_addr(rng.randrange(40), rng.randrange(30)): {"value": i} for i in range(300)}
+        plain["not-an-addr"] = {"value": "x"}
+        store = SheetCells(plain)
+        for index in (0, 5, 17, 39):
+            expected = _remap_addresses(plain, axis, index, count)
+            shifted = store.shifted(axis, index, count)
+            assert shifted == expected
+            assert list(shifted) == list(expected)
+        assert store == plain
+
+
+class TestService:
+    @pytest.fixture
+    def svc(self, tmp_path: Path) -> ProjectService:
+        from fin123.project import scaffold_project
+
+        return ProjectService(scaffold_project(tmp_path / "proj"))
+
+    def test_sheets_use_store_and_save_plain_yaml(self, svc: ProjectService) -> None:
+        svc.update_cells("Sheet1", [
+            {"addr": "A1", "value": "10"}, {"addr": "B1", "formula": "=A1*3"}, {"addr": "C1", "value": "x"},
+        ])
+        svc.add_sheet("Other")
+        svc.update_cells("Other", [{"addr": "A1", "formula": "=Sheet1!B1+1"}])
+        svc.insert_rows("Sheet1", 0, 1)
+        assert all(isinstance(s["cells"], SheetCells) for s in svc._sheets)
+        svc.save_snapshot()
+
+        spec = yaml.safe_load((svc.project_dir / "workbook.yaml").read_text())
+        sheets = {s["name"]: s for s in spec["sheets"]}
+        assert sheets["Sheet1"]["cells"] == {
+            "A2": {"value": 10}, "B2": {"formula": "=A2*3"}, "C2": {"value": "x"},
+        }
+        assert sheets["Other"]["cells"] == {"A1": {"formula": "=Sheet1!B2+1"}}
+        assert "fmt" not in sheets["Other"]
+
+        reloaded = ProjectService(svc.project_dir)
+        assert isinstance(reloaded._sheets[0]["cells"], SheetCells)
+        assert reloaded._get_cell_graph().get_display_value("Other", "A1") == "31"
+        # The parsed YAML cell dicts are not retained next to the store
+        assert reloaded._spec["sheets"] is reloaded._sheets
+
+    def test_commit_without_edits_is_stable(self, svc: ProjectService) -> None:
+        svc.update_cells("Sheet1", [{"addr": "B3", "value": "2"}, {"addr": "A1", "formula": "=B3"}])
+        svc.save_snapshot()
+        first = (svc.project_dir / "workbook.yaml").read_text()
+        ProjectService(svc.project_dir).save_snapshot()
+        assert (svc.project_dir / "workbook.yaml").read_text() == first
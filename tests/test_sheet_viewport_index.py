@@ -0,0 +1,159 @@
+"""Tests for the spatial cell index, display cache and viewport ETags."""
+
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+import pytest
+
+from fin123.cell_graph import CellGraph
+from fin123.ui.service import ProjectService, make_addr
+from fin123.ui.sheet_index import SheetIndex
+
+
+def _brute_force(svc: ProjectService, sheet_name: str, r0: int, c0: int, rows: int, cols: int) -> list:
+    """The viewport as the original per-address scan produced it."""
+    sheet = svc._get_sheet(sheet_name)
+    cells_map, fmt_map = sheet.get("cells", {}), sheet.get("fmt", {})
+    cg = svc._get_cell_graph()
+    out = []
+    for r in range(r0, min(r0 + rows, sheet["n_rows"])):
+        for c in range(c0, min(c0 + cols, sheet["n_cols"])):
+            addr = make_addr(r, c)
+            if addr not in cells_map and addr not in fmt_map:
+                continue
+            entry = {"addr": addr, "row": r, "col": c}
+            if addr in cells_map:
+                cell = cells_map[addr]
+                entry["raw"] = str(cell.get("formula") or cell.get("value", ""))
+                entry["display"] = cg.get_display_value(sheet_name, addr)
+            else:
+                entry["raw"] = entry["display"] = ""
+            if addr in fmt_map:
+                entry["fmt"] = fmt_map[addr]
+            out.append(entry)
+    return out
+
+
+@pytest.fixture
+def svc(tmp_path: Path) -> ProjectService:
+    from fin123.project import scaffold_project
+
+    return ProjectService(scaffold_project(tmp_path / "proj"))
+
+
+class TestSheetIndex:
+    def test_query_matches_scan(self) -> None:
+        rng = random.Random(3)
+        cells = {make_addr(rng.randrange(300), rng.randrange(60)): {"value": 1} for _ in range(2000)}
+        fmt = {make_addr(rng.randrange(300), rng.randrange(60)): {"color": "#fff"} for _ in range(200)}
+        index = SheetIndex(cells, fmt)
+        assert len(index) == len(set(cells) | set(fmt))
+        for _ in range(50):
+            r0, c0 = rng.randrange(300), rng.randrange(60)
+            r1, c1 = r0 + rng.randrange(1, 80), c0 + rng.randrange(1, 30)
+            expected = [
+                (r, c, make_addr(r, c))
+                for r in range(r0, r1) for c in range(c0, c1)
+                if make_addr(r, c) in cells or make_addr(r, c) in fmt
+            ]
+            assert list(index.query(r0, r1, c0, c1)) == expected
+
+    def test_touch(self) -> None:
+        cells: dict = {"B2": {"value": 1}}
+        fmt: dict = {}
+        index = SheetIndex(cells, fmt)
+        cells["AA10"] = {"value": 2}
+        index.touch("AA10")
+        fmt["B2"] = {"color": "#000"}
+        del cells["B2"]
+        index.touch("B2")  # still formatted
+        assert [a for _, _, a in index.query(0, 100, 0, 100)] == ["B2", "AA10"]
+        del fmt["B2"]
+        index.touch("B2")
+        index.touch("B2")
+        assert [a for _, _, a in index.query(0, 100, 0, 100)] == ["AA10"]
+        assert index.covers(cells, fmt) and not index.covers(dict(cells), fmt)
+
+
+class TestViewport:
+    def test_matches_scan_through_edits(self, svc: ProjectService) -> None:
+        def check() -> None:
+            for window in [(0, 0, 30, 15), (2, 1, 5, 3), (0, 0, 200, 40)]:
+                assert svc.get_sheet_viewport("Sheet1", *window)["cells"] == _brute_force(svc, "Sheet1", *window)
+
+        check()
+        svc.update_cells("Sheet1", [
+            {"addr": "C3", "value": "2"}, {"addr": "D4", "formula": "=C3*10"}, {"addr": "a1", "value": "x"},
+        ])
+        check()
+        svc.update_cell_format("Sheet1", [{"addr": "F6", "color": "#123456"}])
+        svc.update_cells("Sheet1", [{"addr": "C3", "value": ""}])
+        check()
+        svc.insert_rows("Sheet1", 1, 2)  # replaces the cells/fmt dicts
+        check()
+        svc.update_cell_format("Sheet1", [{"addr": "F8", "color": None}])
+        check()
+        svc.rename_sheet("Sheet1", "Main")
+        assert svc.get_sheet_viewport("Main")["cells"] == _brute_force(svc, "Main", 0, 0, 30, 15)
+
+    def test_out_of_bounds_window(self, svc: ProjectService) -> None:
+        svc.update_cells("Sheet1", [{"addr": "A1", "value": "1"}])
+        assert svc.get_sheet_viewport("Sheet1", r0=500, rows=30)["cells"] == []
+
+
+class TestDisplayCache:
+    def test_cached_until_recalculated(self, monkeypatch) -> None:
+        cells = {"A1": {"value": 1.5}, "B1": {"formula": "=A1*2"}, "C1": {"value": 7}}
+        cg = CellGraph({"S": cells})
+        assert cg.get_display_value("S", "B1") == "3"
+        calls = []
+        real = cg.evaluate_cell
+        monkeypatch.setattr(cg, "evaluate_cell", lambda *a: calls.append(a) or real(*a))
+        assert [cg.get_display_value("S", a) for a in ("B1", "b1", "C1")] == ["3", "3", "7"]
+        assert calls == [("S", "C1")]
+
+        cells["A1"] = {"value": 2.25}
+        assert cg.recalculate("S", ["A1"]) == [("S", "A1"), ("S", "B1")]
+        assert cg.get_display_value("S", "B1") == "4.5"
+        assert cg.get_display_value("S", "A1") == "2.25"
+        cg.invalidate()
+        cells["C1"] = {"value": 8}
+        assert cg.get_display_value("S", "C1") == "8"
+
+    def test_errors_cached_and_cleared(self) -> None:
+        cells = {"A1": {"value": 0}, "B1": {"formula": "=1/A1"}}
+        cg = CellGraph({"S": cells})
+        assert cg.get_display_value("S", "B1") == "#DIV/0!"
+        cells["A1"] = {"value": 4}
+        cg.recalculate("S", ["A1"])
+        assert cg.get_display_value("S", "B1") == "0.25"
+
+
+class TestViewportETag:
+    @pytest.fixture
+    def client(self, svc: ProjectService):
+        from fastapi.testclient import TestClient
+
+        from fin123.ui.server import create_app
+
+        return TestClient(create_app(svc.project_dir))
+
+    def test_not_modified(self, client) -> None:
+        first = client.get("/api/sheet", params={"sheet": "Sheet1"})
+        etag = first.headers["ETag"]
+        assert first.status_code == 200 and first.headers["Cache-Control"] == "no-cache"
+
+        again = client.get("/api/sheet", params={"sheet": "Sheet1"}, headers={"If-None-Match": etag})
+        assert again.status_code == 304 and again.content == b""
+        weak = client.get("/api/sheet", params={"sheet": "Sheet1"}, headers={"If-None-Match": f'"x", W/{etag}'})
+        assert weak.status_code == 304
+
+        other = client.get("/api/sheet", params={"sheet": "Sheet1", "r0": 5}, headers={"If-None-Match": etag})
+        assert other.status_code == 200
+
+        client.post("/api/sheet/cells", json={"sheet": "Sheet1", "edits": [{"addr": "A1", "value": "9"}]})
+        changed = client.get("/api/sheet", params={"sheet": "Sheet1"}, headers={"If-None-Match": etag})
+        assert changed.status_code == 200 and changed.headers["ETag"] != etag
+        assert {"addr": "A1", "row": 0, "col": 0, "raw": "9", "display": "9"} in changed.json()["cells"]
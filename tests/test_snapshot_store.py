@@ -0,0 +1,197 @@
+"""Tests for content-addressed, deduplicated workbook snapshots."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from fin123.versioning import SnapshotStore
+
+
+def _spec(n: int) -> str:
+    return f"version: 1\nmodel_id: m-1\nparams:\n  x: {n}\n"
+
+
+def _version_dirs(store: SnapshotStore) -> list[str]:
+    return sorted(d.name for d in store.snapshot_dir.iterdir() if d.is_dir() and d.name.startswith("v"))
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> SnapshotStore:
+    return SnapshotStore(tmp_path)
+
+
+class TestDedup:
+    def test_unchanged_spec_writes_nothing(self, store: SnapshotStore) -> None:
+        v1 = store.save_snapshot(_spec(1))
+        watched = [store.snapshot_dir / "index.json", store.head_path]
+        before = [(p.stat().st_mtime_ns, p.read_bytes()) for p in watched]
+
+        assert [store.save_snapshot(_spec(1)) for _ in range(5)] == [v1] * 5
+        assert [(p.stat().st_mtime_ns, p.read_bytes()) for p in watched] == before
+        assert _version_dirs(store) == [v1]
+
+    def test_changed_spec_gets_next_version(self, store: SnapshotStore) -> None:
+        versions = [store.save_snapshot(_spec(i)) for i in range(3)]
+        assert versions == ["v0001", "v0002", "v0003"]
+        assert store.load_version("v0002")["params"] == {"x": 1}
+        assert json.loads(store.head_path.read_text())["model_version_id"] == "v0003"
+
+    def test_reverted_spec_shares_content(self, store: SnapshotStore) -> None:
+        store.save_snapshot(_spec(1))
+        store.save_snapshot(_spec(2))
+        v3 = store.save_snapshot(_spec(1))
+        assert v3 == "v0003"
+        first = (store.snapshot_dir / "v0001" / "workbook.yaml").stat()
+        third = (store.snapshot_dir / v3 / "workbook.yaml").stat()
+        assert first.st_ino == third.st_ino
+        assert len(list(store.objects_dir.glob("*.yaml"))) == 2
+
+    def test_builds_share_one_version(self, tmp_path: Path) -> None:
+        from fin123.project import scaffold_project
+        from fin123.workbook import Workbook
+
+        project = scaffold_project(tmp_path / "proj")
+        ids = {
+            json.loads((Workbook(project).run().run_dir / "run_meta.json").read_text())["model_version_id"]
+            for _ in range(3)
+        }
+        assert ids == {"v0001"}
+        assert SnapshotStore(project).list_versions() == ["v0001"]
+
+
+class TestIndex:
+    def test_appended_index_is_canonical(self, store: SnapshotStore) -> None:
+        for i in range(4):
+            store.save_snapshot(_spec(i))
+        raw = (store.snapshot_dir / "index.json").read_text()
+        index = json.loads(raw)
+        assert raw == json.dumps(index, indent=2)
+        assert [v["model_version_id"] for v in index["versions"]] == ["v0001", "v0002", "v0003", "v0004"]
+
+    def test_pin_then_append(self, store: SnapshotStore) -> None:
+        store.save_snapshot(_spec(1))
+        store.pin_version("v0001")
+        store.save_snapshot(_spec(2))
+        versions = store.load_index()["versions"]
+        assert [(v["model_version_id"], v["pinned"]) for v in versions] == [
+            ("v0001", True), ("v0002", False),
+        ]
+
+    def test_interrupted_write_keeps_pins(self, store: SnapshotStore, monkeypatch) -> None:
+        store.save_snapshot(_spec(1))
+        store.pin_version("v0001")
+        index_path = store.snapshot_dir / "index.json"
+        before = index_path.read_bytes()
+        real_replace = os.replace
+
+        def crash_on_index(src, dst):
+            if Path(dst) == index_path:
+                raise OSError("simulated crash")
+            real_replace(src, dst)
+
+        monkeypatch.setattr(os, "replace", crash_on_index)
+        with pytest.raises(OSError):
+            store.save_snapshot(_spec(2))
+        monkeypatch.undo()
+
+        assert index_path.read_bytes() == before
+        assert store.load_index()["versions"][0]["pinned"] is True
+
+    def test_pins_do_not_drop_concurrent_saves(self, tmp_path: Path) -> None:
+        SnapshotStore(tmp_path).save_snapshot(_spec(0))
+        saved: list[str] = []
+
+        def save() -> None:
+            store = SnapshotStore(tmp_path)
+            saved.extend(store.save_snapshot(_spec(i)) for i in range(1, 21))
+
+        def toggle_pin() -> None:
+            store = SnapshotStore(tmp_path)
+            for _ in range(20):
+                store.pin_version("v0001")
+                store.unpin_version("v0001")
+
+        threads = [threading.Thread(target=save), threading.Thread(target=toggle_pin)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert SnapshotStore(tmp_path).list_versions() == ["v0001", *saved]
+
+    def test_concurrent_saves(self, tmp_path: Path) -> None:
+        barrier = threading.Barrier(6)
+        results: list[str] = []
+
+        def save(i: int) -> None:
+            store = SnapshotStore(tmp_path)
+            barrier.wait()
+            for j in range(5):
+                results.append(store.save_snapshot(_spec(i * 100 + j)))
+
+        threads = [threading.Thread(target=save, args=(i,)) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        store = SnapshotStore(tmp_path)
+        assert len(set(results)) == 30
+        assert sorted(store.list_versions()) == sorted(results) == _version_dirs(store)
+        head = json.loads(store.head_path.read_text())
+        assert head["model_version_id"] == max(results)
+
+
+class TestMigration:
+    def test_project_without_head(self, store: SnapshotStore) -> None:
+        store.save_snapshot(_spec(1))
+        store.save_snapshot(_spec(2))
+        store.head_path.unlink()
+        assert store.save_snapshot(_spec(2)) == "v0003"
+        assert store.save_snapshot(_spec(2)) == "v0003"
+
+    def test_version_created_behind_head(self, store: SnapshotStore) -> None:
+        store.save_snapshot(_spec(1))
+        # e.g. pulled from a registry without going through save_snapshot
+        (store.snapshot_dir / "v0002").mkdir()
+        (store.snapshot_dir / "v0002" / "workbook.yaml").write_text(_spec(9))
+        assert store.save_snapshot(_spec(1)) == "v0003"
+
+
+class TestPrune:
+    def test_unreferenced_objects_removed(self, store: SnapshotStore) -> None:
+        import shutil
+
+        store.save_snapshot(_spec(1))
+        store.save_snapshot(_spec(2))
+        store.save_snapshot(_spec(1))
+        shutil.rmtree(store.snapshot_dir / "v0002")
+        assert store.prune_objects(dry_run=True) > 0
+        assert len(list(store.objects_dir.glob("*.yaml"))) == 2
+        store.prune_objects()
+        assert len(list(store.objects_dir.glob("*.yaml"))) == 1
+        assert store.load_version("v0003")["params"] == {"x": 1}
+
+    def test_prune_during_save_keeps_new_object(self, store: SnapshotStore, monkeypatch) -> None:
+        from fin123 import versioning
+
+        real_link = versioning._link_or_copy
+        pruner: list[threading.Thread] = []
+
+        def link_after_gc_starts(src: Path, dst: Path) -> None:
+            # gc runs between storing the object and linking it
+            pruner.append(threading.Thread(target=SnapshotStore(store.project_dir).prune_objects))
+            pruner[0].start()
+            pruner[0].join(0.2)
+            real_link(src, dst)
+
+        monkeypatch.setattr(versioning, "_link_or_copy", link_after_gc_starts)
+        version = store.save_snapshot(_spec(1))
+        pruner[0].join(5)
+        assert store.load_version(version)["params"] == {"x": 1}
+        assert len(list(store.objects_dir.glob("*.yaml"))) == 1
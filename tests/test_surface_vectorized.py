@@ -0,0 +1,229 @@
+"""Tests for vectorized (batched) scalar evaluation and Surface Mode."""
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+
+import polars as pl
+import pytest
+import yaml
+
+from fin123.formulas import extract_refs, parse_formula
+from fin123.formulas.vectorized import VectorizeError, _pow, compile_vectorized
+from fin123.scalars import ScalarGraph
+from fin123.ui.service import ProjectService
+
+
+def _graph(formulas: dict[str, str], values: dict[str, object]) -> ScalarGraph:
+    sg = ScalarGraph()
+    for name, value in values.items():
+        sg.set_value(name, value)
+    for name, text in formulas.items():
+        tree = parse_formula(text)
+        sg.set_parsed_formula(name, tree, extract_refs(tree))
+    return sg
+
+
+def _pointwise(sg: ScalarGraph, axes: dict[str, list[float]], target: str) -> list:
+    n = len(next(iter(axes.values())))
+    return [
+        sg.evaluate({k: v[i] for k, v in axes.items()})[target] for i in range(n)
+    ]
+
+
+class TestEvaluateVectorized:
+    def test_matches_pointwise_evaluation(self) -> None:
+        sg = _graph(
+            {
+                "ebit": "=revenue * margin",
+                "tax": "=MAX(ebit * rate, 0)",
+                "npv": "=NPV(wacc, ebit - tax, ebit - tax, ebit - tax)",
+                "flag": "=IF(npv > 100, npv, 0)",
+                "growth": "=5%",
+            },
+            {"revenue": 1000, "margin": 0.2, "rate": 0.21, "wacc": 0.1},
+        )
+        axes = {"margin": [0.05, 0.2, 0.35, -0.1], "wacc": [0.08, 0.1, 0.12, 0.2]}
+        result = sg.evaluate_vectorized({k: pl.Series(k, v) for k, v in axes.items()})
+        for target in ("ebit", "tax", "npv", "flag"):
+            got = result.values[target].to_list()
+            assert got == _pointwise(sg, axes, target)
+        assert result.fallback == []
+        # Constant node is evaluated once as a scalar
+        assert result.values["growth"] == pytest.approx(0.05)
+
+    def test_scalar_denominators_match_pointwise_exactly(self) -> None:
+        sg = _graph(
+            {"q": "=p / 2.5", "r": "=p / d", "s": "=-1 + p / 0.1", "t": "=p * 7%"},
+            {"p": 1.0, "d": 0.3},
+        )
+        axes = {"p": [1.75, 0.35, 2.2, 1.1, 0.7]}
+        result = sg.evaluate_vectorized({"p": pl.Series("p", axes["p"])})
+        for target in ("q", "r", "s", "t"):
+            assert result.values[target].to_list() == _pointwise(sg, axes, target)
+        assert result.values["q"][0] == 0.7
+
+    def test_npv_and_powers_match_pointwise_exactly(self) -> None:
+        sg = _graph(
+            {
+                "a": "=NPV(x / 100, 100, 200, 300)",
+                "b": "=NPV(0.05, x, y)",
+                "c": "=NPV(x / 100, x, y, 50)",
+                "d": "=(1 + x / 100) ^ 3 + y ^ 0.5",
+            },
+            {"x": 1.0, "y": 1.0},
+        )
+        xs = [i * 0.37 + 0.1 for i in range(8)]
+        ys = [j * 1.9 + 0.3 for j in range(7)]
+        axes = {"x": [x for x in xs for _ in ys], "y": [y for _ in xs for y in ys]}
+        result = sg.evaluate_vectorized({k: pl.Series(k, v) for k, v in axes.items()})
+        assert result.fallback == []
+        for target in ("a", "b", "c", "d"):
+            assert result.values[target].to_list() == _pointwise(sg, axes, target)
+
+    def test_average_matches_pointwise_exactly(self) -> None:
+        sg = _graph(
+            {"m": "=AVERAGE(x, y, 0.3)", "n": "=AVERAGE(x / 7, y)"},
+            {"x": 1.0, "y": 1.0},
+        )
+        xs = [i * 0.37 + 0.1 for i in range(8)]
+        ys = [j * 1.9 + 0.3 for j in range(7)]
+        axes = {"x": [x for x in xs for _ in ys], "y": [y for _ in xs for y in ys]}
+        result = sg.evaluate_vectorized({k: pl.Series(k, v) for k, v in axes.items()})
+        assert result.fallback == []
+        for target in ("m", "n"):
+            assert result.values[target].to_list() == _pointwise(sg, axes, target)
+
+    def test_zero_base_negative_exponent_matches_pointwise(self) -> None:
+        with pytest.raises(VectorizeError, match="Zero base"):
+            _pow(pl.Series([0.0, 2.0]), pl.Series([-1.0, -1.0]))
+        for text, axes in (
+            ("=((0.1 * OR((0.1 > k))) ^ y)", {"k": [1.0, 0.0], "y": [-1.0, -2.0]}),
+            ("=(ABS(IF(3, (1 <> 1), (0.1 / 3))) ^ x)", {"x": [-1.0, -2.0]}),
+        ):
+            sg = _graph({"r": text}, {k: 1.0 for k in axes})
+            with pytest.raises(ZeroDivisionError):
+                _pointwise(sg, axes, "r")
+            with pytest.raises(ZeroDivisionError):
+                sg.evaluate_vectorized({k: pl.Series(k, v) for k, v in axes.items()})
+
+    def test_overflowing_power_matches_pointwise(self) -> None:
+        with pytest.raises(VectorizeError, match="Non-finite"):
+            _pow(pl.Series([1e200, 2.0]), 2)
+        sg = _graph({"r": "=10 ^ y"}, {"y": 1.0})
+        axes = {"y": [400.0, 2.0]}
+        with pytest.raises(OverflowError):
+            _pointwise(sg, axes, "r")
+        with pytest.raises(OverflowError):
+            sg.evaluate_vectorized({"y": pl.Series("y", axes["y"])})
+        # Infinite operands are not an overflow: both paths return inf
+        sg = _graph({"r": "=x ^ 2"}, {"x": 1.0})
+        result = sg.evaluate_vectorized({"x": pl.Series("x", [math.inf, 3.0])})
+        assert result.values["r"].to_list() == [math.inf, 9.0]
+        assert result.fallback == []
+
+    def test_zero_denominator_falls_back_per_point(self) -> None:
+        sg = _graph({"ratio": "=IF(x = 0, -1, 10 / x)"}, {"x": 1.0})
+        result = sg.evaluate_vectorized({"x": pl.Series([0.0, 2.0, 5.0])})
+        assert result.values["ratio"].to_list() == [-1, 5.0, 2.0]
+        assert result.fallback == ["ratio"]
+
+    def test_lookup_keyed_on_axis_falls_back(self) -> None:
+        sg = _graph({"px": '=VLOOKUP(k, "t", "key", "val") * 2'}, {"k": 1})
+        sg.set_table_cache({"t": pl.DataFrame({"key": [1, 2], "val": [10.0, 20.0]})})
+        result = sg.evaluate_vectorized({"k": pl.Series([1, 2, 2])})
+        assert result.values["px"].to_list() == [20.0, 40.0, 40.0]
+        assert result.fallback == ["px"]
+
+    def test_lookup_not_on_axis_stays_vectorized(self) -> None:
+        sg = _graph({"px": '=VLOOKUP(1, "t", "key", "val") * g'}, {"g": 1.0})
+        sg.set_table_cache({"t": pl.DataFrame({"key": [1, 2], "val": [10.0, 20.0]})})
+        result = sg.evaluate_vectorized({"g": pl.Series([1.0, 2.0])})
+        assert result.values["px"].to_list() == [10.0, 20.0]
+        assert result.vectorized == ["px"]
+
+    def test_structured_formula_falls_back(self) -> None:
+        sg = ScalarGraph()
+        sg.set_value("a", 1.0)
+        sg.set_formula("double", "multiply", {"a": "$a", "b": 2})
+        result = sg.evaluate_vectorized({"a": pl.Series([1.0, 3.0])})
+        assert result.values["double"].to_list() == [2.0, 6.0]
+        assert result.fallback == ["double"]
+
+    def test_targets_limit_evaluation(self) -> None:
+        sg = _graph({"used": "=a + 1", "unused": "=a / 0"}, {"a": 1.0})
+        result = sg.evaluate_vectorized({"a": pl.Series([1.0, 2.0])}, targets=["used"])
+        assert result.values["used"].to_list() == [2.0, 3.0]
+        assert "unused" not in result.values
+
+    def test_errors_propagate_like_pointwise(self) -> None:
+        sg = _graph({"bad": "=a / (a - a)"}, {"a": 1.0})
+        with pytest.raises(ZeroDivisionError):
+            sg.evaluate_vectorized({"a": pl.Series([1.0, 2.0])})
+
+    def test_unsupported_node_raises_vectorize_error(self) -> None:
+        with pytest.raises(VectorizeError):
+            compile_vectorized(parse_formula("=ISERROR(a)"))
+
+
+def _surface_project(tmp_path: Path) -> Path:
+    project = tmp_path / "proj"
+    (project / "inputs").mkdir(parents=True)
+    (project / "inputs" / "prices.csv").write_text("ticker,price\nAAA,10\nBBB,20\n")
+    spec = {
+        "version": 1,
+        "params": {"growth": 0.05, "wacc": 0.1, "ticker": "AAA"},
+        "tables": {"prices": {"source": "inputs/prices.csv", "format": "csv"}},
+        "outputs": [
+            {
+                "name": "price",
+                "type": "scalar",
+                "func": "lookup_scalar",
+                "args": {
+                    "table_name": "prices",
+                    "key_col": "ticker",
+                    "value_col": "price",
+                    "key_value": "$ticker",
+                },
+            },
+            {"name": "value", "type": "scalar", "formula": "=price * (1 + growth) / (wacc - growth)"},
+        ],
+    }
+    (project / "workbook.yaml").write_text(yaml.dump(spec))
+    return project
+
+
+class TestSurfaceEndpoint:
+    def test_surface_vectorized_matches_pointwise(self, tmp_path: Path) -> None:
+        svc = ProjectService(project_dir=_surface_project(tmp_path))
+        data = svc.evaluate_surface(
+            x_param="growth",
+            x_range=(0.0, 0.04),
+            y_param="wacc",
+            y_range=(0.08, 0.12),
+            steps=5,
+            fixed_params={},
+            output="value",
+        )
+        assert len(data["grid"]) == 5 and len(data["grid"][0]) == 5
+        assert data["vectorized_nodes"] == ["value"]
+        assert data["fallback_nodes"] == []
+        g, w = data["x_values"][2], data["y_values"][3]
+        assert data["grid"][3][2] == pytest.approx(10 * (1 + g) / (w - g))
+        assert set(data["timings_ms"]) >= {"eval_tables", "compile", "eval_base", "eval_grid"}
+
+    def test_surface_allows_large_grids(self, tmp_path: Path) -> None:
+        svc = ProjectService(project_dir=_surface_project(tmp_path))
+        data = svc.evaluate_surface(
+            x_param="growth",
+            x_range=(0.0, 0.05),
+            y_param="wacc",
+            y_range=(0.06, 0.12),
+            steps=200,
+            fixed_params={},
+            output="value",
+        )
+        assert len(data["grid"]) == 200
+        assert all(len(row) == 200 for row in data["grid"])
+        assert all(math.isfinite(v) for row in data["grid"] for v in row)
@@ -0,0 +1,228 @@
+"""Tests for server-side sweep and grid execution."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+import yaml
+
+from fin123 import batch as batch_mod
+from fin123.sweep import grid_points, iter_sweep, sweep_points
+from fin123.ui.service import ProjectService
+from fin123.workbook import Workbook
+
+
+def _sweep_project(tmp_path: Path) -> Path:
+    project = tmp_path / "proj"
+    (project / "inputs").mkdir(parents=True)
+    (project / "inputs" / "prices.csv").write_text("ticker,price\nAAA,10\nBBB,20\n")
+    spec = {
+        "version": 1,
+        "params": {"growth": 0.05, "wacc": 0.1, "ticker": "AAA"},
+        "tables": {"prices": {"source": "inputs/prices.csv", "format": "csv"}},
+        "outputs": [
+            {
+                "name": "price",
+                "type": "scalar",
+                "func": "lookup_scalar",
+                "args": {
+                    "table_name": "prices",
+                    "key_col": "ticker",
+                    "value_col": "price",
+                    "key_value": "$ticker",
+                },
+            },
+            {"name": "value", "type": "scalar", "formula": "=price * (1 + growth) / (wacc - growth)"},
+        ],
+    }
+    (project / "workbook.yaml").write_text(yaml.dump(spec))
+    return project
+
+
+def _sweep(project: Path, points: list[dict], **kwargs) -> tuple[str, list[dict]]:
+    """Run a sweep to completion; return its batch id and ordered results."""
+    batch_id = "batch-under-test"
+    results = list(iter_sweep(project, points, batch_id=batch_id, **kwargs))
+    return batch_id, sorted(results, key=lambda r: r["index"])
+
+
+def _run_meta(project: Path, run_id: str) -> dict:
+    return json.loads((project / "runs" / run_id / "run_meta.json").read_text())
+
+
+class TestSweepEngine:
+    def test_points(self) -> None:
+        assert sweep_points("g", [1, 2]) == [{"g": 1}, {"g": 2}]
+        assert grid_points("x", [1, 2], "y", [3]) == [{"x": 1, "y": 3}, {"x": 2, "y": 3}]
+        with pytest.raises(ValueError, match="different"):
+            grid_points("x", [1], "x", [2])
+
+    def test_each_point_is_a_real_run(self, tmp_path: Path) -> None:
+        project = _sweep_project(tmp_path)
+        batch_id, results = _sweep(project, sweep_points("growth", [0.0, 0.02]))
+        assert [r["status"] for r in results] == ["ok", "ok"]
+        for idx, (r, g) in enumerate(zip(results, [0.0, 0.02])):
+            assert r["index"] == idx
+            assert r["scalars"]["value"] == pytest.approx(10 * (1 + g) / (0.1 - g))
+            meta = _run_meta(project, r["run_id"])
+            assert meta["build_batch_id"] == batch_id
+            assert meta["effective_params"]["growth"] == g
+
+    def test_tables_evaluated_once(self, tmp_path: Path, monkeypatch) -> None:
+        project = _sweep_project(tmp_path)
+        calls = []
+        original = Workbook.evaluate_tables
+
+        def counting(self, params=None):
+            calls.append(1)
+            return original(self, params)
+
+        monkeypatch.setattr(Workbook, "evaluate_tables", counting)
+        _, results = _sweep(project, sweep_points("wacc", [0.08, 0.09, 0.1, 0.11]))
+        assert all(r["status"] == "ok" for r in results)
+        assert len(calls) == 1
+
+    def test_point_errors_are_reported(self, tmp_path: Path) -> None:
+        project = _sweep_project(tmp_path)
+        _, results = _sweep(project, sweep_points("ticker", ["AAA", "ZZZ"]))
+        assert [r["status"] for r in results] == ["ok", "error"]
+        assert "error" in results[1] and "Traceback" in results[1]["tb"]
+
+    def test_parallel_runs_on_warm_batch_pool(self, tmp_path: Path) -> None:
+        project = _sweep_project(tmp_path)
+        points = grid_points("growth", [0.0, 0.02], "wacc", [0.08, 0.1])
+        try:
+            _, results = _sweep(project, points, max_workers=2)
+            assert [r["status"] for r in results] == ["ok"] * 4
+            assert [r["index"] for r in results] == [0, 1, 2, 3]
+            for r, p in zip(results, points):
+                expected = 10 * (1 + p["growth"]) / (p["wacc"] - p["growth"])
+                assert r["scalars"]["value"] == pytest.approx(expected)
+
+            # The pool stays warm, idle, and is reused by the next sweep
+            pool = batch_mod._pools[(str(project.resolve()), 2)]
+            _sweep(project, points[:1], max_workers=2)
+            assert batch_mod._pools[(str(project.resolve()), 2)] is pool
+            assert not batch_mod._pool_users[(str(project.resolve()), 2)]
+        finally:
+            batch_mod.shutdown_pools()
+
+
+class TestSweepService:
+    def test_sweep_run_streams_and_persists(self, tmp_path: Path) -> None:
+        project = _sweep_project(tmp_path)
+        svc = ProjectService(project_dir=project)
+        spec_before = (project / "workbook.yaml").read_text()
+
+        events = list(svc.sweep_run("growth", [0.0, 0.01, 0.02], selected_outputs=["value"]))
+        assert events[0]["event"] == "started" and events[0]["total"] == 3
+        assert [e["done"] for e in events if e["event"] == "point"] == [1, 2, 3]
+        data = events[-1]["data"]
+        assert events[-1]["event"] == "completed"
+        assert [r["value"] for r in data["results"]] == [0.0, 0.01, 0.02]
+        assert all(r["status"] == "success" and r["run_id"] for r in data["results"])
+        assert data["output_keys"] == ["price", "value"]
+        assert data["success_count"] == 3 and data["failure_count"] == 0
+        assert svc.sweep_get(data["sweep_id"]) == data
+
+        # Working copy params and the committed spec are untouched
+        assert svc.get_project_info()["params"]["growth"] == 0.05
+        assert not svc._dirty
+        assert (project / "workbook.yaml").read_text() == spec_before
+
+    def test_grid_run(self, tmp_path: Path) -> None:
+        svc = ProjectService(project_dir=_sweep_project(tmp_path))
+        events = list(svc.grid_run("growth", [0.0, 0.02], "wacc", [0.08, 0.1], "value"))
+        data = events[-1]["data"]
+        assert [(c["x"], c["y"]) for c in data["cells"]] == [
+            (0.0, 0.08), (0.0, 0.1), (0.02, 0.08), (0.02, 0.1),
+        ]
+        cell = data["cells"][3]
+        assert cell["display_value"] == pytest.approx(10 * 1.02 / 0.08)
+        assert svc.grid_get(data["grid_id"])["cells"] == data["cells"]
+
+    def test_validation_happens_before_streaming(self, tmp_path: Path) -> None:
+        svc = ProjectService(project_dir=_sweep_project(tmp_path))
+        with pytest.raises(ValueError, match="Unknown parameter"):
+            svc.sweep_run("nope", [1])
+        with pytest.raises(ValueError, match="No sweep values"):
+            svc.sweep_run("growth", [])
+        svc.update_param("wacc", 0.2)
+        with pytest.raises(ValueError, match="uncommitted"):
+            svc.grid_run("growth", [0.0], "wacc", [0.1], "value")
+
+
+class TestSweepEndpoints:
+    def test_sweep_run_ndjson(self, tmp_path: Path) -> None:
+        from fastapi.testclient import TestClient
+
+        from fin123.ui.server import create_app
+
+        client = TestClient(create_app(_sweep_project(tmp_path)))
+        resp = client.post("/api/sweeps/run", json={"input": "wacc", "values": [0.08, 0.1]})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        events = [json.loads(line) for line in resp.text.splitlines()]
+        assert [e["event"] for e in events] == ["started", "point", "point", "completed"]
+        assert client.get(f"/api/sweeps/{events[-1]['id']}").status_code == 200
+
+    def test_grid_run_rejects_unknown_param(self, tmp_path: Path) -> None:
+        from fastapi.testclient import TestClient
+
+        from fin123.ui.server import create_app
+
+        client = TestClient(create_app(_sweep_project(tmp_path)))
+        resp = client.post(
+            "/api/grids/run",
+            json={"input_x": "nope", "values_x": [1], "input_y": "wacc",
+                  "values_y": [0.1], "output": "value"},
+        )
+        assert resp.status_code == 400
+
+    def test_sweep_and_grid_jobs(self, tmp_path: Path) -> None:
+        from fastapi.testclient import TestClient
+
+        from fin123.ui.server import create_app
+
+        client = TestClient(create_app(_sweep_project(tmp_path)))
+        submissions = {
+            "sweep": {"input": "wacc", "values": [0.08, 0.1]},
+            "grid": {"input_x": "growth", "values_x": [0.0, 0.01], "input_y": "wacc",
+                     "values_y": [0.1], "output": "value"},
+        }
+        for kind, params in submissions.items():
+            resp = client.post("/api/jobs", json={"kind": kind, "params": params})
+            assert resp.status_code == 202 and resp.json()["writes"]
+            job_id = resp.json()["job_id"]
+            for _ in range(500):
+                if client.get(f"/api/jobs/{job_id}").json()["status"] == "succeeded":
+                    break
+                time.sleep(0.02)
+            record = client.get(f"/api/jobs/{job_id}/result").json()["result"]
+            assert record["success_count"] == 2 and record["failure_count"] == 0
+        bad = {"kind": "sweep", "params": {"input": "nope", "values": [1]}}
+        assert client.post("/api/jobs", json=bad).status_code == 400
+
+    def test_sweep_stream_holds_writer_lock(self, tmp_path: Path) -> None:
+        from fastapi.testclient import TestClient
+
+        from fin123.ui.jobs import writer_lock
+        from fin123.ui.server import create_app
+
+        project = _sweep_project(tmp_path)
+        client = TestClient(create_app(project))
+        responses: list = []
+        sweeper = threading.Thread(target=lambda: responses.append(
+            client.post("/api/sweeps/run", json={"input": "wacc", "values": [0.08, 0.1]})
+        ))
+        with writer_lock(project):
+            sweeper.start()
+            sweeper.join(0.3)
+            assert sweeper.is_alive()  # queued behind the held writer lock
+        sweeper.join(30)
+        events = [json.loads(line) for line in responses[0].text.splitlines()]
+        assert [e["event"] for e in events] == ["started", "point", "point", "completed"]
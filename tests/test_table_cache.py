@@ -0,0 +1,137 @@
+"""Tests for the content-addressed table materialization cache."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+import yaml
+
+from fin123 import table_cache as table_cache_mod
+from fin123.batch import run_batch
+from fin123.table_cache import TableCache
+from fin123.workbook import Workbook
+
+
+def _project(tmp_path: Path) -> Path:
+    (tmp_path / "inputs").mkdir()
+    (tmp_path / "inputs" / "prices.csv").write_text("ticker,price\nAAA,10\nBBB,60\nCCC,80\n")
+    spec = {
+        "version": 1,
+        "params": {"threshold": 50, "ticker": "BBB"},
+        "tables": {"prices": {"source": "inputs/prices.csv", "format": "csv"}},
+        "plans": [
+            {
+                "name": "expensive",
+                "source": "prices",
+                "steps": [{"func": "filter", "column": "price", "op": ">", "value": 50}],
+            }
+        ],
+        "outputs": [
+            {"name": "expensive", "type": "table"},
+            {
+                "name": "px",
+                "type": "scalar",
+                "func": "lookup_scalar",
+                "args": {
+                    "table_name": "prices",
+                    "key_col": "ticker",
+                    "value_col": "price",
+                    "key_value": "$ticker",
+                },
+            },
+        ],
+    }
+    (tmp_path / "workbook.yaml").write_text(yaml.dump(spec))
+    return tmp_path
+
+
+def _meta(result) -> dict:
+    return json.loads((result.run_dir / "run_meta.json").read_text())
+
+
+@pytest.fixture
+def evaluations(monkeypatch) -> list[int]:
+    calls: list[int] = []
+    original = Workbook.evaluate_tables
+
+    def counting(self, params=None):
+        calls.append(1)
+        return original(self, params)
+
+    monkeypatch.setattr(Workbook, "evaluate_tables", counting)
+    return calls
+
+
+def _forget_memory() -> None:
+    table_cache_mod._memory.clear()
+
+
+class TestTableCache:
+    def test_second_build_hits(self, tmp_path: Path, evaluations: list[int]) -> None:
+        project = _project(tmp_path)
+        first = Workbook(project).run()
+        second = Workbook(project, overrides={"ticker": "CCC"}).run()
+
+        assert len(evaluations) == 1
+        assert _meta(first)["timings_ms"]["table_cache"] == {"hits": 0, "misses": 2}
+        assert _meta(second)["timings_ms"]["table_cache"] == {"hits": 2, "misses": 0}
+        assert second.scalars["px"] == 80
+        assert _meta(first)["export_hash"] != ""
+
+    def test_disk_hit_is_byte_identical(self, tmp_path: Path, evaluations: list[int]) -> None:
+        project = _project(tmp_path)
+        first = Workbook(project).run()
+        _forget_memory()
+        second = Workbook(project).run()
+        assert len(evaluations) == 1
+        assert _meta(second)["export_hash"] == _meta(first)["export_hash"]
+
+    def test_input_or_plan_change_misses(self, tmp_path: Path, evaluations: list[int]) -> None:
+        project = _project(tmp_path)
+        Workbook(project).run()
+
+        (project / "inputs" / "prices.csv").write_text("ticker,price\nAAA,10\nBBB,70\nCCC,80\n")
+        assert Workbook(project).run().scalars["px"] == 70
+
+        spec = yaml.safe_load((project / "workbook.yaml").read_text())
+        spec["plans"][0]["steps"][0]["value"] = 75
+        (project / "workbook.yaml").write_text(yaml.dump(spec))
+        result = Workbook(project).run()
+        assert len(evaluations) == 3
+        assert result.tables["expensive"]["ticker"].to_list() == ["CCC"]
+
+    def test_damaged_entry_is_rebuilt(self, tmp_path: Path, evaluations: list[int]) -> None:
+        project = _project(tmp_path)
+        Workbook(project).run()
+        _forget_memory()
+        for f in (project / "cache" / "tables").rglob("*.arrow"):
+            f.write_bytes(b"garbage")
+        assert Workbook(project).run().scalars["px"] == 60
+        assert len(evaluations) == 2
+
+    def test_disabled_by_config(self, tmp_path: Path, evaluations: list[int]) -> None:
+        project = _project(tmp_path)
+        (project / "fin123.yaml").write_text("table_cache: false\n")
+        Workbook(project).run()
+        Workbook(project).run()
+        assert len(evaluations) == 2
+        assert not (project / "cache" / "tables").exists()
+
+    def test_batch_evaluates_tables_once(self, tmp_path: Path, evaluations: list[int]) -> None:
+        project = _project(tmp_path)
+        summary = run_batch(project, [{"ticker": t} for t in ("AAA", "BBB", "CCC")])
+        assert summary["ok"] == 3
+        assert len(evaluations) == 1
+
+    def test_eviction_and_clear(self, tmp_path: Path) -> None:
+        import polars as pl
+
+        cache = TableCache(tmp_path, max_entries=2)
+        for key in ("k1", "k2", "k3"):
+            cache.put(key, {"t": pl.DataFrame({"a": [1]})})
+        entries = sorted(d.name for d in cache.cache_dir.iterdir())
+        assert len(entries) == 2 and "k1" not in entries
+        assert cache.clear() > 0
+        assert cache.get("k3") is None
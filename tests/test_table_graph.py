@@ -0,0 +1,149 @@
+"""Tests for single-pass TableGraph evaluation and selective materialization."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import inspect
+
+import polars as pl
+import pytest
+import yaml
+
+import fin123.functions.table  # noqa: F401
+from fin123.project import scaffold_project
+from fin123.tables import TableGraph
+from fin123.workbook import Workbook, _formula_table_refs
+from fin123.formulas import parse_formula
+from fin123.formulas.evaluator import TABLE_ARG_POSITIONS, _FUNC_TABLE
+
+
+def _graph(tmp_path: Path) -> TableGraph:
+    """Two plans over one CSV source, one joining against a second source."""
+    (tmp_path / "prices.csv").write_text(
+        "ticker,price\nAAA,10\nBBB,60\nCCC,80\n"
+    )
+    (tmp_path / "ref.csv").write_text("ticker,sector\nAAA,tech\nBBB,energy\nCCC,tech\n")
+    tg = TableGraph(tmp_path)
+    tg.add_source("prices", "prices.csv")
+    tg.add_source("ref", "ref.csv")
+    tg.add_plan(
+        "expensive", "prices", [{"func": "filter", "column": "price", "op": ">", "value": 50}]
+    )
+    tg.add_plan(
+        "enriched", "prices", [{"func": "join_left", "right": "ref", "on": "ticker"}]
+    )
+    return tg
+
+
+class TestSinglePassEvaluation:
+    def test_single_pass_matches_per_frame_collect(self, tmp_path: Path) -> None:
+        tg = _graph(tmp_path)
+        single = tg.evaluate()
+        separate = tg.evaluate(single_pass=False)
+        assert list(single) == list(separate)
+        for name in single:
+            assert single[name].equals(separate[name])
+
+    def test_materialize_subset_skips_intermediates(self, tmp_path: Path) -> None:
+        tg = _graph(tmp_path)
+        frames = tg.evaluate(materialize={"expensive"})
+        # "prices" and "enriched" are never collected; "ref" is a join target.
+        assert set(frames) == {"expensive", "ref"}
+        assert frames["expensive"]["ticker"].to_list() == ["BBB", "CCC"]
+
+    def test_join_right_side_always_materialized(self, tmp_path: Path) -> None:
+        tg = _graph(tmp_path)
+        frames = tg.evaluate(materialize=["enriched"])
+        assert set(frames) == {"ref", "enriched"}
+
+    def test_deferred_join_validation_still_runs(self, tmp_path: Path) -> None:
+        tg = _graph(tmp_path)
+        (tmp_path / "ref.csv").write_text("ticker,sector\nAAA,tech\nAAA,energy\n")
+        with pytest.raises(ValueError, match="duplicate key"):
+            tg.evaluate(materialize=["expensive"])
+
+    def test_unknown_table_raises(self, tmp_path: Path) -> None:
+        tg = _graph(tmp_path)
+        with pytest.raises(ValueError, match="unknown table"):
+            tg.evaluate(materialize=["nope"])
+
+    def test_repeated_evaluation_is_stable(self, tmp_path: Path) -> None:
+        tg = _graph(tmp_path)
+        first = tg.evaluate()
+        second = tg.evaluate()
+        assert all(first[n].equals(second[n]) for n in first)
+
+
+class TestWorkbookRequiredTables:
+    def test_formula_table_refs_literals(self) -> None:
+        tree = parse_formula('=VLOOKUP("AAPL", "prices", "close") + SUMIFS("facts", "v", "k", "=", 1)')
+        assert _formula_table_refs(tree) == {"prices", "facts"}
+
+    def test_formula_table_refs_computed_name(self) -> None:
+        tree = parse_formula('=INDEX(tbl, "close", 1)')
+        assert _formula_table_refs(tree) is None
+
+    def test_formula_table_refs_finance(self) -> None:
+        tree = parse_formula('=XNPV(0.1, "cf", "d", "amt") + XIRR("flows", "d", "amt")')
+        assert _formula_table_refs(tree) == {"cf", "flows"}
+
+    def test_every_table_reader_has_arg_position(self) -> None:
+        # Any formula function that reads the table cache must say where its
+        # table argument is, or selective materialization would skip it.
+        readers = {
+            name
+            for name, fn in _FUNC_TABLE.items()
+            if any(
+                marker in inspect.getsource(fn)
+                for marker in ("tc[", "in tc", "_get_table(tc", "_get_table_cols(tc")
+            )
+        }
+        assert readers <= set(TABLE_ARG_POSITIONS)
+
+    def test_finance_scalar_with_table_output(self, tmp_path: Path) -> None:
+        (tmp_path / "cf.csv").write_text(
+            "d,amt\n2024-01-01,-1000\n2024-07-01,500\n2025-01-01,600\n"
+        )
+        spec = {
+            "version": 1,
+            "tables": {"cf": {"source": "cf.csv", "format": "csv"}},
+            "plans": [
+                {
+                    "name": "o",
+                    "source": "cf",
+                    "steps": [{"func": "filter", "column": "amt", "op": ">", "value": 0}],
+                }
+            ],
+            "outputs": [
+                {"name": "o", "type": "table"},
+                {"name": "npv", "type": "scalar", "formula": '=XNPV(0.1, "cf", "d", "amt")'},
+                {"name": "irr", "type": "scalar", "formula": '=XIRR("cf", "d", "amt")'},
+            ],
+        }
+        (tmp_path / "workbook.yaml").write_text(yaml.dump(spec))
+        wb = Workbook(tmp_path)
+        assert "cf" in wb._required_table_names()
+        result = wb.run()
+        assert result.scalars["npv"] == pytest.approx(22.11, rel=1e-2)
+        assert result.scalars["irr"] == pytest.approx(0.1318, rel=1e-3)
+
+    def test_demo_required_tables(self, tmp_path: Path) -> None:
+        project = scaffold_project(tmp_path / "proj")
+        wb = Workbook(project)
+        required = wb._required_table_names()
+        assert required is not None
+        # Outputs, lookup target and primary-key table; the raw prices source
+        # is only an intermediate.
+        assert "prices" not in required
+        assert {"filtered_prices", "va_estimates"} <= required
+
+    def test_run_outputs_unchanged(self, tmp_path: Path) -> None:
+        project = scaffold_project(tmp_path / "proj")
+        result = Workbook(project).run()
+        assert set(result.tables) == {
+            "filtered_prices",
+            "summary_by_category",
+            "prices_with_estimates",
+        }
+        assert isinstance(result.tables["filtered_prices"], pl.DataFrame)
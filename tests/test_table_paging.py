@@ -0,0 +1,154 @@
+"""Tests for the paged, pushdown-filtered table output API."""
+
+from __future__ import annotations
+
+import io
+import random
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from fin123.project import scaffold_project
+from fin123.ui.service import ProjectService
+from fin123.ui.view_transforms import (
+    BetweenFilter,
+    BlanksFilter,
+    NumericFilter,
+    SortSpec,
+    TextFilter,
+    ValueListFilter,
+    apply_view_transforms,
+    view_query,
+)
+
+N_ROWS = 60_000
+
+
+def _big_table() -> pl.DataFrame:
+    rng = random.Random(11)
+    return pl.DataFrame({
+        "id": list(range(N_ROWS)),
+        "region": [rng.choice(["North", "South", "east", None]) for _ in range(N_ROWS)],
+        "amount": [rng.choice([None, float("nan"), round(rng.uniform(-50, 50), 2)]) for _ in range(N_ROWS)],
+        "units": [rng.randint(0, 20) for _ in range(N_ROWS)],
+    })
+
+
+@pytest.fixture(scope="module")
+def big() -> pl.DataFrame:
+    return _big_table()
+
+
+@pytest.fixture
+def svc(tmp_path: Path, big: pl.DataFrame) -> ProjectService:
+    svc = ProjectService(scaffold_project(tmp_path / "proj"))
+    svc.save_snapshot()
+    run_id = svc.build_workbook()["run_id"]
+    big.write_parquet(svc.project_dir / "runs" / run_id / "outputs" / "big.parquet")
+    return svc
+
+
+CASES = [
+    ([], []),
+    ([SortSpec(column="units", descending=True)], []),
+    ([SortSpec(column="region"), SortSpec(column="amount", descending=True)], []),
+    ([], [NumericFilter(column="units", op=">=", value=15)]),
+    (
+        [SortSpec(column="amount")],
+        [TextFilter(column="region", op="starts_with", value="NO"), BlanksFilter(column="amount", show_blanks=False)],
+    ),
+    ([SortSpec(column="id", descending=True)], [BetweenFilter(column="amount", low=-5, high=5)]),
+    ([], [ValueListFilter(column="region", values=["east", "South"]), NumericFilter(column="units", op="<>", value=3)]),
+]
+
+
+class TestQueryTableOutput:
+    @pytest.mark.parametrize("sorts,filters", CASES)
+    @pytest.mark.parametrize("offset", [0, 12_345])
+    def test_matches_in_memory_transforms(self, svc, big, sorts, filters, offset) -> None:
+        expected = apply_view_transforms(big, sorts=sorts, filters=filters)
+        result = svc.query_table_output("big", offset=offset, limit=1000, sorts=sorts, filters=filters)
+        assert result["total_rows"] == expected.height
+        assert result["page"].equals(expected.slice(offset, 1000))
+
+    def test_projection(self, svc, big) -> None:
+        result = svc.query_table_output(
+            "big", columns=["units", "id"], sorts=[SortSpec(column="units")], limit=10
+        )
+        assert result["columns"] == ["units", "id"]
+        assert result["total_rows"] == N_ROWS
+
+    def test_pushdown(self, tmp_path: Path, big) -> None:
+        path = tmp_path / "t.parquet"
+        big.write_parquet(path)
+        rows, _ = view_query(
+            pl.scan_parquet(path),
+            filters=[NumericFilter(column="units", op=">", value=3)],
+            columns=["id"],
+        )
+        plan = rows.explain()
+        assert "SELECTION" in plan and "PROJECT 2/4 COLUMNS" in plan
+
+    def test_unknown_column(self, svc) -> None:
+        with pytest.raises(ValueError, match="nope"):
+            svc.query_table_output("big", sorts=[SortSpec(column="nope")])
+
+    def test_get_table_output_counts_all_rows(self, svc) -> None:
+        result = svc.get_table_output("big", limit=5)
+        assert len(result["rows"]) == 5 and result["total_rows"] == N_ROWS and result["limited"]
+
+
+class TestEndpoints:
+    @pytest.fixture
+    def client(self, svc):
+        from fastapi.testclient import TestClient
+
+        from fin123.ui.server import create_app
+
+        return TestClient(create_app(svc.project_dir))
+
+    def test_json_page(self, client, big) -> None:
+        resp = client.post("/api/outputs/table/page", json={
+            "name": "big", "offset": 59_990, "limit": 50,
+            "sorts": [{"column": "id"}],
+        })
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["total_rows"] == N_ROWS and data["has_more"] is False
+        assert [r["id"] for r in data["rows"]] == list(range(59_990, N_ROWS))
+        # NaN is not valid JSON; it is serialized as null
+        nan_rows = big.filter(pl.col("amount").is_nan())["id"].to_list()
+        resp = client.post("/api/outputs/table/page", json={
+            "name": "big", "limit": 1, "filters": [{"type": "value_list", "column": "id", "values": nan_rows[:1]}],
+        })
+        assert resp.json()["rows"][0]["amount"] is None
+
+    def test_arrow_page(self, client, big) -> None:
+        resp = client.post("/api/outputs/table/page", json={
+            "name": "big", "limit": 100, "format": "arrow", "columns": ["id", "units"],
+            "filters": [{"type": "numeric", "column": "units", "op": "=", "value": 7}],
+        })
+        assert resp.status_code == 200
+        page = pl.read_ipc(io.BytesIO(resp.content))
+        expected = big.filter(pl.col("units") == 7).select("id", "units")
+        assert page.equals(expected.head(100))
+        assert resp.headers["X-Total-Rows"] == str(expected.height)
+        assert resp.headers["X-Has-More"] == "true"
+
+    def test_errors(self, client) -> None:
+        assert client.post("/api/outputs/table/page", json={"name": "missing"}).status_code == 404
+        resp = client.post("/api/outputs/table/page", json={"name": "big", "columns": ["nope"]})
+        assert resp.status_code == 400
+        assert client.post("/api/outputs/table/page", json={"name": "big", "limit": 0}).status_code == 422
+        for limit in (0, 50_001):
+            resp = client.post("/api/outputs/table/view", json={"name": "big", "limit": limit})
+            assert resp.status_code == 422
+
+    def test_view_totals_past_50k(self, client, big) -> None:
+        resp = client.post("/api/outputs/table/view", json={
+            "name": "big", "limit": 10, "sorts": [{"column": "units", "descending": True}],
+        })
+        data = resp.json()
+        assert data["total_rows"] == N_ROWS and data["limited"]
+        assert data["rows"][0]["units"] == big["units"].max()
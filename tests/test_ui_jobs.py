@@ -0,0 +1,232 @@
+"""Tests for UI background jobs and the project writer lock."""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from fin123.ui import jobs as jobs_mod
+from fin123.ui.jobs import JobManager
+
+
+@pytest.fixture
+def manager(tmp_path: Path):
+    mgr = JobManager(tmp_path, max_workers=2)
+    yield mgr
+    mgr.shutdown(wait=True)
+
+
+class TestJobManager:
+    def test_success_and_failure(self, manager: JobManager) -> None:
+        ok = manager.submit("build", lambda: {"run_id": "r1"})
+        boom = manager.submit("build", lambda: 1 / 0)
+        dirty = manager.submit("build", lambda: {"error": "Working copy has uncommitted edits."})
+
+        assert manager.wait(ok.job_id).status == "succeeded"
+        assert ok.result == {"run_id": "r1"} and ok.started_at and ok.finished_at
+        assert manager.wait(boom.job_id).status == "failed"
+        assert "division" in boom.error
+        assert manager.wait(dirty.job_id).status == "failed"
+        assert dirty.error.startswith("Working copy")
+        assert [j.job_id for j in manager.list_jobs()] == [dirty.job_id, boom.job_id, ok.job_id]
+
+    def test_writers_serialized_readers_not(self, manager: JobManager) -> None:
+        active, peak = [0], [0]
+        guard = threading.Lock()
+        writer_started, release = threading.Event(), threading.Event()
+
+        def writer() -> None:
+            with guard:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            writer_started.set()
+            release.wait(5)
+            with guard:
+                active[0] -= 1
+
+        w1 = manager.submit("build", writer)
+        writer_started.wait(5)
+        w2 = manager.submit("build", writer)
+        reader = manager.submit("surface", lambda: "read", writes=False)
+        # The reader finishes while the first writer still holds the lock
+        assert manager.wait(reader.job_id, timeout=5).status == "succeeded"
+        assert manager.get(w2.job_id).status == "running"  # blocked on the lock
+        release.set()
+        manager.wait(w1.job_id, timeout=5)
+        manager.wait(w2.job_id, timeout=5)
+        assert peak[0] == 1
+
+    def test_lock_shared_per_project(self, tmp_path: Path) -> None:
+        assert jobs_mod.writer_lock(tmp_path) is jobs_mod.writer_lock(tmp_path / "." / "")
+        assert jobs_mod.writer_lock(tmp_path) is not jobs_mod.writer_lock(tmp_path / "other")
+
+    def test_cancel_queued_only(self, tmp_path: Path) -> None:
+        mgr = JobManager(tmp_path, max_workers=1)
+        release = threading.Event()
+        running = mgr.submit("build", lambda: release.wait(5))
+        queued = mgr.submit("build", lambda: pytest.fail("cancelled job ran"))
+
+        assert mgr.cancel(queued.job_id).status == "cancelled"
+        while mgr.get(running.job_id).status == "queued":
+            time.sleep(0.01)
+        with pytest.raises(ValueError, match="running"):
+            mgr.cancel(running.job_id)
+        with pytest.raises(KeyError):
+            mgr.cancel("nope")
+        release.set()
+        assert mgr.wait(running.job_id).status == "succeeded"
+        mgr.shutdown(wait=True)
+        assert queued.status == "cancelled" and queued.result is None
+
+    def test_finished_jobs_pruned(self, manager: JobManager, monkeypatch) -> None:
+        monkeypatch.setattr(jobs_mod, "MAX_FINISHED_JOBS", 3)
+        ids = [manager.submit("commit", lambda: {}).job_id for _ in range(6)]
+        for jid in ids:
+            manager.wait(jid)
+        manager.submit("commit", lambda: {})
+        assert manager.get(ids[0]) is None
+        assert manager.get(ids[-1]) is not None
+
+
+class TestJobEndpoints:
+    @pytest.fixture
+    def client(self, tmp_path: Path):
+        from fastapi.testclient import TestClient
+
+        from fin123.project import scaffold_project
+        from fin123.ui.server import _svc, create_app
+
+        app = create_app(scaffold_project(tmp_path / "proj"))
+        with TestClient(app) as client:
+            client.svc = _svc()
+            yield client
+
+    def _wait(self, client, job_id: str) -> dict:
+        for _ in range(500):
+            job = client.get(f"/api/jobs/{job_id}").json()
+            if job["status"] in ("succeeded", "failed", "cancelled"):
+                return job
+            time.sleep(0.02)
+        raise AssertionError("job did not finish")
+
+    def test_build_job(self, client) -> None:
+        resp = client.post("/api/jobs", json={"kind": "build"})
+        assert resp.status_code == 202
+        job_id = resp.json()["job_id"]
+        assert self._wait(client, job_id)["status"] == "succeeded"
+        result = client.get(f"/api/jobs/{job_id}/result").json()["result"]
+        assert client.get("/api/run/latest").json()["run_id"] == result["run_id"]
+        assert [j["job_id"] for j in client.get("/api/jobs").json()] == [job_id]
+
+    def test_job_errors(self, client) -> None:
+        assert client.post("/api/jobs", json={"kind": "rm -rf"}).status_code == 400
+        assert client.post("/api/jobs", json={"kind": "workflow", "params": {}}).status_code == 422
+        assert client.post(
+            "/api/jobs", json={"kind": "verify", "params": {"run_id": "../x"}}
+        ).status_code == 400
+        assert client.get("/api/jobs/missing").status_code == 404
+        assert client.post("/api/jobs/missing/cancel").status_code == 404
+
+    def test_result_conflict_while_running(self, client, monkeypatch) -> None:
+        release = threading.Event()
+        monkeypatch.setattr(client.svc, "build_workbook", lambda: release.wait(5) and {"run_id": "x"})
+        job_id = client.post("/api/jobs", json={"kind": "build"}).json()["job_id"]
+        assert client.get(f"/api/jobs/{job_id}/result").status_code == 409
+        release.set()
+        assert self._wait(client, job_id)["status"] == "succeeded"
+
+    def test_reads_served_during_legacy_build(self, client, monkeypatch) -> None:
+        started, release = threading.Event(), threading.Event()
+
+        def slow_build() -> dict:
+            started.set()
+            release.wait(5)
+            return {"run_id": "slow"}
+
+        monkeypatch.setattr(client.svc, "build_workbook", slow_build)
+        responses: list = []
+        builder = threading.Thread(target=lambda: responses.append(client.post("/api/build")))
+        builder.start()
+        assert started.wait(5)
+
+        t0 = time.monotonic()
+        assert client.get("/api/project").status_code == 200
+        assert client.get("/api/sheet", params={"sheet": "Sheet1"}).status_code == 200
+        assert time.monotonic() - t0 < 2  # not stuck behind the 5 s build
+        assert not release.is_set()
+
+        release.set()
+        builder.join(5)
+        assert responses[0].json() == {"run_id": "slow"}
+
+    def test_edit_waits_for_concurrent_commit(self, client, monkeypatch) -> None:
+        from fin123.versioning import SnapshotStore
+
+        started, release = threading.Event(), threading.Event()
+        real_save = SnapshotStore.save_snapshot
+
+        def slow_save(store, workbook_yaml: str) -> str:
+            started.set()
+            release.wait(5)
+            return real_save(store, workbook_yaml)
+
+        monkeypatch.setattr(SnapshotStore, "save_snapshot", slow_save)
+        responses: dict = {}
+        committer = threading.Thread(
+            target=lambda: responses.setdefault("commit", client.post("/api/commit"))
+        )
+        committer.start()
+        assert started.wait(5)
+
+        edit = {"sheet": "Sheet1", "edits": [{"addr": "A1", "value": "918273"}]}
+        editor = threading.Thread(
+            target=lambda: responses.setdefault("edit", client.post("/api/sheet/cells", json=edit))
+        )
+        editor.start()
+        editor.join(0.3)
+        assert editor.is_alive()  # queued behind the commit's writer lock
+
+        release.set()
+        committer.join(5)
+        editor.join(5)
+        assert responses["commit"].status_code == 200 and responses["edit"].status_code == 200
+        # The edit landed after the commit, so it is still uncommitted
+        assert client.svc._dirty
+        assert "918273" not in (client.svc.project_dir / "workbook.yaml").read_text()
+
+    def test_viewport_waits_for_inflight_edit(self, client, monkeypatch) -> None:
+        assert client.get("/api/sheet", params={"sheet": "Sheet1"}).status_code == 200
+        cg = client.svc._get_cell_graph()
+        started, release = threading.Event(), threading.Event()
+        real_recalculate = cg.recalculate
+
+        def slow_recalculate(*args, **kwargs):
+            started.set()
+            release.wait(5)
+            return real_recalculate(*args, **kwargs)
+
+        monkeypatch.setattr(cg, "recalculate", slow_recalculate)
+        edit = {"sheet": "Sheet1", "edits": [{"addr": "A1", "value": "918273"}]}
+        responses: dict = {}
+        editor = threading.Thread(
+            target=lambda: responses.setdefault("edit", client.post("/api/sheet/cells", json=edit))
+        )
+        editor.start()
+        assert started.wait(5)
+
+        reader = threading.Thread(target=lambda: responses.setdefault(
+            "view", client.get("/api/sheet", params={"sheet": "Sheet1"})
+        ))
+        reader.start()
+        reader.join(0.3)
+        assert reader.is_alive()  # not iterating the sheet mid-edit
+
+        release.set()
+        editor.join(5)
+        reader.join(5)
+        assert responses["edit"].status_code == 200
+        cells = {c["addr"]: c for c in responses["view"].json()["cells"]}
+        assert cells["A1"]["display"] == "918273"
@@ -0,0 +1,132 @@
+"""Tests for metadata-only row counts, cached input hashes, and verify --all."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import polars as pl
+import pytest
+from click.testing import CliRunner
+
+from fin123 import verify as verify_mod
+from fin123.cli_core import main
+from fin123.verify import parquet_row_count, verify_run, verify_runs
+
+
+@pytest.fixture
+def project_dir(tmp_path: Path) -> Path:
+    from fin123.project import scaffold_project
+
+    return scaffold_project(tmp_path / "proj")
+
+
+@pytest.fixture
+def run_ids(project_dir: Path) -> list[str]:
+    from fin123.workbook import Workbook
+
+    return [Workbook(project_dir).run().run_dir.name for _ in range(3)]
+
+
+def _input_path(project_dir: Path, run_id: str) -> Path:
+    meta = json.loads((project_dir / "runs" / run_id / "run_meta.json").read_text())
+    return Path(next(iter(meta["input_hashes"])))
+
+
+class TestRowCounts:
+    def test_footer_count(self, tmp_path: Path) -> None:
+        path = tmp_path / "t.parquet"
+        pl.DataFrame({"a": range(12345), "b": ["x"] * 12345}).write_parquet(path, row_group_size=1000)
+        assert parquet_row_count(path) == 12345
+
+    def test_verify_does_not_read_tables(self, project_dir: Path, run_ids: list[str], monkeypatch) -> None:
+        def fail(*args, **kwargs):
+            raise AssertionError("verify must not load output tables")
+
+        monkeypatch.setattr(pl, "read_parquet", fail)
+        report = verify_run(project_dir, run_ids[0])
+        assert report["status"] == "pass", report["failures"]
+
+    def test_row_count_mismatch_detected(self, project_dir: Path, run_ids: list[str]) -> None:
+        meta_path = project_dir / "runs" / run_ids[0] / "run_meta.json"
+        meta = json.loads(meta_path.read_text())
+        assert meta["export_row_counts"]
+        table = next(iter(meta["export_row_counts"]))
+        meta["export_row_counts"][table] += 1
+        meta_path.write_text(json.dumps(meta))
+        report = verify_run(project_dir, run_ids[0])
+        assert any(f.startswith(f"Row count mismatch for {table}") for f in report["failures"])
+
+
+class TestHashCache:
+    def test_cached_hashes_match(self, project_dir: Path, run_ids: list[str]) -> None:
+        assert verify_run(project_dir, run_ids[0], use_hash_cache=True) == verify_run(
+            project_dir, run_ids[0]
+        )
+
+    def test_changed_input_detected(self, project_dir: Path, run_ids: list[str]) -> None:
+        path = _input_path(project_dir, run_ids[0])
+        path.write_text(path.read_text() + "\n")
+        report = verify_run(project_dir, run_ids[0], use_hash_cache=True)
+        assert any("Input hash mismatch" in f for f in report["failures"])
+
+    def test_trusts_unchanged_stat(self, project_dir: Path, run_ids: list[str]) -> None:
+        path = _input_path(project_dir, run_ids[0])
+        stat = path.stat()
+        data = bytearray(path.read_bytes())
+        data[-2] = ord("9") if data[-2] != ord("9") else ord("8")
+        path.write_bytes(bytes(data))
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        # Same size and mtime: the cache is trusted, a full verify is not fooled
+        assert verify_run(project_dir, run_ids[0], use_hash_cache=True)["status"] == "pass"
+        assert verify_run(project_dir, run_ids[0])["status"] == "fail"
+
+
+class TestVerifyAll:
+    def test_summary(self, project_dir: Path, run_ids: list[str]) -> None:
+        summary = verify_runs(project_dir)
+        assert summary["total"] == 3 and summary["passed"] == 3 and summary["failed"] == 0
+        assert [r["run_id"] for r in summary["runs"]] == sorted(run_ids)
+        for run_id in run_ids:
+            assert (project_dir / "runs" / run_id / "verify_report.json").exists()
+
+    def test_parallel_matches_sequential(self, project_dir: Path, run_ids: list[str]) -> None:
+        (project_dir / "runs" / run_ids[1] / "outputs" / "scalars.json").write_text("{}")
+        sequential = verify_runs(project_dir)
+        assert verify_runs(project_dir, max_workers=2) == sequential
+        assert sequential["failed"] == 1
+        assert [r["run_id"] for r in sequential["runs"] if r["status"] == "fail"] == [run_ids[1]]
+
+    def test_skips_directories_without_meta(self, project_dir: Path, run_ids: list[str]) -> None:
+        (project_dir / "runs" / "partial").mkdir()
+        assert "partial" not in verify_mod.list_verifiable_runs(project_dir)
+
+    def test_lists_runs_from_index(self, project_dir: Path, run_ids: list[str], monkeypatch) -> None:
+        monkeypatch.setattr(verify_mod.RunIndex, "run_ids", lambda self: run_ids[:1])
+        assert verify_mod.list_verifiable_runs(project_dir) == run_ids[:1]
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_corrupt_meta_fails_only_that_run(
+        self, project_dir: Path, run_ids: list[str], max_workers: int
+    ) -> None:
+        (project_dir / "runs" / run_ids[1] / "run_meta.json").write_text('{"run_id": ')
+        summary = verify_runs(project_dir, max_workers=max_workers)
+        assert summary["total"] == 3 and summary["passed"] == 2
+        failed = [r for r in summary["runs"] if r["status"] == "fail"]
+        assert [r["run_id"] for r in failed] == [run_ids[1]]
+        assert "JSONDecodeError" in failed[0]["failures"][0]
+
+    def test_cli(self, project_dir: Path, run_ids: list[str]) -> None:
+        runner = CliRunner()
+        result = runner.invoke(main, ["verify", "--all", "--project", str(project_dir)])
+        assert result.exit_code == 0, result.output
+        assert "Verified 3 build(s): 3 passed, 0 failed" in result.output
+
+        result = runner.invoke(main, ["--json", "verify", "--all", "--project", str(project_dir)])
+        payload = json.loads(result.output)
+        assert payload["ok"] and payload["data"]["passed"] == 3
+
+        result = runner.invoke(main, ["verify", "--project", str(project_dir)])
+        assert result.exit_code == 2
@@ -0,0 +1,234 @@
+"""Tests for Polars translation of worksheet derived columns."""
+
+from __future__ import annotations
+
+import math
+from typing import Any
+
+import polars as pl
+import pytest
+
+from fin123.formulas.errors import ENGINE_ERRORS
+from fin123.formulas.vectorized import VectorizeError
+from fin123.worksheet.compiler import compile_worksheet
+from fin123.worksheet.eval_expr import RowExpr, column_kind, translate_row_tree
+from fin123.worksheet.eval_row import _error_code, evaluate_row_tree, parse_row_expression
+from fin123.worksheet.spec import parse_worksheet_view
+from fin123.worksheet.view_table import ViewTable, from_polars, suggest_schema
+
+FROZEN_TIME = "2025-06-15T12:00:00+00:00"
+
+
+@pytest.fixture
+def messy_vt() -> ViewTable:
+    """Rows with nulls, zeros, NaN and empty strings."""
+    df = pl.DataFrame({
+        "id": list(range(8)),
+        "a": [1, 0, None, -3, 5, 2, 7, 0],
+        "x": [1.5, 0.0, None, float("nan"), -2.25, 2.5, 0.125, 3.0],
+        "s": ["p", "", None, "q", "p", "z", "a", "b"],
+        "t": [True, False, None, True, False, True, True, False],
+    })
+    return from_polars(df, suggest_schema(df), row_key="id")
+
+
+def _row_reference(vt: ViewTable, exprs: dict[str, str]) -> list[dict[str, Any]]:
+    """Evaluate expressions row by row, as the compiler's fallback does."""
+    trees = {name: parse_row_expression(e) for name, e in exprs.items()}
+    out = []
+    for row in vt.df.to_dicts():
+        ctx = dict(row)
+        for name, tree in trees.items():
+            try:
+                ctx[name] = evaluate_row_tree(tree, ctx)
+            except ENGINE_ERRORS as exc:
+                ctx[name] = {"error": _error_code(exc)}
+        out.append({name: ctx[name] for name in exprs})
+    return out
+
+
+def _same(got: Any, expected: Any) -> bool:
+    if isinstance(got, float) and isinstance(expected, float):
+        return got == expected or (math.isnan(got) and math.isnan(expected))
+    return got == expected and isinstance(got, bool) == isinstance(expected, bool)
+
+
+def _compile(vt: ViewTable, exprs: dict[str, str], flags: list | None = None):
+    spec = parse_worksheet_view({
+        "name": "ws",
+        "columns": [{"source": "id"}] + [
+            {"name": name, "expression": e} for name, e in exprs.items()
+        ],
+        "flags": flags or [],
+    })
+    return compile_worksheet(vt, spec, compiled_at=FROZEN_TIME)
+
+
+# Declared in dependency order so the reference can evaluate sequentially
+PARITY_EXPRESSIONS = {
+    "ratio": "a / x",
+    "lin": "a + x * 2",
+    "guarded": "IFERROR(ratio, -1)",
+    "bumped": "ratio + 1",
+    "is_err": "ISERROR(ratio)",
+    "lo": "MIN(a, 2)",
+    "hi": "MAX(x, 0.5)",
+    "rounded": "ROUND(x, 1)",
+    "rounded_err": "ROUND(ratio)",
+    "is_p": 's = "p"',
+    "same_s": "s <> s",
+    "both": "AND(t, a)",
+    "either": "OR(s, x)",
+    "negated": "NOT(ratio)",
+    "sq": "x ^ 2",
+    "neg": "-a",
+    "pct": "a%",
+    "total": "SUM(a, t, x)",
+    "mean": "AVERAGE(a, x)",
+    "mag": "ABS(x)",
+    "err_eq": "ratio = ratio",
+    "nan_eq": "x = x",
+    "label": 'IF(t, s, "no")',
+    "cmp": "a > x",
+    "cmp2": "x <= a",
+    "single_min": "MIN(ratio)",
+    "err_cond": "IF(ratio, 1, 0)",
+    "bools": "t + t",
+    "always": "1/0",
+    "chained": "always * 2",
+    "self_div": "IFERROR(a/a, 0)",
+    "passthrough": "+s",
+}
+
+
+class TestParity:
+    def test_matches_row_evaluation(self, messy_vt: ViewTable) -> None:
+        ws = _compile(messy_vt, PARITY_EXPRESSIONS)
+        expected = _row_reference(messy_vt, PARITY_EXPRESSIONS)
+        for got_row, exp_row in zip(ws.rows, expected):
+            for name in PARITY_EXPRESSIONS:
+                assert _same(got_row[name], exp_row[name]), (name, got_row[name], exp_row[name])
+
+    def test_literal_denominators_divide_exactly(self) -> None:
+        xs = [1.75, 0.35, 2.2, -1.1, 0.7, 3.3, 1e-3, 7.0]
+        df = pl.DataFrame({"id": list(range(len(xs))), "x": xs})
+        vt = from_polars(df, suggest_schema(df), row_key="id")
+        exprs = {
+            "q": "x / 2.5",
+            "d": "x / 0.1",
+            "shifted": "-1 + AVERAGE(x, 1) / 2.5",
+            "third": "AVERAGE(x, x, 1)",
+            "pct": "x%",
+            "folded": "x / (2 + 0.5)",
+            "lit": "0.7 / 0.1",
+        }
+        for name, e in exprs.items():
+            # Every expression takes the vectorized path
+            translate_row_tree(parse_row_expression(e), {"x": RowExpr(pl.col("x"), "float")})
+        ws = _compile(vt, exprs)
+        expected = _row_reference(vt, exprs)
+        for got_row, exp_row in zip(ws.rows, expected):
+            for name in exprs:
+                assert got_row[name] == exp_row[name], (name, got_row[name], exp_row[name])
+        assert ws.rows[0]["q"] == 0.7
+
+    def test_column_denominators_reducing_to_literals_divide_exactly(self) -> None:
+        df = pl.DataFrame({
+            "id": [0, 1, 2, 3],
+            "a": [-3, 1, 7, 2],
+            "b": [1, 2, 3, 4],
+            "c": [0.5, 1.5, 2.5, 3.5],
+            "x": [1.75, 0.35, 2.2, -1.1],
+        })
+        vt = from_polars(df, suggest_schema(df), row_key="id")
+        exprs = {
+            "if_den": "x / IF(a > 5, a, 2.5)",
+            "max_den": "(a - 2.5) / MAX(3, c, b)",
+            "min_den": "x / MIN(a, 2.5)",
+            "bool_den": "a / MAX((ABS(3) = OR(a)), 2.5)",
+        }
+        ws = _compile(vt, exprs)
+        expected = _row_reference(vt, exprs)
+        for got_row, exp_row in zip(ws.rows, expected):
+            for name in exprs:
+                assert got_row[name] == exp_row[name], (name, got_row[name], exp_row[name])
+        assert ws.rows[0]["if_den"] == 0.7
+
+    def test_literal_powers_match_rowwise_exactly(self) -> None:
+        xs = [1.0 + i * 0.0137 for i in range(200)]
+        df = pl.DataFrame({"id": list(range(len(xs))), "x": xs, "n": list(range(len(xs)))})
+        vt = from_polars(df, suggest_schema(df), row_key="id")
+        exprs = {"cube": "x ^ 3", "fifth": "(1 + x / 100) ^ 5", "int_cube": "n ^ 3"}
+        ws = _compile(vt, exprs)
+        expected = _row_reference(vt, exprs)
+        for got_row, exp_row in zip(ws.rows, expected):
+            for name in exprs:
+                assert got_row[name] == exp_row[name], (name, got_row[name], exp_row[name])
+                assert type(got_row[name]) is type(exp_row[name])
+
+    def test_error_summary_matches_row_order(self, messy_vt: ViewTable) -> None:
+        exprs = {"late": "IF(id = 3, 1/0, 1)", "early": "IF(id = 1, a/0, 1)", "ok": "a"}
+        ws = _compile(messy_vt, exprs)
+        assert list(ws.error_summary.by_column) == ["early", "late"]
+        assert ws.rows[1]["early"] == {"error": "#DIV/0!"}
+
+    def test_flags(self, messy_vt: ViewTable) -> None:
+        flags = [
+            {"name": "big", "expression": "a / x > 1", "severity": "warning", "message": "m"},
+            {"name": "named", "expression": "s", "severity": "info", "message": "m"},
+        ]
+        ws = _compile(messy_vt, {"ratio": "a / x"}, flags)
+        fired = [[f.name for f in row] for row in ws.flags]
+        # Row 1 divides by zero: the flag error is silent
+        assert fired[1] == []
+        assert fired[6] == ["big", "named"]
+        assert fired[2] == []
+
+
+    def test_numeric_branches_share_a_dtype(self, messy_vt: ViewTable) -> None:
+        # Row evaluation keeps the Python type of the chosen argument; a
+        # column has one dtype, so int and bool branches come back promoted
+        ws = _compile(messy_vt, {"hi": "MAX(t, a)", "pick": "IF(t, 1, 0.5)"})
+        assert ws.rows[0]["hi"] == 1 and ws.rows[0]["pick"] == 1.0
+        assert isinstance(ws.rows[0]["pick"], float)
+
+
+class TestFallback:
+    def test_untranslatable_and_dependents_fall_back(self, messy_vt: ViewTable) -> None:
+        exprs = {"y": "YEAR(a)", "y1": "y + 1", "cat": "s + s", "fine": "a * 2"}
+        ws = _compile(messy_vt, exprs)
+        expected = _row_reference(messy_vt, exprs)
+        for got_row, exp_row in zip(ws.rows, expected):
+            for name in exprs:
+                assert _same(got_row[name], exp_row[name]), name
+
+    def test_flag_on_fallback_column(self, messy_vt: ViewTable) -> None:
+        flags = [{"name": "f", "expression": "cat", "severity": "info", "message": "m"}]
+        ws = _compile(messy_vt, {"cat": "s + s"}, flags)
+        # A null string makes ``s + s`` an error value, which is truthy
+        assert [bool(row) for row in ws.flags] == [
+            s != "" for s in messy_vt.df["s"].to_list()
+        ]
+
+
+class TestTranslator:
+    @pytest.mark.parametrize(
+        "expression",
+        ["YEAR(a)", "s + 1", "s > a", "x ^ a", "x ^ -1", "ROUND(x, a)", "IF(t, 1)"],
+    )
+    def test_untranslatable(self, expression: str) -> None:
+        columns = {
+            "a": RowExpr(pl.col("a"), "int"),
+            "x": RowExpr(pl.col("x"), "float"),
+            "s": RowExpr(pl.col("s"), "str"),
+            "t": RowExpr(pl.col("t"), "bool"),
+        }
+        with pytest.raises(VectorizeError):
+            translate_row_tree(parse_row_expression(expression), columns)
+
+    def test_column_kinds(self) -> None:
+        assert column_kind(pl.Int32) == "int"
+        assert column_kind(pl.Float64) == "float"
+        assert column_kind(pl.Boolean) == "bool"
+        assert column_kind(pl.String) == "str"
+        assert column_kind(pl.Date) == "other"